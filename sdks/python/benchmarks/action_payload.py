@@ -0,0 +1,151 @@
+"""
+Measures the CPU time and memory it takes to turn an assigned action's payload into a task's
+validated input, for payloads with large parent outputs, comparing the eager decoding the action
+listener used to do with the lazy `ActionPayload`.
+
+    poetry run python benchmarks/action_payload.py --parents 4 --parent-kb 256
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    ActionPayload,
+    parse_additional_metadata,
+)
+from hatchet_sdk.utils.typing import JSONSerializableMapping
+
+
+class EagerActionPayload(BaseModel):
+    """The `ActionPayload` model the action listener used to decode every payload into."""
+
+    model_config = ConfigDict(extra="allow")
+
+    input: JSONSerializableMapping = Field(default_factory=dict)
+    parents: dict[str, JSONSerializableMapping] = Field(default_factory=dict)
+    overrides: JSONSerializableMapping = Field(default_factory=dict)
+    user_data: JSONSerializableMapping = Field(default_factory=dict)
+    step_run_errors: dict[str, str] = Field(default_factory=dict)
+    triggered_by: str | None = None
+    triggers: JSONSerializableMapping = Field(default_factory=dict)
+
+    @field_validator(
+        "input", "parents", "overrides", "user_data", "step_run_errors", mode="before"
+    )
+    @classmethod
+    def validate_fields(cls, v: Any) -> Any:
+        return v or {}
+
+
+class TaskInput(BaseModel):
+    user_id: int
+    email: str
+    tags: list[str]
+
+
+def make_payload(parents: int, parent_kb: int) -> tuple[bytes, str]:
+    row = {"id": 0, "name": "x" * 32, "score": 0.5, "labels": ["a", "b", "c"]}
+    rows = max(1, parent_kb * 1024 // len(json.dumps(row)))
+
+    payload = {
+        "input": {"user_id": 1, "email": "user@example.com", "tags": ["a", "b"]},
+        "parents": {
+            f"parent_{i}": {"rows": [{**row, "id": j} for j in range(rows)]}
+            for i in range(parents)
+        },
+        "overrides": {},
+        "user_data": {},
+        "triggered_by": "manual",
+        "triggers": {},
+    }
+    metadata = {"hatchet__traceparent": "00-" + "0" * 32 + "-" + "0" * 16 + "-01"}
+
+    return json.dumps(payload).encode(), json.dumps(metadata)
+
+
+def eager(raw: bytes, metadata: str, read_parents: bool) -> Any:
+    payload = EagerActionPayload.model_validate_json(raw)
+    parse_additional_metadata(metadata)
+
+    ## the span attributes re-dumped the decoded payload
+    json.dumps(payload.model_dump(), default=str)
+
+    if read_parents:
+        payload.parents["parent_0"]
+
+    return TaskInput.model_validate(payload.input)
+
+
+def lazy(raw: bytes, metadata: str, read_parents: bool) -> Any:
+    payload = ActionPayload.from_raw(raw)
+    parse_additional_metadata(metadata)
+
+    if read_parents:
+        payload.parents["parent_0"]
+
+    return payload.validate_input(TaskInput)
+
+
+def measure(
+    decode: Callable[[bytes, str, bool], Any],
+    raw: bytes,
+    metadata: str,
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    decode(raw, metadata, args.read_parents)
+
+    start = time.process_time()
+
+    for _ in range(args.actions):
+        decode(raw, metadata, args.read_parents)
+
+    cpu = (time.process_time() - start) / args.actions
+
+    tracemalloc.start()
+    decode(raw, metadata, args.read_parents)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cpu_us_per_action": round(cpu * 1e6, 1),
+        "peak_alloc_kb_per_action": round(peak / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--actions", type=int, default=200)
+    parser.add_argument("--parents", type=int, default=4)
+    parser.add_argument(
+        "--parent-kb", type=int, default=256, help="size of each parent's output"
+    )
+    parser.add_argument(
+        "--read-parents",
+        action="store_true",
+        help="read a parent's output in each action, as a task that uses it would",
+    )
+    args = parser.parse_args()
+
+    raw, metadata = make_payload(args.parents, args.parent_kb)
+
+    for mode, decode in [("eager", eager), ("lazy", lazy)]:
+        result = measure(decode, raw, metadata, args)
+        print(
+            json.dumps(
+                {
+                    "mode": mode,
+                    "payload_kb": round(len(raw) / 1024),
+                    "read_parents": args.read_parents,
+                    **result,
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
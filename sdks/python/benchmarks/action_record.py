@@ -0,0 +1,140 @@
+"""
+Measures the per-action cost of building an `ActionRecord` from an `AssignedAction` and of pickling and
+unpickling it (as the queue transport does between the action listener process and the runner),
+comparing the pydantic `Action` the action listener used to build with the slotted `ActionRecord` it
+builds now.
+
+    poetry run python benchmarks/action_record.py --actions 100000
+"""
+
+import argparse
+import json
+import pickle
+import timeit
+from typing import Any, Callable
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    ActionPayload,
+    ActionRecord,
+    ActionType,
+    parse_additional_metadata,
+)
+from hatchet_sdk.contracts.dispatcher_pb2 import ActionType as ActionTypeProto
+from hatchet_sdk.contracts.dispatcher_pb2 import AssignedAction
+from hatchet_sdk.utils.proto_enums import convert_proto_enum_to_python
+from hatchet_sdk.utils.typing import JSONSerializableMapping
+
+
+class PydanticAction(BaseModel):
+    """The pydantic `Action` as the action listener used to build it."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    worker_id: str
+    tenant_id: str
+    workflow_run_id: str
+    get_group_key_run_id: str
+    job_id: str
+    job_name: str
+    job_run_id: str
+    step_id: str
+    step_run_id: str
+    action_id: str
+    action_type: ActionType
+    retry_count: int
+    action_payload: ActionPayload
+    additional_metadata: JSONSerializableMapping = Field(default_factory=dict)
+
+    child_workflow_index: int | None = None
+    child_workflow_key: str | None = None
+    parent_workflow_run_id: str | None = None
+
+
+def pydantic_from_proto(assigned_action: AssignedAction) -> PydanticAction:
+    return PydanticAction(
+        tenant_id=assigned_action.tenantId,
+        worker_id="worker",
+        workflow_run_id=assigned_action.workflowRunId,
+        get_group_key_run_id=assigned_action.getGroupKeyRunId,
+        job_id=assigned_action.jobId,
+        job_name=assigned_action.jobName,
+        job_run_id=assigned_action.jobRunId,
+        step_id=assigned_action.stepId,
+        step_run_id=assigned_action.stepRunId,
+        action_id=assigned_action.actionId,
+        action_payload=ActionPayload.from_raw(assigned_action.actionPayload),
+        action_type=convert_proto_enum_to_python(
+            assigned_action.actionType, ActionType, ActionTypeProto
+        ),
+        retry_count=assigned_action.retryCount,
+        additional_metadata=parse_additional_metadata(
+            assigned_action.additional_metadata
+        ),
+        child_workflow_index=assigned_action.child_workflow_index,
+        child_workflow_key=assigned_action.child_workflow_key,
+        parent_workflow_run_id=assigned_action.parent_workflow_run_id,
+    )
+
+
+def slotted_from_proto(assigned_action: AssignedAction) -> ActionRecord:
+    return ActionRecord.from_proto(assigned_action, "worker")
+
+
+def per_action_us(fn: Callable[[], Any], actions: int) -> float:
+    return round(timeit.timeit(fn, number=actions) / actions * 1e6, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--actions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    assigned_action = AssignedAction(
+        tenantId="707d0855-80ab-4e1f-a156-f1c4546cbf52",
+        workflowRunId="9b7a6e31-4f0b-4c55-9a0e-e3f1e0c2a9f1",
+        getGroupKeyRunId="",
+        jobId="2c1d8e47-2b8e-4bd2-8a0b-6f1e2c7d9a11",
+        jobName="process-order",
+        jobRunId="5f0c2e9b-0d1c-4d7e-9c2a-4b8f6a1e3d22",
+        stepId="8a3e6b1c-7f2d-4e9a-b5c0-1d2e3f4a5b33",
+        stepRunId="c4d5e6f7-8a9b-4c0d-9e1f-2a3b4c5d6e44",
+        actionId="process-order:charge",
+        actionType=ActionTypeProto.START_STEP_RUN,
+        actionPayload=json.dumps({"input": {"order_id": 1234, "amount": 99.5}}),
+        retryCount=0,
+        additional_metadata=json.dumps({"source": "api", "region": "us-east-1"}),
+        child_workflow_index=0,
+        child_workflow_key="",
+        parent_workflow_run_id="",
+    )
+
+    for mode, from_proto in [
+        ("pydantic", pydantic_from_proto),
+        ("slotted", slotted_from_proto),
+    ]:
+        action: Any = from_proto(assigned_action)
+        pickled = pickle.dumps(action)
+
+        print(
+            json.dumps(
+                {
+                    "mode": mode,
+                    "construct_us": per_action_us(
+                        lambda: from_proto(assigned_action), args.actions
+                    ),
+                    "pickle_us": per_action_us(
+                        lambda: pickle.dumps(action), args.actions
+                    ),
+                    "unpickle_us": per_action_us(
+                        lambda: pickle.loads(pickled), args.actions
+                    ),
+                    "pickled_bytes": len(pickled),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
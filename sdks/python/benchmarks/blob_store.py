@@ -0,0 +1,81 @@
+"""
+Measures what offloading a task output to a `LocalBlobStore` costs: the time to write it and send
+the reference, the time to read it back cold (as the first child to read a parent's output does)
+and from the store's cache, and the bytes left on the wire, next to sending the output as is.
+
+    poetry run python benchmarks/blob_store.py
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from typing import Any, Callable
+
+from hatchet_sdk.blob_store import LocalBlobStore, resolve_blob_reference
+from hatchet_sdk.contracts.dispatcher_pb2 import StepActionEvent
+
+SIZES = {"1MB": 1024 * 1024, "4MB": 4 * 1024 * 1024, "16MB": 16 * 1024 * 1024}
+
+
+def timed(fn: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        fn()
+
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for label, size in SIZES.items():
+            output = json.dumps({"data": "x" * size}).encode()
+            cold = LocalBlobStore(root, cache_bytes=0)
+            cached = LocalBlobStore(root)
+
+            reference = cold.offload(output)
+            value = json.loads(reference)
+            resolve_blob_reference(value, cached)
+
+            print(
+                json.dumps(
+                    {
+                        "size": label,
+                        "wire_bytes": StepActionEvent(
+                            eventPayload=output  # type: ignore[arg-type]
+                        ).ByteSize(),
+                        "offloaded_wire_bytes": StepActionEvent(
+                            eventPayload=reference  # type: ignore[arg-type]
+                        ).ByteSize(),
+                        "offload_ms": round(
+                            timed(lambda: cold.offload(output), args.iterations) * 1e3,
+                            2,
+                        ),
+                        "read_cold_ms": round(
+                            timed(
+                                lambda: resolve_blob_reference(value, cold),
+                                args.iterations,
+                            )
+                            * 1e3,
+                            2,
+                        ),
+                        "read_cached_us": round(
+                            timed(
+                                lambda: resolve_blob_reference(value, cached),
+                                args.iterations,
+                            )
+                            * 1e6,
+                            2,
+                        ),
+                    }
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
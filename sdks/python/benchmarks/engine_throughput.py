@@ -0,0 +1,226 @@
+"""
+Measures the SDK end to end against the in-process `FakeEngine`, with no engine or network in the
+way: how many tasks per second a worker completes (for an async and a sync task), how many runs
+per second a client triggers and events it pushes, and how long a client waits for a run's result.
+The worker and the client run in their own processes, and the engine's records give the worker's
+numbers, from each task being assigned to its result arriving.
+
+    poetry run python benchmarks/engine_throughput.py --runs 5000 --slots 100 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import statistics
+import time
+from multiprocessing.queues import Queue
+from typing import Any, Awaitable, Callable
+
+from hatchet_sdk import Context, EmptyModel, Hatchet
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.runnables.workflow import Workflow
+from hatchet_sdk.testing import FakeEngine
+
+
+def workflows(hatchet: Hatchet, task_ms: float) -> dict[str, Workflow[EmptyModel]]:
+    aio_workflow = hatchet.workflow(name="benchmark-async")
+    sync_workflow = hatchet.workflow(name="benchmark-sync")
+    idle_workflow = hatchet.workflow(name="benchmark-idle")
+
+    @aio_workflow.task()
+    async def aio_task(input: EmptyModel, ctx: Context) -> dict[str, int]:
+        await asyncio.sleep(task_ms / 1000)
+        return {"done": 1}
+
+    @sync_workflow.task()
+    def sync_task(input: EmptyModel, ctx: Context) -> dict[str, int]:
+        time.sleep(task_ms / 1000)
+        return {"done": 1}
+
+    ## no worker runs it, so its runs stay queued
+    @idle_workflow.task()
+    async def idle_task(input: EmptyModel, ctx: Context) -> None:
+        pass
+
+    return {"async": aio_workflow, "sync": sync_workflow, "idle": idle_workflow}
+
+
+def work(config: ClientConfig, slots: int, task_ms: float) -> None:
+    ## in a process group of its own, to be killed along with its action listener process
+    os.setpgrp()
+
+    hatchet = Hatchet(config=config)
+    registered = workflows(hatchet, task_ms)
+    worker = hatchet.worker(
+        "benchmark", slots=slots, workflows=[registered["async"], registered["sync"]]
+    )
+    worker.start()
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+
+    def at(p: float) -> float:
+        return round(samples[min(int(len(samples) * p), len(samples) - 1)] * 1000, 2)
+
+    return {
+        "p50_ms": at(0.5),
+        "p90_ms": at(0.9),
+        "p99_ms": at(0.99),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2),
+    }
+
+
+def measure_worker(
+    engine: FakeEngine, workflow_name: str, args: argparse.Namespace
+) -> dict[str, Any]:
+    run_ids = engine.generate(workflow_name, count=args.runs, rate=args.rate).result()
+    engine.wait_for_runs(run_ids, timeout=600)
+
+    step_runs = [
+        step_run
+        for run_id in run_ids
+        for step_run in engine.workflow_runs[run_id].step_runs.values()
+    ]
+    assigned = [s.assigned_at for s in step_runs if s.assigned_at is not None]
+    finished = [s.finished_at for s in step_runs if s.finished_at is not None]
+
+    return {
+        "scenario": f"worker ({workflow_name})",
+        "tasks": len(step_runs),
+        "failed": sum(s.status != "completed" for s in step_runs),
+        "tasks_per_sec": round(len(step_runs) / (max(finished) - min(assigned))),
+        "assigned_to_result": percentiles(
+            [
+                s.finished_at - s.assigned_at
+                for s in step_runs
+                if s.finished_at is not None and s.assigned_at is not None
+            ]
+        ),
+    }
+
+
+async def rate(
+    name: str, count: int, concurrency: int, call: Callable[[], Awaitable[Any]]
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    remaining = iter(range(count))
+
+    async def caller() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[caller() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": name,
+        "calls": count,
+        "calls_per_sec": round(count / elapsed),
+        "latency": percentiles(latencies),
+    }
+
+
+async def aio_measure_client(
+    config: ClientConfig, args: argparse.Namespace, results: "Queue[dict[str, Any]]"
+) -> None:
+    hatchet = Hatchet(config=config)
+    registered = workflows(hatchet, args.task_ms)
+
+    idle = registered["idle"]
+    await hatchet._client.admin.aio_put_workflow(
+        idle._get_name(config.namespace), idle._get_create_opts(config.namespace)
+    )
+
+    results.put(
+        await rate(
+            "trigger (aio_run_no_wait)",
+            args.runs,
+            args.concurrency,
+            registered["idle"].aio_run_no_wait,
+        )
+    )
+    results.put(
+        await rate(
+            "push event (aio_push)",
+            args.runs,
+            args.concurrency,
+            lambda: hatchet.event.aio_push("benchmark:event", {}),
+        )
+    )
+
+    for kind in ("async", "sync"):
+
+        async def run_and_wait(
+            workflow: Workflow[EmptyModel] = registered[kind],
+        ) -> None:
+            ref = await workflow.aio_run_no_wait()
+            await ref.aio_result()
+
+        results.put(
+            await rate(
+                f"trigger and wait for result ({kind})",
+                args.runs,
+                args.concurrency,
+                run_and_wait,
+            )
+        )
+
+
+def measure_client(
+    config: ClientConfig, args: argparse.Namespace, results: "Queue[dict[str, Any]]"
+) -> None:
+    try:
+        asyncio.run(aio_measure_client(config, args, results))
+    finally:
+        results.put({})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=5_000)
+    parser.add_argument("--slots", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument(
+        "--rate", type=float, default=None, help="runs per second, all at once if unset"
+    )
+    parser.add_argument("--task-ms", type=float, default=0)
+    parser.add_argument("--single-process", action="store_true")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+
+    with FakeEngine() as engine:
+        config = engine.client_config(worker_single_process=args.single_process)
+
+        ## killed rather than stopped, since stopping a worker goes through the REST API
+        worker = ctx.Process(target=work, args=(config, args.slots, args.task_ms))
+        worker.start()
+
+        try:
+            engine.wait_for_workers(1, timeout=60)
+
+            for kind in ("async", "sync"):
+                print(json.dumps(measure_worker(engine, f"benchmark-{kind}", args)))
+
+            results: Queue[dict[str, Any]] = ctx.Queue()
+            client = ctx.Process(target=measure_client, args=(config, args, results))
+            client.start()
+
+            while result := results.get():
+                print(json.dumps(result))
+
+            client.join()
+        finally:
+            if worker.pid is not None:
+                os.killpg(worker.pid, signal.SIGKILL)
+
+
+if __name__ == "__main__":
+    main()
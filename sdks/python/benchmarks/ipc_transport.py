@@ -0,0 +1,220 @@
+"""
+Compares the worker's IPC transports by echoing actions through a spawned process, the way the
+action listener and runner exchange them, and reports throughput and per-hop latency. The `local`
+transport echoes on the same event loop instead, as in single process mode.
+
+    poetry run python benchmarks/ipc_transport.py --messages 50000 --payload-bytes 1024
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import time
+from typing import Any
+
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    ActionPayload,
+    ActionRecord,
+    ActionType,
+)
+from hatchet_sdk.contracts.dispatcher_pb2 import STEP_EVENT_TYPE_COMPLETED
+from hatchet_sdk.worker.action_listener_process import (
+    STOP_LOOP,
+    STOP_LOOP_TYPE,
+    ActionEvent,
+    ActionTimings,
+)
+from hatchet_sdk.worker.ipc import (
+    ActionCodec,
+    ActionEventCodec,
+    IPCChannel,
+    LocalChannel,
+    QueueChannel,
+    ShmRingChannel,
+)
+
+
+def create_action(i: int, payload_bytes: int) -> ActionRecord:
+    return ActionRecord(
+        worker_id="worker",
+        tenant_id="tenant",
+        workflow_run_id="workflow-run",
+        get_group_key_run_id="",
+        job_id="job",
+        job_name="job",
+        job_run_id="job-run",
+        step_id="step",
+        step_run_id=str(i),
+        action_id="workflow:step",
+        action_type=ActionType.START_STEP_RUN,
+        retry_count=0,
+        action_payload=ActionPayload.from_raw(
+            json.dumps({"input": {"data": "x" * payload_bytes}})
+        ),
+        raw_additional_metadata=json.dumps({"source": "benchmark"}),
+    )
+
+
+async def aio_echo(
+    actions: IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE],
+    events: IPCChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    while True:
+        action = await actions.aio_get()
+
+        if action == STOP_LOOP:
+            events.put(STOP_LOOP)
+            return
+
+        assert isinstance(action, ActionRecord)
+
+        ## the receive time rides back in the payload; perf_counter is CLOCK_MONOTONIC, so it is comparable across processes
+        events.put(
+            ActionEvent(
+                action=action,
+                type=STEP_EVENT_TYPE_COMPLETED,
+                payload=json.dumps(time.perf_counter()),
+            )
+        )
+
+
+def echo(
+    actions: IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE],
+    events: IPCChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    asyncio.run(aio_echo(actions, events))
+
+
+def percentile(values: list[float], p: float) -> float:
+    return statistics.quantiles(values, n=1000)[int(p * 10) - 1]
+
+
+async def measure(
+    actions: IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE],
+    events: IPCChannel[ActionEvent | STOP_LOOP_TYPE],
+    messages: list[ActionRecord],
+    window: int,
+) -> dict[str, Any]:
+    sent_at: dict[str, float] = {}
+    action_hops: list[float] = []
+    event_hops: list[float] = []
+    in_flight = asyncio.Semaphore(window)
+
+    async def send() -> None:
+        for action in messages:
+            await in_flight.acquire()
+            sent_at[action.step_run_id] = time.perf_counter()
+            actions.put(action)
+
+            ## let the receiver run, as the listener's gRPC stream would
+            await asyncio.sleep(0)
+
+        actions.put(STOP_LOOP)
+
+    ## one round trip first, so the child's startup is not part of the measurement
+    actions.put(create_action(-1, 0))
+    await events.aio_get()
+
+    start = time.perf_counter()
+    sender = asyncio.create_task(send())
+
+    while True:
+        event = await events.aio_get()
+
+        if event == STOP_LOOP:
+            break
+
+        assert isinstance(event, ActionEvent)
+
+        received = time.perf_counter()
+        echoed = json.loads(event.payload)
+
+        action_hops.append(echoed - sent_at.pop(event.action.step_run_id))
+        event_hops.append(received - echoed)
+        in_flight.release()
+
+    elapsed = time.perf_counter() - start
+    await sender
+
+    return {
+        "msgs_per_sec": round(len(messages) / elapsed),
+        "action_hop_p50_us": round(percentile(action_hops, 50) * 1e6, 1),
+        "action_hop_p99_us": round(percentile(action_hops, 99) * 1e6, 1),
+        "event_hop_p50_us": round(percentile(event_hops, 50) * 1e6, 1),
+        "event_hop_p99_us": round(percentile(event_hops, 99) * 1e6, 1),
+    }
+
+
+async def measure_local(messages: list[ActionRecord], window: int) -> dict[str, Any]:
+    ## single process mode: the listener and runner share one event loop
+    actions: IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE] = LocalChannel()
+    events: IPCChannel[ActionEvent | STOP_LOOP_TYPE] = LocalChannel()
+
+    echoer = asyncio.create_task(aio_echo(actions, events))
+    result = await measure(actions, events, messages, window)
+    await echoer
+
+    return result
+
+
+def run_transport(transport: str, args: argparse.Namespace) -> dict[str, Any]:
+    messages = [create_action(i, args.payload_bytes) for i in range(args.messages)]
+
+    if transport == "local":
+        return {
+            "transport": transport,
+            **asyncio.run(measure_local(messages, args.window)),
+        }
+
+    ctx = multiprocessing.get_context("spawn")
+
+    actions: IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE]
+    events: IPCChannel[ActionEvent | STOP_LOOP_TYPE]
+
+    if transport == "shm":
+        actions = ShmRingChannel(ctx, ActionCodec(), args.buffer_size)
+        events = ShmRingChannel(ctx, ActionEventCodec(), args.buffer_size)
+    else:
+        actions = QueueChannel(ctx)
+        events = QueueChannel(ctx)
+
+    process = ctx.Process(target=echo, args=(actions, events))
+    process.start()
+
+    try:
+        result = asyncio.run(measure(actions, events, messages, args.window))
+    finally:
+        process.join(timeout=10)
+        actions.close()
+        events.close()
+
+    return {"transport": transport, **result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--payload-bytes", type=int, default=1024)
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=100,
+        help="maximum number of actions in flight, like a worker's slots",
+    )
+    parser.add_argument("--buffer-size", type=int, default=16 * 1024 * 1024)
+    parser.add_argument(
+        "--transport",
+        choices=["queue", "shm", "local"],
+        action="append",
+        default=None,
+    )
+    args = parser.parse_args()
+
+    for transport in args.transport or ["queue", "shm", "local"]:
+        print(json.dumps(run_transport(transport, args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Measures how many log lines per second a worker gets to the engine, against a stand-in events
+service that answers `PutLog` after a fixed delay, for step runs logging at once. It compares one
+`PutLog` per line on a single-thread executor (what `Context.log` used to do) with the
+`LogShipper`, and reports how long the logging calls themselves took.
+
+    poetry run python benchmarks/log_shipper.py --lines 20000 --step-runs 10 --latency-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.sharedctypes import Synchronized
+from typing import Any, Callable
+
+import grpc
+
+from hatchet_sdk.clients.events import EventClient, new_event
+from hatchet_sdk.clients.log_shipper import LogShipper
+from hatchet_sdk.config import ClientConfig, ClientTLSConfig
+from hatchet_sdk.connection import shared_conn
+from hatchet_sdk.contracts.events_pb2 import PutLogRequest, PutLogResponse
+from hatchet_sdk.contracts.events_pb2_grpc import (
+    EventsServiceServicer,
+    add_EventsServiceServicer_to_server,
+)
+
+
+class StandInEventsService(EventsServiceServicer):
+    def __init__(self, latency: float, received: "Synchronized[int]") -> None:
+        self.latency = latency
+        self.received = received
+
+    async def PutLog(self, request: PutLogRequest, context: Any) -> PutLogResponse:
+        await asyncio.sleep(self.latency)
+
+        with self.received.get_lock():
+            self.received.value += request.message.count("\n") + 1
+
+        return PutLogResponse()
+
+
+async def aio_serve(port: int, latency: float, received: "Synchronized[int]") -> None:
+    server = grpc.aio.server()
+    add_EventsServiceServicer_to_server(StandInEventsService(latency, received), server)  # type: ignore[no-untyped-call]
+    server.add_insecure_port(f"localhost:{port}")
+
+    await server.start()
+    await server.wait_for_termination()
+
+
+def serve(port: int, latency: float, received: "Synchronized[int]") -> None:
+    asyncio.run(aio_serve(port, latency, received))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return int(s.getsockname()[1])
+
+
+def wait_for_server(port: int) -> None:
+    deadline = time.monotonic() + 10
+
+    while True:
+        try:
+            socket.create_connection(("localhost", port)).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(0.05)
+
+
+def per_line_executor(
+    event_client: EventClient,
+) -> tuple[Callable[[str, str], None], Callable[[], None]]:
+    pools: dict[str, ThreadPoolExecutor] = {}
+
+    def log(step_run_id: str, line: str) -> None:
+        ## every context had its own single-thread executor
+        pool = pools.setdefault(step_run_id, ThreadPoolExecutor(max_workers=1))
+        pool.submit(event_client.log, message=line, step_run_id=step_run_id)
+
+    def flush() -> None:
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+    return log, flush
+
+
+def shipper(
+    config: ClientConfig,
+) -> tuple[Callable[[str, str], None], Callable[[], None]]:
+    log_shipper = LogShipper(config, max_buffer_lines=1_000_000)
+
+    return log_shipper.send, lambda: log_shipper.close()
+
+
+def measure(
+    name: str,
+    setup: tuple[Callable[[str, str], None], Callable[[], None]],
+    received: "Synchronized[int]",
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    log, flush = setup
+    received.value = 0
+    lines_per_step_run = args.lines // args.step_runs
+    logging_time = [0.0] * args.step_runs
+
+    def step_run(i: int) -> None:
+        start = time.perf_counter()
+
+        for n in range(lines_per_step_run):
+            log(f"step-run-{i}", f"processed record {n} of step run {i}")
+
+        logging_time[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=step_run, args=(i,)) for i in range(args.step_runs)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    flush()
+    elapsed = time.perf_counter() - start
+    lines = lines_per_step_run * args.step_runs
+
+    assert received.value == lines, (received.value, lines)
+
+    return {
+        "log_path": name,
+        "lines": lines,
+        "delivered_lines_per_sec": round(lines / elapsed),
+        "log_call_us": round(
+            sum(logging_time) / args.step_runs / lines_per_step_run * 1e6, 2
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--lines", type=int, default=20_000)
+    parser.add_argument("--step-runs", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    received: Synchronized[int] = ctx.Value("q", 0)
+
+    port = free_port()
+    server = ctx.Process(
+        target=serve, args=(port, args.latency_ms / 1000, received), daemon=True
+    )
+    server.start()
+    wait_for_server(port)
+
+    config = ClientConfig(
+        token="benchmark",
+        tenant_id="benchmark",
+        host_port=f"localhost:{port}",
+        tls_config=ClientTLSConfig(strategy="none"),
+    )
+    event_client = new_event(shared_conn(config, False), config)
+
+    try:
+        for name, setup in [
+            ("PutLog per line", per_line_executor(event_client)),
+            ("LogShipper", shipper(config)),
+        ]:
+            print(json.dumps(measure(name, setup, received, args)))
+    finally:
+        server.kill()
+
+
+if __name__ == "__main__":
+    main()
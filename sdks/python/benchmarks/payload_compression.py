@@ -0,0 +1,110 @@
+"""
+Reports how many bytes a task output takes on the wire as a `StepActionEvent` with and without
+payload compression, and what compressing and decompressing it costs in CPU time. Channel-level
+gzip is estimated by gzipping the serialized message at zlib's default level, as gRPC does with
+each message.
+
+    poetry run python benchmarks/payload_compression.py
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+from typing import Any, Callable
+
+from hatchet_sdk.compression import compress_payload, decompressed_payload
+from hatchet_sdk.contracts.dispatcher_pb2 import StepActionEvent
+
+SIZES = {"100KB": 100 * 1024, "1MB": 1024 * 1024, "3MB": 3 * 1024 * 1024}
+
+
+def make_output(size: int) -> bytes:
+    rng = random.Random(0)
+    rows: list[dict[str, Any]] = []
+    encoded = 2
+
+    while encoded < size:
+        row = {
+            "id": len(rows),
+            "customer_id": f"cus_{rng.randrange(10**8):08d}",
+            "status": rng.choice(["paid", "refunded", "pending", "failed"]),
+            "amount": round(rng.uniform(1, 500), 2),
+            "currency": "usd",
+            "created_at": f"2025-0{rng.randrange(1, 10)}-1{rng.randrange(10)}T12:00:00Z",
+        }
+        rows.append(row)
+        encoded += len(json.dumps(row)) + 2
+
+    return json.dumps({"rows": rows}).encode()
+
+
+def timed(fn: Callable[[], Any], iterations: int) -> float:
+    start = time.process_time()
+
+    for _ in range(iterations):
+        fn()
+
+    return (time.process_time() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    for label, size in SIZES.items():
+        output = make_output(size)
+        compressed = compress_payload(output, threshold=1)
+        marker = json.loads(compressed)
+
+        plain_event = StepActionEvent(eventPayload=output)  # type: ignore[arg-type]
+        compressed_event = StepActionEvent(eventPayload=compressed)  # type: ignore[arg-type]
+
+        plain_bytes = plain_event.ByteSize()
+        compressed_bytes = compressed_event.ByteSize()
+        gzip_bytes = len(
+            gzip.compress(plain_event.SerializeToString(), compresslevel=6)
+        )
+
+        print(
+            json.dumps(
+                {
+                    "size": label,
+                    "wire_bytes": plain_bytes,
+                    "payload_compressed_wire_bytes": compressed_bytes,
+                    "payload_compressed_saved_pct": round(
+                        100 * (1 - compressed_bytes / plain_bytes), 1
+                    ),
+                    "gzip_channel_wire_bytes": gzip_bytes,
+                    "gzip_channel_saved_pct": round(
+                        100 * (1 - gzip_bytes / plain_bytes), 1
+                    ),
+                    "compress_ms": round(
+                        timed(lambda: compress_payload(output, 1), args.iterations)
+                        * 1e3,
+                        2,
+                    ),
+                    "decompress_ms": round(
+                        timed(lambda: decompressed_payload(marker), args.iterations)
+                        * 1e3,
+                        2,
+                    ),
+                    "gzip_channel_ms": round(
+                        timed(
+                            lambda: gzip.compress(
+                                plain_event.SerializeToString(), compresslevel=6
+                            ),
+                            args.iterations,
+                        )
+                        * 1e3,
+                        2,
+                    ),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Measures how long each serializer takes to encode a payload into a `PushEventRequest` and to decode
+it again, for 1KB, 100KB and 3MB payloads, next to the `json.dumps` to `str` path the SDK used to
+take.
+
+    poetry run python benchmarks/serializer.py
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+from hatchet_sdk.contracts.events_pb2 import PushEventRequest
+from hatchet_sdk.serializer import (
+    JSONSerializer,
+    OrjsonSerializer,
+    PydanticCoreSerializer,
+    Serializer,
+)
+
+SIZES = {"1KB": 1024, "100KB": 100 * 1024, "3MB": 3 * 1024 * 1024}
+
+
+def make_payload(size: int) -> dict[str, Any]:
+    row = {"id": 0, "name": "x" * 24, "score": 0.25, "active": True, "tags": ["a"]}
+    rows = max(1, size // len(json.dumps(row)))
+
+    return {"rows": [{**row, "id": i} for i in range(rows)]}
+
+
+def best_of(fn: Callable[[], Any], iterations: int) -> float:
+    fn()
+
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        fn()
+
+    return (time.perf_counter() - start) / iterations
+
+
+class StdlibStrSerializer(Serializer):
+    """What the SDK used to do: encode to a `str` with the standard library's `json`."""
+
+    def dumps(self, value: Any) -> Any:
+        return json.dumps(value)
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=500,
+        help="roughly how long to spend measuring each serializer at each size",
+    )
+    args = parser.parse_args()
+
+    serializers: dict[str, Serializer] = {
+        "json (before)": StdlibStrSerializer(),
+        "json": JSONSerializer(),
+        "pydantic": PydanticCoreSerializer(),
+    }
+
+    try:
+        serializers["orjson"] = OrjsonSerializer()
+    except ModuleNotFoundError:
+        pass
+
+    for label, size in SIZES.items():
+        payload = make_payload(size)
+        encoded = json.dumps(payload)
+        iterations = max(1, int(args.budget_ms / 1e3 / (len(encoded) / 100e6)))
+
+        for name, serializer in serializers.items():
+
+            def encode() -> None:
+                PushEventRequest(
+                    key="event",
+                    payload=serializer.dumps(payload),  # type: ignore[arg-type]
+                )
+
+            def decode() -> None:
+                serializer.loads(encoded)
+
+            print(
+                json.dumps(
+                    {
+                        "size": label,
+                        "serializer": name,
+                        "encode_us": round(best_of(encode, iterations) * 1e6, 1),
+                        "decode_us": round(best_of(decode, iterations) * 1e6, 1),
+                    }
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
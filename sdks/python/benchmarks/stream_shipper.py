@@ -0,0 +1,199 @@
+"""
+Streams tokens from step runs, as an LLM task would, to a stand-in events service that answers
+`PutStreamEvent` after a fixed delay, and reports how many tokens per second reach the engine and in
+how many stream events. It compares one `PutStreamEvent` per token on a single-thread executor
+(what `Context.put_stream` used to do) with the `StreamShipper`, through `send` and `aio_send`.
+
+    poetry run python benchmarks/stream_shipper.py --tokens 20000 --step-runs 10 --latency-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.sharedctypes import Synchronized
+from typing import Any
+
+import grpc
+
+from hatchet_sdk.clients.events import new_event
+from hatchet_sdk.clients.stream_shipper import StreamShipper
+from hatchet_sdk.config import ClientConfig, ClientTLSConfig
+from hatchet_sdk.connection import shared_conn
+from hatchet_sdk.contracts.events_pb2 import (
+    PutStreamEventRequest,
+    PutStreamEventResponse,
+)
+from hatchet_sdk.contracts.events_pb2_grpc import (
+    EventsServiceServicer,
+    add_EventsServiceServicer_to_server,
+)
+
+TOKEN = b"tok "
+
+
+class StandInEventsService(EventsServiceServicer):
+    def __init__(
+        self,
+        latency: float,
+        events: "Synchronized[int]",
+        received: "Synchronized[int]",
+    ) -> None:
+        self.latency = latency
+        self.events = events
+        self.received = received
+
+    async def PutStreamEvent(
+        self, request: PutStreamEventRequest, context: Any
+    ) -> PutStreamEventResponse:
+        await asyncio.sleep(self.latency)
+
+        with self.received.get_lock():
+            self.events.value += 1
+            self.received.value += len(request.message)
+
+        return PutStreamEventResponse()
+
+
+async def aio_serve(
+    port: int,
+    latency: float,
+    events: "Synchronized[int]",
+    received: "Synchronized[int]",
+) -> None:
+    server = grpc.aio.server()
+    add_EventsServiceServicer_to_server(StandInEventsService(latency, events, received), server)  # type: ignore[no-untyped-call]
+    server.add_insecure_port(f"localhost:{port}")
+
+    await server.start()
+    await server.wait_for_termination()
+
+
+def serve(
+    port: int,
+    latency: float,
+    events: "Synchronized[int]",
+    received: "Synchronized[int]",
+) -> None:
+    asyncio.run(aio_serve(port, latency, events, received))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return int(s.getsockname()[1])
+
+
+def wait_for_server(port: int) -> None:
+    deadline = time.monotonic() + 10
+
+    while True:
+        try:
+            socket.create_connection(("localhost", port)).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(0.05)
+
+
+async def per_token_executor(config: ClientConfig, args: argparse.Namespace) -> None:
+    event_client = new_event(shared_conn(config, False), config)
+
+    async def step_run(i: int) -> None:
+        ## every context had its own single-thread executor
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            for _ in range(args.tokens // args.step_runs):
+                pool.submit(event_client.stream, TOKEN, f"step-run-{i}")
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*[step_run(i) for i in range(args.step_runs)])
+
+
+async def shipper_send(config: ClientConfig, args: argparse.Namespace) -> None:
+    shipper = StreamShipper(config)
+
+    async def step_run(i: int) -> None:
+        for _ in range(args.tokens // args.step_runs):
+            shipper.send(f"step-run-{i}", TOKEN)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*[step_run(i) for i in range(args.step_runs)])
+    await asyncio.to_thread(shipper.close)
+
+
+async def shipper_aio_send(config: ClientConfig, args: argparse.Namespace) -> None:
+    shipper = StreamShipper(config)
+
+    async def step_run(i: int) -> None:
+        for _ in range(args.tokens // args.step_runs):
+            await shipper.aio_send(f"step-run-{i}", TOKEN)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*[step_run(i) for i in range(args.step_runs)])
+    await asyncio.to_thread(shipper.close)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--step-runs", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    events: Synchronized[int] = ctx.Value("q", 0)
+    received: Synchronized[int] = ctx.Value("q", 0)
+
+    port = free_port()
+    server = ctx.Process(
+        target=serve,
+        args=(port, args.latency_ms / 1000, events, received),
+        daemon=True,
+    )
+    server.start()
+    wait_for_server(port)
+
+    config = ClientConfig(
+        token="benchmark",
+        tenant_id="benchmark",
+        host_port=f"localhost:{port}",
+        tls_config=ClientTLSConfig(strategy="none"),
+    )
+    tokens = args.tokens // args.step_runs * args.step_runs
+
+    try:
+        for name, run in [
+            ("PutStreamEvent per token", per_token_executor),
+            ("StreamShipper.send", shipper_send),
+            ("StreamShipper.aio_send", shipper_aio_send),
+        ]:
+            events.value = 0
+            received.value = 0
+
+            start = time.perf_counter()
+            asyncio.run(run(config, args))
+            elapsed = time.perf_counter() - start
+
+            assert received.value == tokens * len(TOKEN), (received.value, tokens)
+
+            print(
+                json.dumps(
+                    {
+                        "stream_path": name,
+                        "tokens": tokens,
+                        "stream_events": events.value,
+                        "delivered_tokens_per_sec": round(tokens / elapsed),
+                    }
+                )
+            )
+    finally:
+        server.kill()
+
+
+if __name__ == "__main__":
+    main()
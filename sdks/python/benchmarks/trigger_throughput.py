@@ -0,0 +1,180 @@
+"""
+Measures how many workflow runs a single event loop can trigger per second against a stub engine
+that answers `TriggerWorkflow` after a fixed delay, comparing the blocking sync stub the aio
+methods used to call, a thread hop per call (`asyncio.to_thread`), and the native `grpc.aio` path.
+
+    poetry run python benchmarks/trigger_throughput.py --triggers 2000 --concurrency 100 --latency-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+import grpc
+
+from hatchet_sdk.clients.admin import AdminClient, TriggerWorkflowOptions
+from hatchet_sdk.config import ClientConfig, ClientTLSConfig
+from hatchet_sdk.contracts import workflows_pb2 as v0_workflow_protos
+from hatchet_sdk.contracts.workflows_pb2_grpc import (
+    WorkflowServiceServicer,
+    add_WorkflowServiceServicer_to_server,
+)
+from hatchet_sdk.metadata import get_metadata
+
+
+class StubWorkflowService(WorkflowServiceServicer):
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def TriggerWorkflow(
+        self, request: v0_workflow_protos.TriggerWorkflowRequest, context: Any
+    ) -> v0_workflow_protos.TriggerWorkflowResponse:
+        await asyncio.sleep(self.latency)
+
+        return v0_workflow_protos.TriggerWorkflowResponse(
+            workflow_run_id=str(uuid.uuid4())
+        )
+
+
+async def aio_serve(port: int, latency: float) -> None:
+    server = grpc.aio.server()
+    add_WorkflowServiceServicer_to_server(StubWorkflowService(latency), server)  # type: ignore[no-untyped-call]
+    server.add_insecure_port(f"localhost:{port}")
+
+    await server.start()
+    await server.wait_for_termination()
+
+
+def serve(port: int, latency: float) -> None:
+    asyncio.run(aio_serve(port, latency))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return int(s.getsockname()[1])
+
+
+def wait_for_server(port: int) -> None:
+    deadline = time.monotonic() + 10
+
+    while True:
+        try:
+            socket.create_connection(("localhost", port)).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(0.05)
+
+
+async def measure(
+    trigger: Callable[[], Awaitable[Any]], triggers: int, concurrency: int
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    remaining = triggers
+
+    async def run() -> None:
+        nonlocal remaining
+
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await trigger()
+            latencies.append(time.perf_counter() - start)
+
+    ## warm up the channel, so connecting isn't part of the measurement
+    await trigger()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[run() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    return {
+        "triggers_per_sec": round(triggers / elapsed),
+        "latency_p50_ms": round(latencies[len(latencies) // 2] * 1e3, 2),
+        "latency_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1e3, 2),
+    }
+
+
+async def run_mode(mode: str, admin: AdminClient, args: argparse.Namespace) -> Any:
+    request = admin._create_workflow_run_request(
+        "benchmark", admin._encode_input({}), TriggerWorkflowOptions()
+    )
+
+    async def blocking() -> Any:
+        ## what `aio_run_workflow` used to do: call the sync stub on the event loop
+        return admin.v0_client.TriggerWorkflow(
+            request, metadata=get_metadata(admin.token)
+        )
+
+    async def thread() -> Any:
+        return await asyncio.to_thread(
+            admin.v0_client.TriggerWorkflow,
+            request,
+            metadata=get_metadata(admin.token),
+        )
+
+    async def native() -> Any:
+        return await admin.aio_run_workflow("benchmark", {})
+
+    triggers = {"blocking": blocking, "thread": thread, "aio": native}
+
+    return await measure(triggers[mode], args.triggers, args.concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--triggers", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="number of coroutines triggering at once",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=2,
+        help="how long the stub engine takes to answer each trigger",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["blocking", "thread", "aio"],
+        action="append",
+        default=None,
+    )
+    args = parser.parse_args()
+
+    port = free_port()
+    ctx = multiprocessing.get_context("spawn")
+    server = ctx.Process(target=serve, args=(port, args.latency_ms / 1000), daemon=True)
+    server.start()
+    wait_for_server(port)
+
+    try:
+        config = ClientConfig(
+            token="benchmark",
+            tenant_id="benchmark",
+            host_port=f"localhost:{port}",
+            tls_config=ClientTLSConfig(strategy="none"),
+        )
+
+        for mode in args.mode or ["blocking", "thread", "aio"]:
+            admin = AdminClient(config)
+            result = asyncio.run(run_mode(mode, admin, args))
+            print(json.dumps({"mode": mode, **result}))
+    finally:
+        server.kill()
+
+
+if __name__ == "__main__":
+    main()
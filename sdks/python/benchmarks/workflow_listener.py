@@ -0,0 +1,190 @@
+"""
+Drives many concurrent `PooledWorkflowRunListener.result` waiters against a stand-in dispatcher,
+which finishes each subscribed workflow run after a random delay, and reports how long it takes
+for every waiter to resolve and how many subscriptions the dispatcher received.
+
+    poetry run python benchmarks/workflow_listener.py --runs 100000 --waiters-per-run 2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import resource
+import socket
+import time
+from multiprocessing.sharedctypes import Synchronized
+from typing import Any, AsyncIterator
+
+import grpc
+
+from hatchet_sdk.clients.workflow_listener import PooledWorkflowRunListener
+from hatchet_sdk.config import ClientConfig, ClientTLSConfig
+from hatchet_sdk.contracts.dispatcher_pb2 import (
+    StepRunResult,
+    SubscribeToWorkflowRunsRequest,
+    WorkflowRunEvent,
+)
+from hatchet_sdk.contracts.dispatcher_pb2_grpc import (
+    DispatcherServicer,
+    add_DispatcherServicer_to_server,
+)
+
+
+class StandInDispatcher(DispatcherServicer):
+    def __init__(self, max_delay: float, subscriptions: "Synchronized[int]") -> None:
+        self.max_delay = max_delay
+        self.subscriptions = subscriptions
+
+    async def SubscribeToWorkflowRuns(
+        self,
+        request_iterator: AsyncIterator[SubscribeToWorkflowRunsRequest],
+        context: Any,
+    ) -> AsyncIterator[WorkflowRunEvent]:
+        finished: asyncio.Queue[str] = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        async def read() -> None:
+            async for request in request_iterator:
+                with self.subscriptions.get_lock():
+                    self.subscriptions.value += 1
+
+                loop.call_later(
+                    random.random() * self.max_delay,
+                    finished.put_nowait,
+                    request.workflowRunId,
+                )
+
+        reader = asyncio.create_task(read())
+
+        try:
+            while True:
+                workflow_run_id = await finished.get()
+
+                yield WorkflowRunEvent(
+                    workflowRunId=workflow_run_id,
+                    results=[
+                        StepRunResult(
+                            stepRunId=workflow_run_id,
+                            stepReadableId="step",
+                            output=json.dumps({"run": workflow_run_id}),
+                        )
+                    ],
+                )
+        finally:
+            reader.cancel()
+
+
+async def aio_serve(
+    port: int, max_delay: float, subscriptions: "Synchronized[int]"
+) -> None:
+    server = grpc.aio.server()
+    add_DispatcherServicer_to_server(StandInDispatcher(max_delay, subscriptions), server)  # type: ignore[no-untyped-call]
+    server.add_insecure_port(f"localhost:{port}")
+
+    await server.start()
+    await server.wait_for_termination()
+
+
+def serve(port: int, max_delay: float, subscriptions: "Synchronized[int]") -> None:
+    asyncio.run(aio_serve(port, max_delay, subscriptions))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return int(s.getsockname()[1])
+
+
+def wait_for_server(port: int) -> None:
+    deadline = time.monotonic() + 10
+
+    while True:
+        try:
+            socket.create_connection(("localhost", port)).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(0.05)
+
+
+async def measure(port: int, args: argparse.Namespace) -> dict[str, Any]:
+    config = ClientConfig(
+        token="benchmark",
+        tenant_id="benchmark",
+        host_port=f"localhost:{port}",
+        tls_config=ClientTLSConfig(strategy="none"),
+    )
+    listener = PooledWorkflowRunListener(config)
+
+    ## one round trip first, so connecting isn't part of the measurement
+    await listener.result("warmup")
+
+    run_ids = [f"run-{i}" for i in range(args.runs)]
+
+    start = time.perf_counter()
+    waiters = [
+        asyncio.create_task(listener.result(run_id))
+        for run_id in run_ids
+        for _ in range(args.waiters_per_run)
+    ]
+    subscribed = time.perf_counter() - start
+
+    results = await asyncio.gather(*waiters)
+    elapsed = time.perf_counter() - start
+
+    assert all(
+        result["step"]["run"] == run_ids[i // args.waiters_per_run]
+        for i, result in enumerate(results)
+    )
+
+    return {
+        "runs": args.runs,
+        "waiters": len(waiters),
+        "subscribe_all_ms": round(subscribed * 1e3),
+        "resolve_all_ms": round(elapsed * 1e3),
+        "waiters_per_sec": round(len(waiters) / elapsed),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=100_000)
+    parser.add_argument(
+        "--waiters-per-run",
+        type=int,
+        default=1,
+        help="how many callers wait on each run's result",
+    )
+    parser.add_argument(
+        "--max-delay",
+        type=float,
+        default=5,
+        help="the most seconds the stand-in dispatcher takes to finish a run",
+    )
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    subscriptions: Synchronized[int] = ctx.Value("q", 0)
+
+    port = free_port()
+    server = ctx.Process(
+        target=serve, args=(port, args.max_delay, subscriptions), daemon=True
+    )
+    server.start()
+    wait_for_server(port)
+
+    try:
+        result = asyncio.run(measure(port, args))
+    finally:
+        server.kill()
+
+    print(json.dumps({**result, "subscriptions_received": subscriptions.value - 1}))
+
+
+if __name__ == "__main__":
+    main()
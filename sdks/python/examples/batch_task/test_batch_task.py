@@ -0,0 +1,38 @@
+import pytest
+
+from examples.batch_task.worker import ScoreInput, batch_workflow
+from hatchet_sdk import Hatchet
+
+
+# requires scope module or higher for shared event loop
+@pytest.mark.asyncio(loop_scope="session")
+async def test_invalid_input_only_fails_its_own_run(hatchet: Hatchet) -> None:
+    valid = [
+        batch_workflow.create_run_workflow_config(
+            input=ScoreInput(values=[float(j) for j in range(1, i + 1)])
+        )
+        for i in range(1, 5)
+    ]
+    ## bypasses the input validator, which would reject it before it's sent
+    invalid = batch_workflow.create_run_workflow_config().model_copy(
+        update={"input": {"values": "not a list"}}
+    )
+
+    results = {
+        ref.workflow_run_id: result
+        async for ref, result in batch_workflow.aio_run_many_iter(
+            [*valid[:2], invalid, *valid[2:]], return_exceptions=True
+        )
+    }
+
+    assert len(results) == 5
+
+    failed = [r for r in results.values() if isinstance(r, BaseException)]
+    scores = sorted(
+        r["score"]["score"]
+        for r in results.values()
+        if not isinstance(r, BaseException)
+    )
+
+    assert len(failed) == 1
+    assert scores == [1.0, 1.5, 2.0, 2.5]
@@ -0,0 +1,12 @@
+from examples.batch_task.worker import ScoreInput, batch_workflow
+
+results = batch_workflow.run_many(
+    [
+        batch_workflow.create_run_workflow_config(
+            input=ScoreInput(values=[float(j) for j in range(i)])
+        )
+        for i in range(1, 201)
+    ]
+)
+
+print(results)
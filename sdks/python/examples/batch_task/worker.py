@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from pydantic import BaseModel
+
+from hatchet_sdk import Context, Hatchet
+
+hatchet = Hatchet(debug=True)
+
+
+class ScoreInput(BaseModel):
+    values: list[float]
+
+
+class ScoreOutput(BaseModel):
+    score: float
+
+
+# ❓ Batch Task
+batch_workflow = hatchet.workflow(name="BatchScoreWorkflow", input_validator=ScoreInput)
+
+
+@batch_workflow.batch_task(max_batch=64, max_wait=timedelta(milliseconds=20))
+def score(
+    inputs: list[ScoreInput], ctxs: list[Context]
+) -> list[ScoreOutput | Exception]:
+    ## The whole batch is scored in one call, which is where a vectorized library like NumPy would come in
+    outputs: list[ScoreOutput | Exception] = []
+
+    for input in inputs:
+        if not input.values:
+            ## Returning an exception fails only this run
+            outputs.append(ValueError("cannot score an empty list of values"))
+        else:
+            outputs.append(ScoreOutput(score=sum(input.values) / len(input.values)))
+
+    return outputs
+
+
+# ‼️
+
+
+def main() -> None:
+    worker = hatchet.worker("batch-worker", slots=100, workflows=[batch_workflow])
+    worker.start()
+
+
+if __name__ == "__main__":
+    main()
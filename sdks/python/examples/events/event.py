@@ -5,3 +5,9 @@ hatchet = Hatchet()
 # ❓ Event trigger
 hatchet.event.push("user:create", {})
 # ‼️
+
+# ❓ Event producer
+with hatchet.event.producer(max_batch=500, linger_ms=5) as producer:
+    for i in range(10):
+        producer.send("user:create", {"user_id": i})
+# ‼️
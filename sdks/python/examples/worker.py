@@ -1,4 +1,5 @@
 from examples.affinity_workers.worker import affinity_worker_workflow
+from examples.batch_task.worker import batch_workflow
 from examples.bulk_fanout.worker import bulk_child_wf, bulk_parent_wf
 from examples.cancellation.worker import wf
 from examples.concurrency_limit.worker import concurrency_limit_workflow
@@ -22,6 +23,7 @@ def main() -> None:
         slots=100,
         workflows=[
             affinity_worker_workflow,
+            batch_workflow,
             bulk_child_wf,
             bulk_parent_wf,
             concurrency_limit_workflow,
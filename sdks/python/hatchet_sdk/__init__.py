@@ -1,9 +1,21 @@
+from hatchet_sdk.blob_store import (
+    BlobNotFoundError,
+    BlobStore,
+    LocalBlobStore,
+    S3BlobStore,
+)
 from hatchet_sdk.clients.admin import (
     DedupeViolationErr,
     ScheduleTriggerWorkflowOptions,
     TriggerWorkflowOptions,
 )
+from hatchet_sdk.clients.bulk import BulkRequestError
 from hatchet_sdk.clients.durable_event_listener import RegisterDurableEventRequest
+from hatchet_sdk.clients.event_producer import (
+    EventBufferFullError,
+    EventProducer,
+    EventProducerClosedError,
+)
 from hatchet_sdk.clients.events import PushEventOptions
 from hatchet_sdk.clients.rest.models.accept_invite_request import AcceptInviteRequest
 
@@ -141,10 +153,18 @@ from hatchet_sdk.runnables.types import (
     ConcurrencyExpression,
     ConcurrencyLimitStrategy,
     EmptyModel,
+    ExecutorType,
+    ProfileConfig,
     StickyStrategy,
     TaskDefaults,
     WorkflowConfig,
 )
+from hatchet_sdk.serializer import (
+    JSONSerializer,
+    OrjsonSerializer,
+    PydanticCoreSerializer,
+    Serializer,
+)
 from hatchet_sdk.waits import (
     Condition,
     OrGroup,
@@ -237,14 +257,26 @@ __all__ = [
     "RateLimitDuration",
     "StickyStrategy",
     "DedupeViolationErr",
+    "BulkRequestError",
     "ScheduleTriggerWorkflowOptions",
     "TriggerWorkflowOptions",
     "PushEventOptions",
+    "EventProducer",
+    "EventBufferFullError",
+    "EventProducerClosedError",
     "StepRunEventType",
     "WorkflowRunEventType",
     "Context",
     "WorkerContext",
     "ClientConfig",
+    "Serializer",
+    "PydanticCoreSerializer",
+    "OrjsonSerializer",
+    "JSONSerializer",
+    "BlobStore",
+    "LocalBlobStore",
+    "S3BlobStore",
+    "BlobNotFoundError",
     "Hatchet",
     "workflow",
     "Worker",
@@ -264,4 +296,6 @@ __all__ = [
     "DurableContext",
     "RegisterDurableEventRequest",
     "TaskDefaults",
+    "ExecutorType",
+    "ProfileConfig",
 ]
@@ -0,0 +1,489 @@
+"""
+Drives a workflow at a fixed arrival rate and reports how long its runs take to trigger and to
+return their results, as latency histograms and throughput over time.
+
+    python -m hatchet_sdk.bench my-workflow --rate 200 --duration 60 --input '{"n": 1}' --json out.json
+
+It connects to the engine in the environment's `HATCHET_CLIENT_*` config, or, with `--fake`, to a
+`FakeEngine` with a worker that runs a no-op task for the workflow, which measures the SDK alone.
+
+Runs are triggered on schedule whether or not earlier ones have finished (an open loop), and their
+latencies are measured from when they were scheduled to be triggered rather than from when they
+were, so a client or engine that falls behind shows up in them. The time a run spends on the
+worker, by stage, is in the worker's `hatchet_step_stage_duration_seconds` histogram.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+from dataclasses import dataclass, field
+from typing import Any
+
+from hatchet_sdk.client import Client
+from hatchet_sdk.clients.admin import TriggerWorkflowOptions, WorkflowRunTriggerConfig
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.logger import logger
+from hatchet_sdk.workflow_run import WorkflowRunRef
+
+## HDR histograms keep this many significant bits of each value, i.e. they're off by under 1/128
+_SIGNIFICANT_BITS = 8
+
+
+class LatencyHistogram:
+    """
+    Counts latencies, in microseconds, in buckets that get wider as the values do, so that whatever
+    their range, each is recorded to within 1% of itself in a fixed amount of memory, like an HDR
+    histogram.
+    """
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: int | None = None
+        self.max = 0
+
+    def record(self, seconds: float) -> None:
+        value = max(round(seconds * 1e6), 0)
+        shift = max(value.bit_length() - _SIGNIFICANT_BITS, 0)
+        bucket = value >> shift << shift
+
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+        self.count += other.count
+        self.total += other.total
+
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> int:
+        """
+        The value (in microseconds) `p` percent of the latencies are at or under.
+        """
+        target = max(self.count * p / 100, 1)
+        seen = 0
+
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+
+            if seen >= target:
+                width = 1 << max(bucket.bit_length() - _SIGNIFICANT_BITS, 0)
+                return min(bucket + width - 1, self.max)
+
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+
+        return {
+            "count": self.count,
+            "min_ms": (self.min or 0) / 1000,
+            "mean_ms": round(self.total / self.count / 1000, 3),
+            **{
+                f"p{str(p).replace('.', '_')}_ms": self.percentile(p) / 1000
+                for p in (50, 90, 99, 99.9)
+            },
+            "max_ms": self.max / 1000,
+            ## the non-empty buckets, as [lowest value in microseconds, count], to merge or compare runs
+            "buckets": sorted(self.counts.items()),
+        }
+
+
+@dataclass
+class Interval:
+    triggered: int = 0
+    completed: int = 0
+    failed: int = 0
+
+
+@dataclass
+class BenchResult:
+    workflow_name: str
+    rate: float
+    duration: float
+    bulk_size: int
+    triggered: int = 0
+    completed: int = 0
+    failed: int = 0
+    trigger_errors: int = 0
+    ## arrivals skipped because `max_in_flight` runs were already waiting on their results
+    dropped: int = 0
+    trigger: LatencyHistogram = field(default_factory=LatencyHistogram)
+    result: LatencyHistogram = field(default_factory=LatencyHistogram)
+    timeline: list[Interval] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "workflow_name": self.workflow_name,
+            "rate": self.rate,
+            "duration": self.duration,
+            "bulk_size": self.bulk_size,
+            "triggered": self.triggered,
+            "completed": self.completed,
+            "failed": self.failed,
+            "trigger_errors": self.trigger_errors,
+            "dropped": self.dropped,
+            "trigger_latency": self.trigger.to_dict(),
+            "result_latency": self.result.to_dict(),
+            "timeline": [
+                {"second": second, **interval.__dict__}
+                for second, interval in enumerate(self.timeline)
+            ],
+        }
+
+
+class LoadGenerator:
+    """
+    Triggers `rate` runs of `workflow_name` per second for `duration` seconds, `bulk_size` at a time
+    (with a single bulk trigger if it's more than one), and waits on each run's result through the
+    admin client's `PooledWorkflowRunListener`. Runs triggered in the first `warmup` seconds aren't
+    counted.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        workflow_name: str,
+        rate: float,
+        duration: float,
+        input: dict[str, Any] = {},
+        options: TriggerWorkflowOptions = TriggerWorkflowOptions(),
+        bulk_size: int = 1,
+        warmup: float = 0,
+        max_in_flight: int = 10_000,
+        report_interval: float | None = None,
+    ) -> None:
+        self.client = client
+        self.workflow_name = workflow_name
+        self.rate = rate
+        self.duration = duration
+        self.input = input
+        self.options = options
+        self.bulk_size = bulk_size
+        self.warmup = warmup
+        self.max_in_flight = max_in_flight
+        self.report_interval = report_interval
+
+        self.result = BenchResult(
+            workflow_name=workflow_name,
+            rate=rate,
+            duration=duration,
+            bulk_size=bulk_size,
+        )
+        self.in_flight = 0
+        self.start = 0.0
+
+    async def run(self) -> BenchResult:
+        loop = asyncio.get_running_loop()
+        arrivals = int((self.warmup + self.duration) * self.rate / self.bulk_size)
+        pending: set[asyncio.Task[None]] = set()
+        reporter = asyncio.create_task(self._report()) if self.report_interval else None
+
+        self.start = loop.time()
+
+        for i in range(arrivals):
+            scheduled = self.start + i * self.bulk_size / self.rate
+            delay = scheduled - loop.time()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if self.in_flight + self.bulk_size > self.max_in_flight:
+                self.result.dropped += self.bulk_size
+                continue
+
+            task = asyncio.create_task(self._arrive(scheduled))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        await asyncio.gather(*pending)
+
+        if reporter:
+            reporter.cancel()
+
+        return self.result
+
+    def _interval(self, at: float) -> Interval | None:
+        second = int(at - self.start - self.warmup)
+
+        if second < 0:
+            return None
+
+        while len(self.result.timeline) <= second:
+            self.result.timeline.append(Interval())
+
+        return self.result.timeline[second]
+
+    async def _arrive(self, scheduled: float) -> None:
+        loop = asyncio.get_running_loop()
+        recorded = scheduled - self.start >= self.warmup
+        self.in_flight += self.bulk_size
+
+        try:
+            try:
+                refs = await self._trigger()
+            except Exception as e:
+                if recorded:
+                    self.result.trigger_errors += self.bulk_size
+
+                logger.debug(f"failed to trigger {self.workflow_name}: {e}")
+                return
+
+            now = loop.time()
+
+            if recorded:
+                self.result.triggered += len(refs)
+                self.result.trigger.record(now - scheduled)
+
+                if interval := self._interval(now):
+                    interval.triggered += len(refs)
+
+            await asyncio.gather(
+                *[self._wait_for_result(ref, scheduled, recorded) for ref in refs]
+            )
+        finally:
+            self.in_flight -= self.bulk_size
+
+    async def _trigger(self) -> list[WorkflowRunRef]:
+        if self.bulk_size == 1:
+            return [
+                await self.client.admin.aio_run_workflow(
+                    self.workflow_name, self.input, self.options
+                )
+            ]
+
+        return await self.client.admin.aio_run_workflows(
+            [
+                WorkflowRunTriggerConfig(
+                    workflow_name=self.workflow_name,
+                    input=self.input,
+                    options=self.options,
+                )
+            ]
+            * self.bulk_size
+        )
+
+    async def _wait_for_result(
+        self, ref: WorkflowRunRef, scheduled: float, recorded: bool
+    ) -> None:
+        try:
+            await ref.aio_result()
+            succeeded = True
+        except Exception as e:
+            succeeded = False
+            logger.debug(f"workflow run {ref.workflow_run_id} failed: {e}")
+
+        if not recorded:
+            return
+
+        now = asyncio.get_running_loop().time()
+        interval = self._interval(now)
+
+        if succeeded:
+            self.result.completed += 1
+            self.result.result.record(now - scheduled)
+        else:
+            self.result.failed += 1
+
+        if interval:
+            if succeeded:
+                interval.completed += 1
+            else:
+                interval.failed += 1
+
+    async def _report(self) -> None:
+        assert self.report_interval is not None
+        triggered = completed = failed = 0
+
+        while True:
+            await asyncio.sleep(self.report_interval)
+
+            result = self.result
+            print(
+                f"[{asyncio.get_running_loop().time() - self.start:6.1f}s] "
+                f"triggered {(result.triggered - triggered) / self.report_interval:.0f}/s, "
+                f"completed {(result.completed - completed) / self.report_interval:.0f}/s, "
+                f"failed {result.failed - failed}, in flight {self.in_flight}, "
+                f"result p99 {result.result.percentile(99) / 1000 if result.result.count else 0:.1f}ms",
+                file=sys.stderr,
+            )
+            triggered, completed, failed = (
+                result.triggered,
+                result.completed,
+                result.failed,
+            )
+
+
+def _run_fake_worker(config: ClientConfig, workflow_name: str, task_ms: float) -> None:
+    from hatchet_sdk.context.context import Context
+    from hatchet_sdk.hatchet import Hatchet
+    from hatchet_sdk.runnables.types import EmptyModel
+
+    ## in a process group of its own, to be killed along with its action listener process
+    os.setpgrp()
+
+    hatchet = Hatchet(config=config)
+    workflow = hatchet.workflow(name=workflow_name)
+
+    @workflow.task()
+    async def noop(input: EmptyModel, ctx: Context) -> dict[str, Any]:
+        await asyncio.sleep(task_ms / 1000)
+        return {}
+
+    hatchet.worker("bench", slots=1000, workflows=[workflow]).start()
+
+
+def _summary(result: BenchResult) -> str:
+    lines = [
+        f"{result.workflow_name}: {result.triggered} triggered, {result.completed} completed, "
+        f"{result.failed} failed, {result.trigger_errors} trigger errors, {result.dropped} dropped",
+        f"{'':10} {'count':>8} {'p50':>9} {'p90':>9} {'p99':>9} {'p99.9':>9} {'max':>9}",
+    ]
+
+    for name, histogram in (("trigger", result.trigger), ("result", result.result)):
+        if not histogram.count:
+            continue
+
+        lines.append(
+            f"{name:10} {histogram.count:>8}"
+            + "".join(
+                f" {histogram.percentile(p) / 1000:>7.1f}ms" for p in (50, 90, 99, 99.9)
+            )
+            + f" {histogram.max / 1000:>7.1f}ms"
+        )
+
+    if result.timeline:
+        completed = [interval.completed for interval in result.timeline]
+        lines.append(
+            f"completed/s: min {min(completed)}, mean {sum(completed) / len(completed):.0f}, max {max(completed)}"
+        )
+
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m hatchet_sdk.bench",
+        description=__doc__.split("\n\n")[0].strip(),
+    )
+    parser.add_argument("workflow", help="the name of the workflow to trigger")
+    parser.add_argument("--rate", type=float, default=10, help="runs per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=0, help="seconds of runs not to count"
+    )
+    parser.add_argument("--input", type=json.loads, default={}, help="JSON")
+    parser.add_argument(
+        "--additional-metadata", type=json.loads, default={}, help="JSON"
+    )
+    parser.add_argument(
+        "--bulk",
+        type=int,
+        default=1,
+        help="runs per trigger, sent with a single bulk trigger if more than one",
+    )
+    parser.add_argument("--max-in-flight", type=int, default=10_000)
+    parser.add_argument("--report-interval", type=float, default=5, help="seconds")
+    parser.add_argument("--json", help="a file to write the results to, as JSON")
+    parser.add_argument(
+        "--slo-p99-ms",
+        type=float,
+        help="exit with 1 if the p99 trigger-to-result latency is over this",
+    )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="run against a local FakeEngine with a no-op worker for the workflow",
+    )
+    parser.add_argument(
+        "--fake-task-ms",
+        type=float,
+        default=0,
+        help="how long the --fake worker's task takes",
+    )
+    args = parser.parse_args(argv)
+
+    engine = worker = None
+
+    if args.fake:
+        from hatchet_sdk.testing import FakeEngineProcess
+
+        ## the engine runs in a process of its own, since grpc.aio doesn't cope well with event
+        ## loops on more than one thread of a process
+        engine = FakeEngineProcess(workers=1).start()
+        config = engine.client_config()
+
+        worker = multiprocessing.get_context("spawn").Process(
+            target=_run_fake_worker, args=(config, args.workflow, args.fake_task_ms)
+        )
+        worker.start()
+    else:
+        config = ClientConfig()
+
+    try:
+        if engine is not None:
+            engine.wait_for_workers(60)
+
+        generator = LoadGenerator(
+            Client(config=config),
+            args.workflow,
+            rate=args.rate,
+            duration=args.duration,
+            input=args.input,
+            options=TriggerWorkflowOptions(
+                additional_metadata=args.additional_metadata
+            ),
+            bulk_size=args.bulk,
+            warmup=args.warmup,
+            max_in_flight=args.max_in_flight,
+            report_interval=args.report_interval or None,
+        )
+        result = asyncio.run(generator.run())
+    finally:
+        ## killed rather than stopped, since stopping a worker goes through the REST API
+        if worker is not None and worker.pid is not None:
+            try:
+                os.killpg(worker.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                worker.kill()
+
+        if engine is not None:
+            engine.stop()
+
+    print(_summary(result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result.to_dict(), f, indent=2)
+
+    if (
+        args.slo_p99_ms is not None
+        and result.result.count
+        and result.result.percentile(99) / 1000 > args.slo_p99_ms
+    ):
+        print(
+            f"p99 trigger-to-result latency is over the {args.slo_p99_ms}ms SLO",
+            file=sys.stderr,
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
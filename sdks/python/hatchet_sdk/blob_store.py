@@ -0,0 +1,297 @@
+import os
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from hatchet_sdk.logger import logger
+
+## an offloaded payload is sent as `{"hatchet__blob": "<key>", "size": <bytes>}` in its place
+BLOB_REFERENCE_KEY = "hatchet__blob"
+BLOB_REFERENCE_SIZE_KEY = "size"
+
+
+class BlobNotFoundError(Exception):
+    """Raised when an offloaded payload's blob isn't in the blob store, e.g. because it has expired."""
+
+    pass
+
+
+class BlobStore(ABC):
+    """
+    Holds payloads that are too big to send through Hatchet (a "claim check"): the payload is
+    written to the store and only a reference to it is sent, which the SDK on the receiving side
+    resolves by reading the blob back. Reads are cached, up to `cache_bytes`, since e.g. every child
+    of a task reads the same parent output.
+
+    Blob keys start with the UTC date they were written on, which `delete_older_than` uses to expire
+    them along with the runs that referenced them.
+    """
+
+    def __init__(self, cache_bytes: int = 64 * 1024 * 1024) -> None:
+        self.cache_bytes = cache_bytes
+        self._init_cache()
+
+    def _init_cache(self) -> None:
+        self.cache: OrderedDict[str, bytes] = OrderedDict()
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def read(self, key: str) -> bytes:
+        """
+        Reads a blob, bypassing the cache. Raises `BlobNotFoundError` if there's no such blob.
+        """
+        pass
+
+    @abstractmethod
+    def delete_older_than(self, cutoff: datetime) -> int:
+        """
+        Deletes the blobs written before `cutoff`, and returns how many were deleted.
+        """
+        pass
+
+    def offload(self, data: bytes) -> bytes:
+        """
+        Writes `data` to a new blob, and returns the reference to send in its place.
+        """
+        key = f"{datetime.now(timezone.utc):%Y/%m/%d}/{uuid.uuid4().hex}"
+        self.put(key, data)
+
+        return (
+            f'{{"{BLOB_REFERENCE_KEY}":"{key}","{BLOB_REFERENCE_SIZE_KEY}":{len(data)}}}'
+        ).encode()
+
+    def get(self, key: str) -> bytes:
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        data = self.read(key)
+
+        if len(data) <= self.cache_bytes:
+            with self.lock:
+                if key not in self.cache:
+                    self.cache[key] = data
+                    self.cached_bytes += len(data)
+
+                while self.cached_bytes > self.cache_bytes:
+                    _, evicted = self.cache.popitem(last=False)
+                    self.cached_bytes -= len(evicted)
+
+        return data
+
+    def __getstate__(self) -> dict[str, Any]:
+        ## stores are sent to the worker's child processes with the config, without their caches
+        state = self.__dict__.copy()
+
+        for name in ("cache", "cached_bytes", "lock"):
+            state.pop(name, None)
+
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_cache()
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Keeps blobs as files under `root`, which every worker and client using the store has to be able
+    to read (e.g. a shared volume).
+    """
+
+    def __init__(self, root: str, cache_bytes: int = 64 * 1024 * 1024) -> None:
+        super().__init__(cache_bytes)
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        ## written to a temporary file first, so a reader never sees a partial blob
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+
+        with open(tmp, "wb") as f:
+            f.write(data)
+
+        os.replace(tmp, path)
+
+    def read(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(f"blob {key} not found in {self.root}")
+
+    def delete_older_than(self, cutoff: datetime) -> int:
+        deleted = 0
+
+        for day in _day_prefixes(self.root):
+            if day.date() >= cutoff.date():
+                continue
+
+            path = self._path(f"{day:%Y/%m/%d}")
+            deleted += sum(len(files) for _, _, files in os.walk(path))
+            shutil.rmtree(path, ignore_errors=True)
+
+            ## and the month and year directories, once they're empty
+            for parent in (f"{day:%Y/%m}", f"{day:%Y}"):
+                try:
+                    os.rmdir(self._path(parent))
+                except OSError:
+                    break
+
+        return deleted
+
+
+def _day_prefixes(root: str) -> list[datetime]:
+    days: list[datetime] = []
+
+    for dirpath, dirnames, _ in os.walk(root):
+        parts = os.path.relpath(dirpath, root).split(os.sep)
+
+        if len(parts) == 3:
+            dirnames.clear()
+
+            try:
+                days.append(datetime.strptime("/".join(parts), "%Y/%m/%d"))
+            except ValueError:
+                pass
+
+    return days
+
+
+class S3BlobStore(BlobStore):
+    """
+    Keeps blobs as objects under `prefix` in an S3 bucket, or in any S3-compatible store (e.g. MinIO
+    or a local stand-in) at `endpoint_url`. Needs `boto3`, which has to be installed separately;
+    `client_kwargs` are passed on to `boto3.client`.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "hatchet/",
+        endpoint_url: str | None = None,
+        cache_bytes: int = 64 * 1024 * 1024,
+        **client_kwargs: Any,
+    ) -> None:
+        super().__init__(cache_bytes)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.client_kwargs = client_kwargs
+        self._client: Any = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            try:
+                import boto3  # type: ignore[import-not-found, import-untyped, unused-ignore]
+            except ImportError:
+                raise ModuleNotFoundError(
+                    "To use the S3 blob store, you must install boto3 using (e.g.) `pip install boto3`"
+                )
+
+            self._client = boto3.client(
+                "s3", endpoint_url=self.endpoint_url, **self.client_kwargs
+            )
+
+        return self._client
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def read(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            raise BlobNotFoundError(f"blob {key} not found in s3://{self.bucket}")
+
+        return bytes(response["Body"].read())
+
+    def delete_older_than(self, cutoff: datetime) -> int:
+        deleted = 0
+        expired: list[dict[str, str]] = []
+
+        paginator = self.client.get_paginator("list_objects_v2")
+
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["LastModified"] < cutoff:
+                    expired.append({"Key": obj["Key"]})
+
+        ## the API deletes at most 1000 objects per request
+        for i in range(0, len(expired), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": expired[i : i + 1000]}
+            )
+            deleted += len(expired[i : i + 1000])
+
+        return deleted
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = super().__getstate__()
+        state["_client"] = None
+
+        return state
+
+
+def get_blob_store(url: str) -> BlobStore:
+    """
+    Creates a blob store from a URL: `file:///path/to/dir` for a `LocalBlobStore`, or
+    `s3://bucket/prefix/` (optionally with `?endpoint_url=http://localhost:9000`) for an
+    `S3BlobStore`.
+    """
+    parsed = urlparse(url)
+
+    if parsed.scheme == "file":
+        return LocalBlobStore(parsed.path)
+
+    if parsed.scheme == "s3":
+        query = parse_qs(parsed.query)
+        endpoint_url = query.get("endpoint_url", [None])[0]
+
+        return S3BlobStore(
+            bucket=parsed.netloc,
+            prefix=parsed.path.lstrip("/"),
+            endpoint_url=endpoint_url,
+        )
+
+    raise ValueError(f"unsupported blob store url: {url}")
+
+
+def resolve_blob_reference(value: Any, blob_store: BlobStore | None) -> bytes | None:
+    """
+    Returns the payload that `value` refers to if it's a decoded blob reference, and `None` if it
+    isn't one.
+    """
+    if (
+        not isinstance(value, dict)
+        or len(value) != 2
+        or not isinstance(value.get(BLOB_REFERENCE_KEY), str)
+        or BLOB_REFERENCE_SIZE_KEY not in value
+    ):
+        return None
+
+    if blob_store is None:
+        raise BlobNotFoundError(
+            f"payload was offloaded to blob {value[BLOB_REFERENCE_KEY]}, but no blob store is configured"
+        )
+
+    logger.debug(f"reading offloaded payload {value[BLOB_REFERENCE_KEY]}")
+
+    return blob_store.get(value[BLOB_REFERENCE_KEY])
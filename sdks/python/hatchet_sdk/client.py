@@ -9,7 +9,7 @@ from hatchet_sdk.clients.rest_client import RestApi
 from hatchet_sdk.clients.run_event_listener import RunEventListenerClient
 from hatchet_sdk.clients.workflow_listener import PooledWorkflowRunListener
 from hatchet_sdk.config import ClientConfig
-from hatchet_sdk.connection import new_conn
+from hatchet_sdk.connection import shared_conn
 
 
 class Client:
@@ -29,7 +29,7 @@ class Client:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-        conn: grpc.Channel = new_conn(config, False)
+        conn: grpc.Channel = shared_conn(config, False)
 
         self.config = config
         self.admin = admin_client or AdminClient(config)
@@ -7,16 +7,24 @@ import grpc
 from google.protobuf import timestamp_pb2
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+from hatchet_sdk.clients.bulk import (
+    aio_send_chunked,
+    max_bulk_request_bytes,
+    retry_not_applied,
+    send_chunked,
+)
 from hatchet_sdk.clients.rest.tenacity_utils import tenacity_retry
 from hatchet_sdk.clients.run_event_listener import RunEventListenerClient
+from hatchet_sdk.clients.trigger_coalescer import AioTriggerCoalescer, TriggerCoalescer
 from hatchet_sdk.clients.workflow_listener import PooledWorkflowRunListener
 from hatchet_sdk.config import ClientConfig
-from hatchet_sdk.connection import new_conn
+from hatchet_sdk.connection import LoopBoundChannel, shared_conn
 from hatchet_sdk.contracts import workflows_pb2 as v0_workflow_protos
 from hatchet_sdk.contracts.v1 import workflows_pb2 as workflow_protos
 from hatchet_sdk.contracts.v1.workflows_pb2_grpc import AdminServiceStub
 from hatchet_sdk.contracts.workflows_pb2_grpc import WorkflowServiceStub
 from hatchet_sdk.metadata import get_metadata
+from hatchet_sdk.payloads import aio_encode_payload, encode_payload
 from hatchet_sdk.rate_limit import RateLimitDuration
 from hatchet_sdk.runnables.contextvars import (
     ctx_step_run_id,
@@ -61,16 +69,52 @@ class DedupeViolationErr(Exception):
 
 class AdminClient:
     def __init__(self, config: ClientConfig):
-        conn = new_conn(config, False)
+        conn = shared_conn(config, False)
         self.config = config
         self.client = AdminServiceStub(conn)  # type: ignore[no-untyped-call]
         self.v0_client = WorkflowServiceStub(conn)  # type: ignore[no-untyped-call]
+        self.aio_conn = LoopBoundChannel(config)
         self.token = config.token
         self.listener_client = RunEventListenerClient(config=config)
         self.namespace = config.namespace
 
         self.pooled_workflow_listener: PooledWorkflowRunListener | None = None
 
+        self.trigger_coalescer: TriggerCoalescer | None = None
+        self.aio_trigger_coalescer: AioTriggerCoalescer | None = None
+
+        if config.trigger_coalesce_linger_ms is not None:
+            self.trigger_coalescer = TriggerCoalescer(
+                self.v0_client,
+                self.token,
+                linger=config.trigger_coalesce_linger_ms / 1000,
+                max_batch=config.trigger_coalesce_max_batch,
+                max_request_bytes=max_bulk_request_bytes(
+                    config.grpc_max_send_message_length
+                ),
+            )
+
+    def _aio_trigger_coalescer(self) -> AioTriggerCoalescer | None:
+        if self.config.trigger_coalesce_linger_ms is None:
+            return None
+
+        ## batches on the loop it was created on, so a new one is needed whenever the running loop changes
+        if (
+            self.aio_trigger_coalescer is None
+            or self.aio_trigger_coalescer.loop is not asyncio.get_running_loop()
+        ):
+            self.aio_trigger_coalescer = AioTriggerCoalescer(
+                lambda: self.aio_conn.stub(WorkflowServiceStub),
+                self.token,
+                linger=self.config.trigger_coalesce_linger_ms / 1000,
+                max_batch=self.config.trigger_coalesce_max_batch,
+                max_request_bytes=max_bulk_request_bytes(
+                    self.config.grpc_max_send_message_length
+                ),
+            )
+
+        return self.aio_trigger_coalescer
+
     class TriggerWorkflowRequest(BaseModel):
         model_config = ConfigDict(extra="ignore")
 
@@ -90,28 +134,49 @@ class AdminClient:
             if not v:
                 return None
 
+            ## encoded by the client's serializer before it gets here
+            if isinstance(v, bytes):
+                return v
+
             try:
                 return json.dumps(v).encode("utf-8")
-            except json.JSONDecodeError as e:
+            except (TypeError, ValueError) as e:
                 raise ValueError(f"Error encoding payload: {e}")
 
+    def _serialize_input(self, input: JSONSerializableMapping) -> bytes:
+        try:
+            return self.config.serializer.dumps(input)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Error encoding payload: {e}")
+
+    def _encode_input(self, input: JSONSerializableMapping) -> bytes:
+        return encode_payload(self._serialize_input(input), self.config)
+
+    async def _aio_encode_input(self, input: JSONSerializableMapping) -> bytes:
+        ## an input offloaded to the blob store is uploaded from a thread
+        return await aio_encode_payload(self._serialize_input(input), self.config)
+
     def _prepare_workflow_request(
         self,
         workflow_name: str,
-        input: JSONSerializableMapping,
+        input: bytes,
         options: TriggerWorkflowOptions,
     ) -> v0_workflow_protos.TriggerWorkflowRequest:
         try:
-            payload_data = json.dumps(input)
-        except json.JSONDecodeError as e:
+            additional_metadata = (
+                self.config.serializer.dumps(options.additional_metadata)
+                if options.additional_metadata
+                else None
+            )
+        except Exception as e:
             raise ValueError(f"Error encoding payload: {e}")
 
         _options = self.TriggerWorkflowRequest.model_validate(
-            options.model_dump()
+            {**options.model_dump(), "additional_metadata": additional_metadata}
         ).model_dump()
 
         return v0_workflow_protos.TriggerWorkflowRequest(
-            name=workflow_name, input=payload_data, **_options
+            name=workflow_name, input=input, **_options  # type: ignore[arg-type]
         )
 
     def _prepare_put_workflow_request(
@@ -127,6 +192,22 @@ class AdminClient:
 
         return workflow
 
+    def _prepare_put_rate_limit_request(
+        self,
+        key: str,
+        limit: int,
+        duration: RateLimitDuration,
+    ) -> v0_workflow_protos.PutRateLimitRequest:
+        duration_proto = convert_python_enum_to_proto(
+            duration, workflow_protos.RateLimitDuration
+        )
+
+        return v0_workflow_protos.PutRateLimitRequest(
+            key=key,
+            limit=limit,
+            duration=duration_proto,  # type: ignore[arg-type]
+        )
+
     def _parse_schedule(
         self, schedule: datetime | timestamp_pb2.Timestamp
     ) -> timestamp_pb2.Timestamp:
@@ -146,13 +227,18 @@ class AdminClient:
         self,
         name: str,
         schedules: list[Union[datetime, timestamp_pb2.Timestamp]],
-        input: JSONSerializableMapping = {},
+        input: bytes,
         options: ScheduleTriggerWorkflowOptions = ScheduleTriggerWorkflowOptions(),
     ) -> v0_workflow_protos.ScheduleWorkflowRequest:
+        namespace = options.namespace or self.namespace
+
+        if namespace != "" and not name.startswith(self.namespace):
+            name = f"{namespace}{name}"
+
         return v0_workflow_protos.ScheduleWorkflowRequest(
             name=name,
             schedules=[self._parse_schedule(schedule) for schedule in schedules],
-            input=json.dumps(input),
+            input=input,  # type: ignore[arg-type]
             **options.model_dump(),
         )
 
@@ -169,7 +255,15 @@ class AdminClient:
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
 
-        return await asyncio.to_thread(self.put_workflow, name, workflow, overrides)
+        opts = self._prepare_put_workflow_request(name, workflow, overrides)
+
+        return cast(
+            workflow_protos.CreateWorkflowVersionResponse,
+            await self.aio_conn.stub(AdminServiceStub).PutWorkflow(
+                opts,
+                metadata=get_metadata(self.token),
+            ),
+        )
 
     @tenacity_retry
     async def aio_put_rate_limit(
@@ -184,7 +278,10 @@ class AdminClient:
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
 
-        return await asyncio.to_thread(self.put_rate_limit, key, limit, duration)
+        await self.aio_conn.stub(WorkflowServiceStub).PutRateLimit(
+            self._prepare_put_rate_limit_request(key, limit, duration),
+            metadata=get_metadata(self.token),
+        )
 
     @tenacity_retry
     async def aio_schedule_workflow(
@@ -200,9 +297,23 @@ class AdminClient:
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
 
-        return await asyncio.to_thread(
-            self.schedule_workflow, name, schedules, input, options
-        )
+        try:
+            request = self._prepare_schedule_workflow_request(
+                name, schedules, await self._aio_encode_input(input), options
+            )
+
+            return cast(
+                v0_workflow_protos.WorkflowVersion,
+                await self.aio_conn.stub(WorkflowServiceStub).ScheduleWorkflow(
+                    request,
+                    metadata=get_metadata(self.token),
+                ),
+            )
+        except (grpc.RpcError, grpc.aio.AioRpcError) as e:
+            if e.code() == grpc.StatusCode.ALREADY_EXISTS:
+                raise DedupeViolationErr(e.details())
+
+            raise e
 
     @tenacity_retry
     def put_workflow(
@@ -228,16 +339,8 @@ class AdminClient:
         limit: int,
         duration: RateLimitDuration = RateLimitDuration.SECOND,
     ) -> None:
-        duration_proto = convert_python_enum_to_proto(
-            duration, workflow_protos.RateLimitDuration
-        )
-
         self.v0_client.PutRateLimit(
-            v0_workflow_protos.PutRateLimitRequest(
-                key=key,
-                limit=limit,
-                duration=duration_proto,  # type: ignore[arg-type]
-            ),
+            self._prepare_put_rate_limit_request(key, limit, duration),
             metadata=get_metadata(self.token),
         )
 
@@ -250,13 +353,8 @@ class AdminClient:
         options: ScheduleTriggerWorkflowOptions = ScheduleTriggerWorkflowOptions(),
     ) -> v0_workflow_protos.WorkflowVersion:
         try:
-            namespace = options.namespace or self.namespace
-
-            if namespace != "" and not name.startswith(self.namespace):
-                name = f"{namespace}{name}"
-
             request = self._prepare_schedule_workflow_request(
-                name, schedules, input, options
+                name, schedules, self._encode_input(input), options
             )
 
             return cast(
@@ -275,7 +373,7 @@ class AdminClient:
     def _create_workflow_run_request(
         self,
         workflow_name: str,
-        input: JSONSerializableMapping,
+        input: bytes,
         options: TriggerWorkflowOptions,
     ) -> v0_workflow_protos.TriggerWorkflowRequest:
         workflow_run_id = ctx_workflow_run_id.get()
@@ -318,25 +416,33 @@ class AdminClient:
         input: JSONSerializableMapping,
         options: TriggerWorkflowOptions = TriggerWorkflowOptions(),
     ) -> WorkflowRunRef:
-        request = self._create_workflow_run_request(workflow_name, input, options)
+        request = self._create_workflow_run_request(
+            workflow_name, self._encode_input(input), options
+        )
 
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
 
         try:
-            resp = cast(
-                v0_workflow_protos.TriggerWorkflowResponse,
-                self.v0_client.TriggerWorkflow(
-                    request,
-                    metadata=get_metadata(self.token),
-                ),
-            )
+            if self.trigger_coalescer:
+                workflow_run_id = self.trigger_coalescer.submit(request).result()
+            else:
+                resp = cast(
+                    v0_workflow_protos.TriggerWorkflowResponse,
+                    self.v0_client.TriggerWorkflow(
+                        request,
+                        metadata=get_metadata(self.token),
+                    ),
+                )
+                workflow_run_id = resp.workflow_run_id
         except (grpc.RpcError, grpc.aio.AioRpcError) as e:
             if e.code() == grpc.StatusCode.ALREADY_EXISTS:
                 raise DedupeViolationErr(e.details())
 
+            raise e
+
         return WorkflowRunRef(
-            workflow_run_id=resp.workflow_run_id,
+            workflow_run_id=workflow_run_id,
             workflow_listener=self.pooled_workflow_listener,
             workflow_run_event_listener=self.listener_client,
         )
@@ -352,20 +458,30 @@ class AdminClient:
         ## IMPORTANT: The `pooled_workflow_listener` must be created 1) lazily, and not at `init` time, and 2) on the
         ## main thread. If 1) is not followed, you'll get an error about something being attached to the wrong event
         ## loop. If 2) is not followed, you'll get an error about the event loop not being set up.
+        encoded_input = await self._aio_encode_input(input)
+
         async with spawn_index_lock:
-            request = self._create_workflow_run_request(workflow_name, input, options)
+            request = self._create_workflow_run_request(
+                workflow_name, encoded_input, options
+            )
 
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
 
+        aio_trigger_coalescer = self._aio_trigger_coalescer()
+
         try:
-            resp = cast(
-                v0_workflow_protos.TriggerWorkflowResponse,
-                self.v0_client.TriggerWorkflow(
-                    request,
-                    metadata=get_metadata(self.token),
-                ),
-            )
+            if aio_trigger_coalescer:
+                workflow_run_id = await aio_trigger_coalescer.submit(request)
+            else:
+                resp = cast(
+                    v0_workflow_protos.TriggerWorkflowResponse,
+                    await self.aio_conn.stub(WorkflowServiceStub).TriggerWorkflow(
+                        request,
+                        metadata=get_metadata(self.token),
+                    ),
+                )
+                workflow_run_id = resp.workflow_run_id
         except (grpc.RpcError, grpc.aio.AioRpcError) as e:
             if e.code() == grpc.StatusCode.ALREADY_EXISTS:
                 raise DedupeViolationErr(e.details())
@@ -373,35 +489,38 @@ class AdminClient:
             raise e
 
         return WorkflowRunRef(
-            workflow_run_id=resp.workflow_run_id,
+            workflow_run_id=workflow_run_id,
             workflow_listener=self.pooled_workflow_listener,
             workflow_run_event_listener=self.listener_client,
         )
 
     ## IMPORTANT: Keep this method's signature in sync with the wrapper in the OTel instrumentor
-    @tenacity_retry
     def run_workflows(
         self,
         workflows: list[WorkflowRunTriggerConfig],
     ) -> list[WorkflowRunRef]:
+        """
+        Triggers many workflow runs at once. Runs that don't fit in a single request are split into
+        several, sent concurrently; if some of those fail, a `BulkRequestError` is raised with the
+        run ids of the runs that were triggered and the indices of those that weren't.
+        """
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
 
-        bulk_request = v0_workflow_protos.BulkTriggerWorkflowRequest(
-            workflows=[
-                self._create_workflow_run_request(
-                    workflow.workflow_name, workflow.input, workflow.options
-                )
-                for workflow in workflows
-            ]
-        )
+        requests = [
+            self._create_workflow_run_request(
+                workflow.workflow_name,
+                self._encode_input(workflow.input),
+                workflow.options,
+            )
+            for workflow in workflows
+        ]
 
-        resp = cast(
-            v0_workflow_protos.BulkTriggerWorkflowResponse,
-            self.v0_client.BulkTriggerWorkflow(
-                bulk_request,
-                metadata=get_metadata(self.token),
-            ),
+        workflow_run_ids = send_chunked(
+            requests,
+            self._bulk_trigger_chunk,
+            max_bulk_request_bytes(self.config.grpc_max_send_message_length),
+            self.config.bulk_request_max_in_flight,
         )
 
         return [
@@ -410,10 +529,23 @@ class AdminClient:
                 workflow_listener=self.pooled_workflow_listener,
                 workflow_run_event_listener=self.listener_client,
             )
-            for workflow_run_id in resp.workflow_run_ids
+            for workflow_run_id in workflow_run_ids
         ]
 
-    @tenacity_retry
+    @retry_not_applied
+    def _bulk_trigger_chunk(
+        self, requests: list[v0_workflow_protos.TriggerWorkflowRequest]
+    ) -> list[str]:
+        resp = cast(
+            v0_workflow_protos.BulkTriggerWorkflowResponse,
+            self.v0_client.BulkTriggerWorkflow(
+                v0_workflow_protos.BulkTriggerWorkflowRequest(workflows=requests),
+                metadata=get_metadata(self.token),
+            ),
+        )
+
+        return list(resp.workflow_run_ids)
+
     async def aio_run_workflows(
         self,
         workflows: list[WorkflowRunTriggerConfig],
@@ -424,22 +556,23 @@ class AdminClient:
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
 
+        encoded_inputs = await asyncio.gather(
+            *[self._aio_encode_input(workflow.input) for workflow in workflows]
+        )
+
         async with spawn_index_lock:
-            bulk_request = v0_workflow_protos.BulkTriggerWorkflowRequest(
-                workflows=[
-                    self._create_workflow_run_request(
-                        workflow.workflow_name, workflow.input, workflow.options
-                    )
-                    for workflow in workflows
-                ]
-            )
+            requests = [
+                self._create_workflow_run_request(
+                    workflow.workflow_name, encoded_input, workflow.options
+                )
+                for workflow, encoded_input in zip(workflows, encoded_inputs)
+            ]
 
-        resp = cast(
-            v0_workflow_protos.BulkTriggerWorkflowResponse,
-            self.v0_client.BulkTriggerWorkflow(
-                bulk_request,
-                metadata=get_metadata(self.token),
-            ),
+        workflow_run_ids = await aio_send_chunked(
+            requests,
+            self._aio_bulk_trigger_chunk,
+            max_bulk_request_bytes(self.config.grpc_max_send_message_length),
+            self.config.bulk_request_max_in_flight,
         )
 
         return [
@@ -448,9 +581,23 @@ class AdminClient:
                 workflow_listener=self.pooled_workflow_listener,
                 workflow_run_event_listener=self.listener_client,
             )
-            for workflow_run_id in resp.workflow_run_ids
+            for workflow_run_id in workflow_run_ids
         ]
 
+    @retry_not_applied
+    async def _aio_bulk_trigger_chunk(
+        self, requests: list[v0_workflow_protos.TriggerWorkflowRequest]
+    ) -> list[str]:
+        resp = cast(
+            v0_workflow_protos.BulkTriggerWorkflowResponse,
+            await self.aio_conn.stub(WorkflowServiceStub).BulkTriggerWorkflow(
+                v0_workflow_protos.BulkTriggerWorkflowRequest(workflows=requests),
+                metadata=get_metadata(self.token),
+            ),
+        )
+
+        return list(resp.workflow_run_ids)
+
     def get_workflow_run(self, workflow_run_id: str) -> WorkflowRunRef:
         if not self.pooled_workflow_listener:
             self.pooled_workflow_listener = PooledWorkflowRunListener(self.config)
@@ -0,0 +1,199 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Generic, ParamSpec, Sequence, TypeVar, cast
+
+import grpc
+import tenacity
+from google.protobuf.message import Message
+
+from hatchet_sdk.clients.rest.tenacity_utils import tenacity_alert_retry
+from hatchet_sdk.logger import logger
+
+## the engine rejects bulk pushes and bulk triggers of more than this many items
+MAX_BULK_ITEMS = 1000
+
+## room left in each bulk request for the fields around its items
+BULK_REQUEST_OVERHEAD_BYTES = 64 * 1024
+
+## codes a chunk fails with when the engine didn't apply it, so it's safe to send again. After any other
+## error (e.g. a deadline) its items may have been pushed or triggered, so it isn't retried
+NOT_APPLIED_CODES = frozenset(
+    {
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+    }
+)
+
+M = TypeVar("M", bound=Message)
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class BulkRequestError(Exception, Generic[R]):
+    """
+    Raised when a bulk request was split into chunks and some of them failed. `results` holds each
+    item's result in input order, with `None` for the items that weren't accepted, and
+    `failed_indices` holds the indices of those items. A chunk that failed with a code outside
+    `NOT_APPLIED_CODES` may still have been applied, so its items may have been pushed or triggered.
+    """
+
+    def __init__(
+        self,
+        results: list[R | None],
+        failed_indices: list[int],
+        errors: list[BaseException],
+    ) -> None:
+        self.results = results
+        self.failed_indices = failed_indices
+        self.errors = errors
+
+        super().__init__(
+            f"{len(failed_indices)} of {len(results)} items were not accepted: {errors[0]}"
+        )
+
+
+def _not_applied(ex: BaseException) -> bool:
+    return isinstance(ex, grpc.RpcError) and ex.code() in NOT_APPLIED_CODES
+
+
+def retry_not_applied(func: Callable[P, R]) -> Callable[P, R]:
+    """
+    Retries a chunk like `tenacity_retry`, but only when it failed with a code that means the engine
+    didn't apply it, so that a retry can't push or trigger its items twice.
+    """
+    return tenacity.retry(
+        reraise=True,
+        wait=tenacity.wait_exponential_jitter(),
+        stop=tenacity.stop_after_attempt(5),
+        before_sleep=tenacity_alert_retry,
+        retry=tenacity.retry_if_exception(_not_applied),
+    )(func)
+
+
+def max_bulk_request_bytes(grpc_max_send_message_length: int) -> int:
+    return max(grpc_max_send_message_length - BULK_REQUEST_OVERHEAD_BYTES, 1)
+
+
+def item_bytes(item: Message) -> int:
+    ## a repeated message field costs a tag byte and a length prefix per item
+    size = item.ByteSize()
+
+    return size + 1 + (size.bit_length() + 6) // 7
+
+
+def chunk_indices(
+    items: Sequence[Message], max_bytes: int, max_items: int = MAX_BULK_ITEMS
+) -> list[range]:
+    """
+    Splits `items` into consecutive chunks of at most `max_items` items and (unless a single item is
+    bigger on its own) `max_bytes` serialized bytes.
+    """
+    chunks: list[range] = []
+    start = 0
+    size = 0
+
+    for i, item in enumerate(items):
+        n = item_bytes(item)
+
+        if i > start and (i - start >= max_items or size + n > max_bytes):
+            chunks.append(range(start, i))
+            start, size = i, 0
+
+        size += n
+
+    if start < len(items):
+        chunks.append(range(start, len(items)))
+
+    return chunks
+
+
+def _collect(
+    chunks: list[range],
+    outcomes: list[list[R] | BaseException],
+    total: int,
+) -> list[R]:
+    results: list[R | None] = [None] * total
+    failed_indices: list[int] = []
+    errors: list[BaseException] = []
+
+    for chunk, outcome in zip(chunks, outcomes):
+        if isinstance(outcome, BaseException):
+            failed_indices.extend(chunk)
+            errors.append(outcome)
+            continue
+
+        for i, result in zip(chunk, outcome):
+            results[i] = result
+
+    if errors:
+        logger.error(
+            f"{len(errors)} of {len(chunks)} chunks of a bulk request failed: {errors[0]}"
+        )
+        raise BulkRequestError(results, failed_indices, errors)
+
+    return cast(list[R], results)
+
+
+def _check_length(chunk: range, results: list[R]) -> list[R]:
+    if len(results) != len(chunk):
+        raise ValueError(
+            f"bulk request returned {len(results)} results for {len(chunk)} items"
+        )
+
+    return results
+
+
+def send_chunked(
+    items: Sequence[M],
+    send_chunk: Callable[[list[M]], list[R]],
+    max_bytes: int,
+    max_in_flight: int,
+) -> list[R]:
+    """
+    Sends `items` through `send_chunk` in chunks that fit in a request, up to `max_in_flight` at
+    once, and returns the results in input order. A request that fits in one chunk is sent as is,
+    so its errors are raised unchanged; otherwise failed chunks raise a `BulkRequestError`.
+    """
+    chunks = chunk_indices(items, max_bytes)
+
+    if len(chunks) <= 1:
+        return send_chunk(list(items))
+
+    def send(chunk: range) -> list[R] | BaseException:
+        try:
+            return _check_length(chunk, send_chunk([items[i] for i in chunk]))
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=min(max_in_flight, len(chunks))) as pool:
+        outcomes = list(pool.map(send, chunks))
+
+    return _collect(chunks, outcomes, len(items))
+
+
+async def aio_send_chunked(
+    items: Sequence[M],
+    send_chunk: Callable[[list[M]], Awaitable[list[R]]],
+    max_bytes: int,
+    max_in_flight: int,
+) -> list[R]:
+    """
+    The async version of `send_chunked`.
+    """
+    chunks = chunk_indices(items, max_bytes)
+
+    if len(chunks) <= 1:
+        return await send_chunk(list(items))
+
+    window = asyncio.Semaphore(max_in_flight)
+
+    async def send(chunk: range) -> list[R] | BaseException:
+        async with window:
+            try:
+                return _check_length(chunk, await send_chunk([items[i] for i in chunk]))
+            except Exception as e:
+                return e
+
+    outcomes: list[Any] = await asyncio.gather(*[send(chunk) for chunk in chunks])
+
+    return _collect(chunks, outcomes, len(items))
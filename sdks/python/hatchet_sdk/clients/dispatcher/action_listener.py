@@ -1,22 +1,43 @@
 import asyncio
 import json
 import time
-from dataclasses import field
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, AsyncGenerator, cast
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Callable,
+    SupportsIndex,
+    TypeVar,
+    cast,
+)
 
 import grpc
 import grpc.aio
 from grpc._cython import cygrpc  # type: ignore[attr-defined]
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializerFunctionWrapHandler,
+    ValidationError,
+    field_validator,
+    model_serializer,
+    model_validator,
+)
+from pydantic_core import from_json
 
+from hatchet_sdk.blob_store import BlobStore
 from hatchet_sdk.clients.event_ts import ThreadSafeEvent, read_with_interrupt
 from hatchet_sdk.clients.events import proto_timestamp_now
 from hatchet_sdk.clients.run_event_listener import (
     DEFAULT_ACTION_LISTENER_RETRY_INTERVAL,
 )
 from hatchet_sdk.config import ClientConfig
-from hatchet_sdk.connection import new_conn
+from hatchet_sdk.connection import evict_conn, shared_conn
 from hatchet_sdk.contracts.dispatcher_pb2 import ActionType as ActionTypeProto
 from hatchet_sdk.contracts.dispatcher_pb2 import (
     AssignedAction,
@@ -28,13 +49,17 @@ from hatchet_sdk.contracts.dispatcher_pb2 import (
 from hatchet_sdk.contracts.dispatcher_pb2_grpc import DispatcherStub
 from hatchet_sdk.logger import logger
 from hatchet_sdk.metadata import get_metadata
+from hatchet_sdk.payloads import resolve_payload
 from hatchet_sdk.utils.backoff import exp_backoff_sleep
-from hatchet_sdk.utils.proto_enums import convert_proto_enum_to_python
 from hatchet_sdk.utils.typing import JSONSerializableMapping
+from hatchet_sdk.worker.latency import StepStage
+from hatchet_sdk.worker.recording import ActionRecorder
 
 DEFAULT_ACTION_TIMEOUT = 600  # seconds
 DEFAULT_ACTION_LISTENER_RETRY_COUNT = 15
 
+TModel = TypeVar("TModel", bound=BaseModel)
+
 
 class GetActionListenerRequest(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -60,7 +85,33 @@ class GetActionListenerRequest(BaseModel):
         return self
 
 
+def _resolved(value: Any, blob_store: BlobStore | None) -> Any:
+    data = resolve_payload(value, blob_store)
+
+    return value if data is None else from_json(data)
+
+
+def _each_resolved(
+    values: dict[str, Any], blob_store: BlobStore | None
+) -> dict[str, Any]:
+    return {key: _resolved(value, blob_store) for key, value in values.items()}
+
+
+## the fields that may have been compressed or offloaded to the blob store, and how they're resolved
+_RESOLVERS: dict[str, Callable[[Any, BlobStore | None], Any]] = {
+    "input": _resolved,
+    "parents": _each_resolved,
+}
+
+
 class ActionPayload(BaseModel):
+    """
+    An action's payload. One built `from_raw` keeps the JSON it was sent as, which is only parsed the
+    first time one of its fields is read, and each field is only validated (and read back from
+    `blob_store`, if it was offloaded to it) the first time it's read, so a task that never reads e.g.
+    its parents' outputs never decodes them.
+    """
+
     model_config = ConfigDict(extra="allow")
 
     input: JSONSerializableMapping = Field(default_factory=dict)
@@ -71,6 +122,10 @@ class ActionPayload(BaseModel):
     triggered_by: str | None = None
     triggers: JSONSerializableMapping = Field(default_factory=dict)
 
+    _raw: str | bytes | None = PrivateAttr(default=None)
+    _parsed: dict[str, Any] | None = PrivateAttr(default=None)
+    _blob_store: BlobStore | None = PrivateAttr(default=None)
+
     @field_validator(
         "input", "parents", "overrides", "user_data", "step_run_errors", mode="before"
     )
@@ -78,6 +133,161 @@ class ActionPayload(BaseModel):
     def validate_fields(cls, v: Any) -> Any:
         return v or {}
 
+    @classmethod
+    def from_raw(
+        cls, raw: str | bytes, blob_store: BlobStore | None = None
+    ) -> "ActionPayload":
+        ## built without its fields, which are decoded from `raw` as they're read (see `__getattr__`)
+        payload = cls.__new__(cls)
+        object.__setattr__(payload, "__dict__", {})
+        object.__setattr__(payload, "__pydantic_fields_set__", set())
+        object.__setattr__(payload, "__pydantic_extra__", {})
+        object.__setattr__(
+            payload,
+            "__pydantic_private__",
+            {"_raw": raw or b"{}", "_parsed": None, "_blob_store": blob_store},
+        )
+
+        return payload
+
+    @property
+    def raw(self) -> str | bytes:
+        """The payload's JSON, as it was sent if it was built `from_raw`."""
+        return self._raw if self._raw is not None else self.model_dump_json()
+
+    @property
+    def blob_store(self) -> BlobStore | None:
+        return self._blob_store
+
+    @blob_store.setter
+    def blob_store(self, blob_store: BlobStore | None) -> None:
+        self._blob_store = blob_store
+
+    if not TYPE_CHECKING:
+
+        def __getattr__(self, name: str) -> Any:
+            if name in ActionPayload.model_fields:
+                return self._decode(name)
+
+            ## the payload's extra fields are only known once it's been parsed
+            if not name.startswith("_") and self._raw is not None:
+                self._parse()
+
+            return super().__getattr__(name)
+
+    def _parse(self) -> dict[str, Any]:
+        if self._parsed is None:
+            try:
+                parsed = from_json(cast(str | bytes, self._raw))
+            except ValueError as e:
+                raise ValueError(f"Error decoding payload: {e}")
+
+            if not isinstance(parsed, dict):
+                raise ValueError(
+                    f"Error decoding payload: expected an object, got {type(parsed).__name__}"
+                )
+
+            self._parsed = parsed
+            object.__setattr__(
+                self,
+                "__pydantic_extra__",
+                {
+                    k: v
+                    for k, v in parsed.items()
+                    if k not in ActionPayload.model_fields
+                },
+            )
+
+        return self._parsed
+
+    def _decode(self, name: str) -> Any:
+        parsed = self._parse()
+
+        if name not in parsed:
+            self.__dict__[name] = ActionPayload.model_fields[name].get_default(
+                call_default_factory=True
+            )
+
+            return self.__dict__[name]
+
+        value = parsed[name]
+        resolve = _RESOLVERS.get(name)
+
+        if value is not None and resolve is not None:
+            value = resolve(value, self._blob_store)
+
+        try:
+            self.__pydantic_validator__.validate_assignment(self, name, value)
+        except ValidationError as e:
+            raise ValueError(f"Error decoding payload: {e}")
+
+        return self.__dict__[name]
+
+    def _decode_all(self) -> None:
+        if self._raw is None:
+            return
+
+        for name in ActionPayload.model_fields:
+            if name not in self.__dict__:
+                self._decode(name)
+
+    def validate_input(self, input_validator: type[TModel]) -> TModel:
+        """
+        Validates the payload's input into `input_validator`. An input that was compressed or
+        offloaded to the blob store is validated straight from the JSON it resolves to.
+        """
+        if "input" in self.__dict__:
+            return input_validator.model_validate(self.input)
+
+        input = self._parse().get("input")
+        data = resolve_payload(input, self._blob_store) if input else None
+
+        if data is not None:
+            return input_validator.model_validate_json(data)
+
+        return input_validator.model_validate(input or {})
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler: SerializerFunctionWrapHandler) -> Any:
+        self._decode_all()
+
+        return handler(self)
+
+    def __eq__(self, other: Any) -> bool:
+        ## compared by their fields alone, not by the raw payload they were decoded from
+        if not isinstance(other, ActionPayload):
+            return NotImplemented
+
+        return self.model_dump() == other.model_dump()
+
+    def __iter__(self) -> Any:
+        self._decode_all()
+
+        return super().__iter__()
+
+    def __repr_args__(self) -> Any:
+        ## a payload that hasn't been decoded is shown as it was sent, rather than read back from the blob store
+        if self._raw is not None and len(self.__dict__) < len(
+            ActionPayload.model_fields
+        ):
+            return [("raw", self._raw)]
+
+        return super().__repr_args__()
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> Any:
+        ## one built `from_raw` is pickled as only its raw payload, not the fields decoded from it
+        private = self.__pydantic_private__ or {}
+
+        if private.get("_raw") is not None:
+            return _payload_from_raw, (private["_raw"], private["_blob_store"])
+
+        return super().__reduce_ex__(protocol)
+
+
+## unpickles a payload, since a module function is pickled as just its name, unlike the bound `from_raw`
+def _payload_from_raw(raw: str | bytes, blob_store: BlobStore | None) -> ActionPayload:
+    return ActionPayload.from_raw(raw, blob_store)
+
 
 class ActionType(str, Enum):
     START_STEP_RUN = "START_STEP_RUN"
@@ -85,7 +295,12 @@ class ActionType(str, Enum):
     START_GET_GROUP_KEY = "START_GET_GROUP_KEY"
 
 
+_ACTION_TYPES = {ActionTypeProto.Value(t.name): t for t in ActionType}
+
+
 class Action(BaseModel):
+    """An action assigned to this worker, as a task sees it through `Context.action`."""
+
     worker_id: str
     tenant_id: str
     workflow_run_id: str
@@ -99,42 +314,168 @@ class Action(BaseModel):
     action_type: ActionType
     retry_count: int
     action_payload: ActionPayload
-    additional_metadata: JSONSerializableMapping = field(default_factory=dict)
+    additional_metadata: JSONSerializableMapping = Field(default_factory=dict)
 
     child_workflow_index: int | None = None
     child_workflow_key: str | None = None
     parent_workflow_run_id: str | None = None
 
-    def _dump_payload_to_str(self) -> str:
-        try:
-            return json.dumps(self.action_payload.model_dump(), default=str)
-        except Exception:
-            return str(self.action_payload)
+    ## when the action finished each stage on this worker, see `StepStage`
+    timings: dict[StepStage, float] = Field(
+        default_factory=dict, exclude=True, repr=False
+    )
 
     @property
     def otel_attributes(self) -> dict[str, str | int]:
-        try:
-            payload_str = json.dumps(self.action_payload.model_dump(), default=str)
-        except Exception:
-            payload_str = str(self.action_payload)
-
-        attrs: dict[str, str | int | None] = {
-            "hatchet.tenant_id": self.tenant_id,
-            "hatchet.worker_id": self.worker_id,
-            "hatchet.workflow_run_id": self.workflow_run_id,
-            "hatchet.step_id": self.step_id,
-            "hatchet.step_run_id": self.step_run_id,
-            "hatchet.retry_count": self.retry_count,
-            "hatchet.parent_workflow_run_id": self.parent_workflow_run_id,
-            "hatchet.child_workflow_index": self.child_workflow_index,
-            "hatchet.child_workflow_key": self.child_workflow_key,
-            "hatchet.action_payload": payload_str,
-            "hatchet.workflow_name": self.job_name,
-            "hatchet.action_name": self.action_id,
-            "hatchet.get_group_key_run_id": self.get_group_key_run_id,
-        }
-
-        return {k: v for k, v in attrs.items() if v}
+        return _otel_attributes(self)
+
+
+@dataclass(slots=True)
+class ActionRecord:
+    """
+    An action assigned to this worker, as the listener and runner pass it around. It's a plain
+    slotted record rather than a pydantic model, since one is built, pickled or framed across
+    processes, and read for every assignment. Tasks see it as an `Action` (see `to_action`).
+    """
+
+    worker_id: str
+    tenant_id: str
+    workflow_run_id: str
+    get_group_key_run_id: str
+    job_id: str
+    job_name: str
+    job_run_id: str
+    step_id: str
+    step_run_id: str
+    action_id: str
+    action_type: ActionType
+    retry_count: int
+    action_payload: ActionPayload
+    raw_additional_metadata: str = ""
+
+    child_workflow_index: int | None = None
+    child_workflow_key: str | None = None
+    parent_workflow_run_id: str | None = None
+
+    ## when the action finished each stage on this worker, see `StepStage`
+    timings: dict[StepStage, float] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    _additional_metadata: JSONSerializableMapping | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_proto(
+        cls, assigned_action: AssignedAction, worker_id: str
+    ) -> "ActionRecord":
+        return cls(
+            tenant_id=assigned_action.tenantId,
+            worker_id=worker_id,
+            workflow_run_id=assigned_action.workflowRunId,
+            get_group_key_run_id=assigned_action.getGroupKeyRunId,
+            job_id=assigned_action.jobId,
+            job_name=assigned_action.jobName,
+            job_run_id=assigned_action.jobRunId,
+            step_id=assigned_action.stepId,
+            step_run_id=assigned_action.stepRunId,
+            action_id=assigned_action.actionId,
+            action_payload=ActionPayload.from_raw(assigned_action.actionPayload),
+            action_type=_ACTION_TYPES[assigned_action.actionType],
+            retry_count=assigned_action.retryCount,
+            raw_additional_metadata=assigned_action.additional_metadata,
+            child_workflow_index=assigned_action.child_workflow_index,
+            child_workflow_key=assigned_action.child_workflow_key,
+            parent_workflow_run_id=assigned_action.parent_workflow_run_id,
+        )
+
+    def __reduce__(self) -> tuple[type["ActionRecord"], tuple[Any, ...]]:
+        ## pickled as its constructor arguments, which is smaller and quicker to load than its slots
+        return ActionRecord, (
+            self.worker_id,
+            self.tenant_id,
+            self.workflow_run_id,
+            self.get_group_key_run_id,
+            self.job_id,
+            self.job_name,
+            self.job_run_id,
+            self.step_id,
+            self.step_run_id,
+            self.action_id,
+            self.action_type,
+            self.retry_count,
+            self.action_payload,
+            self.raw_additional_metadata,
+            self.child_workflow_index,
+            self.child_workflow_key,
+            self.parent_workflow_run_id,
+            self.timings,
+        )
+
+    @property
+    def additional_metadata(self) -> JSONSerializableMapping:
+        if self._additional_metadata is None:
+            self._additional_metadata = parse_additional_metadata(
+                self.raw_additional_metadata
+            )
+
+        return self._additional_metadata
+
+    @property
+    def otel_attributes(self) -> dict[str, str | int]:
+        return _otel_attributes(self)
+
+    def to_action(self) -> Action:
+        ## shares the record's payload and timings, so stages marked on either show on both
+        return Action.model_construct(
+            worker_id=self.worker_id,
+            tenant_id=self.tenant_id,
+            workflow_run_id=self.workflow_run_id,
+            get_group_key_run_id=self.get_group_key_run_id,
+            job_id=self.job_id,
+            job_name=self.job_name,
+            job_run_id=self.job_run_id,
+            step_id=self.step_id,
+            step_run_id=self.step_run_id,
+            action_id=self.action_id,
+            action_type=self.action_type,
+            retry_count=self.retry_count,
+            action_payload=self.action_payload,
+            additional_metadata=self.additional_metadata,
+            child_workflow_index=self.child_workflow_index,
+            child_workflow_key=self.child_workflow_key,
+            parent_workflow_run_id=self.parent_workflow_run_id,
+            timings=self.timings,
+        )
+
+
+def _dump_payload_to_str(payload: ActionPayload) -> str:
+    ## decoded rather than passed through as sent, which may be a compressed or offloaded input
+    try:
+        return json.dumps(payload.model_dump(), default=str)
+    except Exception:
+        return str(payload)
+
+
+def _otel_attributes(action: Action | ActionRecord) -> dict[str, str | int]:
+    attrs: dict[str, str | int | None] = {
+        "hatchet.tenant_id": action.tenant_id,
+        "hatchet.worker_id": action.worker_id,
+        "hatchet.workflow_run_id": action.workflow_run_id,
+        "hatchet.step_id": action.step_id,
+        "hatchet.step_run_id": action.step_run_id,
+        "hatchet.retry_count": action.retry_count,
+        "hatchet.parent_workflow_run_id": action.parent_workflow_run_id,
+        "hatchet.child_workflow_index": action.child_workflow_index,
+        "hatchet.child_workflow_key": action.child_workflow_key,
+        "hatchet.action_payload": _dump_payload_to_str(action.action_payload),
+        "hatchet.workflow_name": action.job_name,
+        "hatchet.action_name": action.action_id,
+        "hatchet.get_group_key_run_id": action.get_group_key_run_id,
+    }
+
+    return {k: v for k, v in attrs.items() if v}
 
 
 def parse_additional_metadata(additional_metadata: str) -> JSONSerializableMapping:
@@ -152,7 +493,7 @@ class ActionListener:
         self.config = config
         self.worker_id = worker_id
 
-        self.aio_client = DispatcherStub(new_conn(self.config, True))  # type: ignore[no-untyped-call]
+        self.aio_client = DispatcherStub(shared_conn(self.config, True))  # type: ignore[no-untyped-call]
         self.token = self.config.token
 
         self.retries = 0
@@ -163,6 +504,14 @@ class ActionListener:
         self.run_heartbeat = True
         self.listen_strategy = "v2"
         self.stop_signal = False
+
+        self.recorder = (
+            ActionRecorder(
+                Path(config.worker_action_record_dir) / f"{worker_id}.actions"
+            )
+            if config.worker_action_record_dir
+            else None
+        )
         self.missed_heartbeats = 0
 
     def is_healthy(self) -> bool:
@@ -242,10 +591,10 @@ class ActionListener:
                 raise e
         self.heartbeat_task = loop.create_task(self.heartbeat())
 
-    def __aiter__(self) -> AsyncGenerator[Action | None, None]:
+    def __aiter__(self) -> AsyncGenerator[ActionRecord | None, None]:
         return self._generator()
 
-    async def _generator(self) -> AsyncGenerator[Action | None, None]:
+    async def _generator(self) -> AsyncGenerator[ActionRecord | None, None]:
         listener = None
 
         while not self.stop_signal:
@@ -291,42 +640,10 @@ class ActionListener:
 
                     self.retries = 0
 
-                    try:
-                        action_payload = (
-                            ActionPayload()
-                            if not assigned_action.actionPayload
-                            else ActionPayload.model_validate_json(
-                                assigned_action.actionPayload
-                            )
-                        )
-                    except (ValueError, json.JSONDecodeError) as e:
-                        raise ValueError(f"Error decoding payload: {e}")
-
-                    action = Action(
-                        tenant_id=assigned_action.tenantId,
-                        worker_id=self.worker_id,
-                        workflow_run_id=assigned_action.workflowRunId,
-                        get_group_key_run_id=assigned_action.getGroupKeyRunId,
-                        job_id=assigned_action.jobId,
-                        job_name=assigned_action.jobName,
-                        job_run_id=assigned_action.jobRunId,
-                        step_id=assigned_action.stepId,
-                        step_run_id=assigned_action.stepRunId,
-                        action_id=assigned_action.actionId,
-                        action_payload=action_payload,
-                        action_type=convert_proto_enum_to_python(
-                            assigned_action.actionType,
-                            ActionType,
-                            ActionTypeProto,
-                        ),
-                        retry_count=assigned_action.retryCount,
-                        additional_metadata=parse_additional_metadata(
-                            assigned_action.additional_metadata
-                        ),
-                        child_workflow_index=assigned_action.child_workflow_index,
-                        child_workflow_key=assigned_action.child_workflow_key,
-                        parent_workflow_run_id=assigned_action.parent_workflow_run_id,
-                    )
+                    if self.recorder is not None:
+                        self.recorder.record(assigned_action)
+
+                    action = ActionRecord.from_proto(assigned_action, self.worker_id)
 
                     yield action
             except grpc.RpcError as e:
@@ -386,7 +703,10 @@ class ActionListener:
                 f"action listener connection interrupted, retrying... ({self.retries}/{DEFAULT_ACTION_LISTENER_RETRY_COUNT})"
             )
 
-        self.aio_client = DispatcherStub(new_conn(self.config, True))  # type: ignore[no-untyped-call]
+            ## reconnect on a new channel, rather than the shared one the stream was interrupted on
+            evict_conn(self.config, True)
+
+        self.aio_client = DispatcherStub(shared_conn(self.config, True))  # type: ignore[no-untyped-call]
 
         if self.listen_strategy == "v2":
             # we should await for the listener to be established before
@@ -4,13 +4,13 @@ import grpc.aio
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from hatchet_sdk.clients.dispatcher.action_listener import (
-    Action,
     ActionListener,
+    ActionRecord,
     GetActionListenerRequest,
 )
 from hatchet_sdk.clients.rest.tenacity_utils import tenacity_retry
 from hatchet_sdk.config import ClientConfig
-from hatchet_sdk.connection import new_conn
+from hatchet_sdk.connection import shared_conn
 from hatchet_sdk.contracts.dispatcher_pb2 import (
     STEP_EVENT_TYPE_COMPLETED,
     STEP_EVENT_TYPE_FAILED,
@@ -37,10 +37,10 @@ class DispatcherClient:
     config: ClientConfig
 
     def __init__(self, config: ClientConfig):
-        conn = new_conn(config, False)
+        conn = shared_conn(config, False)
         self.client = DispatcherStub(conn)  # type: ignore[no-untyped-call]
 
-        aio_conn = new_conn(config, True)
+        aio_conn = shared_conn(config, True)
         self.aio_client = DispatcherStub(aio_conn)  # type: ignore[no-untyped-call]
         self.token = config.token
         self.config = config
@@ -73,7 +73,10 @@ class DispatcherClient:
         return ActionListener(self.config, response.workerId)
 
     async def send_step_action_event(
-        self, action: Action, event_type: StepActionEventType, payload: str
+        self,
+        action: ActionRecord,
+        event_type: StepActionEventType,
+        payload: str | bytes,
     ) -> grpc.aio.UnaryUnaryCall[StepActionEvent, ActionEventResponse] | None:
         try:
             return await self._try_send_step_action_event(action, event_type, payload)
@@ -93,7 +96,10 @@ class DispatcherClient:
 
     @tenacity_retry
     async def _try_send_step_action_event(
-        self, action: Action, event_type: StepActionEventType, payload: str
+        self,
+        action: ActionRecord,
+        event_type: StepActionEventType,
+        payload: str | bytes,
     ) -> grpc.aio.UnaryUnaryCall[StepActionEvent, ActionEventResponse]:
         event_timestamp = Timestamp()
         event_timestamp.GetCurrentTime()
@@ -107,7 +113,7 @@ class DispatcherClient:
             actionId=action.action_id,
             eventTimestamp=event_timestamp,
             eventType=event_type,
-            eventPayload=payload,
+            eventPayload=payload,  # type: ignore[arg-type]
             retryCount=action.retry_count,
         )
 
@@ -120,7 +126,10 @@ class DispatcherClient:
         )
 
     async def send_group_key_action_event(
-        self, action: Action, event_type: GroupKeyActionEventType, payload: str
+        self,
+        action: ActionRecord,
+        event_type: GroupKeyActionEventType,
+        payload: str | bytes,
     ) -> grpc.aio.UnaryUnaryCall[GroupKeyActionEvent, ActionEventResponse]:
         event_timestamp = Timestamp()
         event_timestamp.GetCurrentTime()
@@ -132,7 +141,7 @@ class DispatcherClient:
             actionId=action.action_id,
             eventTimestamp=event_timestamp,
             eventType=event_type,
-            eventPayload=payload,
+            eventPayload=payload,  # type: ignore[arg-type]
         )
 
         return cast(
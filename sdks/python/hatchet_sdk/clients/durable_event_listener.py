@@ -1,5 +1,4 @@
 import asyncio
-import json
 from collections.abc import AsyncIterator
 from typing import Any, Literal, cast
 
@@ -11,7 +10,7 @@ from pydantic import BaseModel, ConfigDict
 from hatchet_sdk.clients.event_ts import ThreadSafeEvent, read_with_interrupt
 from hatchet_sdk.clients.rest.tenacity_utils import tenacity_retry
 from hatchet_sdk.config import ClientConfig
-from hatchet_sdk.connection import new_conn
+from hatchet_sdk.connection import shared_conn
 from hatchet_sdk.contracts.v1.dispatcher_pb2 import (
     DurableEvent,
     ListenForDurableEventRequest,
@@ -90,7 +89,7 @@ class DurableEventListener:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-        conn = new_conn(config, True)
+        conn = shared_conn(config, True)
         self.client = V1DispatcherStub(conn)  # type: ignore[no-untyped-call]
         self.token = config.token
         self.config = config
@@ -324,4 +323,4 @@ class DurableEventListener:
     async def result(self, task_id: str, signal_key: str) -> dict[str, Any]:
         event = await self.subscribe(task_id, signal_key)
 
-        return cast(dict[str, Any], json.loads(event.data.decode("utf-8")))
+        return cast(dict[str, Any], self.config.serializer.loads(event.data))
@@ -0,0 +1,366 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Literal, cast
+
+from hatchet_sdk.clients.bulk import MAX_BULK_ITEMS, item_bytes, max_bulk_request_bytes
+from hatchet_sdk.clients.rest.tenacity_utils import tenacity_retry
+from hatchet_sdk.contracts.events_pb2 import (
+    BulkPushEventRequest,
+    Event,
+    Events,
+    PushEventRequest,
+)
+from hatchet_sdk.logger import logger
+from hatchet_sdk.metadata import get_metadata
+from hatchet_sdk.utils.typing import JSONSerializableMapping
+
+if TYPE_CHECKING:
+    from hatchet_sdk.clients.events import EventClient, PushEventOptions
+
+## a buffered event, its serialized size and the future its caller is holding
+_Pending = tuple[PushEventRequest, int, Future[Event]]
+
+
+class EventBufferFullError(Exception):
+    """Raised by an `EventProducer` when an event can't be buffered because the buffer is full."""
+
+    pass
+
+
+class EventProducerClosedError(Exception):
+    """Raised by an `EventProducer` when an event is sent after the producer was closed."""
+
+    pass
+
+
+class EventProducer:
+    """
+    Buffers pushed events and sends them in the background as bulk pushes, once `max_batch` events
+    (or a request's worth of bytes) are waiting or `linger_ms` has passed since the first of them
+    was sent. `send` returns a future that resolves to the pushed `Event`.
+
+    The buffer holds at most `max_buffer_bytes` of serialized events. When it's full, `send` either
+    blocks until there's room (for up to `block_timeout` seconds) or, with `on_full="drop"`, drops
+    the event and returns a future that has failed with `EventBufferFullError`.
+
+    Up to `max_in_flight` bulk pushes are sent at once, so events sent close together may be pushed
+    out of order.
+    """
+
+    def __init__(
+        self,
+        event_client: "EventClient",
+        max_batch: int = 500,
+        linger_ms: float = 5,
+        max_buffer_bytes: int = 32 * 1024 * 1024,
+        on_full: Literal["block", "drop"] = "block",
+        block_timeout: float | None = None,
+        max_in_flight: int = 4,
+    ) -> None:
+        if not 0 < max_batch <= MAX_BULK_ITEMS:
+            raise ValueError(f"max_batch must be between 1 and {MAX_BULK_ITEMS}")
+
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be greater than 0")
+
+        self.event_client = event_client
+        self.max_batch = max_batch
+        self.linger = linger_ms / 1000
+        self.max_buffer_bytes = max_buffer_bytes
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        self.max_request_bytes = max_bulk_request_bytes(
+            event_client.config.grpc_max_send_message_length
+        )
+
+        self.pending: list[_Pending] = []
+        self.pending_bytes = 0
+        self.first_pending_at = 0.0
+        self.flushing = 0
+
+        ## bytes of events that are buffered or in flight, which `max_buffer_bytes` bounds
+        self.buffered_bytes = 0
+        self.unresolved = 0
+        self.closed = False
+
+        self.condition = threading.Condition()
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.senders = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="hatchet-event-producer"
+        )
+        self.flusher = threading.Thread(
+            target=self._flush_loop, name="hatchet-event-producer", daemon=True
+        )
+        self.flusher.start()
+
+    def send(
+        self,
+        event_key: str,
+        payload: JSONSerializableMapping,
+        options: "PushEventOptions | None" = None,
+    ) -> Future[Event]:
+        request = self._prepare(event_key, payload, options)
+        size = item_bytes(request)
+
+        with self.condition:
+            if not self._wait_for_room(size):
+                return self._dropped(event_key)
+
+            return self._append(request, size)
+
+    async def aio_send(
+        self,
+        event_key: str,
+        payload: JSONSerializableMapping,
+        options: "PushEventOptions | None" = None,
+    ) -> Event:
+        request = self._prepare(event_key, payload, options)
+        size = item_bytes(request)
+
+        with self.condition:
+            if self._has_room(size):
+                future = self._append(request, size)
+            elif self.on_full == "drop":
+                future = self._dropped(event_key)
+            else:
+                future = None
+
+        if future is None:
+            ## only wait for room off the event loop, so a full buffer doesn't stall it
+            future = await asyncio.to_thread(self._send_when_room, request, size)
+
+        return await asyncio.wrap_future(future)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """
+        Sends every buffered event right away, and waits until they've all been pushed.
+        """
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+
+            try:
+                if not self.condition.wait_for(lambda: self.unresolved == 0, timeout):
+                    raise TimeoutError(
+                        f"timed out flushing {self.unresolved} buffered events"
+                    )
+            finally:
+                self.flushing -= 1
+
+    async def aio_flush(self, timeout: float | None = None) -> None:
+        await asyncio.to_thread(self.flush, timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Flushes the buffered events and stops the producer. Events sent afterwards fail with
+        `EventProducerClosedError`.
+        """
+        with self.condition:
+            self.closed = True
+
+        self.flush(timeout)
+        self.senders.shutdown(wait=True)
+
+    def __enter__(self) -> "EventProducer":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _prepare(
+        self,
+        event_key: str,
+        payload: JSONSerializableMapping,
+        options: "PushEventOptions | None",
+    ) -> PushEventRequest:
+        from hatchet_sdk.clients.events import PushEventOptions
+
+        return self.event_client._prepare_push_event_request(
+            event_key,
+            self.event_client._encode_payload(payload),
+            options or PushEventOptions(),
+        )
+
+    def _has_room(self, size: int) -> bool:
+        if self.closed:
+            raise EventProducerClosedError("the event producer has been closed")
+
+        ## an event bigger than the whole buffer is let through on its own
+        return (
+            self.buffered_bytes == 0
+            or self.buffered_bytes + size <= self.max_buffer_bytes
+        )
+
+    def _wait_for_room(self, size: int) -> bool:
+        if self._has_room(size):
+            return True
+
+        if self.on_full == "drop":
+            return False
+
+        deadline = (
+            time.monotonic() + self.block_timeout
+            if self.block_timeout is not None
+            else None
+        )
+
+        while not self._has_room(size):
+            remaining = deadline - time.monotonic() if deadline is not None else None
+
+            if remaining is not None and remaining <= 0:
+                raise EventBufferFullError(
+                    f"timed out after {self.block_timeout}s waiting for room in the event buffer"
+                )
+
+            self.condition.wait(remaining)
+
+        return True
+
+    def _send_when_room(self, request: PushEventRequest, size: int) -> Future[Event]:
+        with self.condition:
+            if not self._wait_for_room(size):
+                return self._dropped(request.key)
+
+            return self._append(request, size)
+
+    def _dropped(self, event_key: str) -> Future[Event]:
+        logger.debug(f"event buffer is full, dropping event {event_key}")
+
+        future: Future[Event] = Future()
+        future.set_exception(
+            EventBufferFullError(
+                f"event buffer is full ({self.buffered_bytes} bytes), dropped event {event_key}"
+            )
+        )
+
+        return future
+
+    def _append(self, request: PushEventRequest, size: int) -> Future[Event]:
+        future: Future[Event] = Future()
+
+        if not self.pending:
+            self.first_pending_at = time.monotonic()
+
+        self.pending.append((request, size, future))
+        self.pending_bytes += size
+        self.buffered_bytes += size
+        self.unresolved += 1
+
+        if (
+            len(self.pending) == 1
+            or len(self.pending) >= self.max_batch
+            or self.pending_bytes >= self.max_request_bytes
+        ):
+            self.condition.notify_all()
+
+        return future
+
+    def _batch_is_ready(self) -> bool:
+        return (
+            self.flushing > 0
+            or len(self.pending) >= self.max_batch
+            or self.pending_bytes >= self.max_request_bytes
+            or time.monotonic() >= self.first_pending_at + self.linger
+        )
+
+    def _take_batch(self) -> tuple[list[_Pending], int]:
+        batch: list[_Pending] = []
+        size = 0
+
+        for pending in self.pending:
+            if batch and (
+                len(batch) >= self.max_batch
+                or size + pending[1] > self.max_request_bytes
+            ):
+                break
+
+            batch.append(pending)
+            size += pending[1]
+
+        self.pending = self.pending[len(batch) :]
+        self.pending_bytes -= size
+
+        if self.pending:
+            self.first_pending_at = time.monotonic()
+
+        return batch, size
+
+    def _flush_loop(self) -> None:
+        while True:
+            ## wait for a free sender first, so events keep batching up while every sender is busy
+            self.in_flight.acquire()
+
+            with self.condition:
+                while not self.pending or not self._batch_is_ready():
+                    if not self.pending and self.closed:
+                        self.in_flight.release()
+                        return
+
+                    if not self.pending:
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(
+                            max(
+                                self.first_pending_at + self.linger - time.monotonic(),
+                                0,
+                            )
+                        )
+
+                batch, size = self._take_batch()
+
+            try:
+                self.senders.submit(self._send, batch, size)
+            except RuntimeError:
+                ## the producer was closed while this batch was being taken
+                self.in_flight.release()
+                self._resolve(batch, size, None, EventProducerClosedError())
+                return
+
+    def _send(self, batch: list[_Pending], size: int) -> None:
+        try:
+            response = self._bulk_push(
+                BulkPushEventRequest(events=[request for request, _, _ in batch])
+            )
+            events = list(response.events)
+
+            if len(events) != len(batch):
+                raise ValueError(
+                    f"bulk push returned {len(events)} events for {len(batch)} pushed"
+                )
+
+            self._resolve(batch, size, events, None)
+        except Exception as e:
+            logger.error(f"failed to push {len(batch)} buffered events: {e}")
+            self._resolve(batch, size, None, e)
+        finally:
+            self.in_flight.release()
+
+    @tenacity_retry
+    def _bulk_push(self, request: BulkPushEventRequest) -> Events:
+        return cast(
+            Events,
+            self.event_client.client.BulkPush(
+                request, metadata=get_metadata(self.event_client.token)
+            ),
+        )
+
+    def _resolve(
+        self,
+        batch: list[_Pending],
+        size: int,
+        events: list[Event] | None,
+        error: BaseException | None,
+    ) -> None:
+        for i, (_, _, future) in enumerate(batch):
+            if future.set_running_or_notify_cancel():
+                if events is not None:
+                    future.set_result(events[i])
+                else:
+                    future.set_exception(error or RuntimeError("event was not pushed"))
+
+        with self.condition:
+            self.buffered_bytes -= size
+            self.unresolved -= len(batch)
+            self.condition.notify_all()
@@ -1,14 +1,23 @@
 import asyncio
 import datetime
-import json
-from typing import List, cast
+from typing import List, Literal, cast
 
 import grpc
 from google.protobuf import timestamp_pb2
 from pydantic import BaseModel, Field
 
+from hatchet_sdk.clients.bulk import (
+    aio_send_chunked,
+    max_bulk_request_bytes,
+    retry_not_applied,
+    send_chunked,
+)
+from hatchet_sdk.clients.event_producer import EventProducer
+from hatchet_sdk.clients.log_shipper import get_log_shipper
 from hatchet_sdk.clients.rest.tenacity_utils import tenacity_retry
+from hatchet_sdk.clients.stream_shipper import get_stream_shipper
 from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.connection import LoopBoundChannel
 from hatchet_sdk.contracts.events_pb2 import (
     BulkPushEventRequest,
     Event,
@@ -18,6 +27,7 @@ from hatchet_sdk.contracts.events_pb2 import (
 )
 from hatchet_sdk.contracts.events_pb2_grpc import EventsServiceStub
 from hatchet_sdk.metadata import get_metadata
+from hatchet_sdk.payloads import aio_encode_payload, encode_payload
 from hatchet_sdk.utils.typing import JSONSerializableMapping
 
 
@@ -36,6 +46,15 @@ def proto_timestamp_now() -> timestamp_pb2.Timestamp:
     return timestamp_pb2.Timestamp(seconds=seconds, nanos=nanos)
 
 
+def _stream_bytes(data: str | bytes) -> bytes:
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    elif isinstance(data, bytes):
+        return data
+    else:
+        raise ValueError("Invalid data type. Expected str, bytes, or file.")
+
+
 class PushEventOptions(BaseModel):
     additional_metadata: JSONSerializableMapping = Field(default_factory=dict)
     namespace: str | None = None
@@ -54,17 +73,70 @@ class BulkPushEventWithMetadata(BaseModel):
 class EventClient:
     def __init__(self, client: EventsServiceStub, config: ClientConfig):
         self.client = client
+        self.config = config
         self.token = config.token
         self.namespace = config.namespace
+        self.aio_conn = LoopBoundChannel(config)
 
+    def producer(
+        self,
+        max_batch: int = 500,
+        linger_ms: float = 5,
+        max_buffer_bytes: int = 32 * 1024 * 1024,
+        on_full: Literal["block", "drop"] = "block",
+        block_timeout: float | None = None,
+        max_in_flight: int = 4,
+    ) -> EventProducer:
+        """
+        Create a producer that buffers events and pushes them in the background in batches, for
+        sending many events quickly without waiting for each push.
+
+        :param max_batch: The most events to send in one bulk push, up to 1000. Defaults to 500.
+        :type max_batch: int
+
+        :param linger_ms: How long to wait for more events after the first one is buffered before sending them. Defaults to 5.
+        :type linger_ms: float
+
+        :param max_buffer_bytes: The most serialized bytes of events to hold, buffered or in flight, at once. Defaults to 32MB.
+        :type max_buffer_bytes: int
+
+        :param on_full: Whether `send` blocks until there's room or drops the event when the buffer is full. Defaults to `block`.
+        :type on_full: Literal["block", "drop"]
+
+        :param block_timeout: How many seconds `send` blocks for before raising an `EventBufferFullError`. Defaults to waiting forever.
+        :type block_timeout: float | None
+
+        :param max_in_flight: The most bulk pushes to send at once. Defaults to 4.
+        :type max_in_flight: int
+
+        :returns: An `EventProducer`, which should be closed (or used as a context manager) to flush the remaining events.
+        """
+        return EventProducer(
+            self,
+            max_batch=max_batch,
+            linger_ms=linger_ms,
+            max_buffer_bytes=max_buffer_bytes,
+            on_full=on_full,
+            block_timeout=block_timeout,
+            max_in_flight=max_in_flight,
+        )
+
+    @tenacity_retry
     async def aio_push(
         self,
         event_key: str,
         payload: JSONSerializableMapping,
         options: PushEventOptions = PushEventOptions(),
     ) -> Event:
-        return await asyncio.to_thread(
-            self.push, event_key=event_key, payload=payload, options=options
+        request = self._prepare_push_event_request(
+            event_key, await self._aio_encode_payload(payload), options
+        )
+
+        return cast(
+            Event,
+            await self.aio_conn.stub(EventsServiceStub).Push(
+                request, metadata=get_metadata(self.token)
+            ),
         )
 
     async def aio_bulk_push(
@@ -72,7 +144,30 @@ class EventClient:
         events: list[BulkPushEventWithMetadata],
         options: BulkPushEventOptions = BulkPushEventOptions(),
     ) -> List[Event]:
-        return await asyncio.to_thread(self.bulk_push, events=events, options=options)
+        payloads = await asyncio.gather(
+            *[self._aio_encode_payload(event.payload) for event in events]
+        )
+
+        return await aio_send_chunked(
+            self._prepare_push_event_requests(events, options, payloads),
+            self._aio_bulk_push_chunk,
+            max_bulk_request_bytes(self.config.grpc_max_send_message_length),
+            self.config.bulk_request_max_in_flight,
+        )
+
+    @retry_not_applied
+    async def _aio_bulk_push_chunk(
+        self, requests: list[PushEventRequest]
+    ) -> list[Event]:
+        response = await self.aio_conn.stub(EventsServiceStub).BulkPush(
+            BulkPushEventRequest(events=requests),
+            metadata=get_metadata(self.token),
+        )
+
+        return cast(
+            list[Event],
+            list(response.events),
+        )
 
     ## IMPORTANT: Keep this method's signature in sync with the wrapper in the OTel instrumentor
     @tenacity_retry
@@ -82,78 +177,115 @@ class EventClient:
         payload: JSONSerializableMapping,
         options: PushEventOptions = PushEventOptions(),
     ) -> Event:
+        request = self._prepare_push_event_request(
+            event_key, self._encode_payload(payload), options
+        )
+
+        return cast(Event, self.client.Push(request, metadata=get_metadata(self.token)))
+
+    def _serialize_payload(self, payload: JSONSerializableMapping) -> bytes:
+        try:
+            return self.config.serializer.dumps(payload)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Error encoding payload: {e}")
+
+    def _encode_payload(self, payload: JSONSerializableMapping) -> bytes:
+        return encode_payload(self._serialize_payload(payload), self.config)
+
+    async def _aio_encode_payload(self, payload: JSONSerializableMapping) -> bytes:
+        ## a payload offloaded to the blob store is uploaded from a thread
+        return await aio_encode_payload(self._serialize_payload(payload), self.config)
+
+    def _prepare_push_event_request(
+        self,
+        event_key: str,
+        payload: bytes,
+        options: PushEventOptions,
+    ) -> PushEventRequest:
         namespace = options.namespace or self.namespace
         namespaced_event_key = namespace + event_key
 
         try:
             meta = options.additional_metadata
-            meta_bytes = None if meta is None else json.dumps(meta)
+            meta_bytes = None if meta is None else self.config.serializer.dumps(meta)
         except Exception as e:
             raise ValueError(f"Error encoding meta: {e}")
 
-        try:
-            payload_str = json.dumps(payload)
-        except (TypeError, ValueError) as e:
-            raise ValueError(f"Error encoding payload: {e}")
-
-        request = PushEventRequest(
+        return PushEventRequest(
             key=namespaced_event_key,
-            payload=payload_str,
+            payload=payload,  # type: ignore[arg-type]
             eventTimestamp=proto_timestamp_now(),
-            additionalMetadata=meta_bytes,
+            additionalMetadata=meta_bytes,  # type: ignore[arg-type]
         )
 
-        return cast(Event, self.client.Push(request, metadata=get_metadata(self.token)))
-
     def _create_push_event_request(
         self,
         event: BulkPushEventWithMetadata,
         namespace: str,
+        payload: bytes,
     ) -> PushEventRequest:
         event_key = namespace + event.key
-        payload = event.payload
-
         meta = event.additional_metadata
 
         try:
-            meta_str = json.dumps(meta)
+            meta_str = self.config.serializer.dumps(meta)
         except Exception as e:
             raise ValueError(f"Error encoding meta: {e}")
 
-        try:
-            serialized_payload = json.dumps(payload)
-        except (TypeError, ValueError) as e:
-            raise ValueError(f"Error serializing payload: {e}")
-
         return PushEventRequest(
             key=event_key,
-            payload=serialized_payload,
+            payload=payload,  # type: ignore[arg-type]
             eventTimestamp=proto_timestamp_now(),
-            additionalMetadata=meta_str,
+            additionalMetadata=meta_str,  # type: ignore[arg-type]
         )
 
     ## IMPORTANT: Keep this method's signature in sync with the wrapper in the OTel instrumentor
-    @tenacity_retry
     def bulk_push(
         self,
         events: List[BulkPushEventWithMetadata],
         options: BulkPushEventOptions = BulkPushEventOptions(),
     ) -> List[Event]:
-        namespace = options.namespace or self.namespace
-
-        bulk_request = BulkPushEventRequest(
-            events=[
-                self._create_push_event_request(event, namespace) for event in events
-            ]
+        """
+        Push many events at once. Events that don't fit in a single request are split into
+        several, sent concurrently; if some of those fail, a `BulkRequestError` is raised with the
+        events that were pushed and the indices of those that weren't.
+        """
+        return send_chunked(
+            self._prepare_push_event_requests(
+                events,
+                options,
+                [self._encode_payload(event.payload) for event in events],
+            ),
+            self._bulk_push_chunk,
+            max_bulk_request_bytes(self.config.grpc_max_send_message_length),
+            self.config.bulk_request_max_in_flight,
         )
 
-        response = self.client.BulkPush(bulk_request, metadata=get_metadata(self.token))
+    @retry_not_applied
+    def _bulk_push_chunk(self, requests: list[PushEventRequest]) -> list[Event]:
+        response = self.client.BulkPush(
+            BulkPushEventRequest(events=requests),
+            metadata=get_metadata(self.token),
+        )
 
         return cast(
             list[Event],
-            response.events,
+            list(response.events),
         )
 
+    def _prepare_push_event_requests(
+        self,
+        events: List[BulkPushEventWithMetadata],
+        options: BulkPushEventOptions,
+        payloads: list[bytes],
+    ) -> list[PushEventRequest]:
+        namespace = options.namespace or self.namespace
+
+        return [
+            self._create_push_event_request(event, namespace, payload)
+            for event, payload in zip(events, payloads)
+        ]
+
     def log(self, message: str, step_run_id: str) -> None:
         request = PutLogRequest(
             stepRunId=step_run_id,
@@ -163,18 +295,41 @@ class EventClient:
 
         self.client.PutLog(request, metadata=get_metadata(self.token))
 
-    def stream(self, data: str | bytes, step_run_id: str) -> None:
-        if isinstance(data, str):
-            data_bytes = data.encode("utf-8")
-        elif isinstance(data, bytes):
-            data_bytes = data
-        else:
-            raise ValueError("Invalid data type. Expected str, bytes, or file.")
+    def buffer_log(self, message: str, step_run_id: str) -> None:
+        """
+        Queues a log line to be sent in the background by this process's `LogShipper`, instead of
+        sending it right away like `log`.
+        """
+        get_log_shipper(self.config).send(step_run_id, message)
+
+    def buffer_stream(self, data: str | bytes, step_run_id: str) -> None:
+        """
+        Queues a chunk to be put on a step run's stream in the background by this process's
+        `StreamShipper`, which may send it together with the chunks put around it. Blocks while
+        the shipper's buffer is full.
+        """
+        get_stream_shipper(self.config).send(step_run_id, _stream_bytes(data))
+
+    async def aio_buffer_stream(self, data: str | bytes, step_run_id: str) -> None:
+        await get_stream_shipper(self.config).aio_send(step_run_id, _stream_bytes(data))
+
+    async def aio_flush_buffered(
+        self, step_run_id: str | None = None, timeout: float | None = None
+    ) -> None:
+        """
+        Waits until the buffered log lines and stream chunks (of `step_run_id`, or of every step run)
+        have been sent.
+        """
+        await asyncio.gather(
+            get_log_shipper(self.config).aio_flush(step_run_id, timeout),
+            get_stream_shipper(self.config).aio_flush(step_run_id, timeout),
+        )
 
+    def stream(self, data: str | bytes, step_run_id: str) -> None:
         request = PutStreamEventRequest(
             stepRunId=step_run_id,
             createdAt=proto_timestamp_now(),
-            message=data_bytes,
+            message=_stream_bytes(data),
         )
 
         self.client.PutStreamEvent(request, metadata=get_metadata(self.token))
@@ -0,0 +1,88 @@
+from prometheus_client import Counter
+
+from hatchet_sdk.clients.rest.tenacity_utils import tenacity_retry
+from hatchet_sdk.clients.step_run_buffer import (
+    Buffered,
+    BufferPolicy,
+    StepRunBuffer,
+    buffered_at,
+    process_buffer,
+)
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.connection import shared_conn
+from hatchet_sdk.contracts.events_pb2 import PutLogRequest
+from hatchet_sdk.contracts.events_pb2_grpc import EventsServiceStub
+from hatchet_sdk.metadata import get_metadata
+
+log_lines = Counter(
+    "hatchet_log_lines",
+    "Number of task log lines shipped to the Hatchet engine, dropped because the log buffer was full, or that failed to send",
+    ["outcome"],
+)
+
+
+class LogShipper(StepRunBuffer[str]):
+    """
+    Buffers task log lines and sends them to the engine in the background, so logging never waits
+    on a `PutLog` call. Each step run's waiting lines are sent together as one multi-line log entry
+    of up to `max_message_bytes`. The buffer holds at most `max_buffer_lines` lines, see
+    `StepRunBuffer` for what happens when it's full.
+    """
+
+    item_name = "log line"
+
+    def __init__(
+        self,
+        config: ClientConfig,
+        max_buffer_lines: int = 10_000,
+        on_full: BufferPolicy = "drop_oldest",
+        block_timeout: float | None = 5,
+        max_in_flight: int = 8,
+        linger_ms: float = 20,
+        max_message_bytes: int = 64 * 1024,
+    ) -> None:
+        self.client = EventsServiceStub(shared_conn(config, False))  # type: ignore[no-untyped-call]
+        self.token = config.token
+
+        super().__init__(
+            max_buffered=max_buffer_lines,
+            on_full=on_full,
+            block_timeout=block_timeout,
+            max_in_flight=max_in_flight,
+            linger_ms=linger_ms,
+            max_batch_bytes=max_message_bytes,
+            thread_name="hatchet-log-shipper",
+        )
+
+    def _size(self, item: str) -> int:
+        ## and the newline it's joined with
+        return len(item) + 1
+
+    def _send_batch(self, step_run_id: str, items: list[Buffered[str]]) -> None:
+        self._put_log(
+            PutLogRequest(
+                stepRunId=step_run_id,
+                createdAt=buffered_at(items),
+                message="\n".join(line for line, _ in items),
+            )
+        )
+
+    @tenacity_retry
+    def _put_log(self, request: PutLogRequest) -> None:
+        self.client.PutLog(request, metadata=get_metadata(self.token))
+
+    def _record(self, items: list[Buffered[str]], outcome: str) -> None:
+        log_lines.labels(outcome=outcome).inc(len(items))
+
+
+def get_log_shipper(config: ClientConfig) -> LogShipper:
+    return process_buffer(
+        LogShipper,
+        config,
+        lambda: LogShipper(
+            config,
+            max_buffer_lines=config.log_buffer_size,
+            on_full=config.log_buffer_on_full,
+            max_in_flight=config.log_max_in_flight,
+        ),
+    )
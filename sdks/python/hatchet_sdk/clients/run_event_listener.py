@@ -7,7 +7,7 @@ import grpc
 from pydantic import BaseModel
 
 from hatchet_sdk.config import ClientConfig
-from hatchet_sdk.connection import new_conn
+from hatchet_sdk.connection import shared_conn
 from hatchet_sdk.contracts.dispatcher_pb2 import (
     RESOURCE_TYPE_STEP_RUN,
     RESOURCE_TYPE_WORKFLOW_RUN,
@@ -240,7 +240,7 @@ class RunEventListenerClient:
             workflow_run_id = str(workflow_run_id)
 
         if not self.client:
-            aio_conn = new_conn(self.config, True)
+            aio_conn = shared_conn(self.config, True)
             self.client = DispatcherStub(aio_conn)  # type: ignore[no-untyped-call]
 
         return RunEventListener(
@@ -249,7 +249,7 @@ class RunEventListenerClient:
 
     def stream_by_additional_metadata(self, key: str, value: str) -> RunEventListener:
         if not self.client:
-            aio_conn = new_conn(self.config, True)
+            aio_conn = shared_conn(self.config, True)
             self.client = DispatcherStub(aio_conn)  # type: ignore[no-untyped-call]
 
         return RunEventListener(
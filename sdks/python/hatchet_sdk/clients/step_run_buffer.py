@@ -0,0 +1,367 @@
+import asyncio
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generic, Literal, TypeVar
+
+from google.protobuf import timestamp_pb2
+
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.logger import logger
+
+T = TypeVar("T")
+TBuffer = TypeVar("TBuffer", bound="StepRunBuffer[Any]")
+
+BufferPolicy = Literal["drop_oldest", "block"]
+
+## a buffered item and when it was buffered
+Buffered = tuple[T, float]
+
+
+class StepRunBuffer(ABC, Generic[T]):
+    """
+    Buffers items (e.g. log lines or stream chunks) per step run, and sends each step run's waiting
+    items together in the background in batches of up to `max_batch_bytes`, once `linger_ms` has
+    passed since the buffer stopped being empty (or right away when flushing).
+
+    Up to `max_in_flight` batches are sent at once, but only one per step run, so a step run's items
+    stay in order. The buffer holds at most `max_buffered` items' worth of `_cost`; when it's full,
+    the oldest buffered items are dropped (`on_full="drop_oldest"`), or `send` waits for room for up
+    to `block_timeout` seconds and then drops its item (`on_full="block"`).
+    """
+
+    ## what an item is called in log messages, e.g. "log line"
+    item_name = "item"
+
+    def __init__(
+        self,
+        max_buffered: int,
+        on_full: BufferPolicy,
+        block_timeout: float | None,
+        max_in_flight: int,
+        linger_ms: float,
+        max_batch_bytes: int,
+        thread_name: str,
+    ) -> None:
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be greater than 0")
+
+        self.max_buffered = max_buffered
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        self.linger = linger_ms / 1000
+        self.max_batch_bytes = max_batch_bytes
+        self.pid = os.getpid()
+
+        self.pending: OrderedDict[str, deque[Buffered[T]]] = OrderedDict()
+        self.buffered = 0
+        self.first_pending_at = 0.0
+        self.flushing = 0
+
+        ## step runs with a batch in flight, and how many of each step run's items are buffered or in flight
+        self.sending: set[str] = set()
+        self.unsent: dict[str, int] = {}
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self.condition = threading.Condition()
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.senders = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix=thread_name
+        )
+        self.flusher = threading.Thread(
+            target=self._flush_loop, name=thread_name, daemon=True
+        )
+        self.flusher.start()
+
+    @abstractmethod
+    def _send_batch(self, step_run_id: str, items: list[Buffered[T]]) -> None:
+        pass
+
+    @abstractmethod
+    def _size(self, item: T) -> int:
+        """
+        The bytes `item` adds to a batch.
+        """
+        pass
+
+    def _cost(self, item: T) -> int:
+        """
+        How much of the buffer `item` takes up, counted against `max_buffered`.
+        """
+        return 1
+
+    def _record(self, items: list[Buffered[T]], outcome: str) -> None:
+        """
+        Called with the items that were sent, dropped or failed to send, e.g. to count them.
+        """
+        pass
+
+    def send(self, step_run_id: str, item: T) -> None:
+        with self.condition:
+            if self.closed or not self._wait_for_room(item):
+                self._drop([(item, time.time())])
+                return
+
+            self._append(step_run_id, item)
+
+    async def aio_send(self, step_run_id: str, item: T) -> None:
+        with self.condition:
+            if not self.closed and (
+                self._has_room(item) or self.on_full == "drop_oldest"
+            ):
+                self._wait_for_room(item)
+                self._append(step_run_id, item)
+                return
+
+        ## only wait for room off the event loop, so a full buffer doesn't stall it
+        await asyncio.to_thread(self.send, step_run_id, item)
+
+    def flush(
+        self, step_run_id: str | None = None, timeout: float | None = None
+    ) -> None:
+        """
+        Sends the buffered items (of `step_run_id`, or of every step run) right away, and waits until
+        they've all been sent or have failed to send.
+        """
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+
+            try:
+                if not self.condition.wait_for(
+                    lambda: self._flushed(step_run_id), timeout
+                ):
+                    raise TimeoutError(
+                        f"timed out flushing {self._unsent(step_run_id)} buffered {self.item_name}s"
+                    )
+            finally:
+                self.flushing -= 1
+
+    async def aio_flush(
+        self, step_run_id: str | None = None, timeout: float | None = None
+    ) -> None:
+        if self._flushed(step_run_id):
+            return
+
+        await asyncio.to_thread(self.flush, step_run_id, timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Flushes the buffered items and stops sending. Items sent afterwards are dropped.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+        self.flush(timeout=timeout)
+        self.senders.shutdown(wait=True)
+
+    def _unsent(self, step_run_id: str | None) -> int:
+        return (
+            self.unsent.get(step_run_id, 0)
+            if step_run_id is not None
+            else sum(self.unsent.values())
+        )
+
+    def _flushed(self, step_run_id: str | None) -> bool:
+        return self._unsent(step_run_id) == 0
+
+    def _has_room(self, item: T) -> bool:
+        ## an item bigger than the whole buffer is let through on its own
+        return (
+            self.buffered == 0 or self.buffered + self._cost(item) <= self.max_buffered
+        )
+
+    def _wait_for_room(self, item: T) -> bool:
+        if self.on_full == "drop_oldest":
+            while not self._has_room(item):
+                self._drop_oldest()
+
+            return True
+
+        return (
+            self.condition.wait_for(
+                lambda: self.closed or self._has_room(item), self.block_timeout
+            )
+            and not self.closed
+        )
+
+    def _append(self, step_run_id: str, item: T) -> None:
+        if self.buffered == 0:
+            self.first_pending_at = time.monotonic()
+
+        items = self.pending.get(step_run_id)
+
+        if items is None:
+            items = self.pending[step_run_id] = deque()
+            self.condition.notify_all()
+
+        items.append((item, time.time()))
+        self.buffered += self._cost(item)
+        self.unsent[step_run_id] = self.unsent.get(step_run_id, 0) + 1
+
+    def _drop_oldest(self) -> None:
+        ## the first step run waiting holds the oldest items, give or take the ones it has sent since
+        step_run_id, items = next(iter(self.pending.items()))
+        dropped = items.popleft()
+
+        if not items:
+            del self.pending[step_run_id]
+
+        self.buffered -= self._cost(dropped[0])
+        self._resolved(step_run_id, 1)
+        self._drop([dropped])
+
+    def _drop(self, items: list[Buffered[T]]) -> None:
+        if self.dropped == 0:
+            logger.warning(
+                f"{self.item_name} buffer is full, dropping {self.item_name}s"
+            )
+
+        self.dropped += len(items)
+        self._record(items, "dropped")
+
+    def _resolved(self, step_run_id: str, count: int) -> None:
+        unsent = self.unsent.pop(step_run_id, 0) - count
+
+        if unsent > 0:
+            self.unsent[step_run_id] = unsent
+
+        self.condition.notify_all()
+
+    def _next_step_run(self) -> str | None:
+        if not self.pending or (
+            self.flushing == 0
+            and not self.closed
+            and time.monotonic() < self.first_pending_at + self.linger
+        ):
+            return None
+
+        return next((s for s in self.pending if s not in self.sending), None)
+
+    def _take(self, step_run_id: str) -> list[Buffered[T]]:
+        items = self.pending[step_run_id]
+        taken: list[Buffered[T]] = []
+        size = 0
+
+        while items and (
+            not taken or size + self._size(items[0][0]) <= self.max_batch_bytes
+        ):
+            item = items.popleft()
+            taken.append(item)
+            size += self._size(item[0])
+            self.buffered -= self._cost(item[0])
+
+        ## a step run with items left over waits behind the others
+        if items:
+            self.pending.move_to_end(step_run_id)
+        else:
+            del self.pending[step_run_id]
+
+        ## wakes up senders waiting for room in the buffer
+        self.condition.notify_all()
+
+        return taken
+
+    def _flush_loop(self) -> None:
+        while True:
+            ## wait for a free sender first, so items keep coalescing while every sender is busy
+            self.in_flight.acquire()
+
+            with self.condition:
+                while (step_run_id := self._next_step_run()) is None:
+                    if not self.pending and self.closed:
+                        self.in_flight.release()
+                        return
+
+                    if (
+                        not self.pending
+                        or self.flushing
+                        or self.closed
+                        or self.sending.issuperset(self.pending)
+                    ):
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(
+                            max(
+                                self.first_pending_at + self.linger - time.monotonic(),
+                                0,
+                            )
+                        )
+
+                items = self._take(step_run_id)
+                self.sending.add(step_run_id)
+
+            try:
+                self.senders.submit(self._send, step_run_id, items)
+            except RuntimeError:
+                ## the buffer was closed while these items were being taken
+                self.in_flight.release()
+                self._sent(step_run_id, items, False)
+                return
+
+    def _send(self, step_run_id: str, items: list[Buffered[T]]) -> None:
+        try:
+            self._send_batch(step_run_id, items)
+            self._sent(step_run_id, items, True)
+        except Exception as e:
+            logger.error(f"failed to send {len(items)} {self.item_name}s: {e}")
+            self._sent(step_run_id, items, False)
+        finally:
+            self.in_flight.release()
+
+    def _sent(self, step_run_id: str, items: list[Buffered[T]], success: bool) -> None:
+        self._record(items, "sent" if success else "failed")
+
+        with self.condition:
+            if success:
+                self.sent += len(items)
+            else:
+                self.failed += len(items)
+
+            self.sending.discard(step_run_id)
+            self._resolved(step_run_id, len(items))
+
+
+def buffered_at(items: list[Buffered[Any]]) -> timestamp_pb2.Timestamp:
+    """
+    When the first of a batch's items was buffered, as a protobuf timestamp.
+    """
+    timestamp = timestamp_pb2.Timestamp()
+    timestamp.FromNanoseconds(int(items[0][1] * 1e9))
+
+    return timestamp
+
+
+_buffers: dict[tuple[type[Any], str, str], Any] = {}
+_buffers_lock = threading.Lock()
+
+
+def process_buffer(
+    cls: type[TBuffer], config: ClientConfig, create: Callable[[], TBuffer]
+) -> TBuffer:
+    """
+    Returns this process's `cls` buffer for the engine and token in `config`, creating it the first
+    time. A buffer inherited from the parent of a forked process is replaced, since its threads
+    didn't survive the fork.
+    """
+    key = (cls, config.host_port, config.token)
+    buffer: TBuffer | None = _buffers.get(key)
+
+    if buffer is not None and buffer.pid == os.getpid():
+        return buffer
+
+    with _buffers_lock:
+        buffer = _buffers.get(key)
+
+        if buffer is None or buffer.pid != os.getpid():
+            buffer = _buffers[key] = create()
+
+        return buffer
@@ -0,0 +1,110 @@
+import time
+
+from prometheus_client import Counter, Histogram
+
+from hatchet_sdk.clients.rest.tenacity_utils import tenacity_retry
+from hatchet_sdk.clients.step_run_buffer import (
+    Buffered,
+    StepRunBuffer,
+    buffered_at,
+    process_buffer,
+)
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.connection import shared_conn
+from hatchet_sdk.contracts.events_pb2 import PutStreamEventRequest
+from hatchet_sdk.contracts.events_pb2_grpc import EventsServiceStub
+from hatchet_sdk.metadata import get_metadata
+
+stream_chunks = Counter(
+    "hatchet_stream_chunks",
+    "Number of chunks put on task streams that were sent to the Hatchet engine, failed to send, or were dropped",
+    ["outcome"],
+)
+stream_bytes = Counter(
+    "hatchet_stream_bytes",
+    "Bytes put on task streams that were sent to the Hatchet engine, failed to send, or were dropped",
+    ["outcome"],
+)
+stream_queueing_delay = Histogram(
+    "hatchet_stream_queueing_delay_seconds",
+    "How long chunks put on task streams waited to be sent to the Hatchet engine",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+class StreamShipper(StepRunBuffer[bytes]):
+    """
+    Buffers the chunks put on task streams and sends them to the engine in the background. A step
+    run's chunks that are put within `coalesce_ms` of each other (or while its previous event is
+    being sent) are sent together as one stream event of up to `max_event_bytes`, in the order they
+    were put.
+
+    Once `max_buffer_bytes` are waiting to be sent, `send` blocks (and `aio_send` waits) until
+    there's room, so a task that streams faster than the engine accepts is slowed down to its pace
+    instead of buffering without bound.
+    """
+
+    item_name = "stream chunk"
+
+    def __init__(
+        self,
+        config: ClientConfig,
+        coalesce_ms: float = 5,
+        max_buffer_bytes: int = 8 * 1024 * 1024,
+        max_in_flight: int = 16,
+        max_event_bytes: int = 1024 * 1024,
+    ) -> None:
+        self.client = EventsServiceStub(shared_conn(config, False))  # type: ignore[no-untyped-call]
+        self.token = config.token
+
+        super().__init__(
+            max_buffered=max_buffer_bytes,
+            on_full="block",
+            block_timeout=None,
+            max_in_flight=max_in_flight,
+            linger_ms=coalesce_ms,
+            max_batch_bytes=max_event_bytes,
+            thread_name="hatchet-stream-shipper",
+        )
+
+    def _size(self, item: bytes) -> int:
+        return len(item)
+
+    def _cost(self, item: bytes) -> int:
+        return len(item)
+
+    def _send_batch(self, step_run_id: str, items: list[Buffered[bytes]]) -> None:
+        sent_at = time.time()
+
+        for _, buffered_at_ in items:
+            stream_queueing_delay.observe(sent_at - buffered_at_)
+
+        self._put_stream_event(
+            PutStreamEventRequest(
+                stepRunId=step_run_id,
+                createdAt=buffered_at(items),
+                message=b"".join(chunk for chunk, _ in items),
+            )
+        )
+
+    @tenacity_retry
+    def _put_stream_event(self, request: PutStreamEventRequest) -> None:
+        self.client.PutStreamEvent(request, metadata=get_metadata(self.token))
+
+    def _record(self, items: list[Buffered[bytes]], outcome: str) -> None:
+        stream_chunks.labels(outcome=outcome).inc(len(items))
+        stream_bytes.labels(outcome=outcome).inc(sum(len(chunk) for chunk, _ in items))
+
+
+def get_stream_shipper(config: ClientConfig) -> StreamShipper:
+    return process_buffer(
+        StreamShipper,
+        config,
+        lambda: StreamShipper(
+            config,
+            coalesce_ms=config.stream_coalesce_ms,
+            max_buffer_bytes=config.stream_buffer_bytes,
+            max_in_flight=config.stream_max_in_flight,
+            max_event_bytes=min(1024 * 1024, config.grpc_max_send_message_length // 2),
+        ),
+    )
@@ -0,0 +1,359 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, cast
+
+import grpc
+
+from hatchet_sdk.clients.bulk import MAX_BULK_ITEMS, chunk_indices
+from hatchet_sdk.contracts import workflows_pb2 as v0_workflow_protos
+from hatchet_sdk.contracts.workflows_pb2_grpc import WorkflowServiceStub
+from hatchet_sdk.logger import logger
+from hatchet_sdk.metadata import get_metadata
+
+## codes a bulk trigger fails with when the engine rejected it as a whole (or it was never sent, as with
+## RESOURCE_EXHAUSTED for a request over the send limit), so none of its runs were created
+REJECTED_CODES = frozenset(
+    {
+        grpc.StatusCode.INVALID_ARGUMENT,
+        grpc.StatusCode.NOT_FOUND,
+        grpc.StatusCode.ALREADY_EXISTS,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+    }
+)
+
+
+class TriggerCoalescer:
+    """
+    Buffers `TriggerWorkflow` requests made at around the same time, from any thread, and sends them as a single `BulkTriggerWorkflow` once `max_batch` requests are waiting or
+    `linger` seconds have passed since the first of them arrived, split into as many bulk triggers
+    as it takes to keep each under `max_request_bytes`. Each request's future resolves to its own
+    workflow run id. `AioTriggerCoalescer` does the same for requests made on an event loop.
+
+    If the engine rejects a bulk trigger as a whole (e.g. for a dedupe violation), its requests are
+    retried one by one, so that the error only reaches the caller whose request caused it. Any other
+    error, like a deadline, may have left the runs created, so it fails every request in the batch
+    instead of risking triggering them twice.
+    """
+
+    def __init__(
+        self,
+        client: WorkflowServiceStub,
+        token: str,
+        linger: float,
+        max_batch: int,
+        max_request_bytes: int,
+    ) -> None:
+        self.client = client
+        self.token = token
+        self.linger = linger
+        self.max_batch = min(max_batch, MAX_BULK_ITEMS)
+        self.max_request_bytes = max_request_bytes
+
+        self.pending: list[
+            tuple[v0_workflow_protos.TriggerWorkflowRequest, Future[str]]
+        ] = []
+        self.first_pending_at = 0.0
+        self.condition = threading.Condition()
+        self.flusher: threading.Thread | None = None
+
+    def submit(self, request: v0_workflow_protos.TriggerWorkflowRequest) -> Future[str]:
+        future: Future[str] = Future()
+
+        with self.condition:
+            ## started lazily, so a client created before a fork doesn't lose its flusher
+            if self.flusher is None or not self.flusher.is_alive():
+                self.flusher = threading.Thread(
+                    target=self._flush_loop,
+                    name="hatchet-trigger-coalescer",
+                    daemon=True,
+                )
+                self.flusher.start()
+
+            if not self.pending:
+                self.first_pending_at = time.monotonic()
+
+            self.pending.append((request, future))
+
+            if len(self.pending) == 1 or len(self.pending) >= self.max_batch:
+                self.condition.notify()
+
+        return future
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+
+                while len(self.pending) < self.max_batch:
+                    remaining = self.first_pending_at + self.linger - time.monotonic()
+
+                    if remaining <= 0:
+                        break
+
+                    self.condition.wait(remaining)
+
+                batch, self.pending = (
+                    self.pending[: self.max_batch],
+                    self.pending[self.max_batch :],
+                )
+
+                if self.pending:
+                    self.first_pending_at = time.monotonic()
+
+            ## requests arriving while this one is in flight make up the next batch
+            for chunk in chunk_indices(
+                [request for request, _ in batch],
+                self.max_request_bytes,
+                self.max_batch,
+            ):
+                self._send([batch[i] for i in chunk])
+
+    def _send(
+        self,
+        batch: list[tuple[v0_workflow_protos.TriggerWorkflowRequest, Future[str]]],
+    ) -> None:
+        batch = [
+            (request, future)
+            for request, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+
+        if not batch:
+            return
+
+        if len(batch) == 1:
+            self._send_one(*batch[0])
+            return
+
+        try:
+            resp = cast(
+                v0_workflow_protos.BulkTriggerWorkflowResponse,
+                self.client.BulkTriggerWorkflow(
+                    v0_workflow_protos.BulkTriggerWorkflowRequest(
+                        workflows=[request for request, _ in batch]
+                    ),
+                    metadata=get_metadata(self.token),
+                ),
+            )
+
+            if len(resp.workflow_run_ids) != len(batch):
+                raise ValueError(
+                    f"bulk trigger returned {len(resp.workflow_run_ids)} run ids for {len(batch)} workflows"
+                )
+        except grpc.RpcError as e:
+            if e.code() not in REJECTED_CODES:
+                self._fail(batch, e)
+                return
+
+            logger.debug(
+                f"coalesced trigger of {len(batch)} workflows was rejected, retrying them one by one: {e}"
+            )
+
+            for request, future in batch:
+                self._send_one(request, future)
+
+            return
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        for (_, future), workflow_run_id in zip(batch, resp.workflow_run_ids):
+            future.set_result(workflow_run_id)
+
+    def _fail(
+        self,
+        batch: list[tuple[v0_workflow_protos.TriggerWorkflowRequest, Future[str]]],
+        e: Exception,
+    ) -> None:
+        logger.error(f"coalesced trigger of {len(batch)} workflows failed: {e}")
+
+        for _, future in batch:
+            future.set_exception(e)
+
+    def _send_one(
+        self,
+        request: v0_workflow_protos.TriggerWorkflowRequest,
+        future: Future[str],
+    ) -> None:
+        try:
+            resp = cast(
+                v0_workflow_protos.TriggerWorkflowResponse,
+                self.client.TriggerWorkflow(
+                    request,
+                    metadata=get_metadata(self.token),
+                ),
+            )
+        except Exception as e:
+            future.set_exception(e)
+            return
+
+        future.set_result(resp.workflow_run_id)
+
+
+class AioTriggerCoalescer:
+    """
+    The `TriggerCoalescer` for `aio_run_workflow`: it buffers requests on the event loop it was
+    created on and sends them with that loop's aio stub, so neither the callers nor the sends wait on
+    a thread. Batches are sent, split and retried the same way.
+    """
+
+    def __init__(
+        self,
+        client: Callable[[], WorkflowServiceStub],
+        token: str,
+        linger: float,
+        max_batch: int,
+        max_request_bytes: int,
+    ) -> None:
+        self.client = client
+        self.token = token
+        self.linger = linger
+        self.max_batch = min(max_batch, MAX_BULK_ITEMS)
+        self.max_request_bytes = max_request_bytes
+
+        self.loop = asyncio.get_running_loop()
+        self.pending: list[
+            tuple[v0_workflow_protos.TriggerWorkflowRequest, asyncio.Future[str]]
+        ] = []
+        self.full = asyncio.Event()
+        self.flusher: asyncio.Task[None] | None = None
+        self.sends: set[asyncio.Task[None]] = set()
+
+    async def submit(self, request: v0_workflow_protos.TriggerWorkflowRequest) -> str:
+        future: asyncio.Future[str] = self.loop.create_future()
+        self.pending.append((request, future))
+
+        if len(self.pending) >= self.max_batch:
+            self.full.set()
+
+        if self.flusher is None or self.flusher.done():
+            self.flusher = self.loop.create_task(self._flush_loop())
+
+        return await future
+
+    async def _flush_loop(self) -> None:
+        while self.pending:
+            try:
+                await asyncio.wait_for(self.full.wait(), self.linger)
+            except asyncio.TimeoutError:
+                pass
+
+            batch, self.pending = (
+                self.pending[: self.max_batch],
+                self.pending[self.max_batch :],
+            )
+
+            if len(self.pending) < self.max_batch:
+                self.full.clear()
+
+            ## sent from a task of its own, so requests arriving while it's in flight make up the next batch
+            send = self.loop.create_task(self._send_batch(batch))
+            self.sends.add(send)
+            send.add_done_callback(self.sends.discard)
+
+    async def _send_batch(
+        self,
+        batch: list[
+            tuple[v0_workflow_protos.TriggerWorkflowRequest, asyncio.Future[str]]
+        ],
+    ) -> None:
+        await asyncio.gather(
+            *(
+                self._send([batch[i] for i in chunk])
+                for chunk in chunk_indices(
+                    [request for request, _ in batch],
+                    self.max_request_bytes,
+                    self.max_batch,
+                )
+            )
+        )
+
+    async def _send(
+        self,
+        batch: list[
+            tuple[v0_workflow_protos.TriggerWorkflowRequest, asyncio.Future[str]]
+        ],
+    ) -> None:
+        ## a caller that was cancelled while its request waited has nothing to receive the run id
+        batch = [(request, future) for request, future in batch if not future.done()]
+
+        if not batch:
+            return
+
+        if len(batch) == 1:
+            await self._send_one(*batch[0])
+            return
+
+        try:
+            resp = cast(
+                v0_workflow_protos.BulkTriggerWorkflowResponse,
+                await self.client().BulkTriggerWorkflow(
+                    v0_workflow_protos.BulkTriggerWorkflowRequest(
+                        workflows=[request for request, _ in batch]
+                    ),
+                    metadata=get_metadata(self.token),
+                ),
+            )
+
+            if len(resp.workflow_run_ids) != len(batch):
+                raise ValueError(
+                    f"bulk trigger returned {len(resp.workflow_run_ids)} run ids for {len(batch)} workflows"
+                )
+        except grpc.RpcError as e:
+            if e.code() not in REJECTED_CODES:
+                self._fail(batch, e)
+                return
+
+            logger.debug(
+                f"coalesced trigger of {len(batch)} workflows was rejected, retrying them one by one: {e}"
+            )
+
+            await asyncio.gather(
+                *(self._send_one(request, future) for request, future in batch)
+            )
+
+            return
+        except Exception as e:
+            self._fail(batch, e)
+            return
+
+        for (_, future), workflow_run_id in zip(batch, resp.workflow_run_ids):
+            if not future.done():
+                future.set_result(workflow_run_id)
+
+    def _fail(
+        self,
+        batch: list[
+            tuple[v0_workflow_protos.TriggerWorkflowRequest, asyncio.Future[str]]
+        ],
+        e: Exception,
+    ) -> None:
+        logger.error(f"coalesced trigger of {len(batch)} workflows failed: {e}")
+
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+
+    async def _send_one(
+        self,
+        request: v0_workflow_protos.TriggerWorkflowRequest,
+        future: asyncio.Future[str],
+    ) -> None:
+        try:
+            resp = cast(
+                v0_workflow_protos.TriggerWorkflowResponse,
+                await self.client().TriggerWorkflow(
+                    request,
+                    metadata=get_metadata(self.token),
+                ),
+            )
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        if not future.done():
+            future.set_result(resp.workflow_run_id)
@@ -1,5 +1,4 @@
 import asyncio
-import json
 from collections.abc import AsyncIterator
 from typing import Any, cast
 
@@ -9,7 +8,7 @@ from grpc._cython import cygrpc  # type: ignore[attr-defined]
 
 from hatchet_sdk.clients.event_ts import ThreadSafeEvent, read_with_interrupt
 from hatchet_sdk.config import ClientConfig
-from hatchet_sdk.connection import new_conn
+from hatchet_sdk.connection import shared_conn
 from hatchet_sdk.contracts.dispatcher_pb2 import (
     SubscribeToWorkflowRunsRequest,
     WorkflowRunEvent,
@@ -17,6 +16,7 @@ from hatchet_sdk.contracts.dispatcher_pb2 import (
 from hatchet_sdk.contracts.dispatcher_pb2_grpc import DispatcherStub
 from hatchet_sdk.logger import logger
 from hatchet_sdk.metadata import get_metadata
+from hatchet_sdk.payloads import resolve_payload
 
 DEFAULT_WORKFLOW_LISTENER_RETRY_INTERVAL = 3  # seconds
 DEFAULT_WORKFLOW_LISTENER_RETRY_COUNT = 5
@@ -25,34 +25,13 @@ DEFAULT_WORKFLOW_LISTENER_INTERRUPT_INTERVAL = 1800  # 30 minutes
 DEDUPE_MESSAGE = "DUPLICATE_WORKFLOW_RUN"
 
 
-class _Subscription:
-    def __init__(self, id: int, workflow_run_id: str):
-        self.id = id
-        self.workflow_run_id = workflow_run_id
-        self.queue: asyncio.Queue[WorkflowRunEvent | None] = asyncio.Queue()
-
-    async def __aiter__(self) -> "_Subscription":
-        return self
-
-    async def __anext__(self) -> WorkflowRunEvent | None:
-        return await self.queue.get()
-
-    async def get(self) -> WorkflowRunEvent:
-        event = await self.queue.get()
-
-        if event is None:
-            raise StopAsyncIteration
-
-        return event
-
-    async def put(self, item: WorkflowRunEvent) -> None:
-        await self.queue.put(item)
-
-    async def close(self) -> None:
-        await self.queue.put(None)
-
-
 class PooledWorkflowRunListener:
+    """
+    Waits on the results of workflow runs over a single `SubscribeToWorkflowRuns` stream. Each run
+    id is subscribed to once, however many local callers are waiting on it, and every waiter of a
+    run is resolved by the run's one finished event.
+    """
+
     def __init__(self, config: ClientConfig):
         try:
             asyncio.get_running_loop()
@@ -60,23 +39,16 @@ class PooledWorkflowRunListener:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-        conn = new_conn(config, True)
+        conn = shared_conn(config, True)
         self.client = DispatcherStub(conn)  # type: ignore[no-untyped-call]
         self.token = config.token
         self.config = config
 
-        # list of all active subscriptions, mapping from a subscription id to a workflow run id
-        self.subscriptions_to_workflows: dict[int, str] = {}
-
-        # list of workflow run ids mapped to an array of subscription ids
-        self.workflows_to_subscriptions: dict[str, list[int]] = {}
+        # the futures of the callers waiting on each subscribed workflow run
+        self.waiters: dict[str, set[asyncio.Future[WorkflowRunEvent]]] = {}
 
-        self.subscription_counter: int = 0
-        self.subscription_counter_lock: asyncio.Lock = asyncio.Lock()
-
-        self.requests: asyncio.Queue[SubscribeToWorkflowRunsRequest | int] = (
-            asyncio.Queue()
-        )
+        # the run ids to subscribe to on the current stream, or None to end it
+        self.requests: asyncio.Queue[str | None] = asyncio.Queue()
 
         self.listener: (
             grpc.aio.UnaryStreamCall[SubscribeToWorkflowRunsRequest, WorkflowRunEvent]
@@ -84,11 +56,6 @@ class PooledWorkflowRunListener:
         ) = None
         self.listener_task: asyncio.Task[None] | None = None
 
-        self.curr_requester: int = 0
-
-        # events have keys of the format workflow_run_id + subscription_id
-        self.events: dict[int, _Subscription] = {}
-
         self.interrupter: asyncio.Task[None] | None = None
 
     async def _interrupter(self) -> None:
@@ -144,13 +111,12 @@ class PooledWorkflowRunListener:
                             if workflow_event is cygrpc.EOF:
                                 break
 
-                            # get a list of subscriptions for this workflow
-                            subscriptions = self.workflows_to_subscriptions.get(
-                                workflow_event.workflowRunId, []
-                            )
-
-                            for subscription_id in subscriptions:
-                                await self.events[subscription_id].put(workflow_event)
+                            # a run only finishes once, so its waiters are done with the subscription
+                            for waiter in self.waiters.pop(
+                                workflow_event.workflowRunId, ()
+                            ):
+                                if not waiter.done():
+                                    waiter.set_result(workflow_event)
 
                     except grpc.RpcError as e:
                         logger.debug(f"grpc error in workflow run listener: {e}")
@@ -162,79 +128,61 @@ class PooledWorkflowRunListener:
 
             self.listener = None
 
-            # close all subscriptions
-            for subscription_id in self.events:
-                await self.events[subscription_id].close()
+            # fail everyone still waiting
+            waiters, self.waiters = self.waiters, {}
 
-            raise e
-
-    async def _request(self) -> AsyncIterator[SubscribeToWorkflowRunsRequest]:
-        self.curr_requester = self.curr_requester + 1
+            for run_waiters in waiters.values():
+                for waiter in run_waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
 
-        # replay all existing subscriptions
-        workflow_run_set = set(self.subscriptions_to_workflows.values())
+            raise e
 
-        for workflow_run_id in workflow_run_set:
-            yield SubscribeToWorkflowRunsRequest(
-                workflowRunId=workflow_run_id,
-            )
+    async def _request(
+        self, replay: list[str], requests: "asyncio.Queue[str | None]"
+    ) -> AsyncIterator[SubscribeToWorkflowRunsRequest]:
+        # resubscribe to every run that was being waited on when this stream was opened
+        for workflow_run_id in replay:
+            yield SubscribeToWorkflowRunsRequest(workflowRunId=workflow_run_id)
 
         while True:
-            request = await self.requests.get()
-
-            # if the request is an int which matches the current requester, then we should stop
-            if request == self.curr_requester:
-                break
+            next_id: str | None = await requests.get()
 
-            # if we've gotten an int that doesn't match the current requester, then we should ignore it
-            if isinstance(request, int):
-                continue
+            # send everything that's queued up before waiting again
+            while next_id is not None:
+                yield SubscribeToWorkflowRunsRequest(workflowRunId=next_id)
 
-            yield request
-            self.requests.task_done()
+                if requests.empty():
+                    break
 
-    def cleanup_subscription(self, subscription_id: int) -> None:
-        workflow_run_id = self.subscriptions_to_workflows[subscription_id]
-
-        if workflow_run_id in self.workflows_to_subscriptions:
-            self.workflows_to_subscriptions[workflow_run_id].remove(subscription_id)
-
-        del self.subscriptions_to_workflows[subscription_id]
-        del self.events[subscription_id]
+                next_id = requests.get_nowait()
+            else:
+                return
 
     async def subscribe(self, workflow_run_id: str) -> WorkflowRunEvent:
-        try:
-            # create a new subscription id, place a mutex on the counter
-            await self.subscription_counter_lock.acquire()
-            self.subscription_counter += 1
-            subscription_id = self.subscription_counter
-            self.subscription_counter_lock.release()
-
-            self.subscriptions_to_workflows[subscription_id] = workflow_run_id
+        waiter: asyncio.Future[WorkflowRunEvent] = (
+            asyncio.get_running_loop().create_future()
+        )
 
-            if workflow_run_id not in self.workflows_to_subscriptions:
-                self.workflows_to_subscriptions[workflow_run_id] = [subscription_id]
-            else:
-                self.workflows_to_subscriptions[workflow_run_id].append(subscription_id)
+        run_waiters = self.waiters.get(workflow_run_id)
 
-            self.events[subscription_id] = _Subscription(
-                subscription_id, workflow_run_id
-            )
+        if run_waiters is None:
+            run_waiters = self.waiters[workflow_run_id] = set()
+            self.requests.put_nowait(workflow_run_id)
 
-            await self.requests.put(
-                SubscribeToWorkflowRunsRequest(
-                    workflowRunId=workflow_run_id,
-                )
-            )
+        run_waiters.add(waiter)
 
-            if not self.listener_task or self.listener_task.done():
-                self.listener_task = asyncio.create_task(self._init_producer())
+        if not self.listener_task or self.listener_task.done():
+            self.listener_task = asyncio.create_task(self._init_producer())
 
-            return await self.events[subscription_id].get()
-        except asyncio.CancelledError:
-            raise
+        try:
+            return await waiter
         finally:
-            self.cleanup_subscription(subscription_id)
+            run_waiters.discard(waiter)
+
+            ## the run can't be unsubscribed from, so its event is just dropped if nobody is left waiting
+            if not run_waiters and self.waiters.get(workflow_run_id) is run_waiters:
+                del self.waiters[workflow_run_id]
 
     async def result(self, workflow_run_id: str) -> dict[str, Any]:
         from hatchet_sdk.clients.admin import DedupeViolationErr
@@ -249,11 +197,17 @@ class PooledWorkflowRunListener:
                 raise Exception(f"Workflow Errors: {errors}")
 
         return {
-            result.stepReadableId: json.loads(result.output)
+            result.stepReadableId: self._decode_output(result.output)
             for result in event.results
             if result.output
         }
 
+    def _decode_output(self, output: str) -> Any:
+        value = self.config.serializer.loads(output)
+        data = resolve_payload(value, self.config.blob_store)
+
+        return value if data is None else self.config.serializer.loads(data)
+
     async def _retry_subscribe(
         self,
     ) -> grpc.aio.UnaryStreamCall[SubscribeToWorkflowRunsRequest, WorkflowRunEvent]:
@@ -264,16 +218,17 @@ class PooledWorkflowRunListener:
                 if retries > 0:
                     await asyncio.sleep(DEFAULT_WORKFLOW_LISTENER_RETRY_INTERVAL)
 
-                # signal previous async iterator to stop
-                if self.curr_requester != 0:
-                    self.requests.put_nowait(self.curr_requester)
+                # signal the previous request iterator to stop, and start a new one that replays
+                # the runs still being waited on
+                self.requests.put_nowait(None)
+                self.requests = asyncio.Queue()
 
                 return cast(
                     grpc.aio.UnaryStreamCall[
                         SubscribeToWorkflowRunsRequest, WorkflowRunEvent
                     ],
                     self.client.SubscribeToWorkflowRuns(
-                        self._request(),
+                        self._request(list(self.waiters), self.requests),
                         metadata=get_metadata(self.token),
                     ),
                 )
@@ -0,0 +1,61 @@
+import base64
+import zlib
+from typing import Any
+
+## a compressed payload is sent as `{"hatchet__compressed": "zlib", "data": "<base64>"}`, which is
+## still JSON, so the engine can store it and nest it in other payloads (e.g. a child's parents)
+COMPRESSED_PAYLOAD_KEY = "hatchet__compressed"
+COMPRESSED_PAYLOAD_DATA_KEY = "data"
+COMPRESSION_ALGORITHM = "zlib"
+
+## zlib's fastest level, which already shrinks typical JSON several times over
+COMPRESSION_LEVEL = 1
+
+_MARKER_PREFIX = (
+    f'{{"{COMPRESSED_PAYLOAD_KEY}":"{COMPRESSION_ALGORITHM}",'
+    f'"{COMPRESSED_PAYLOAD_DATA_KEY}":"'
+).encode()
+
+
+def compress_payload(data: bytes, threshold: int | None) -> bytes:
+    """
+    Compresses a JSON payload of at least `threshold` bytes into a marker object, or returns it as
+    is if it's smaller, compression is off (`threshold` is `None`) or compressing didn't help.
+    """
+    if threshold is None or len(data) < threshold:
+        return data
+
+    marker = (
+        _MARKER_PREFIX
+        + base64.b64encode(zlib.compress(data, COMPRESSION_LEVEL))
+        + b'"}'
+    )
+
+    return marker if len(marker) < len(data) else data
+
+
+def decompressed_payload(value: Any) -> bytes | None:
+    """
+    Returns the JSON that `value` holds if it's a decoded compressed payload marker, and `None` if
+    it isn't one.
+    """
+    if (
+        not isinstance(value, dict)
+        or len(value) != 2
+        or value.get(COMPRESSED_PAYLOAD_KEY) != COMPRESSION_ALGORITHM
+    ):
+        return None
+
+    data = value.get(COMPRESSED_PAYLOAD_DATA_KEY)
+
+    if not isinstance(data, str):
+        return None
+
+    return decompress_data(data)
+
+
+def decompress_data(data: str) -> bytes:
+    """
+    Returns the JSON held by the `data` of a compressed payload marker.
+    """
+    return zlib.decompress(base64.b64decode(data))
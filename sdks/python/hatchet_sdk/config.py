@@ -1,9 +1,18 @@
 import json
+from datetime import timedelta
 from logging import Logger, getLogger
+from typing import Literal
 
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from hatchet_sdk.blob_store import BlobStore, get_blob_store
+from hatchet_sdk.serializer import (
+    PydanticCoreSerializer,
+    Serializer,
+    SerializerName,
+    get_serializer,
+)
 from hatchet_sdk.token import get_addresses_from_jwt, get_tenant_id_from_jwt
 
 
@@ -34,6 +43,8 @@ class HealthcheckConfig(BaseSettings):
 
     port: int = 8001
     enabled: bool = False
+    ## serves `/debug/profile`, which samples the worker's stacks, and `/debug/tasks`, which lists its in-flight runs
+    debug_endpoints: bool = False
 
 
 DEFAULT_HOST_PORT = "localhost:7070"
@@ -63,9 +74,81 @@ class ClientConfig(BaseSettings):
         default=4 * 1024 * 1024, description="4MB default"
     )
 
+    ## how many connections each shared channel spreads its calls over, for clients making many calls at once
+    grpc_channel_pool_size: int = Field(default=1, gt=0)
+
+    ## compresses every gRPC message the client sends
+    grpc_compression: Literal["none", "gzip", "deflate"] = "none"
+
+    ## task inputs and outputs and event payloads of at least this many bytes are sent compressed, which only
+    ## Hatchet SDKs can read: the engine can't evaluate expressions (e.g. concurrency keys) on them
+    payload_compression_threshold: int | None = Field(default=None, gt=0)
+
+    ## `Context.log` and captured log lines are buffered, up to `log_buffer_size` lines per process, and sent in
+    ## the background with each step run's lines coalesced into one request. When the engine can't keep up and the
+    ## buffer fills, "drop_oldest" drops the oldest lines, and "block" makes logging wait (for up to 5s) for room
+    log_buffer_size: int = Field(default=10_000, gt=0)
+    log_buffer_on_full: Literal["drop_oldest", "block"] = "drop_oldest"
+    log_max_in_flight: int = Field(default=8, gt=0)
+
+    ## `Context.put_stream` chunks are sent in the background, with a step run's chunks that are put within
+    ## `stream_coalesce_ms` of each other sent as one stream event. Once `stream_buffer_bytes` are waiting to be
+    ## sent, putting a chunk waits for room
+    stream_coalesce_ms: float = Field(default=5, ge=0)
+    stream_buffer_bytes: int = Field(
+        default=8 * 1024 * 1024, gt=0, description="8MB default"
+    )
+    stream_max_in_flight: int = Field(default=16, gt=0)
+
     worker_preset_labels: dict[str, str] = Field(default_factory=dict)
     enable_force_kill_sync_threads: bool = False
 
+    ## "shm" links the action listener process and the runner with shared memory ring buffers instead of queues
+    worker_ipc_transport: Literal["queue", "shm"] = "queue"
+    worker_ipc_buffer_size: int = Field(
+        default=16 * 1024 * 1024, description="16MB default, per ring buffer"
+    )
+
+    ## runs the action listener on the worker's event loop instead of in a child process
+    worker_single_process: bool = False
+
+    ## when set, the worker measures how late its event loop runs callbacks (`hatchet_event_loop_lag_seconds` on
+    ## /metrics), and when it's blocked for longer than this many seconds, logs the stack it's blocked in and the step
+    ## run responsible
+    worker_loop_lag_threshold: float | None = Field(default=None, gt=0)
+
+    ## records the actions each of the worker's action listeners gets from the engine (inputs included), and when, to a
+    ## file per listener in this directory, to be replayed with `python -m hatchet_sdk.worker.replay`
+    worker_action_record_dir: str | None = None
+
+    ## profiles this fraction of the runs of tasks without a `profile` of their own with cProfile (and tracemalloc, with
+    ## `worker_profile_trace_memory`), and logs their slowest functions and largest allocations to the run. With
+    ## `worker_profile_dir`, each run's profile and summary are written to <dir>/<step run id>.prof and .txt instead
+    worker_profile_sample_rate: float = Field(default=0, ge=0, le=1)
+    worker_profile_trace_memory: bool = False
+    worker_profile_dir: str | None = None
+
+    ## when set, `run_workflow` calls made within this many milliseconds of each other are sent as one bulk trigger
+    trigger_coalesce_linger_ms: float | None = None
+    trigger_coalesce_max_batch: int = Field(default=100, gt=0, le=1000)
+
+    ## how many chunks of a bulk push or bulk trigger that's too big for one request are sent at once
+    bulk_request_max_in_flight: int = Field(default=4, gt=0)
+
+    ## encodes and decodes payloads: "pydantic" (pydantic-core, the default), "orjson", "json", or a `Serializer`
+    serializer: Serializer = Field(default_factory=PydanticCoreSerializer)
+
+    ## task inputs and outputs and event payloads still over `blob_offload_threshold` bytes once compressed are
+    ## written to this store, and only a reference to them is sent: a `BlobStore`, or a URL like
+    ## "file:///mnt/hatchet-blobs" or "s3://bucket/prefix/". Every worker and client has to use the same store
+    blob_store: BlobStore | None = None
+    blob_offload_threshold: int = Field(
+        default=1024 * 1024, gt=0, description="1MB default"
+    )
+
+    ## workers delete blobs older than this, which should match how long the engine keeps runs for
+    blob_store_retention: timedelta = timedelta(days=30)
+
     @model_validator(mode="after")
     def validate_token_and_tenant(self) -> "ClientConfig":
         if not self.token:
@@ -93,6 +176,22 @@ class ClientConfig(BaseSettings):
 
         return self
 
+    @field_validator("serializer", mode="before")
+    @classmethod
+    def validate_serializer(cls, value: Serializer | SerializerName) -> Serializer:
+        if isinstance(value, str):
+            return get_serializer(value)
+
+        return value
+
+    @field_validator("blob_store", mode="before")
+    @classmethod
+    def validate_blob_store(cls, value: BlobStore | str | None) -> BlobStore | None:
+        if isinstance(value, str):
+            return get_blob_store(value) if value else None
+
+        return value
+
     @field_validator("listener_v2_timeout")
     @classmethod
     def validate_listener_timeout(cls, value: int | None | str) -> int | None:
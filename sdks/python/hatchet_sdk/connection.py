@@ -1,10 +1,17 @@
+import asyncio
+import itertools
 import os
-from typing import Literal, cast, overload
+import threading
+import warnings
+from typing import Any, Callable, Literal, TypeVar, cast, overload
 
 import grpc
+from prometheus_client import Counter, Gauge
 
 from hatchet_sdk.config import ClientConfig
 
+T = TypeVar("T")
+
 
 @overload
 def new_conn(config: ClientConfig, aio: Literal[False]) -> grpc.Channel: ...
@@ -15,31 +22,124 @@ def new_conn(config: ClientConfig, aio: Literal[True]) -> grpc.aio.Channel: ...
 
 
 def new_conn(config: ClientConfig, aio: bool) -> grpc.Channel | grpc.aio.Channel:
-    credentials: grpc.ChannelCredentials | None = None
+    """
+    Creates a new channel to the engine. Most callers should use `shared_conn` instead, which reuses
+    one channel (or pool of channels) per config across the process.
+    """
+    return _new_channel(config, aio, pooled=False)
+
+
+@overload
+def shared_conn(config: ClientConfig, aio: Literal[False]) -> grpc.Channel: ...
+
+
+@overload
+def shared_conn(config: ClientConfig, aio: Literal[True]) -> grpc.aio.Channel: ...
+
+
+def shared_conn(config: ClientConfig, aio: bool) -> grpc.Channel | grpc.aio.Channel:
+    """
+    Returns this process's channel to the engine for `config`, creating it on first use. `grpc.aio`
+    channels are shared per event loop, since they can only be used on the loop they were created on.
+    """
+    return channel_registry.get(config, aio)
+
+
+def evict_conn(config: ClientConfig, aio: bool) -> None:
+    """
+    Drops this process's channel to the engine for `config` (on the running loop, for `grpc.aio`), so
+    the next `shared_conn` builds a new one, e.g. after a long-lived stream on it was interrupted.
+    """
+    channel_registry.evict(config, aio)
+
+
+## the config fields that a channel is built from, so configs that only differ elsewhere share channels
+ChannelKey = tuple[
+    str, str, str | None, str | None, str | None, str, int, int, int, str
+]
+
+_COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def _channel_key(config: ClientConfig) -> ChannelKey:
+    return (
+        config.host_port,
+        config.tls_config.strategy,
+        config.tls_config.root_ca_file,
+        config.tls_config.key_file,
+        config.tls_config.cert_file,
+        config.tls_config.server_name,
+        config.grpc_max_send_message_length,
+        config.grpc_max_recv_message_length,
+        config.grpc_channel_pool_size,
+        config.grpc_compression,
+    )
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _mtime(path: str | None) -> float | None:
+    return os.stat(path).st_mtime if path else None
+
+
+_credentials_cache: dict[tuple[object, ...], grpc.ChannelCredentials] = {}
+_credentials_lock = threading.Lock()
+
+
+def _credentials(config: ClientConfig) -> grpc.ChannelCredentials | None:
+    tls = config.tls_config
+
+    if tls.strategy not in ("tls", "mtls"):
+        return None
+
+    ## the files' modification times are part of the key, so rotated certificates are picked up
+    key = (
+        tls.strategy,
+        tls.root_ca_file,
+        tls.key_file,
+        tls.cert_file,
+        _mtime(tls.root_ca_file),
+        _mtime(tls.key_file),
+        _mtime(tls.cert_file),
+    )
+
+    with _credentials_lock:
+        if key in _credentials_cache:
+            return _credentials_cache[key]
 
     # load channel credentials
-    if config.tls_config.strategy == "tls":
+    if tls.strategy == "tls":
         root: bytes | None = None
 
-        if config.tls_config.root_ca_file:
-            root = open(config.tls_config.root_ca_file, "rb").read()
+        if tls.root_ca_file:
+            root = _read(tls.root_ca_file)
 
         credentials = grpc.ssl_channel_credentials(root_certificates=root)
-    elif config.tls_config.strategy == "mtls":
-        assert config.tls_config.root_ca_file
-        assert config.tls_config.key_file
-        assert config.tls_config.cert_file
-
-        root = open(config.tls_config.root_ca_file, "rb").read()
-        private_key = open(config.tls_config.key_file, "rb").read()
-        certificate_chain = open(config.tls_config.cert_file, "rb").read()
+    else:
+        assert tls.root_ca_file
+        assert tls.key_file
+        assert tls.cert_file
 
         credentials = grpc.ssl_channel_credentials(
-            root_certificates=root,
-            private_key=private_key,
-            certificate_chain=certificate_chain,
+            root_certificates=_read(tls.root_ca_file),
+            private_key=_read(tls.key_file),
+            certificate_chain=_read(tls.cert_file),
         )
 
+    with _credentials_lock:
+        return _credentials_cache.setdefault(key, credentials)
+
+
+def _new_channel(
+    config: ClientConfig, aio: bool, pooled: bool
+) -> grpc.Channel | grpc.aio.Channel:
     start = grpc if not aio else grpc.aio
 
     channel_options: list[tuple[str, str | int]] = [
@@ -52,6 +152,10 @@ def new_conn(config: ClientConfig, aio: bool) -> grpc.Channel | grpc.aio.Channel
         ("grpc.keepalive_permit_without_calls", 1),
     ]
 
+    if pooled:
+        ## otherwise channels with the same target and options share one connection
+        channel_options.append(("grpc.use_local_subchannel_pool", 1))
+
     # Set environment variable to disable fork support. Reference: https://github.com/grpc/grpc/issues/28557
     # When steps execute via os.fork, we see `TSI_DATA_CORRUPTED` errors.
     os.environ["GRPC_ENABLE_FORK_SUPPORT"] = "False"
@@ -60,6 +164,7 @@ def new_conn(config: ClientConfig, aio: bool) -> grpc.Channel | grpc.aio.Channel
         conn = start.insecure_channel(
             target=config.host_port,
             options=channel_options,
+            compression=_COMPRESSION[config.grpc_compression],
         )
     else:
         channel_options.append(
@@ -68,11 +173,254 @@ def new_conn(config: ClientConfig, aio: bool) -> grpc.Channel | grpc.aio.Channel
 
         conn = start.secure_channel(
             target=config.host_port,
-            credentials=credentials,
+            credentials=_credentials(config),
             options=channel_options,
+            compression=_COMPRESSION[config.grpc_compression],
         )
 
     return cast(
         grpc.Channel | grpc.aio.Channel,
         conn,
     )
+
+
+class _RoundRobinMultiCallable:
+    """
+    Stands in for the multicallable a stub gets from a pooled channel, and sends each call over the
+    next channel in the pool.
+    """
+
+    def __init__(self, callables: list[Any]) -> None:
+        self.callables = itertools.cycle(callables)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return next(self.callables)(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        ## e.g. `future` and `with_call` on sync multicallables
+        return getattr(next(self.callables), name)
+
+
+class _PooledChannel:
+    """
+    A pool of channels, each with its own connection, that stubs can be built on like a single
+    channel. Calls are spread over the pool round robin.
+    """
+
+    def __init__(self, channels: list[Any]) -> None:
+        self.channels = channels
+
+    def unary_unary(self, *args: Any, **kwargs: Any) -> _RoundRobinMultiCallable:
+        return _RoundRobinMultiCallable(
+            [c.unary_unary(*args, **kwargs) for c in self.channels]
+        )
+
+    def unary_stream(self, *args: Any, **kwargs: Any) -> _RoundRobinMultiCallable:
+        return _RoundRobinMultiCallable(
+            [c.unary_stream(*args, **kwargs) for c in self.channels]
+        )
+
+    def stream_unary(self, *args: Any, **kwargs: Any) -> _RoundRobinMultiCallable:
+        return _RoundRobinMultiCallable(
+            [c.stream_unary(*args, **kwargs) for c in self.channels]
+        )
+
+    def stream_stream(self, *args: Any, **kwargs: Any) -> _RoundRobinMultiCallable:
+        return _RoundRobinMultiCallable(
+            [c.stream_stream(*args, **kwargs) for c in self.channels]
+        )
+
+    def close(self, *args: Any) -> Any:
+        results = [c.close(*args) for c in self.channels]
+
+        if asyncio.iscoroutine(results[0]):
+            return asyncio.gather(*results)
+
+    def __getattr__(self, name: str) -> Any:
+        ## e.g. `subscribe`, `get_state` and `channel_ready`, which only look at the first channel
+        return getattr(self.channels[0], name)
+
+
+def _loop_for_new_aio_channel() -> asyncio.AbstractEventLoop:
+    ## the loop `grpc.aio` binds a channel to when it's created
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            return asyncio.get_event_loop()
+
+
+class ChannelRegistry:
+    """
+    Holds the channels to the engine that the clients in this process share, keyed by the config
+    fields they're built from and, for `grpc.aio` channels, by event loop. Channels of loops that
+    have been closed are closed and dropped, and a forked child starts over with no channels.
+
+    An evicted channel is left to the clients that still hold it, which keep it open until they let
+    go of it, since closing it would cancel their calls in flight. `generation` is bumped on every
+    eviction, so `LoopBoundChannel`s know to get the new one.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.generation = 0
+        self.sync_channels: dict[ChannelKey, grpc.Channel] = {}
+        self.aio_channels: dict[
+            int,
+            tuple[asyncio.AbstractEventLoop, dict[ChannelKey, grpc.aio.Channel]],
+        ] = {}
+
+    def get(self, config: ClientConfig, aio: bool) -> grpc.Channel | grpc.aio.Channel:
+        key = _channel_key(config)
+
+        with self.lock:
+            self._reset_if_forked()
+
+            if not aio:
+                if key not in self.sync_channels:
+                    self.sync_channels[key] = cast(
+                        grpc.Channel, self._create(config, aio=False)
+                    )
+
+                return self.sync_channels[key]
+
+            self._drop_closed_loops()
+
+            loop = _loop_for_new_aio_channel()
+            _, channels = self.aio_channels.setdefault(id(loop), (loop, {}))
+
+            if key not in channels:
+                channels[key] = cast(grpc.aio.Channel, self._create(config, aio=True))
+
+            return channels[key]
+
+    def evict(self, config: ClientConfig, aio: bool) -> None:
+        key = _channel_key(config)
+
+        with self.lock:
+            self._reset_if_forked()
+
+            if not aio:
+                self.sync_channels.pop(key, None)
+            else:
+                loop = _loop_for_new_aio_channel()
+                _, channels = self.aio_channels.get(id(loop), (loop, {}))
+                channels.pop(key, None)
+
+            self.generation += 1
+
+    def open_channels(self, aio: bool) -> int:
+        """
+        The number of connections (one per channel in each pool) open in this process.
+        """
+        with self.lock:
+            self._reset_if_forked()
+
+            if not aio:
+                return sum(_pool_size(c) for c in self.sync_channels.values())
+
+            self._drop_closed_loops()
+
+            return sum(
+                _pool_size(c)
+                for _, channels in self.aio_channels.values()
+                for c in channels.values()
+            )
+
+    def _create(
+        self, config: ClientConfig, aio: bool
+    ) -> grpc.Channel | grpc.aio.Channel:
+        size = config.grpc_channel_pool_size
+        channels_created.labels(kind="aio" if aio else "sync").inc(size)
+
+        if size == 1:
+            return _new_channel(config, aio, pooled=False)
+
+        return cast(
+            grpc.Channel | grpc.aio.Channel,
+            _PooledChannel(
+                [_new_channel(config, aio, pooled=True) for _ in range(size)]
+            ),
+        )
+
+    def _drop_closed_loops(self) -> None:
+        for loop_id, (loop, _) in list(self.aio_channels.items()):
+            if loop.is_closed():
+                for channel in self.aio_channels.pop(loop_id)[1].values():
+                    _close_on_closed_loop(channel)
+
+    def _reset_if_forked(self) -> None:
+        ## a child can't use its parent's channels, and closing them could affect the parent
+        if os.getpid() != self.pid:
+            self.pid = os.getpid()
+            self.sync_channels = {}
+            self.aio_channels = {}
+
+
+def _pool(channel: object) -> list[Any]:
+    return channel.channels if isinstance(channel, _PooledChannel) else [channel]
+
+
+def _pool_size(channel: object) -> int:
+    return len(_pool(channel))
+
+
+def _close_on_closed_loop(channel: object) -> None:
+    ## `grpc.aio`'s `close` is a coroutine, which can't run once the channel's loop is closed, so this
+    ## closes the underlying channel the way its finalizer does
+    for c in _pool(channel):
+        underlying = getattr(c, "_channel", None)
+
+        if underlying is not None and not underlying.closed():
+            underlying.close()
+
+
+channel_registry = ChannelRegistry()
+
+channels_open = Gauge(
+    "hatchet_grpc_channels_open",
+    "Number of gRPC connections to the Hatchet engine open in this process",
+    ["kind"],
+)
+channels_open.labels(kind="sync").set_function(
+    lambda: channel_registry.open_channels(aio=False)
+)
+channels_open.labels(kind="aio").set_function(
+    lambda: channel_registry.open_channels(aio=True)
+)
+
+channels_created = Counter(
+    "hatchet_grpc_channels_created",
+    "Number of gRPC connections to the Hatchet engine created in this process",
+    ["kind"],
+)
+
+
+class LoopBoundChannel:
+    """
+    Lazily gets the shared `grpc.aio` channel, and creates the stubs on it, for whichever event loop
+    is running. An aio channel can only be used on the loop it was created on, so a client that's
+    used from a new loop (e.g. a second `asyncio.run`) gets that loop's channel.
+    """
+
+    def __init__(self, config: ClientConfig) -> None:
+        self.config = config
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.generation = -1
+        self.stubs: dict[Callable[[grpc.aio.Channel], object], object] = {}
+
+    def stub(self, stub_type: Callable[[grpc.aio.Channel], T]) -> T:
+        loop = asyncio.get_running_loop()
+
+        if loop is not self.loop or self.generation != channel_registry.generation:
+            self.loop = loop
+            self.generation = channel_registry.generation
+            self.channel = shared_conn(self.config, True)
+            self.stubs = {}
+
+        if stub_type not in self.stubs:
+            self.stubs[stub_type] = stub_type(self.channel)
+
+        return cast(T, self.stubs[stub_type])
@@ -1,17 +1,13 @@
 import inspect
 import json
-import traceback
-from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import timedelta
 from typing import TYPE_CHECKING, Any, cast
 
 from pydantic import BaseModel
 
 from hatchet_sdk.clients.admin import AdminClient
-from hatchet_sdk.clients.dispatcher.dispatcher import (  # type: ignore[attr-defined]
-    Action,
-    DispatcherClient,
-)
+from hatchet_sdk.clients.dispatcher.action_listener import Action, ActionRecord
+from hatchet_sdk.clients.dispatcher.dispatcher import DispatcherClient
 from hatchet_sdk.clients.durable_event_listener import (
     DurableEventListener,
     RegisterDurableEventRequest,
@@ -49,7 +45,7 @@ class StepRunError(BaseModel):
 class Context:
     def __init__(
         self,
-        action: Action,
+        action: Action | ActionRecord,
         dispatcher_client: DispatcherClient,
         admin_client: AdminClient,
         event_client: EventClient,
@@ -66,7 +62,8 @@ class Context:
 
         self.data = action.action_payload
 
-        self.action = action
+        ## the runner passes the record it was assigned, which is only made into an `Action` if it's read
+        self._action = action
 
         self.step_run_id: str = action.step_run_id
         self.exit_flag = False
@@ -79,12 +76,20 @@ class Context:
         self.workflow_run_event_listener = workflow_run_event_listener
         self.namespace = namespace
 
-        # FIXME: this limits the number of concurrent log requests to 1, which means we can do about
-        # 100 log lines per second but this depends on network.
-        self.logger_thread_pool = ThreadPoolExecutor(max_workers=1)
-        self.stream_event_thread_pool = ThreadPoolExecutor(max_workers=1)
+    @property
+    def action(self) -> Action:
+        if isinstance(self._action, ActionRecord):
+            self._action = self._action.to_action()
+
+        return self._action
 
-        self.input = self.data.input
+    @action.setter
+    def action(self, action: Action) -> None:
+        self._action = action
+
+    @property
+    def input(self) -> JSONSerializableMapping:
+        return self.data.input
 
     def was_skipped(self, task: "Task[TWorkflowInput, R]") -> bool:
         return self.data.parents.get(task.name, {}).get("skipped", False)
@@ -99,7 +104,7 @@ class Context:
         if self.was_skipped(task):
             raise ValueError("{task.name} was skipped")
 
-        action_prefix = self.action.action_id.split(":")[0]
+        action_prefix = self._action.action_id.split(":")[0]
 
         workflow_validator = next(
             (
@@ -134,7 +139,7 @@ class Context:
 
     @property
     def workflow_run_id(self) -> str:
-        return self.action.workflow_run_id
+        return self._action.workflow_run_id
 
     def cancel(self) -> None:
         logger.debug("cancelling step...")
@@ -144,14 +149,6 @@ class Context:
     def done(self) -> bool:
         return self.exit_flag
 
-    def _log(self, line: str) -> tuple[bool, Exception | None]:
-        try:
-            self.event_client.log(message=line, step_run_id=self.step_run_id)
-            return True, None
-        except Exception as e:
-            # we don't want to raise an exception here, as it will kill the log thread
-            return False, e
-
     def log(
         self, line: str | JSONSerializableMapping, raise_on_error: bool = False
     ) -> None:
@@ -164,40 +161,45 @@ class Context:
             except Exception:
                 line = str(line)
 
-        future = self.logger_thread_pool.submit(self._log, line)
-
-        def handle_result(future: Future[tuple[bool, Exception | None]]) -> None:
-            success, exception = future.result()
-            if not success and exception:
-                if raise_on_error:
-                    raise exception
-                else:
-                    thread_trace = "".join(
-                        traceback.format_exception(
-                            type(exception), exception, exception.__traceback__
-                        )
-                    )
-                    call_site_trace = "".join(traceback.format_stack())
-                    logger.error(
-                        f"Error in log thread: {exception}\n{thread_trace}\nCalled from:\n{call_site_trace}"
-                    )
-
-        future.add_done_callback(handle_result)
+        ## the line is sent in the background, so only a failure to buffer it can be raised here
+        try:
+            self.event_client.buffer_log(message=line, step_run_id=self.step_run_id)
+        except Exception as e:
+            if raise_on_error:
+                raise e
+
+            logger.error(f"Error logging: {e}")
 
     def release_slot(self) -> None:
         return self.dispatcher_client.release_slot(self.step_run_id)
 
-    def _put_stream(self, data: str | bytes) -> None:
+    def put_stream(self, data: str | bytes) -> None:
+        """
+        Puts a chunk on the step run's stream. Chunks are sent in the background, and ones put close
+        together may be sent as one stream event; this only blocks while too many chunks are waiting
+        to be sent, so use `aio_put_stream` in async tasks.
+        """
+        if self.step_run_id == "":
+            return
+
         try:
-            self.event_client.stream(data=data, step_run_id=self.step_run_id)
+            self.event_client.buffer_stream(data=data, step_run_id=self.step_run_id)
         except Exception as e:
             logger.error(f"Error putting stream event: {e}")
 
-    def put_stream(self, data: str | bytes) -> None:
+    async def aio_put_stream(self, data: str | bytes) -> None:
+        """
+        Puts a chunk on the step run's stream, waiting while too many chunks are waiting to be sent.
+        """
         if self.step_run_id == "":
             return
 
-        self.stream_event_thread_pool.submit(self._put_stream, data)
+        try:
+            await self.event_client.aio_buffer_stream(
+                data=data, step_run_id=self.step_run_id
+            )
+        except Exception as e:
+            logger.error(f"Error putting stream event: {e}")
 
     def refresh_timeout(self, increment_by: str | timedelta) -> None:
         if isinstance(increment_by, timedelta):
@@ -212,23 +214,23 @@ class Context:
 
     @property
     def retry_count(self) -> int:
-        return self.action.retry_count
+        return self._action.retry_count
 
     @property
     def additional_metadata(self) -> JSONSerializableMapping | None:
-        return self.action.additional_metadata
+        return self._action.additional_metadata
 
     @property
     def child_index(self) -> int | None:
-        return self.action.child_workflow_index
+        return self._action.child_workflow_index
 
     @property
     def child_key(self) -> str | None:
-        return self.action.child_workflow_key
+        return self._action.child_workflow_key
 
     @property
     def parent_workflow_run_id(self) -> str | None:
-        return self.action.parent_workflow_run_id
+        return self._action.parent_workflow_run_id
 
     @property
     def task_run_errors(self) -> dict[str, str]:
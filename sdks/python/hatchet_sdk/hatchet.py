@@ -21,6 +21,8 @@ from hatchet_sdk.runnables.types import (
     DEFAULT_SCHEDULE_TIMEOUT,
     ConcurrencyExpression,
     EmptyModel,
+    ExecutorType,
+    ProfileConfig,
     R,
     StickyStrategy,
     TaskDefaults,
@@ -112,6 +114,7 @@ class Hatchet:
         slots: int = 100,
         labels: dict[str, str | int] = {},
         workflows: list[BaseWorkflow[Any]] = [],
+        executor: ExecutorType = ExecutorType.THREAD,
     ) -> Worker:
         """
         Create a Hatchet worker on which to run workflows.
@@ -128,6 +131,8 @@ class Hatchet:
         :param workflows: A list of workflows to register on the worker, as a shorthand for calling `register_workflow` on each or `register_workflows` on all of them. Defaults to an empty list
         :type workflows: list[Workflow]
 
+        :param executor: Where sync tasks run by default. `ExecutorType.THREAD` runs them on a thread pool, and `ExecutorType.PROCESS` runs them in a warm pool of processes sized to the lesser of `slots` and the CPU count, which lets CPU-bound tasks use more than one core, but can't use the context's admin and REST clients or run event listener. Tasks can override this with their own `executor`. Default: `ExecutorType.THREAD`
+        :type executor: ExecutorType
 
         :returns: The created `Worker` object, which exposes an instance method `start` which can be called to start the worker.
         :rtype: Worker
@@ -146,6 +151,7 @@ class Hatchet:
             debug=self._client.debug,
             owned_loop=loop is None,
             workflows=workflows,
+            executor=executor,
         )
 
     @overload
@@ -267,6 +273,8 @@ class Hatchet:
         desired_worker_labels: dict[str, DesiredWorkerLabel] = {},
         backoff_factor: float | None = None,
         backoff_max_seconds: int | None = None,
+        executor: ExecutorType | None = None,
+        profile: ProfileConfig | None = None,
     ) -> Callable[[Callable[[EmptyModel, Context], R]], Standalone[EmptyModel, R]]: ...
 
     @overload
@@ -289,6 +297,8 @@ class Hatchet:
         desired_worker_labels: dict[str, DesiredWorkerLabel] = {},
         backoff_factor: float | None = None,
         backoff_max_seconds: int | None = None,
+        executor: ExecutorType | None = None,
+        profile: ProfileConfig | None = None,
     ) -> Callable[
         [Callable[[TWorkflowInput, Context], R]], Standalone[TWorkflowInput, R]
     ]: ...
@@ -312,6 +322,8 @@ class Hatchet:
         desired_worker_labels: dict[str, DesiredWorkerLabel] = {},
         backoff_factor: float | None = None,
         backoff_max_seconds: int | None = None,
+        executor: ExecutorType | None = None,
+        profile: ProfileConfig | None = None,
     ) -> (
         Callable[[Callable[[EmptyModel, Context], R]], Standalone[EmptyModel, R]]
         | Callable[
@@ -369,6 +381,12 @@ class Hatchet:
         :param backoff_max_seconds: The maximum number of seconds to allow retries with exponential backoff to continue. Default: None
         :type backoff_max_seconds: int | None
 
+        :param executor: Where the task's function runs on the worker. `ExecutorType.PROCESS` runs a sync task in a warm pool of worker processes instead of a thread, where the context's admin and REST clients and run event listener can't be used. Defaults to the worker's executor.
+        :type executor: ExecutorType | None
+
+        :param profile: Profiles a sampled fraction of the task's runs with `cProfile`, and optionally `tracemalloc`, and logs their slowest functions and largest allocations to the run, or writes them to the worker's `worker_profile_dir`. Defaults to the worker's `worker_profile_sample_rate`.
+        :type profile: ProfileConfig | None
+
         :returns: A decorator which creates a `Standalone` task object.
         :rtype: Callable[[Callable[[TWorkflowInput, Context], R]], Standalone[TWorkflowInput, R]]
         """
@@ -399,6 +417,8 @@ class Hatchet:
             backoff_factor=backoff_factor,
             backoff_max_seconds=backoff_max_seconds,
             concurrency=[concurrency] if concurrency else [],
+            executor=executor,
+            profile=profile,
         )
 
         def inner(
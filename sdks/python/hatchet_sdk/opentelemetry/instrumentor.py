@@ -12,6 +12,7 @@ try:
     from opentelemetry.metrics import MeterProvider, NoOpMeterProvider, get_meter
     from opentelemetry.trace import (
         NoOpTracerProvider,
+        Span,
         StatusCode,
         TracerProvider,
         get_tracer,
@@ -32,13 +33,14 @@ from hatchet_sdk.clients.admin import (
     TriggerWorkflowOptions,
     WorkflowRunTriggerConfig,
 )
-from hatchet_sdk.clients.dispatcher.action_listener import Action
+from hatchet_sdk.clients.dispatcher.action_listener import ActionRecord
 from hatchet_sdk.clients.events import (
     BulkPushEventWithMetadata,
     EventClient,
     PushEventOptions,
 )
 from hatchet_sdk.contracts.events_pb2 import Event
+from hatchet_sdk.worker.latency import stage_durations
 from hatchet_sdk.worker.runner.runner import Runner
 from hatchet_sdk.workflow_run import WorkflowRunRef
 
@@ -145,6 +147,7 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
         self,
         tracer_provider: TracerProvider | None = None,
         meter_provider: MeterProvider | None = None,
+        record_step_stages: bool = False,
     ):
         """
         Hatchet OpenTelemetry instrumentor.
@@ -156,10 +159,15 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
                 If not provided, the global tracer provider will be used.
         :param meter_provider: MeterProvider | None: The OpenTelemetry MeterProvider to use.
                 If not provided, a no-op meter provider will be used.
+        :param record_step_stages: bool: Whether to add an event to each step run's span for every stage
+                it went through on the worker (e.g. `hatchet.stage.user_code`), at the time the stage ended
+                and with its duration. Stages after the step run's result is serialized end after its span
+                does, so they're only recorded in the worker's `hatchet_step_stage_duration_seconds` metric.
         """
 
         self.tracer_provider = tracer_provider or get_tracer_provider()
         self.meter_provider = meter_provider or NoOpMeterProvider()
+        self.record_step_stages = record_step_stages
 
         super().__init__()
 
@@ -192,12 +200,24 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
             self._wrap_push_event,
         )
 
+        wrap_function_wrapper(
+            hatchet_sdk,
+            "clients.events.EventClient.aio_push",
+            self._wrap_async_push_event,
+        )
+
         wrap_function_wrapper(
             hatchet_sdk,
             "clients.events.EventClient.bulk_push",
             self._wrap_bulk_push_event,
         )
 
+        wrap_function_wrapper(
+            hatchet_sdk,
+            "clients.events.EventClient.aio_bulk_push",
+            self._wrap_async_bulk_push_event,
+        )
+
         wrap_function_wrapper(
             hatchet_sdk,
             "clients.admin.AdminClient.run_workflow",
@@ -225,9 +245,9 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
     ## IMPORTANT: Keep these types in sync with the wrapped method's signature
     async def _wrap_handle_start_step_run(
         self,
-        wrapped: Callable[[Action], Coroutine[None, None, Exception | None]],
+        wrapped: Callable[[ActionRecord], Coroutine[None, None, Exception | None]],
         instance: Runner,
-        args: tuple[Action],
+        args: tuple[ActionRecord],
         kwargs: Any,
     ) -> Exception | None:
         action = args[0]
@@ -240,6 +260,9 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
         ) as span:
             result = await wrapped(*args, **kwargs)
 
+            if self.record_step_stages:
+                self._add_stage_events(span, action)
+
             if isinstance(result, Exception):
                 span.set_status(StatusCode.ERROR, str(result))
 
@@ -248,9 +271,9 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
     ## IMPORTANT: Keep these types in sync with the wrapped method's signature
     async def _wrap_handle_get_group_key_run(
         self,
-        wrapped: Callable[[Action], Coroutine[None, None, Exception | None]],
+        wrapped: Callable[[ActionRecord], Coroutine[None, None, Exception | None]],
         instance: Runner,
-        args: tuple[Action],
+        args: tuple[ActionRecord],
         kwargs: Any,
     ) -> Exception | None:
         action = args[0]
@@ -261,11 +284,22 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
         ) as span:
             result = await wrapped(*args, **kwargs)
 
+            if self.record_step_stages:
+                self._add_stage_events(span, action)
+
             if isinstance(result, Exception):
                 span.set_status(StatusCode.ERROR, str(result))
 
             return result
 
+    def _add_stage_events(self, span: Span, action: ActionRecord) -> None:
+        for stage, ended_at, duration in stage_durations(action.timings):
+            span.add_event(
+                f"hatchet.stage.{stage.value}",
+                attributes={"hatchet.stage.duration_seconds": duration},
+                timestamp=int(ended_at * 1e9),
+            )
+
     ## IMPORTANT: Keep these types in sync with the wrapped method's signature
     async def _wrap_handle_cancel_action(
         self,
@@ -301,6 +335,26 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
         ):
             return wrapped(*args, **kwargs)
 
+    ## IMPORTANT: Keep these types in sync with the wrapped method's signature
+    async def _wrap_async_push_event(
+        self,
+        wrapped: Callable[
+            [str, dict[str, Any], PushEventOptions | None],
+            Coroutine[None, None, Event],
+        ],
+        instance: EventClient,
+        args: tuple[
+            str,
+            dict[str, Any],
+            PushEventOptions | None,
+        ],
+        kwargs: dict[str, str | dict[str, Any] | PushEventOptions | None],
+    ) -> Event:
+        with self._tracer.start_as_current_span(
+            "hatchet.push_event",
+        ):
+            return await wrapped(*args, **kwargs)
+
     ## IMPORTANT: Keep these types in sync with the wrapped method's signature
     def _wrap_bulk_push_event(
         self,
@@ -319,6 +373,25 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
         ):
             return wrapped(*args, **kwargs)
 
+    ## IMPORTANT: Keep these types in sync with the wrapped method's signature
+    async def _wrap_async_bulk_push_event(
+        self,
+        wrapped: Callable[
+            [list[BulkPushEventWithMetadata], PushEventOptions | None],
+            Coroutine[None, None, list[Event]],
+        ],
+        instance: EventClient,
+        args: tuple[
+            list[BulkPushEventWithMetadata],
+            PushEventOptions | None,
+        ],
+        kwargs: dict[str, list[BulkPushEventWithMetadata] | PushEventOptions | None],
+    ) -> list[Event]:
+        with self._tracer.start_as_current_span(
+            "hatchet.bulk_push_event",
+        ):
+            return await wrapped(*args, **kwargs)
+
     ## IMPORTANT: Keep these types in sync with the wrapped method's signature
     def _wrap_run_workflow(
         self,
@@ -388,7 +461,9 @@ class HatchetInstrumentor(BaseInstrumentor):  # type: ignore[misc]
         unwrap(hatchet_sdk, "worker.runner.runner.Runner.handle_start_group_key_run")
         unwrap(hatchet_sdk, "worker.runner.runner.Runner.handle_cancel_action")
         unwrap(hatchet_sdk, "clients.events.EventClient.push")
+        unwrap(hatchet_sdk, "clients.events.EventClient.aio_push")
         unwrap(hatchet_sdk, "clients.events.EventClient.bulk_push")
+        unwrap(hatchet_sdk, "clients.events.EventClient.aio_bulk_push")
         unwrap(hatchet_sdk, "clients.admin.AdminClient.run_workflow")
         unwrap(hatchet_sdk, "clients.admin.AdminClient.aio_run_workflow")
         unwrap(hatchet_sdk, "clients.admin.AdminClient.run_workflows")
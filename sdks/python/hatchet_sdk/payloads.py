@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any
+
+from hatchet_sdk.blob_store import BlobStore, resolve_blob_reference
+from hatchet_sdk.compression import compress_payload, decompressed_payload
+from hatchet_sdk.config import ClientConfig
+
+
+def encode_payload(data: bytes, config: ClientConfig) -> bytes:
+    """
+    Prepares a serialized task input, task output or event payload to be sent: it's compressed if
+    it's over `payload_compression_threshold`, and if it's still over `blob_offload_threshold`, it's
+    offloaded to the blob store and only a reference to it is sent.
+    """
+    encoded = compress_payload(data, config.payload_compression_threshold)
+
+    if config.blob_store is not None and len(encoded) >= config.blob_offload_threshold:
+        return config.blob_store.offload(data)
+
+    return encoded
+
+
+async def aio_encode_payload(data: bytes, config: ClientConfig) -> bytes:
+    """
+    `encode_payload` for async code: a payload offloaded to the blob store is uploaded from a thread,
+    so the upload doesn't block the event loop.
+    """
+    encoded = compress_payload(data, config.payload_compression_threshold)
+
+    if config.blob_store is not None and len(encoded) >= config.blob_offload_threshold:
+        return await asyncio.to_thread(config.blob_store.offload, data)
+
+    return encoded
+
+
+def resolve_payload(value: Any, blob_store: BlobStore | None) -> bytes | None:
+    """
+    Returns the JSON that `value` stands for if it's a decoded compressed payload marker or blob
+    reference, and `None` if it's neither.
+    """
+    data = resolve_blob_reference(value, blob_store)
+
+    if data is None:
+        data = decompressed_payload(value)
+
+    return data
@@ -1,6 +1,17 @@
 import asyncio
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Generic, cast, get_type_hints
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Generic,
+    Iterable,
+    Literal,
+    cast,
+    get_type_hints,
+    overload,
+)
 
 from google.protobuf import timestamp_pb2
 
@@ -124,6 +135,53 @@ class Standalone(BaseWorkflow[TWorkflowInput], Generic[TWorkflowInput, R]):
             for result in await self._workflow.aio_run_many(workflows)
         ]
 
+    @overload
+    def aio_run_many_iter(
+        self,
+        workflows: (
+            Iterable[WorkflowRunTriggerConfig] | AsyncIterable[WorkflowRunTriggerConfig]
+        ),
+        max_in_flight: int = ...,
+        return_exceptions: Literal[False] = ...,
+    ) -> AsyncGenerator[tuple[TaskRunRef[TWorkflowInput, R], R], None]: ...
+
+    @overload
+    def aio_run_many_iter(
+        self,
+        workflows: (
+            Iterable[WorkflowRunTriggerConfig] | AsyncIterable[WorkflowRunTriggerConfig]
+        ),
+        max_in_flight: int = ...,
+        return_exceptions: Literal[True] = ...,
+    ) -> AsyncGenerator[
+        tuple[TaskRunRef[TWorkflowInput, R], R | BaseException], None
+    ]: ...
+
+    async def aio_run_many_iter(
+        self,
+        workflows: (
+            Iterable[WorkflowRunTriggerConfig] | AsyncIterable[WorkflowRunTriggerConfig]
+        ),
+        max_in_flight: int = 1000,
+        return_exceptions: bool = False,
+    ) -> AsyncGenerator[tuple[TaskRunRef[TWorkflowInput, R], R | BaseException], None]:
+        results = self._workflow.aio_run_many_iter(
+            workflows, max_in_flight=max_in_flight, return_exceptions=True
+        )
+
+        ## close the workflow's iterator as soon as this one stops, so it stops waiting on runs too
+        async with aclosing(results):
+            async for ref, result in results:
+                if isinstance(result, BaseException):
+                    if not return_exceptions:
+                        raise result
+
+                    yield TaskRunRef[TWorkflowInput, R](self, ref), result
+                else:
+                    yield TaskRunRef[TWorkflowInput, R](
+                        self, ref
+                    ), self._extract_result(result)
+
     def run_many_no_wait(
         self, workflows: list[WorkflowRunTriggerConfig]
     ) -> list[TaskRunRef[TWorkflowInput, R]]:
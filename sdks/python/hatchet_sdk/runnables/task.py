@@ -4,6 +4,7 @@ from typing import (
     Awaitable,
     Callable,
     Generic,
+    Sequence,
     TypeVar,
     Union,
     cast,
@@ -17,7 +18,10 @@ from hatchet_sdk.contracts.v1.workflows_pb2 import (
 from hatchet_sdk.runnables.types import (
     DEFAULT_EXECUTION_TIMEOUT,
     DEFAULT_SCHEDULE_TIMEOUT,
+    BatchConfig,
     ConcurrencyExpression,
+    ExecutorType,
+    ProfileConfig,
     R,
     StepType,
     TWorkflowInput,
@@ -69,6 +73,9 @@ class Task(Generic[TWorkflowInput, R]):
         wait_for: list[Condition | OrGroup] = [],
         skip_if: list[Condition | OrGroup] = [],
         cancel_if: list[Condition | OrGroup] = [],
+        executor: ExecutorType | None = None,
+        batch: BatchConfig | None = None,
+        profile: ProfileConfig | None = None,
     ) -> None:
         self.is_durable = is_durable
 
@@ -92,6 +99,9 @@ class Task(Generic[TWorkflowInput, R]):
         self.backoff_factor = backoff_factor
         self.backoff_max_seconds = backoff_max_seconds
         self.concurrency = concurrency
+        self.executor = executor
+        self.batch = batch
+        self.profile = profile
 
         self.wait_for = self._flatten_conditions(wait_for)
         self.skip_if = self._flatten_conditions(skip_if)
@@ -142,3 +152,76 @@ class Task(Generic[TWorkflowInput, R]):
             return await self.fn(workflow_input, cast(Context, ctx))  # type: ignore
 
         raise TypeError(f"{self.name} is not an async function. Use `call` instead.")
+
+    def call_batch(self, ctxs: list[Context]) -> Sequence[Any]:
+        if self.is_async_function:
+            raise TypeError(
+                f"{self.name} is not a sync function. Use `aio_call_batch` instead."
+            )
+
+        outputs, valid, inputs = self._validate_batch(ctxs)
+        fn = cast(
+            Callable[[list[TWorkflowInput], list[Context]], Sequence[Any]], self.fn
+        )
+
+        if not valid:
+            return outputs
+
+        return self._merge_batch(outputs, valid, fn(inputs, [ctxs[i] for i in valid]))
+
+    async def aio_call_batch(self, ctxs: list[Context]) -> Sequence[Any]:
+        if not self.is_async_function:
+            raise TypeError(
+                f"{self.name} is not an async function. Use `call_batch` instead."
+            )
+
+        outputs, valid, inputs = self._validate_batch(ctxs)
+        fn = cast(
+            Callable[[list[TWorkflowInput], list[Context]], Awaitable[Sequence[Any]]],
+            self.fn,
+        )
+
+        if not valid:
+            return outputs
+
+        return self._merge_batch(
+            outputs, valid, await fn(inputs, [ctxs[i] for i in valid])
+        )
+
+    def _validate_batch(
+        self, ctxs: list[Context]
+    ) -> tuple[list[Any], list[int], list[TWorkflowInput]]:
+        """
+        Validates each run's input on its own, so that an invalid input only fails its own run. Returns
+        the batch's outputs, with the validation errors filled in, and the indices and inputs of the
+        valid runs, which are the ones passed to the function.
+        """
+        outputs: list[Any] = [None] * len(ctxs)
+        valid: list[int] = []
+        inputs: list[TWorkflowInput] = []
+
+        for i, ctx in enumerate(ctxs):
+            try:
+                inputs.append(self.workflow._get_workflow_input(ctx))
+            except Exception as e:
+                outputs[i] = e
+                continue
+
+            valid.append(i)
+
+        return outputs, valid, inputs
+
+    def _merge_batch(
+        self, outputs: list[Any], valid: list[int], results: Sequence[Any]
+    ) -> list[Any]:
+        results = list(results)
+
+        if len(results) != len(valid):
+            raise ValueError(
+                f"{self.name} returned {len(results)} outputs for a batch of {len(valid)} inputs"
+            )
+
+        for i, result in zip(valid, results):
+            outputs[i] = result
+
+        return outputs
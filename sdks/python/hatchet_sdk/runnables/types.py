@@ -29,6 +29,23 @@ class StickyStrategy(str, Enum):
     HARD = "HARD"
 
 
+class ExecutorType(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class BatchConfig(BaseModel):
+    max_batch: int = Field(gt=0)
+    max_wait: timedelta
+
+
+class ProfileConfig(BaseModel):
+    ## the fraction of the task's runs to profile
+    sample_rate: float = Field(default=1, ge=0, le=1)
+    ## also traces the memory the profiled runs allocate
+    trace_memory: bool = False
+
+
 class ConcurrencyLimitStrategy(str, Enum):
     CANCEL_IN_PROGRESS = "CANCEL_IN_PROGRESS"
     DROP_NEWEST = "DROP_NEWEST"
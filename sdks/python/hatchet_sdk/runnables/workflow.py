@@ -1,6 +1,21 @@
 import asyncio
-from datetime import datetime
-from typing import TYPE_CHECKING, Any, Callable, Generic, Union, cast, overload
+from datetime import datetime, timedelta
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Generic,
+    Iterable,
+    Literal,
+    Sequence,
+    TypeVar,
+    Union,
+    cast,
+    overload,
+)
 
 from google.protobuf import timestamp_pb2
 from pydantic import BaseModel
@@ -10,6 +25,7 @@ from hatchet_sdk.clients.admin import (
     TriggerWorkflowOptions,
     WorkflowRunTriggerConfig,
 )
+from hatchet_sdk.clients.bulk import MAX_BULK_ITEMS
 from hatchet_sdk.clients.rest.models.cron_workflows import CronWorkflows
 from hatchet_sdk.context.context import Context, DurableContext
 from hatchet_sdk.contracts.v1.shared.condition_pb2 import TaskConditions
@@ -28,7 +44,10 @@ from hatchet_sdk.runnables.task import Task
 from hatchet_sdk.runnables.types import (
     DEFAULT_EXECUTION_TIMEOUT,
     DEFAULT_SCHEDULE_TIMEOUT,
+    BatchConfig,
     ConcurrencyExpression,
+    ExecutorType,
+    ProfileConfig,
     R,
     StepType,
     TWorkflowInput,
@@ -51,6 +70,28 @@ if TYPE_CHECKING:
     from hatchet_sdk import Hatchet
     from hatchet_sdk.runnables.standalone import Standalone
 
+T = TypeVar("T")
+
+
+async def _aiter(items: Iterable[T] | AsyncIterable[T]) -> AsyncGenerator[T, None]:
+    if not isinstance(items, AsyncIterable):
+        for item in items:
+            yield item
+
+        return
+
+    iterator = items.__aiter__()
+
+    try:
+        async for item in iterator:
+            yield item
+    finally:
+        ## an async generator is closed once it stops being read, rather than left suspended until it's collected
+        aclose = getattr(iterator, "aclose", None)
+
+        if aclose is not None:
+            await aclose()
+
 
 def transform_desired_worker_label(d: DesiredWorkerLabel) -> DesiredWorkerLabels:
     value = d.value
@@ -252,7 +293,7 @@ class BaseWorkflow(Generic[TWorkflowInput]):
     def _get_workflow_input(self, ctx: Context) -> TWorkflowInput:
         return cast(
             TWorkflowInput,
-            self.config.input_validator.model_validate(ctx.workflow_input),
+            ctx.data.validate_input(self.config.input_validator),
         )
 
     @property
@@ -359,6 +400,114 @@ class Workflow(BaseWorkflow[TWorkflowInput]):
 
         return await asyncio.gather(*[ref.aio_result() for ref in refs])
 
+    @overload
+    def aio_run_many_iter(
+        self,
+        workflows: (
+            Iterable[WorkflowRunTriggerConfig] | AsyncIterable[WorkflowRunTriggerConfig]
+        ),
+        max_in_flight: int = ...,
+        return_exceptions: Literal[False] = ...,
+    ) -> AsyncGenerator[tuple[WorkflowRunRef, dict[str, Any]], None]: ...
+
+    @overload
+    def aio_run_many_iter(
+        self,
+        workflows: (
+            Iterable[WorkflowRunTriggerConfig] | AsyncIterable[WorkflowRunTriggerConfig]
+        ),
+        max_in_flight: int = ...,
+        return_exceptions: Literal[True] = ...,
+    ) -> AsyncGenerator[
+        tuple[WorkflowRunRef, dict[str, Any] | BaseException], None
+    ]: ...
+
+    async def aio_run_many_iter(
+        self,
+        workflows: (
+            Iterable[WorkflowRunTriggerConfig] | AsyncIterable[WorkflowRunTriggerConfig]
+        ),
+        max_in_flight: int = 1000,
+        return_exceptions: bool = False,
+    ) -> AsyncGenerator[tuple[WorkflowRunRef, dict[str, Any] | BaseException], None]:
+        """
+        Run many instances of the workflow, yielding each run's reference and result as it
+        completes, so that results can be processed while other runs are still going.
+
+        At most `max_in_flight` runs are triggered and waited on at once, and `workflows` is only
+        read from as runs complete, so a generator of trigger configs can be streamed through
+        with constant memory.
+
+        :param workflows: The trigger configs of the runs, as an iterable or async iterable.
+        :type workflows: Iterable[WorkflowRunTriggerConfig] | AsyncIterable[WorkflowRunTriggerConfig]
+
+        :param max_in_flight: The most runs to have triggered and not yet yielded at once. Defaults to 1000.
+        :type max_in_flight: int
+
+        :param return_exceptions: Whether to yield a failed run's exception as its result, instead of raising it. Defaults to False.
+        :type return_exceptions: bool
+
+        :returns: An async iterator of `(ref, result)` pairs, in the order the runs complete.
+        """
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be greater than 0")
+
+        configs = _aiter(workflows)
+        exhausted = False
+
+        ## refill in batches rather than one run at a time, so triggers stay bulk
+        refill_at = max(1, min(max_in_flight // 4, MAX_BULK_ITEMS))
+
+        pending: dict[asyncio.Task[dict[str, Any]], WorkflowRunRef] = {}
+
+        try:
+            while True:
+                free = max_in_flight - len(pending)
+
+                while not exhausted and (free >= refill_at or not pending):
+                    batch: list[WorkflowRunTriggerConfig] = []
+
+                    async for config in configs:
+                        batch.append(config)
+
+                        if len(batch) >= min(free, MAX_BULK_ITEMS):
+                            break
+                    else:
+                        exhausted = True
+
+                    if batch:
+                        refs = await self.client.admin.aio_run_workflows(batch)
+
+                        for ref in refs:
+                            pending[asyncio.create_task(ref.aio_result())] = ref
+
+                    free = max_in_flight - len(pending)
+
+                if not pending:
+                    return
+
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    ref = pending.pop(task)
+                    error = task.exception()
+
+                    if error is None:
+                        yield ref, task.result()
+                    elif return_exceptions:
+                        yield ref, error
+                    else:
+                        raise error
+        finally:
+            ## stop waiting on the runs that weren't yielded (the runs themselves keep going)
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+            await configs.aclose()
+
     def run_many_no_wait(
         self,
         workflows: list[WorkflowRunTriggerConfig],
@@ -458,6 +607,8 @@ class Workflow(BaseWorkflow[TWorkflowInput]):
         wait_for: list[Condition | OrGroup] = [],
         skip_if: list[Condition | OrGroup] = [],
         cancel_if: list[Condition | OrGroup] = [],
+        executor: ExecutorType | None = None,
+        profile: ProfileConfig | None = None,
     ) -> Callable[[Callable[[TWorkflowInput, Context], R]], Task[TWorkflowInput, R]]:
         """
         A decorator to transform a function into a Hatchet task that run as part of a workflow.
@@ -486,6 +637,12 @@ class Workflow(BaseWorkflow[TWorkflowInput]):
         :param backoff_max_seconds: The maximum number of seconds to allow retries with exponential backoff to continue. Default: `None`
         :type backoff_max_seconds: int | None
 
+        :param executor: Where a sync task's function runs on the worker. `ExecutorType.PROCESS` runs it in a warm pool of worker processes instead of a thread, so CPU-bound tasks are not serialized by the GIL. The task must be defined at the top level of a module, and its input, output, and context data must be picklable. A pool process has no admin or REST client or run event listener, so `ctx.admin_client`, `ctx.rest_client` and `ctx.workflow_run_event_listener` can't be used, and the worker refuses to register a task that uses them. Defaults to the worker's executor.
+        :type executor: ExecutorType | None
+
+        :param profile: Profiles a sampled fraction of the task's runs with `cProfile`, and optionally `tracemalloc`, and logs their slowest functions and largest allocations to the run, or writes them to the worker's `worker_profile_dir`. Defaults to the worker's `worker_profile_sample_rate`.
+        :type profile: ProfileConfig | None
+
         :returns: A decorator which creates a `Task` object.
         :rtype: Callable[[Callable[[Type[BaseModel], Context], R]], Task[Type[BaseModel], R]]
         """
@@ -514,6 +671,111 @@ class Workflow(BaseWorkflow[TWorkflowInput]):
                 wait_for=wait_for,
                 skip_if=skip_if,
                 cancel_if=cancel_if,
+                executor=executor,
+                profile=profile,
+            )
+
+            self._default_tasks.append(task)
+
+            return task
+
+        return inner
+
+    def batch_task(
+        self,
+        name: str | None = None,
+        max_batch: int = 100,
+        max_wait: timedelta = timedelta(milliseconds=10),
+        schedule_timeout: Duration = DEFAULT_SCHEDULE_TIMEOUT,
+        execution_timeout: Duration = DEFAULT_EXECUTION_TIMEOUT,
+        parents: list[Task[TWorkflowInput, Any]] = [],
+        retries: int = 0,
+        rate_limits: list[RateLimit] = [],
+        desired_worker_labels: dict[str, DesiredWorkerLabel] = {},
+        backoff_factor: float | None = None,
+        backoff_max_seconds: int | None = None,
+        concurrency: list[ConcurrencyExpression] = [],
+        wait_for: list[Condition | OrGroup] = [],
+        skip_if: list[Condition | OrGroup] = [],
+        cancel_if: list[Condition | OrGroup] = [],
+    ) -> Callable[
+        [
+            Callable[[list[TWorkflowInput], list[Context]], Sequence[R | Exception]]
+            | Callable[
+                [list[TWorkflowInput], list[Context]],
+                Awaitable[Sequence[R | Exception]],
+            ]
+        ],
+        Task[TWorkflowInput, R],
+    ]:
+        """
+        A decorator to transform a function into a Hatchet task whose runs are micro-batched on the worker. Runs of the task assigned to a worker at around the same time are collected and handed to the function in a single call, which receives a list of inputs and a list of contexts (one per run) and must return a list of outputs in the same order. Each run still completes, fails and retries on its own.
+
+        :param name: The name of the task. If not specified, defaults to the name of the function being wrapped by the `batch_task` decorator.
+        :type name: str | None
+
+        :param max_batch: The largest number of runs to pass to the function in one call. Default: `100`
+        :type max_batch: int
+
+        :param max_wait: How long to wait for more runs after the first run of a batch is assigned, before calling the function with a partial batch. Default: 10 milliseconds
+        :type max_wait: datetime.timedelta
+
+        :param timeout: The execution timeout of the task. Defaults to 60 minutes.
+        :type timeout: datetime.timedelta | str
+
+        :param parents: A list of tasks that are parents of the task. Note: Parents must be defined before their children. Defaults to an empty list (no parents).
+        :type parents: list[Task]
+
+        :param retries: The number of times to retry the task before failing. Default: `0`
+        :type retries: int
+
+        :param rate_limits: A list of rate limit configurations for the task. Defaults to an empty list (no rate limits).
+        :type rate_limits: list[RateLimit]
+
+        :param desired_worker_labels: A dictionary of desired worker labels that determine to which worker the task should be assigned. See documentation and examples on affinity and worker labels for more details. Defaults to an empty dictionary (no desired worker labels).
+        :type desired_worker_labels: dict[str, DesiredWorkerLabel]
+
+        :param backoff_factor: The backoff factor for controlling exponential backoff in retries. Default: `None`
+        :type backoff_factor: float | None
+
+        :param backoff_max_seconds: The maximum number of seconds to allow retries with exponential backoff to continue. Default: `None`
+        :type backoff_max_seconds: int | None
+
+        :returns: A decorator which creates a `Task` object. To fail individual runs, return an exception in their place in the list of outputs. If the function raises, every run in the batch fails.
+        :rtype: Callable[[Callable[[list[Type[BaseModel]], list[Context]], list[R | Exception]]], Task[Type[BaseModel], R]]
+        """
+
+        def inner(
+            func: (
+                Callable[[list[TWorkflowInput], list[Context]], Sequence[R | Exception]]
+                | Callable[
+                    [list[TWorkflowInput], list[Context]],
+                    Awaitable[Sequence[R | Exception]],
+                ]
+            )
+        ) -> Task[TWorkflowInput, R]:
+            task = Task[TWorkflowInput, R](
+                _fn=cast(Callable[[TWorkflowInput, Context], R], func),
+                is_durable=False,
+                workflow=self,
+                type=StepType.DEFAULT,
+                name=(name or func.__name__).lower(),
+                execution_timeout=execution_timeout,
+                schedule_timeout=schedule_timeout,
+                parents=parents,
+                retries=retries,
+                rate_limits=[r.to_proto() for r in rate_limits],
+                desired_worker_labels={
+                    key: transform_desired_worker_label(d)
+                    for key, d in desired_worker_labels.items()
+                },
+                backoff_factor=backoff_factor,
+                backoff_max_seconds=backoff_max_seconds,
+                concurrency=concurrency,
+                wait_for=wait_for,
+                skip_if=skip_if,
+                cancel_if=cancel_if,
+                batch=BatchConfig(max_batch=max_batch, max_wait=max_wait),
             )
 
             self._default_tasks.append(task)
@@ -0,0 +1,101 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Literal
+
+import pydantic_core
+from pydantic import BaseModel
+
+SerializerName = Literal["pydantic", "orjson", "json"]
+
+
+class Serializer(ABC):
+    """
+    Encodes the payloads the SDK sends (task inputs, event payloads, task outputs and additional
+    metadata) to JSON and decodes the ones it receives. `dumps` returns bytes, which protobuf
+    accepts for string fields as they are (though the generated stubs only allow `str`), so a large
+    payload is never copied into a `str`.
+    """
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def loads(self, data: str | bytes) -> Any:
+        pass
+
+
+class PydanticCoreSerializer(Serializer):
+    """
+    The default serializer, backed by pydantic-core's JSON encoder and parser. Pydantic models,
+    dataclasses, datetimes, UUIDs and the like are encoded as pydantic would encode them, and
+    anything else it can't encode is encoded as its `str()`.
+    """
+
+    def dumps(self, value: Any) -> bytes:
+        return pydantic_core.to_json(value, fallback=str)
+
+    def loads(self, data: str | bytes) -> Any:
+        return pydantic_core.from_json(data)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+
+    return str(value)
+
+
+class OrjsonSerializer(Serializer):
+    """
+    A serializer backed by orjson, which has to be installed separately. Pydantic models are encoded
+    as their JSON-mode dump, and anything else orjson can't encode natively as its `str()`.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import orjson
+        except ImportError:
+            raise ModuleNotFoundError(
+                "To use the orjson serializer, you must install orjson using (e.g.) `pip install orjson`"
+            )
+
+        self.orjson = orjson
+
+    def dumps(self, value: Any) -> bytes:
+        return self.orjson.dumps(
+            value, default=_default, option=self.orjson.OPT_NON_STR_KEYS
+        )
+
+    def loads(self, data: str | bytes) -> Any:
+        return self.orjson.loads(data)
+
+    def __reduce__(self) -> tuple[type["OrjsonSerializer"], tuple[()]]:
+        ## the module isn't picklable, so it's imported again on the other side
+        return OrjsonSerializer, ()
+
+
+class JSONSerializer(Serializer):
+    """
+    A serializer backed by the standard library's `json`, which encodes values it can't encode
+    natively as their `str()`.
+    """
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_default).encode("utf-8")
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+
+def get_serializer(name: SerializerName) -> Serializer:
+    if name == "pydantic":
+        return PydanticCoreSerializer()
+
+    if name == "orjson":
+        return OrjsonSerializer()
+
+    if name == "json":
+        return JSONSerializer()
+
+    raise ValueError(f"unknown serializer: {name}")
@@ -0,0 +1,3 @@
+from hatchet_sdk.testing.engine import FakeEngine, FakeEngineProcess
+
+__all__ = ["FakeEngine", "FakeEngineProcess"]
@@ -0,0 +1,1215 @@
+import asyncio
+import json
+import multiprocessing
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from multiprocessing.synchronize import Event as ProcessEvent
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, TypeVar
+
+import grpc
+import grpc.aio
+from google.protobuf import timestamp_pb2
+
+from hatchet_sdk.config import ClientConfig, ClientTLSConfig
+from hatchet_sdk.contracts import events_pb2 as event_protos
+from hatchet_sdk.contracts import workflows_pb2 as v0_workflow_protos
+from hatchet_sdk.contracts.dispatcher_pb2 import (
+    RESOURCE_EVENT_TYPE_CANCELLED,
+    RESOURCE_EVENT_TYPE_COMPLETED,
+    RESOURCE_EVENT_TYPE_FAILED,
+    RESOURCE_EVENT_TYPE_STARTED,
+    RESOURCE_EVENT_TYPE_STREAM,
+    RESOURCE_TYPE_STEP_RUN,
+    RESOURCE_TYPE_WORKFLOW_RUN,
+    STEP_EVENT_TYPE_COMPLETED,
+    STEP_EVENT_TYPE_FAILED,
+    STEP_EVENT_TYPE_STARTED,
+    WORKFLOW_RUN_EVENT_TYPE_FINISHED,
+    ActionEventResponse,
+    ActionType,
+    AssignedAction,
+    GroupKeyActionEvent,
+    HeartbeatRequest,
+    HeartbeatResponse,
+    OverridesData,
+    OverridesDataResponse,
+    RefreshTimeoutRequest,
+    RefreshTimeoutResponse,
+    ReleaseSlotRequest,
+    ReleaseSlotResponse,
+    StepActionEvent,
+    StepRunResult,
+    SubscribeToWorkflowEventsRequest,
+    SubscribeToWorkflowRunsRequest,
+    UpsertWorkerLabelsRequest,
+    UpsertWorkerLabelsResponse,
+    WorkerListenRequest,
+    WorkerRegisterRequest,
+    WorkerRegisterResponse,
+    WorkerUnsubscribeRequest,
+    WorkerUnsubscribeResponse,
+    WorkflowEvent,
+    WorkflowRunEvent,
+)
+from hatchet_sdk.contracts.dispatcher_pb2_grpc import (
+    DispatcherServicer,
+    add_DispatcherServicer_to_server,
+)
+from hatchet_sdk.contracts.events_pb2_grpc import (
+    EventsServiceServicer,
+    add_EventsServiceServicer_to_server,
+)
+from hatchet_sdk.contracts.v1 import dispatcher_pb2 as v1_dispatcher_protos
+from hatchet_sdk.contracts.v1 import workflows_pb2 as workflow_protos
+from hatchet_sdk.contracts.v1.dispatcher_pb2_grpc import (
+    V1DispatcherServicer,
+    add_V1DispatcherServicer_to_server,
+)
+from hatchet_sdk.contracts.v1.workflows_pb2_grpc import (
+    AdminServiceServicer,
+    add_AdminServiceServicer_to_server,
+)
+from hatchet_sdk.contracts.workflows_pb2_grpc import (
+    WorkflowServiceServicer,
+    add_WorkflowServiceServicer_to_server,
+)
+
+T = TypeVar("T")
+
+_Context = grpc.aio.ServicerContext[Any, Any]
+
+StepRunStatus = Literal[
+    "queued", "assigned", "running", "completed", "failed", "cancelled"
+]
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def _timestamp(at: float | None = None) -> timestamp_pb2.Timestamp:
+    timestamp = timestamp_pb2.Timestamp()
+    timestamp.FromNanoseconds(int((time.time() if at is None else at) * 1e9))
+
+    return timestamp
+
+
+def _duration(expr: str) -> float:
+    return sum(
+        int(amount) * _DURATION_UNITS[unit]
+        for amount, unit in re.findall(r"(\d+)([smhd])", expr)
+    )
+
+
+def _loads(payload: str | bytes) -> Any:
+    try:
+        return json.loads(payload) if payload else {}
+    except ValueError:
+        return payload.decode() if isinstance(payload, bytes) else payload
+
+
+@dataclass
+class FakeTask:
+    readable_id: str
+    action: str
+    parents: list[str]
+    retries: int
+
+
+@dataclass
+class FakeWorkflow:
+    name: str
+    tasks: dict[str, FakeTask]
+    event_triggers: list[str]
+
+
+@dataclass(eq=False)
+class FakeStepRun:
+    id: str
+    workflow_run: "FakeWorkflowRun"
+    task: FakeTask
+    queued_at: float
+    retry_count: int = 0
+    status: StepRunStatus = "queued"
+    worker_id: str | None = None
+    assigned_at: float | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+    output: str | None = None
+    error: str | None = None
+
+
+@dataclass(eq=False)
+class FakeWorkflowRun:
+    id: str
+    workflow: FakeWorkflow
+    input: Any
+    additional_metadata: str | None
+    created_at: float
+    parent_workflow_run_id: str | None = None
+    child_index: int | None = None
+    child_key: str | None = None
+    step_runs: dict[str, FakeStepRun] = field(default_factory=dict)
+    finished_at: float | None = None
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+    event: WorkflowRunEvent | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.finished_at is not None and all(
+            step_run.status == "completed" for step_run in self.step_runs.values()
+        )
+
+
+@dataclass(eq=False)
+class FakeWorker:
+    id: str
+    name: str
+    actions: set[str]
+    slots: int
+    running: set[str] = field(default_factory=set)
+    assignments: asyncio.Queue[AssignedAction] = field(default_factory=asyncio.Queue)
+    listening: bool = False
+    last_heartbeat_at: float | None = None
+
+
+class FakeEngine:
+    """
+    A stand-in Hatchet engine that serves the dispatcher, workflow, admin, events and v1 dispatcher
+    gRPC services on a local port, from its own thread and event loop, so a worker or client can run
+    against it without a live engine, e.g. to measure the SDK's throughput.
+
+    Workflows registered with it are run the way the engine runs them, in as much as the SDK can
+    tell: each run's tasks are assigned to a listening worker with a free slot once their parents
+    have completed, failed tasks are retried, run results are streamed to `SubscribeToWorkflowRuns`
+    subscribers, and events trigger the workflows listening for them. Concurrency limits, rate
+    limits, sticky assignment, worker affinity, timeouts and on-failure tasks aren't modelled.
+
+        with FakeEngine() as engine:
+            hatchet = Hatchet(config=engine.client_config())
+            ...
+            run_ids = engine.generate("my-workflow", count=1000, rate=100).result()
+            engine.wait_for_runs(run_ids)
+
+    `grpc.aio` doesn't cope well with event loops on more than one thread of a process, so clients
+    whose performance is being measured against it are best run in another process.
+
+    Its state belongs to its event loop. The methods without an `aio_` prefix can be called from any
+    other thread, the others (and its records, once the runs they're read from have finished) from
+    its loop, e.g. through `call`.
+    """
+
+    def __init__(self, port: int = 0, tenant_id: str = "fake-tenant") -> None:
+        self.port = port
+        self.tenant_id = tenant_id
+
+        self.workflows: dict[str, FakeWorkflow] = {}
+        self.workflow_runs: dict[str, FakeWorkflowRun] = {}
+        self.step_runs: dict[str, FakeStepRun] = {}
+        self.workers: dict[str, FakeWorker] = {}
+        self.events: dict[str, event_protos.Event] = {}
+        self.logs: dict[str, list[str]] = defaultdict(list)
+        self.stream_events = 0
+        self.stream_bytes = 0
+
+        ## step runs waiting for a worker, by action
+        self.queued: dict[str, deque[FakeStepRun]] = defaultdict(deque)
+
+        ## the queues of the streams waiting on each workflow run's result or events
+        self.run_subscribers: dict[str, set[asyncio.Queue[WorkflowRunEvent]]] = (
+            defaultdict(set)
+        )
+        self.event_subscribers: dict[str, set[asyncio.Queue[WorkflowEvent]]] = (
+            defaultdict(set)
+        )
+
+        ## durable event waits by user event key, and durable events by task id and signal key
+        self.durable_waits: dict[str, list[tuple[str, str, str]]] = defaultdict(list)
+        self.durable_events: dict[
+            tuple[str, str], v1_dispatcher_protos.DurableEvent
+        ] = {}
+        self.durable_listeners: dict[
+            tuple[str, str], set[asyncio.Queue[v1_dispatcher_protos.DurableEvent]]
+        ] = defaultdict(set)
+
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.server: grpc.aio.Server | None = None
+        self.thread: threading.Thread | None = None
+        self.started = threading.Event()
+        self.stopping: asyncio.Event | None = None
+
+    @property
+    def host_port(self) -> str:
+        return f"localhost:{self.port}"
+
+    def client_config(self, **kwargs: Any) -> ClientConfig:
+        """
+        A config for a client (or worker) of this engine. `kwargs` override its fields.
+        """
+        return ClientConfig(
+            **{
+                "token": "fake-token",
+                "tenant_id": self.tenant_id,
+                "host_port": self.host_port,
+                "tls_config": ClientTLSConfig(strategy="none"),
+                **kwargs,
+            }
+        )
+
+    def start(self) -> "FakeEngine":
+        self.thread = threading.Thread(
+            target=self._run, name="hatchet-fake-engine", daemon=True
+        )
+        self.thread.start()
+        self.started.wait()
+
+        if self.server is None:
+            raise RuntimeError("the fake engine failed to start")
+
+        return self
+
+    def stop(self) -> None:
+        if self.loop is not None and self.stopping is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self) -> "FakeEngine":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self.started.set()
+
+    async def _serve(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+
+        server = grpc.aio.server(
+            options=[
+                ## clients ping every 10s on idle streams, which the default policy rejects
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.min_ping_interval_without_data_ms", 5_000),
+                ("grpc.http2.max_ping_strikes", 0),
+            ]
+        )
+        add_DispatcherServicer_to_server(_Dispatcher(self), server)  # type: ignore[no-untyped-call]
+        add_WorkflowServiceServicer_to_server(_WorkflowService(self), server)  # type: ignore[no-untyped-call]
+        add_AdminServiceServicer_to_server(_AdminService(self), server)  # type: ignore[no-untyped-call]
+        add_EventsServiceServicer_to_server(_EventsService(self), server)  # type: ignore[no-untyped-call]
+        add_V1DispatcherServicer_to_server(_V1Dispatcher(self), server)  # type: ignore[no-untyped-call]
+        self.port = server.add_insecure_port(f"localhost:{self.port}")
+
+        await server.start()
+        self.server = server
+        self.started.set()
+
+        await self.stopping.wait()
+        await server.stop(grace=None)
+
+    def call(self, func: Callable[[], Awaitable[T]]) -> "Future[T]":
+        """
+        Runs `func` on the engine's event loop, from another thread.
+        """
+        if self.loop is None:
+            raise RuntimeError("the fake engine isn't running")
+
+        async def run() -> T:
+            return await func()
+
+        return asyncio.run_coroutine_threadsafe(run(), self.loop)
+
+    def trigger(
+        self,
+        workflow_name: str,
+        input: Any = {},
+        additional_metadata: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Triggers a run of `workflow_name` with `input`, as if a client had, and returns its id.
+        """
+
+        async def trigger() -> str:
+            return self.aio_trigger(
+                workflow_name,
+                input,
+                json.dumps(additional_metadata) if additional_metadata else None,
+            ).id
+
+        return self.call(trigger).result()
+
+    def generate(
+        self,
+        workflow_name: str,
+        count: int,
+        rate: float | None = None,
+        input: Any = {},
+    ) -> "Future[list[str]]":
+        """
+        Triggers `count` runs of `workflow_name` at `rate` runs per second (all at once if it's None),
+        on a fixed schedule whether or not earlier runs have finished, and resolves to their ids once
+        they've all been triggered.
+        """
+
+        async def generate() -> list[str]:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            run_ids: list[str] = []
+
+            for i in range(count):
+                if rate is not None:
+                    delay = start + i / rate - loop.time()
+
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                run_ids.append(self.aio_trigger(workflow_name, input).id)
+
+            return run_ids
+
+        return self.call(generate)
+
+    def wait_for_runs(self, run_ids: list[str], timeout: float | None = None) -> None:
+        """
+        Waits until the runs with `run_ids` have finished.
+        """
+
+        async def wait() -> None:
+            await asyncio.gather(
+                *[self.workflow_runs[run_id].finished.wait() for run_id in run_ids]
+            )
+
+        self.call(lambda: asyncio.wait_for(wait(), timeout)).result()
+
+    def wait_for_workers(self, count: int = 1, timeout: float | None = None) -> None:
+        """
+        Waits until `count` workers are listening for actions.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while sum(worker.listening for worker in list(self.workers.values())) < count:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"fewer than {count} workers started listening")
+
+            time.sleep(0.01)
+
+    def aio_trigger(
+        self,
+        workflow_name: str,
+        input: Any,
+        additional_metadata: str | None = None,
+        parent_workflow_run_id: str | None = None,
+        child_index: int | None = None,
+        child_key: str | None = None,
+    ) -> FakeWorkflowRun:
+        workflow = self.workflows.get(workflow_name)
+
+        if workflow is None:
+            raise KeyError(f"workflow {workflow_name} is not registered")
+
+        run = FakeWorkflowRun(
+            id=str(uuid.uuid4()),
+            workflow=workflow,
+            input=input,
+            additional_metadata=additional_metadata,
+            created_at=time.monotonic(),
+            parent_workflow_run_id=parent_workflow_run_id,
+            child_index=child_index,
+            child_key=child_key,
+        )
+        self.workflow_runs[run.id] = run
+
+        for task in workflow.tasks.values():
+            if not task.parents:
+                self._queue(run, task)
+
+        return run
+
+    def _queue(
+        self, run: FakeWorkflowRun, task: FakeTask, retry_count: int = 0
+    ) -> None:
+        step_run = FakeStepRun(
+            id=str(uuid.uuid4()),
+            workflow_run=run,
+            task=task,
+            queued_at=time.monotonic(),
+            retry_count=retry_count,
+        )
+        run.step_runs[task.readable_id] = step_run
+        self.step_runs[step_run.id] = step_run
+
+        self.queued[task.action].append(step_run)
+        self._assign(task.action)
+
+    def _assign(self, action: str) -> None:
+        queued = self.queued.get(action)
+
+        while queued:
+            worker = next(
+                (
+                    w
+                    for w in self.workers.values()
+                    if w.listening and action in w.actions and len(w.running) < w.slots
+                ),
+                None,
+            )
+
+            if worker is None:
+                return
+
+            step_run = queued.popleft()
+
+            if step_run.status != "queued":
+                continue
+
+            step_run.status = "assigned"
+            step_run.worker_id = worker.id
+            step_run.assigned_at = time.monotonic()
+            worker.running.add(step_run.id)
+            worker.assignments.put_nowait(
+                self._assigned_action(step_run, ActionType.START_STEP_RUN)
+            )
+
+    def _assigned_action(
+        self, step_run: FakeStepRun, action_type: ActionType
+    ) -> AssignedAction:
+        run = step_run.workflow_run
+        payload = {
+            "input": run.input,
+            "parents": {
+                readable_id: _loads(run.step_runs[readable_id].output or "")
+                for readable_id in step_run.task.parents
+            },
+        }
+
+        return AssignedAction(
+            tenantId=self.tenant_id,
+            workflowRunId=run.id,
+            jobId=run.workflow.name,
+            jobName=run.workflow.name,
+            jobRunId=run.id,
+            stepId=step_run.task.readable_id,
+            stepRunId=step_run.id,
+            actionId=step_run.task.action,
+            actionType=action_type,
+            actionPayload=json.dumps(payload),
+            stepName=step_run.task.readable_id,
+            retryCount=step_run.retry_count,
+            additional_metadata=run.additional_metadata,
+            child_workflow_index=run.child_index,
+            child_workflow_key=run.child_key,
+            parent_workflow_run_id=run.parent_workflow_run_id,
+        )
+
+    def _release(self, step_run: FakeStepRun) -> None:
+        worker = self.workers.get(step_run.worker_id or "")
+
+        if worker is None or step_run.id not in worker.running:
+            return
+
+        worker.running.discard(step_run.id)
+
+        for action in worker.actions:
+            self._assign(action)
+
+    def _finish_step_run(
+        self,
+        step_run: FakeStepRun,
+        status: Literal["completed", "failed", "cancelled"],
+        output: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        if step_run.status in ("completed", "failed", "cancelled"):
+            return
+
+        step_run.status = status
+        step_run.finished_at = time.monotonic()
+        step_run.output = output
+        step_run.error = error
+        self._release(step_run)
+
+        run = step_run.workflow_run
+
+        self._publish_event(
+            run.id,
+            WorkflowEvent(
+                workflowRunId=run.id,
+                resourceType=RESOURCE_TYPE_STEP_RUN,
+                eventType={
+                    "completed": RESOURCE_EVENT_TYPE_COMPLETED,
+                    "failed": RESOURCE_EVENT_TYPE_FAILED,
+                    "cancelled": RESOURCE_EVENT_TYPE_CANCELLED,
+                }[status],
+                resourceId=step_run.id,
+                eventTimestamp=_timestamp(),
+                eventPayload=output or error or "",
+                stepRetries=step_run.task.retries,
+                retryCount=step_run.retry_count,
+            ),
+        )
+
+        if run.finished_at is not None:
+            return
+
+        if status == "failed" and step_run.retry_count < step_run.task.retries:
+            self._queue(run, step_run.task, step_run.retry_count + 1)
+            return
+
+        if status == "completed":
+            for task in run.workflow.tasks.values():
+                if (
+                    task.readable_id not in run.step_runs
+                    and step_run.task.readable_id in task.parents
+                    and all(
+                        run.step_runs.get(parent) is not None
+                        and run.step_runs[parent].status == "completed"
+                        for parent in task.parents
+                    )
+                ):
+                    self._queue(run, task)
+
+        if (
+            status != "completed"
+            or len(run.step_runs) == len(run.workflow.tasks)
+            and all(s.finished_at is not None for s in run.step_runs.values())
+        ):
+            self._finish_workflow_run(run)
+
+    def _finish_workflow_run(self, run: FakeWorkflowRun) -> None:
+        run.finished_at = time.monotonic()
+        run.event = WorkflowRunEvent(
+            workflowRunId=run.id,
+            eventType=WORKFLOW_RUN_EVENT_TYPE_FINISHED,
+            eventTimestamp=_timestamp(),
+            results=[
+                StepRunResult(
+                    stepRunId=step_run.id,
+                    stepReadableId=readable_id,
+                    jobRunId=run.id,
+                    output=step_run.output,
+                    error=step_run.error,
+                )
+                for readable_id, step_run in run.step_runs.items()
+                if step_run.finished_at is not None
+            ],
+        )
+        run.finished.set()
+
+        for queue in self.run_subscribers.pop(run.id, ()):
+            queue.put_nowait(run.event)
+
+        self._publish_event(
+            run.id,
+            WorkflowEvent(
+                workflowRunId=run.id,
+                resourceType=RESOURCE_TYPE_WORKFLOW_RUN,
+                eventType=(
+                    RESOURCE_EVENT_TYPE_COMPLETED
+                    if run.succeeded
+                    else RESOURCE_EVENT_TYPE_FAILED
+                ),
+                resourceId=run.id,
+                eventTimestamp=_timestamp(),
+                hangup=True,
+            ),
+        )
+
+    def _publish_event(self, workflow_run_id: str, event: WorkflowEvent) -> None:
+        for queue in self.event_subscribers.get(workflow_run_id, ()):
+            queue.put_nowait(event)
+
+    def _cancel(self, step_run: FakeStepRun) -> None:
+        worker = self.workers.get(step_run.worker_id or "")
+
+        if worker is not None and step_run.status in ("assigned", "running"):
+            worker.assignments.put_nowait(
+                self._assigned_action(step_run, ActionType.CANCEL_STEP_RUN)
+            )
+
+        self._finish_step_run(step_run, "cancelled", error="cancelled")
+
+    def _push_event(self, request: event_protos.PushEventRequest) -> event_protos.Event:
+        event = event_protos.Event(
+            tenantId=self.tenant_id,
+            eventId=str(uuid.uuid4()),
+            key=request.key,
+            payload=request.payload,
+            eventTimestamp=request.eventTimestamp,
+            additionalMetadata=request.additionalMetadata,
+        )
+        self.events[event.eventId] = event
+
+        for workflow in self.workflows.values():
+            if request.key in workflow.event_triggers:
+                self.aio_trigger(
+                    workflow.name,
+                    _loads(request.payload),
+                    request.additionalMetadata or None,
+                )
+
+        for task_id, signal_key, readable_data_key in self.durable_waits.pop(
+            request.key, ()
+        ):
+            self._resolve_durable_event(
+                task_id, signal_key, readable_data_key, _loads(request.payload)
+            )
+
+        return event
+
+    def _resolve_durable_event(
+        self, task_id: str, signal_key: str, readable_data_key: str, data: Any
+    ) -> None:
+        key = (task_id, signal_key)
+
+        if key in self.durable_events:
+            return
+
+        ## shaped like the engine's: the data each satisfied condition matched, by what it does and its key
+        event = self.durable_events[key] = v1_dispatcher_protos.DurableEvent(
+            task_id=task_id,
+            signal_key=signal_key,
+            data=json.dumps({"CREATE": {readable_data_key: [data]}}).encode(),
+        )
+
+        for queue in self.durable_listeners.pop(key, ()):
+            queue.put_nowait(event)
+
+
+def _serve_fake_engine(
+    port: int,
+    workers: int,
+    started: ProcessEvent,
+    workers_ready: ProcessEvent,
+    stopping: ProcessEvent,
+) -> None:
+    with FakeEngine(port=port) as engine:
+        started.set()
+
+        while not stopping.wait(0.01):
+            if not workers_ready.is_set() and workers <= sum(
+                worker.listening for worker in list(engine.workers.values())
+            ):
+                workers_ready.set()
+
+
+class FakeEngineProcess:
+    """
+    Runs a `FakeEngine` in a process of its own, for measuring clients or workers in this one. It
+    can't be inspected from here, beyond waiting for `workers` workers to listen for actions.
+    """
+
+    def __init__(self, workers: int = 0) -> None:
+        with socket.socket() as s:
+            s.bind(("localhost", 0))
+            self.port = int(s.getsockname()[1])
+
+        ctx = multiprocessing.get_context("spawn")
+        self.started = ctx.Event()
+        self.workers_ready = ctx.Event()
+        self.stopping = ctx.Event()
+        self.process = ctx.Process(
+            target=_serve_fake_engine,
+            args=(
+                self.port,
+                workers,
+                self.started,
+                self.workers_ready,
+                self.stopping,
+            ),
+            name="hatchet-fake-engine",
+            daemon=True,
+        )
+
+    @property
+    def host_port(self) -> str:
+        return f"localhost:{self.port}"
+
+    def client_config(self, **kwargs: Any) -> ClientConfig:
+        return FakeEngine(port=self.port).client_config(**kwargs)
+
+    def start(self) -> "FakeEngineProcess":
+        self.process.start()
+
+        if not self.started.wait(30):
+            raise RuntimeError("the fake engine failed to start")
+
+        return self
+
+    def wait_for_workers(self, timeout: float | None = None) -> None:
+        if not self.workers_ready.wait(timeout):
+            raise TimeoutError("the fake engine's workers didn't start listening")
+
+    def stop(self) -> None:
+        self.stopping.set()
+        self.process.join()
+
+    def __enter__(self) -> "FakeEngineProcess":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+class _Dispatcher(DispatcherServicer):
+    def __init__(self, engine: FakeEngine) -> None:
+        self.engine = engine
+
+    async def Register(
+        self, request: WorkerRegisterRequest, context: _Context
+    ) -> WorkerRegisterResponse:
+        worker = FakeWorker(
+            id=str(uuid.uuid4()),
+            name=request.workerName,
+            actions=set(request.actions),
+            slots=request.maxRuns if request.HasField("maxRuns") else 100,
+        )
+        self.engine.workers[worker.id] = worker
+
+        return WorkerRegisterResponse(
+            tenantId=self.engine.tenant_id,
+            workerId=worker.id,
+            workerName=worker.name,
+        )
+
+    async def ListenV2(
+        self, request: WorkerListenRequest, context: _Context
+    ) -> AsyncIterator[AssignedAction]:
+        worker = self.engine.workers.get(request.workerId)
+
+        if worker is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "worker not found")
+            return
+
+        worker.listening = True
+
+        for action in worker.actions:
+            self.engine._assign(action)
+
+        try:
+            while True:
+                yield await worker.assignments.get()
+        finally:
+            worker.listening = False
+
+    async def Listen(
+        self, request: WorkerListenRequest, context: _Context
+    ) -> AsyncIterator[AssignedAction]:
+        async for action in self.ListenV2(request, context):
+            yield action
+
+    async def Heartbeat(
+        self, request: HeartbeatRequest, context: _Context
+    ) -> HeartbeatResponse:
+        worker = self.engine.workers.get(request.workerId)
+
+        if worker is not None:
+            worker.last_heartbeat_at = time.monotonic()
+
+        return HeartbeatResponse()
+
+    async def Unsubscribe(
+        self, request: WorkerUnsubscribeRequest, context: _Context
+    ) -> WorkerUnsubscribeResponse:
+        worker = self.engine.workers.pop(request.workerId, None)
+
+        if worker is not None:
+            worker.listening = False
+
+        return WorkerUnsubscribeResponse(
+            tenantId=self.engine.tenant_id, workerId=request.workerId
+        )
+
+    async def SendStepActionEvent(
+        self, request: StepActionEvent, context: _Context
+    ) -> ActionEventResponse:
+        step_run = self.engine.step_runs.get(request.stepRunId)
+
+        if step_run is not None:
+            if request.eventType == STEP_EVENT_TYPE_STARTED:
+                if step_run.status == "assigned":
+                    step_run.status = "running"
+                    step_run.started_at = time.monotonic()
+
+                    self.engine._publish_event(
+                        step_run.workflow_run.id,
+                        WorkflowEvent(
+                            workflowRunId=step_run.workflow_run.id,
+                            resourceType=RESOURCE_TYPE_STEP_RUN,
+                            eventType=RESOURCE_EVENT_TYPE_STARTED,
+                            resourceId=step_run.id,
+                            eventTimestamp=_timestamp(),
+                        ),
+                    )
+            elif request.eventType == STEP_EVENT_TYPE_COMPLETED:
+                self.engine._finish_step_run(
+                    step_run, "completed", output=request.eventPayload
+                )
+            elif request.eventType == STEP_EVENT_TYPE_FAILED:
+                self.engine._finish_step_run(
+                    step_run, "failed", error=request.eventPayload
+                )
+
+        return ActionEventResponse(
+            tenantId=self.engine.tenant_id, workerId=request.workerId
+        )
+
+    async def SendGroupKeyActionEvent(
+        self, request: GroupKeyActionEvent, context: _Context
+    ) -> ActionEventResponse:
+        return ActionEventResponse(
+            tenantId=self.engine.tenant_id, workerId=request.workerId
+        )
+
+    async def SubscribeToWorkflowRuns(
+        self,
+        request_iterator: AsyncIterator[SubscribeToWorkflowRunsRequest],
+        context: _Context,
+    ) -> AsyncIterator[WorkflowRunEvent]:
+        finished: asyncio.Queue[WorkflowRunEvent] = asyncio.Queue()
+
+        async def subscribe() -> None:
+            async for request in request_iterator:
+                run = self.engine.workflow_runs.get(request.workflowRunId)
+
+                if run is not None and run.event is not None:
+                    finished.put_nowait(run.event)
+                else:
+                    self.engine.run_subscribers[request.workflowRunId].add(finished)
+
+        subscriber = asyncio.create_task(subscribe())
+
+        try:
+            while True:
+                yield await finished.get()
+        finally:
+            subscriber.cancel()
+
+            for subscribers in self.engine.run_subscribers.values():
+                subscribers.discard(finished)
+
+    async def SubscribeToWorkflowEvents(
+        self, request: SubscribeToWorkflowEventsRequest, context: _Context
+    ) -> AsyncIterator[WorkflowEvent]:
+        events: asyncio.Queue[WorkflowEvent] = asyncio.Queue()
+        subscribers = self.engine.event_subscribers[request.workflowRunId]
+        subscribers.add(events)
+
+        try:
+            run = self.engine.workflow_runs.get(request.workflowRunId)
+
+            if run is not None and run.finished_at is not None:
+                yield WorkflowEvent(
+                    workflowRunId=run.id,
+                    resourceType=RESOURCE_TYPE_WORKFLOW_RUN,
+                    eventType=(
+                        RESOURCE_EVENT_TYPE_COMPLETED
+                        if run.succeeded
+                        else RESOURCE_EVENT_TYPE_FAILED
+                    ),
+                    resourceId=run.id,
+                    eventTimestamp=_timestamp(),
+                    hangup=True,
+                )
+                return
+
+            while True:
+                event = await events.get()
+                yield event
+
+                if event.hangup:
+                    return
+        finally:
+            subscribers.discard(events)
+
+    async def PutOverridesData(
+        self, request: OverridesData, context: _Context
+    ) -> OverridesDataResponse:
+        return OverridesDataResponse()
+
+    async def RefreshTimeout(
+        self, request: RefreshTimeoutRequest, context: _Context
+    ) -> RefreshTimeoutResponse:
+        return RefreshTimeoutResponse(timeoutAt=_timestamp())
+
+    async def ReleaseSlot(
+        self, request: ReleaseSlotRequest, context: _Context
+    ) -> ReleaseSlotResponse:
+        step_run = self.engine.step_runs.get(request.stepRunId)
+
+        if step_run is not None:
+            self.engine._release(step_run)
+
+        return ReleaseSlotResponse()
+
+    async def UpsertWorkerLabels(
+        self, request: UpsertWorkerLabelsRequest, context: _Context
+    ) -> UpsertWorkerLabelsResponse:
+        return UpsertWorkerLabelsResponse(
+            tenantId=self.engine.tenant_id, workerId=request.workerId
+        )
+
+
+class _WorkflowService(WorkflowServiceServicer):
+    def __init__(self, engine: FakeEngine) -> None:
+        self.engine = engine
+
+    def _trigger(
+        self, request: v0_workflow_protos.TriggerWorkflowRequest, context: _Context
+    ) -> FakeWorkflowRun:
+        return self.engine.aio_trigger(
+            request.name,
+            _loads(request.input),
+            request.additional_metadata or None,
+            parent_workflow_run_id=request.parent_id or None,
+            child_index=(
+                request.child_index if request.HasField("child_index") else None
+            ),
+            child_key=request.child_key or None,
+        )
+
+    async def TriggerWorkflow(
+        self, request: v0_workflow_protos.TriggerWorkflowRequest, context: _Context
+    ) -> v0_workflow_protos.TriggerWorkflowResponse:
+        try:
+            run = self._trigger(request, context)
+        except KeyError as e:
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+
+        return v0_workflow_protos.TriggerWorkflowResponse(workflow_run_id=run.id)
+
+    async def BulkTriggerWorkflow(
+        self, request: v0_workflow_protos.BulkTriggerWorkflowRequest, context: _Context
+    ) -> v0_workflow_protos.BulkTriggerWorkflowResponse:
+        try:
+            runs = [self._trigger(r, context) for r in request.workflows]
+        except KeyError as e:
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+
+        return v0_workflow_protos.BulkTriggerWorkflowResponse(
+            workflow_run_ids=[run.id for run in runs]
+        )
+
+    async def ScheduleWorkflow(
+        self, request: v0_workflow_protos.ScheduleWorkflowRequest, context: _Context
+    ) -> v0_workflow_protos.WorkflowVersion:
+        if request.name not in self.engine.workflows:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND, f"workflow {request.name} is not registered"
+            )
+
+        loop = asyncio.get_running_loop()
+
+        for schedule in request.schedules:
+            loop.call_later(
+                max(schedule.ToNanoseconds() / 1e9 - time.time(), 0),
+                self.engine.aio_trigger,
+                request.name,
+                _loads(request.input),
+                request.additional_metadata or None,
+            )
+
+        return v0_workflow_protos.WorkflowVersion(
+            id=str(uuid.uuid4()), workflow_id=request.name
+        )
+
+    async def PutRateLimit(
+        self, request: v0_workflow_protos.PutRateLimitRequest, context: _Context
+    ) -> v0_workflow_protos.PutRateLimitResponse:
+        return v0_workflow_protos.PutRateLimitResponse()
+
+
+class _AdminService(AdminServiceServicer):
+    def __init__(self, engine: FakeEngine) -> None:
+        self.engine = engine
+
+    async def PutWorkflow(
+        self, request: workflow_protos.CreateWorkflowVersionRequest, context: _Context
+    ) -> workflow_protos.CreateWorkflowVersionResponse:
+        self.engine.workflows[request.name] = FakeWorkflow(
+            name=request.name,
+            tasks={
+                task.readable_id: FakeTask(
+                    readable_id=task.readable_id,
+                    action=task.action,
+                    parents=list(task.parents),
+                    retries=task.retries,
+                )
+                for task in request.tasks
+            },
+            event_triggers=list(request.event_triggers),
+        )
+
+        return workflow_protos.CreateWorkflowVersionResponse(
+            id=str(uuid.uuid4()), workflow_id=request.name
+        )
+
+    async def TriggerWorkflowRun(
+        self, request: workflow_protos.TriggerWorkflowRunRequest, context: _Context
+    ) -> workflow_protos.TriggerWorkflowRunResponse:
+        try:
+            run = self.engine.aio_trigger(
+                request.workflow_name,
+                _loads(request.input),
+                request.additional_metadata.decode() or None,
+            )
+        except KeyError as e:
+            await context.abort(grpc.StatusCode.NOT_FOUND, str(e))
+
+        return workflow_protos.TriggerWorkflowRunResponse(external_id=run.id)
+
+    async def CancelTasks(
+        self, request: workflow_protos.CancelTasksRequest, context: _Context
+    ) -> workflow_protos.CancelTasksResponse:
+        cancelled: list[str] = []
+
+        for external_id in request.externalIds:
+            run = self.engine.workflow_runs.get(external_id)
+            step_run = self.engine.step_runs.get(external_id)
+            step_runs = (
+                list(run.step_runs.values()) if run else [step_run] if step_run else []
+            )
+
+            for s in step_runs:
+                if s is not None and s.finished_at is None:
+                    self.engine._cancel(s)
+                    cancelled.append(s.id)
+
+        return workflow_protos.CancelTasksResponse(cancelled_tasks=cancelled)
+
+    async def ReplayTasks(
+        self, request: workflow_protos.ReplayTasksRequest, context: _Context
+    ) -> workflow_protos.ReplayTasksResponse:
+        return workflow_protos.ReplayTasksResponse()
+
+
+class _EventsService(EventsServiceServicer):
+    def __init__(self, engine: FakeEngine) -> None:
+        self.engine = engine
+
+    async def Push(
+        self, request: event_protos.PushEventRequest, context: _Context
+    ) -> event_protos.Event:
+        return self.engine._push_event(request)
+
+    async def BulkPush(
+        self, request: event_protos.BulkPushEventRequest, context: _Context
+    ) -> event_protos.Events:
+        return event_protos.Events(
+            events=[self.engine._push_event(event) for event in request.events]
+        )
+
+    async def ReplaySingleEvent(
+        self, request: event_protos.ReplayEventRequest, context: _Context
+    ) -> event_protos.Event:
+        event = self.engine.events.get(request.eventId)
+
+        if event is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "event not found")
+
+        return self.engine._push_event(
+            event_protos.PushEventRequest(
+                key=event.key,
+                payload=event.payload,
+                eventTimestamp=_timestamp(),
+                additionalMetadata=event.additionalMetadata,
+            )
+        )
+
+    async def PutLog(
+        self, request: event_protos.PutLogRequest, context: _Context
+    ) -> event_protos.PutLogResponse:
+        self.engine.logs[request.stepRunId].append(request.message)
+
+        return event_protos.PutLogResponse()
+
+    async def PutStreamEvent(
+        self, request: event_protos.PutStreamEventRequest, context: _Context
+    ) -> event_protos.PutStreamEventResponse:
+        self.engine.stream_events += 1
+        self.engine.stream_bytes += len(request.message)
+
+        step_run = self.engine.step_runs.get(request.stepRunId)
+
+        if step_run is not None:
+            self.engine._publish_event(
+                step_run.workflow_run.id,
+                WorkflowEvent(
+                    workflowRunId=step_run.workflow_run.id,
+                    resourceType=RESOURCE_TYPE_STEP_RUN,
+                    eventType=RESOURCE_EVENT_TYPE_STREAM,
+                    resourceId=step_run.id,
+                    eventTimestamp=request.createdAt,
+                    eventPayload=request.message.decode("utf-8", errors="replace"),
+                ),
+            )
+
+        return event_protos.PutStreamEventResponse()
+
+
+class _V1Dispatcher(V1DispatcherServicer):
+    def __init__(self, engine: FakeEngine) -> None:
+        self.engine = engine
+
+    async def RegisterDurableEvent(
+        self,
+        request: v1_dispatcher_protos.RegisterDurableEventRequest,
+        context: _Context,
+    ) -> v1_dispatcher_protos.RegisterDurableEventResponse:
+        loop = asyncio.get_running_loop()
+
+        for sleep in request.conditions.sleep_conditions:
+            loop.call_later(
+                _duration(sleep.sleep_for),
+                self.engine._resolve_durable_event,
+                request.task_id,
+                request.signal_key,
+                sleep.base.readable_data_key,
+                {},
+            )
+
+        for user_event in request.conditions.user_event_conditions:
+            self.engine.durable_waits[user_event.user_event_key].append(
+                (request.task_id, request.signal_key, user_event.base.readable_data_key)
+            )
+
+        return v1_dispatcher_protos.RegisterDurableEventResponse()
+
+    async def ListenForDurableEvent(
+        self,
+        request_iterator: AsyncIterator[
+            v1_dispatcher_protos.ListenForDurableEventRequest
+        ],
+        context: _Context,
+    ) -> AsyncIterator[v1_dispatcher_protos.DurableEvent]:
+        events: asyncio.Queue[v1_dispatcher_protos.DurableEvent] = asyncio.Queue()
+
+        async def listen() -> None:
+            async for request in request_iterator:
+                key = (request.task_id, request.signal_key)
+                event = self.engine.durable_events.get(key)
+
+                if event is not None:
+                    events.put_nowait(event)
+                else:
+                    self.engine.durable_listeners[key].add(events)
+
+        listener = asyncio.create_task(listen())
+
+        try:
+            while True:
+                yield await events.get()
+        finally:
+            listener.cancel()
+
+            for listeners in self.engine.durable_listeners.values():
+                listeners.discard(events)
@@ -3,15 +3,14 @@ import logging
 import signal
 import time
 from dataclasses import dataclass
-from multiprocessing import Queue
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Coroutine, Literal
 
 import grpc
 
 from hatchet_sdk.client import Client
 from hatchet_sdk.clients.dispatcher.action_listener import (
-    Action,
     ActionListener,
+    ActionRecord,
     ActionType,
     GetActionListenerRequest,
 )
@@ -19,7 +18,11 @@ from hatchet_sdk.clients.dispatcher.dispatcher import DispatcherClient
 from hatchet_sdk.clients.rest.models.update_worker_request import UpdateWorkerRequest
 from hatchet_sdk.config import ClientConfig
 from hatchet_sdk.contracts.dispatcher_pb2 import (
+    GROUP_KEY_EVENT_TYPE_COMPLETED,
+    GROUP_KEY_EVENT_TYPE_FAILED,
     GROUP_KEY_EVENT_TYPE_STARTED,
+    STEP_EVENT_TYPE_COMPLETED,
+    STEP_EVENT_TYPE_FAILED,
     STEP_EVENT_TYPE_STARTED,
 )
 from hatchet_sdk.logger import logger
@@ -29,17 +32,40 @@ from hatchet_sdk.runnables.contextvars import (
     ctx_workflow_run_id,
 )
 from hatchet_sdk.utils.backoff import exp_backoff_sleep
+from hatchet_sdk.worker.latency import StepStage, mark
+
+if TYPE_CHECKING:
+    from hatchet_sdk.worker.ipc import IPCChannel
 
 ACTION_EVENT_RETRY_COUNT = 5
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionEvent:
-    action: Action
+    action: ActionRecord
     type: Any  # TODO type
-    payload: str
+    payload: str | bytes
+
+
+@dataclass(slots=True)
+class ActionTimings:
+    """
+    Sent back to the runner once the engine has acknowledged an action's result, with when the
+    action finished each stage, so they're recorded in the process serving the worker's metrics.
+    """
+
+    action_id: str
+    timings: dict[StepStage, float]
 
 
+## the events that report an action's result
+RESULT_EVENT_TYPES = {
+    STEP_EVENT_TYPE_COMPLETED,
+    STEP_EVENT_TYPE_FAILED,
+    GROUP_KEY_EVENT_TYPE_COMPLETED,
+    GROUP_KEY_EVENT_TYPE_FAILED,
+}
+
 STOP_LOOP_TYPE = Literal["STOP_LOOP"]
 STOP_LOOP: STOP_LOOP_TYPE = "STOP_LOOP"  # Sentinel object to stop the loop
 
@@ -56,11 +82,12 @@ class WorkerActionListenerProcess:
         actions: list[str],
         slots: int,
         config: ClientConfig,
-        action_queue: "Queue[Action]",
-        event_queue: "Queue[ActionEvent | STOP_LOOP_TYPE]",
+        action_queue: "IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE]",
+        event_queue: "IPCChannel[ActionEvent | STOP_LOOP_TYPE]",
         handle_kill: bool = True,
         debug: bool = False,
         labels: dict[str, str | int] = {},
+        client: Client | None = None,
     ) -> None:
         self.name = name
         self.actions = actions
@@ -81,6 +108,11 @@ class WorkerActionListenerProcess:
         if self.debug:
             logger.setLevel(logging.DEBUG)
 
+        ## A listener given the worker's client shares the worker's process, where the worker owns the signal handlers
+        if client is not None:
+            self.client = client
+            return
+
         self.client = Client(config=self.config, debug=self.debug)
 
         loop = asyncio.get_event_loop()
@@ -135,8 +167,7 @@ class WorkerActionListenerProcess:
 
     # TODO move event methods to separate class
     async def _get_event(self) -> ActionEvent | STOP_LOOP_TYPE:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self.event_queue.get)
+        return await self.event_queue.aio_get()
 
     async def start_event_send_loop(self) -> None:
         while True:
@@ -145,6 +176,9 @@ class WorkerActionListenerProcess:
                 logger.debug("stopping event send loop...")
                 break
 
+            if event.type in RESULT_EVENT_TYPES:
+                mark(event.action, StepStage.EVENT_IPC)
+
             logger.debug(f"tx: event: {event.action.action_id}/{event.type}")
             asyncio.create_task(self.send_event(event))
 
@@ -189,16 +223,22 @@ class WorkerActionListenerProcess:
                             )
 
                     asyncio.create_task(
-                        self.dispatcher_client.send_step_action_event(
-                            event.action, event.type, event.payload
+                        self._acknowledged(
+                            event,
+                            self.dispatcher_client.send_step_action_event(
+                                event.action, event.type, event.payload
+                            ),
                         )
                     )
                 case ActionType.CANCEL_STEP_RUN:
                     logger.debug("unimplemented event send")
                 case ActionType.START_GET_GROUP_KEY:
                     asyncio.create_task(
-                        self.dispatcher_client.send_group_key_action_event(
-                            event.action, event.type, event.payload
+                        self._acknowledged(
+                            event,
+                            self.dispatcher_client.send_group_key_action_event(
+                                event.action, event.type, event.payload
+                            ),
                         )
                     )
                 case _:
@@ -211,6 +251,21 @@ class WorkerActionListenerProcess:
                 await exp_backoff_sleep(retry_attempt, 1)
                 await self.send_event(event, retry_attempt + 1)
 
+    async def _acknowledged(
+        self, event: ActionEvent, send: Coroutine[Any, Any, Any]
+    ) -> None:
+        await send
+
+        if event.type in RESULT_EVENT_TYPES:
+            mark(event.action, StepStage.ACK)
+
+            try:
+                await self.action_queue.aio_put(
+                    ActionTimings(event.action.action_id, event.action.timings)
+                )
+            except Exception as e:
+                logger.debug(f"could not send action timings: {e}")
+
     def now(self) -> float:
         return time.time()
 
@@ -223,6 +278,8 @@ class WorkerActionListenerProcess:
                 if action is None:
                     break
 
+                mark(action, StepStage.RECEIVED)
+
                 ctx_step_run_id.set(action.step_run_id)
                 ctx_workflow_run_id.set(action.workflow_run_id)
                 ctx_worker_id.set(action.worker_id)
@@ -230,7 +287,7 @@ class WorkerActionListenerProcess:
                 # Process the action here
                 match action.action_type:
                     case ActionType.START_STEP_RUN:
-                        self.event_queue.put(
+                        await self.event_queue.aio_put(
                             ActionEvent(
                                 action=action,
                                 type=STEP_EVENT_TYPE_STARTED,  # TODO ack type
@@ -250,7 +307,7 @@ class WorkerActionListenerProcess:
                     case ActionType.CANCEL_STEP_RUN:
                         logger.info(f"rx: cancel step run: {action.step_run_id}")
                     case ActionType.START_GET_GROUP_KEY:
-                        self.event_queue.put(
+                        await self.event_queue.aio_put(
                             ActionEvent(
                                 action=action,
                                 type=GROUP_KEY_EVENT_TYPE_STARTED,  # TODO ack type
@@ -265,7 +322,8 @@ class WorkerActionListenerProcess:
                             f"rx: unknown action type ({action.action_type}): {action.action_type}"
                         )
                 try:
-                    self.action_queue.put(action)
+                    mark(action, StepStage.LISTENER)
+                    await self.action_queue.aio_put(action)
                 except Exception as e:
                     logger.error(f"error putting action: {e}")
 
@@ -282,7 +340,7 @@ class WorkerActionListenerProcess:
         if self.listener is not None:
             self.listener.cleanup()
 
-        self.event_queue.put(STOP_LOOP)
+        await self.event_queue.aio_put(STOP_LOOP)
 
     async def exit_gracefully(self) -> None:
         await self.pause_task_assignment()
@@ -295,7 +353,7 @@ class WorkerActionListenerProcess:
         await self.cleanup()
 
         while not self.event_queue.empty():
-            pass
+            await asyncio.sleep(0.01)
 
         logger.info("action listener closed")
 
@@ -0,0 +1,603 @@
+import asyncio
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from multiprocessing import Queue
+from multiprocessing.context import SpawnContext
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Generic, TypeVar, cast
+
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    ActionPayload,
+    ActionRecord,
+    ActionType,
+)
+from hatchet_sdk.logger import logger
+from hatchet_sdk.worker.action_listener_process import (
+    STOP_LOOP,
+    STOP_LOOP_TYPE,
+    ActionEvent,
+    ActionTimings,
+)
+from hatchet_sdk.worker.latency import STEP_STAGES, StepStage
+
+T = TypeVar("T")
+
+## Header layout: head (u64), tail (u64), consumer waiting flag (u8), consumer pid (u32 at 20), padded to 64 bytes
+_HEADER_SIZE = 64
+_HEAD = 0
+_TAIL = 1
+_WAITING_OFFSET = 16
+_CONSUMER_PID_OFFSET = 20
+
+_RECORD_LENGTH = struct.Struct("<I")
+_PID = struct.Struct("<I")
+_F64 = struct.Struct("<d")
+_WRAP_MARKER = 0xFFFFFFFF
+_ALIGNMENT = 8
+
+_KIND_STOP = 0
+_KIND_ITEM = 1
+_KIND_TIMINGS = 2
+
+_NONE_STR = 0xFFFFFFFF
+
+## If a wakeup is ever lost to a reordered store/load between processes, the consumer re-polls after this long
+WAKEUP_POLL_INTERVAL = 0.01
+FULL_BACKOFF_INTERVAL = 0.0005
+## how long a put waits for room in a full ring buffer before giving up on its consumer, in seconds
+PUT_TIMEOUT = 60
+
+_ACTION_TYPES = list(ActionType)
+_ACTION_TYPE_INDEX = {t: i for i, t in enumerate(_ACTION_TYPES)}
+_STEP_STAGE_INDEX = {s: i for i, s in enumerate(STEP_STAGES)}
+
+
+class IPCChannelError(Exception):
+    """Raised when an item can't be put on a channel, because its consumer has exited or stopped reading."""
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.parts: list[bytes] = []
+
+    def u8(self, value: int) -> None:
+        self.parts.append(value.to_bytes(1, "little"))
+
+    def i32(self, value: int) -> None:
+        self.parts.append(value.to_bytes(4, "little", signed=True))
+
+    def f64(self, value: float) -> None:
+        self.parts.append(_F64.pack(value))
+
+    def string(self, value: str | bytes | None) -> None:
+        if value is None:
+            self.parts.append(_RECORD_LENGTH.pack(_NONE_STR))
+            return
+
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        self.parts.append(_RECORD_LENGTH.pack(len(data)))
+        self.parts.append(data)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data: memoryview) -> None:
+        self.data = data
+        self.offset = 0
+
+    def u8(self) -> int:
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def i32(self) -> int:
+        value = int.from_bytes(
+            self.data[self.offset : self.offset + 4], "little", signed=True
+        )
+        self.offset += 4
+        return value
+
+    def f64(self) -> float:
+        (value,) = _F64.unpack_from(self.data, self.offset)
+        self.offset += _F64.size
+        return float(value)
+
+    def raw(self) -> bytes | None:
+        (length,) = _RECORD_LENGTH.unpack_from(self.data, self.offset)
+        self.offset += 4
+
+        if length == _NONE_STR:
+            return None
+
+        value = bytes(self.data[self.offset : self.offset + length])
+        self.offset += length
+        return value
+
+    def string(self) -> str | None:
+        value = self.raw()
+        return None if value is None else value.decode("utf-8")
+
+
+class Codec(ABC, Generic[T]):
+    @abstractmethod
+    def encode(self, item: T) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: memoryview) -> T:
+        pass
+
+
+def _write_action_header(w: _Writer, action: ActionRecord) -> None:
+    w.u8(_ACTION_TYPE_INDEX[action.action_type])
+    w.i32(action.retry_count)
+    w.string(action.worker_id)
+    w.string(action.tenant_id)
+    w.string(action.workflow_run_id)
+    w.string(action.get_group_key_run_id)
+    w.string(action.job_id)
+    w.string(action.job_name)
+    w.string(action.job_run_id)
+    w.string(action.step_id)
+    w.string(action.step_run_id)
+    w.string(action.action_id)
+
+
+def _read_action_header(r: _Reader) -> dict[str, Any]:
+    return {
+        "action_type": _ACTION_TYPES[r.u8()],
+        "retry_count": r.i32(),
+        "worker_id": r.string(),
+        "tenant_id": r.string(),
+        "workflow_run_id": r.string(),
+        "get_group_key_run_id": r.string(),
+        "job_id": r.string(),
+        "job_name": r.string(),
+        "job_run_id": r.string(),
+        "step_id": r.string(),
+        "step_run_id": r.string(),
+        "action_id": r.string(),
+    }
+
+
+def _write_timings(w: _Writer, timings: dict[StepStage, float]) -> None:
+    w.u8(len(timings))
+
+    for stage, at in timings.items():
+        w.u8(_STEP_STAGE_INDEX[stage])
+        w.f64(at)
+
+
+def _read_timings(r: _Reader) -> dict[StepStage, float]:
+    return {STEP_STAGES[r.u8()]: r.f64() for _ in range(r.u8())}
+
+
+class ActionCodec(Codec[ActionRecord | ActionTimings | STOP_LOOP_TYPE]):
+    """
+    Frames an `ActionRecord` as its identifying fields followed by the JSON payload, metadata and stage
+    timings, and the `ActionTimings` the listener sends back as the action id and timings.
+    """
+
+    def encode(self, item: ActionRecord | ActionTimings | STOP_LOOP_TYPE) -> bytes:
+        w = _Writer()
+
+        if item == STOP_LOOP:
+            w.u8(_KIND_STOP)
+            return w.getvalue()
+
+        if isinstance(item, ActionTimings):
+            w.u8(_KIND_TIMINGS)
+            w.string(item.action_id)
+            _write_timings(w, item.timings)
+            return w.getvalue()
+
+        w.u8(_KIND_ITEM)
+        _write_action_header(w, item)
+        w.i32(-1 if item.child_workflow_index is None else item.child_workflow_index)
+        w.string(item.child_workflow_key)
+        w.string(item.parent_workflow_run_id)
+        w.string(item.raw_additional_metadata)
+        w.string(item.action_payload.raw)
+        _write_timings(w, item.timings)
+
+        return w.getvalue()
+
+    def decode(self, data: memoryview) -> ActionRecord | ActionTimings | STOP_LOOP_TYPE:
+        r = _Reader(data)
+        kind = r.u8()
+
+        if kind == _KIND_STOP:
+            return STOP_LOOP
+
+        if kind == _KIND_TIMINGS:
+            return ActionTimings(action_id=r.string() or "", timings=_read_timings(r))
+
+        fields = _read_action_header(r)
+        child_workflow_index = r.i32()
+
+        return ActionRecord(
+            **fields,
+            child_workflow_index=(
+                None if child_workflow_index < 0 else child_workflow_index
+            ),
+            child_workflow_key=r.string(),
+            parent_workflow_run_id=r.string(),
+            raw_additional_metadata=r.string() or "",
+            action_payload=ActionPayload.from_raw(r.raw() or b""),
+            timings=_read_timings(r),
+        )
+
+
+class ActionEventCodec(Codec[ActionEvent | STOP_LOOP_TYPE]):
+    """
+    Frames an `ActionEvent` with only the action fields the dispatcher needs to send it and the
+    action's stage timings, so the (potentially large) action payload does not travel back to the
+    listener.
+    """
+
+    def encode(self, item: ActionEvent | STOP_LOOP_TYPE) -> bytes:
+        w = _Writer()
+
+        if item == STOP_LOOP:
+            w.u8(_KIND_STOP)
+            return w.getvalue()
+
+        w.u8(_KIND_ITEM)
+        w.i32(item.type)
+        _write_action_header(w, item.action)
+        _write_timings(w, item.action.timings)
+        w.string(item.payload)
+
+        return w.getvalue()
+
+    def decode(self, data: memoryview) -> ActionEvent | STOP_LOOP_TYPE:
+        r = _Reader(data)
+
+        if r.u8() == _KIND_STOP:
+            return STOP_LOOP
+
+        event_type = r.i32()
+        action = ActionRecord(
+            **_read_action_header(r),
+            action_payload=ActionPayload.from_raw(b"{}"),
+            child_workflow_index=None,
+            child_workflow_key=None,
+            parent_workflow_run_id=None,
+            timings=_read_timings(r),
+        )
+
+        return ActionEvent(action=action, type=event_type, payload=r.raw() or b"")
+
+
+class IPCChannel(ABC, Generic[T]):
+    """A one-way link between the action listener process and the runner."""
+
+    @abstractmethod
+    def put(self, item: T) -> None:
+        pass
+
+    async def aio_put(self, item: T) -> None:
+        """Puts `item`, waiting for room, if the channel is bounded, without blocking the loop."""
+        self.put(item)
+
+    def try_put(self, item: T) -> bool:
+        """Puts `item` if it can be without waiting for room, and returns whether it was."""
+        self.put(item)
+        return True
+
+    @abstractmethod
+    async def aio_get(self) -> T:
+        pass
+
+    @abstractmethod
+    def empty(self) -> bool:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class QueueChannel(IPCChannel[T]):
+    """Pickles items through a `multiprocessing.Queue`, reading each one with an executor hop."""
+
+    def __init__(self, ctx: SpawnContext) -> None:
+        self.queue: "Queue[T]" = ctx.Queue()
+
+    def put(self, item: T) -> None:
+        self.queue.put(item)
+
+    async def aio_get(self) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.queue.get)
+
+    def empty(self) -> bool:
+        return self.queue.empty()
+
+
+class LocalChannel(IPCChannel[T]):
+    """
+    Hands items over on the event loop, for workers running the action listener in the same process
+    as the runner. Nothing is serialized, so items must only be put from the loop's thread.
+    """
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[T] = asyncio.Queue()
+
+    def put(self, item: T) -> None:
+        self.queue.put_nowait(item)
+
+    async def aio_get(self) -> T:
+        return await self.queue.get()
+
+    def empty(self) -> bool:
+        return self.queue.empty()
+
+
+class ShmRingChannel(IPCChannel[T]):
+    """
+    A ring buffer in shared memory carrying length-prefixed records framed by a `Codec`.
+
+    Producers serialize on a lock, and there is a single consumer. The consumer drains records
+    without syscalls, and only when the ring is empty does it flag itself as waiting and sleep on a
+    pipe, which the next producer writes a byte to. Waiting is done with `loop.add_reader`, so there
+    is no executor hop per message.
+
+    A producer finding the ring full waits for room without holding the lock, for up to
+    `PUT_TIMEOUT`, and raises an `IPCChannelError` if the consumer exits or doesn't make room in
+    time. `aio_put` waits on the event loop instead of blocking it.
+    """
+
+    def __init__(self, ctx: SpawnContext, codec: Codec[T], capacity: int) -> None:
+        self.capacity = capacity - capacity % _ALIGNMENT
+        self.codec = codec
+
+        self.shm = SharedMemory(create=True, size=_HEADER_SIZE + self.capacity)
+        self.shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        self.owner = True
+
+        self.lock = ctx.Lock()
+        self.wake_r, self.wake_w = ctx.Pipe(duplex=False)
+
+        self._setup()
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "name": self.shm.name,
+            "capacity": self.capacity,
+            "codec": self.codec,
+            "lock": self.lock,
+            "wake_r": self.wake_r,
+            "wake_w": self.wake_w,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.shm = SharedMemory(name=state["name"])
+        self.owner = False
+        self.capacity = state["capacity"]
+        self.codec = state["codec"]
+        self.lock = state["lock"]
+        self.wake_r = state["wake_r"]
+        self.wake_w = state["wake_w"]
+
+        self._setup()
+
+    def _setup(self) -> None:
+        self.buf = self.shm.buf
+        ## `struct.pack_into` zero-fills before writing, so a reader in the other process could see a torn
+        ## head or tail; item assignment on a typed view is a single aligned 8-byte store
+        self.positions = self.buf[:16].cast("Q")
+        self.warned_full = False
+        self.consumer_registered = False
+
+        os.set_blocking(self.wake_r.fileno(), False)
+        os.set_blocking(self.wake_w.fileno(), False)
+
+    def _load(self, index: int) -> int:
+        return self.positions[index]
+
+    def _store(self, index: int, value: int) -> None:
+        self.positions[index] = value
+
+    def _encode(self, item: T) -> bytes:
+        record = self.codec.encode(item)
+        size = _RECORD_LENGTH.size + len(record)
+        size += -size % _ALIGNMENT
+
+        if size > self.capacity // 2:
+            raise ValueError(
+                f"IPC record of {size} bytes exceeds half of the ring buffer capacity ({self.capacity} bytes)"
+            )
+
+        return record
+
+    def put(self, item: T, timeout: float = PUT_TIMEOUT) -> None:
+        record = self._encode(item)
+        deadline = time.monotonic() + timeout
+
+        while not self._try_write(record, max(deadline - time.monotonic(), 0)):
+            self._check_full(deadline, timeout)
+            time.sleep(FULL_BACKOFF_INTERVAL)
+
+    async def aio_put(self, item: T, timeout: float = PUT_TIMEOUT) -> None:
+        record = self._encode(item)
+        deadline = time.monotonic() + timeout
+
+        ## the lock is only held to copy a record in, so it's never waited on for long
+        while not self._try_write(record, None):
+            self._check_full(deadline, timeout)
+            await asyncio.sleep(FULL_BACKOFF_INTERVAL)
+
+    def try_put(self, item: T) -> bool:
+        return self._try_write(self._encode(item), None)
+
+    def _try_write(self, record: bytes, lock_timeout: float | None) -> bool:
+        """
+        Writes `record` if there's room for it, waiting up to `lock_timeout` for the lock, or only
+        taking it if it's free if None.
+        """
+        if lock_timeout is None:
+            if not self.lock.acquire(block=False):
+                return False
+        elif not self.lock.acquire(timeout=lock_timeout):
+            return False
+
+        try:
+            size = _RECORD_LENGTH.size + len(record)
+            size += -size % _ALIGNMENT
+
+            tail = self._load(_TAIL)
+            position = tail % self.capacity
+            wasted = self.capacity - position if position + size > self.capacity else 0
+
+            if self.capacity - (tail - self._load(_HEAD)) < size + wasted:
+                return False
+
+            if wasted:
+                _RECORD_LENGTH.pack_into(
+                    self.buf, _HEADER_SIZE + position, _WRAP_MARKER
+                )
+                tail += wasted
+                position = 0
+
+            start = _HEADER_SIZE + position
+            _RECORD_LENGTH.pack_into(self.buf, start, len(record))
+            start += _RECORD_LENGTH.size
+            self.buf[start : start + len(record)] = record
+
+            self._store(_TAIL, tail + size)
+        finally:
+            self.lock.release()
+
+        self.warned_full = False
+
+        if self.buf[_WAITING_OFFSET]:
+            self._wake()
+
+        return True
+
+    def _check_full(self, deadline: float, timeout: float) -> None:
+        if not self.warned_full:
+            logger.warning("IPC ring buffer is full, waiting for the consumer")
+            self.warned_full = True
+
+        if not self._consumer_alive():
+            raise IPCChannelError("the IPC ring buffer's consumer has exited")
+
+        if time.monotonic() >= deadline:
+            raise IPCChannelError(
+                f"the IPC ring buffer's consumer made no room for {timeout}s"
+            )
+
+    def _consumer_alive(self) -> bool:
+        (pid,) = _PID.unpack_from(self.buf, _CONSUMER_PID_OFFSET)
+
+        ## a consumer that hasn't started reading yet can't have exited
+        if not pid:
+            return True
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+
+        return True
+
+    def _wake(self) -> None:
+        try:
+            os.write(self.wake_w.fileno(), b"\x00")
+        except BlockingIOError:
+            ## the pipe is full of unread wakeups, so the consumer will be woken anyway
+            pass
+
+    def _try_get(self) -> tuple[bool, T | None]:
+        head = self._load(_HEAD)
+
+        while head != self._load(_TAIL):
+            position = head % self.capacity
+            (length,) = _RECORD_LENGTH.unpack_from(self.buf, _HEADER_SIZE + position)
+
+            if length == _WRAP_MARKER:
+                head += self.capacity - position
+                continue
+
+            start = _HEADER_SIZE + position + _RECORD_LENGTH.size
+            item = self.codec.decode(self.buf[start : start + length])
+
+            size = _RECORD_LENGTH.size + length
+            self._store(_HEAD, head + size + -size % _ALIGNMENT)
+
+            return True, item
+
+        self._store(_HEAD, head)
+
+        return False, None
+
+    async def _wait(self) -> None:
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self.wake_r.fileno()
+
+        def on_readable() -> None:
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(fd, on_readable)
+
+        try:
+            await asyncio.wait_for(readable, WAKEUP_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    async def aio_get(self) -> T:
+        if not self.consumer_registered:
+            _PID.pack_into(self.buf, _CONSUMER_PID_OFFSET, os.getpid())
+            self.consumer_registered = True
+
+        while True:
+            found, item = self._try_get()
+
+            if found:
+                return cast(T, item)
+
+            self.buf[_WAITING_OFFSET] = 1
+
+            ## re-check after raising the flag, or a record published in between would not wake us
+            found, item = self._try_get()
+
+            if not found:
+                await self._wait()
+
+            self.buf[_WAITING_OFFSET] = 0
+
+            if found:
+                return cast(T, item)
+
+    def empty(self) -> bool:
+        return self._load(_HEAD) == self._load(_TAIL)
+
+    def __del__(self) -> None:
+        ## `SharedMemory` can't unmap while the typed view of the header is still exported
+        positions = getattr(self, "positions", None)
+
+        if positions is not None:
+            positions.release()
+
+    def close(self) -> None:
+        ## only the name is removed, the mapping stays valid for anything still reading or writing during shutdown
+        if self.owner:
+            self.shm.unlink()
+            self.owner = False
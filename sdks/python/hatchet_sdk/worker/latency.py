@@ -0,0 +1,120 @@
+import time
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from prometheus_client import Histogram
+
+if TYPE_CHECKING:
+    from hatchet_sdk.clients.dispatcher.action_listener import Action, ActionRecord
+
+
+class StepStage(str, Enum):
+    """
+    The stages a step run goes through on a worker, in order. Each is marked with the (wall clock)
+    time it ended at, so stages marked in the action listener process and in the runner can be
+    compared.
+    """
+
+    ## the action listener got the action from the engine
+    RECEIVED = "received"
+    ## the action listener handled it and is putting it on the channel to the runner
+    LISTENER = "listener"
+    ## the runner got it off the channel
+    IPC = "ipc"
+    ## `Runner.run` dispatched it and its handler started
+    DISPATCH = "dispatch"
+    ## its context was created
+    CONTEXT = "context"
+    ## its executor (the event loop, the thread or process pool, or its batch) started running it
+    EXECUTOR_QUEUE = "executor_queue"
+    ## the task returned or raised
+    USER_CODE = "user_code"
+    ## its buffered log lines and stream chunks were sent
+    FLUSH = "flush"
+    ## its output (or error) was serialized and is being put on the channel to the action listener
+    SERIALIZATION = "serialization"
+    ## the action listener got its result off the channel
+    EVENT_IPC = "event_ipc"
+    ## the engine acknowledged its result
+    ACK = "ack"
+
+
+STEP_STAGES = list(StepStage)
+
+_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    300,
+)
+
+step_stage_duration = Histogram(
+    "hatchet_step_stage_duration_seconds",
+    "How long step runs spent in each stage on the worker, from the action listener receiving them to the engine acknowledging their result",
+    ["action_id", "stage"],
+    buckets=_BUCKETS,
+)
+step_latency = Histogram(
+    "hatchet_step_latency_seconds",
+    "How long step runs took on the worker, from the action listener receiving them to the engine acknowledging their result",
+    ["action_id"],
+    buckets=_BUCKETS,
+)
+
+
+def mark(action: "Action | ActionRecord", stage: StepStage) -> None:
+    action.timings[stage] = time.time()
+
+
+def stage_durations(
+    timings: dict[StepStage, float],
+) -> list[tuple[StepStage, float, float]]:
+    """
+    Each marked stage after the first, with the time it ended at and how long it took. The time
+    spent in a stage that wasn't marked is counted in the next one that was.
+    """
+    durations: list[tuple[StepStage, float, float]] = []
+    previous: float | None = None
+
+    for stage in STEP_STAGES:
+        ended_at = timings.get(stage)
+
+        if ended_at is None:
+            continue
+
+        if previous is not None:
+            ## the clock can step backwards between marks
+            durations.append((stage, ended_at, max(ended_at - previous, 0)))
+
+        previous = ended_at
+
+    return durations
+
+
+def observe_step_latency(action_id: str, timings: dict[StepStage, float]) -> None:
+    durations = stage_durations(timings)
+
+    for stage, _, duration in durations:
+        step_stage_duration.labels(action_id=action_id, stage=stage.value).observe(
+            duration
+        )
+
+    if durations:
+        step_latency.labels(action_id=action_id).observe(
+            sum(duration for _, _, duration in durations)
+        )
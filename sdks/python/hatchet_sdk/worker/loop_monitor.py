@@ -0,0 +1,131 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable
+
+from prometheus_client import Counter, Histogram
+
+from hatchet_sdk.logger import logger
+from hatchet_sdk.runnables.contextvars import ctx_step_run_id
+
+## how often the monitor checks how late the loop is, in seconds
+LOOP_LAG_PROBE_INTERVAL = 0.1
+
+loop_lag = Histogram(
+    "hatchet_event_loop_lag_seconds",
+    "How much later than scheduled the worker's event loop ran a callback, i.e. how long it was blocked",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+loop_blocked = Counter(
+    "hatchet_event_loop_blocked",
+    "Number of times the worker's event loop was blocked for longer than the threshold",
+)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late `loop` runs a callback scheduled every `LOOP_LAG_PROBE_INTERVAL` seconds,
+    which is how long something blocked it, into the `hatchet_event_loop_lag_seconds` histogram.
+
+    A watchdog thread notices when the loop has been blocked for longer than `threshold` seconds
+    while it still is, and logs the loop thread's stack along with the step run whose task was
+    running, so the sync call that stalled the loop can be found. The step run is read from the
+    task's `ctx_step_run_id` where the task's context can be read (Python 3.12+), and looked up with
+    `find_step_run` otherwise. Each lag measured is also passed to `on_lag`, if given.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold: float,
+        find_step_run: Callable[["asyncio.Task[Any]"], str | None] | None = None,
+        on_lag: Callable[[float], None] | None = None,
+    ) -> None:
+        self.loop = loop
+        self.threshold = threshold
+        self.find_step_run = find_step_run
+        self.on_lag = on_lag
+
+        self.thread_id: int | None = None
+        self.last_tick = time.monotonic()
+        self.probe: asyncio.Task[None] | None = None
+        self.stopped = threading.Event()
+        self.watchdog = threading.Thread(
+            target=self._watch, name="hatchet-loop-watchdog", daemon=True
+        )
+
+    def start(self) -> None:
+        self.probe = self.loop.create_task(self._probe())
+        self.watchdog.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+        if self.probe is not None:
+            self.probe.cancel()
+
+    async def _probe(self) -> None:
+        self.thread_id = threading.get_ident()
+
+        while True:
+            self.last_tick = time.monotonic()
+            scheduled = self.loop.time() + LOOP_LAG_PROBE_INTERVAL
+
+            await asyncio.sleep(LOOP_LAG_PROBE_INTERVAL)
+
+            lag = max(self.loop.time() - scheduled, 0)
+            loop_lag.observe(lag)
+
+            if self.on_lag is not None:
+                self.on_lag(lag)
+
+    def _watch(self) -> None:
+        reported_tick = None
+
+        while not self.stopped.wait(min(self.threshold / 4, 1)):
+            tick = self.last_tick
+            blocked_for = time.monotonic() - tick - LOOP_LAG_PROBE_INTERVAL
+
+            ## each stall is reported once, while it's still going on
+            if blocked_for > self.threshold and tick != reported_tick:
+                reported_tick = tick
+
+                ## an error reporting one stall mustn't stop the watchdog from noticing the next
+                try:
+                    self._report(blocked_for)
+                except Exception:
+                    logger.exception("failed to report a blocked event loop")
+
+    def _report(self, blocked_for: float) -> None:
+        loop_blocked.inc()
+
+        frame = (
+            sys._current_frames().get(self.thread_id)
+            if self.thread_id is not None
+            else None
+        )
+        stack = "".join(traceback.format_stack(frame)) if frame else "(unavailable)\n"
+
+        ## reads the loop's running task from this thread, which is only a dict lookup
+        task = asyncio.current_task(self.loop)
+        step_run_id = self._step_run_id(task) if task is not None else None
+
+        logger.warning(
+            f"the event loop has been blocked for {blocked_for:.2f}s"
+            + (f" by step run {step_run_id}" if step_run_id else "")
+            + f", which delays every other task on this worker. It's blocked in:\n{stack}"
+            + "Use async clients, or `asyncio.to_thread`, for blocking calls in async tasks."
+        )
+
+    def _step_run_id(self, task: "asyncio.Task[Any]") -> str | None:
+        get_context = getattr(task, "get_context", None)
+
+        if get_context is not None:
+            step_run_id: str | None = get_context().get(ctx_step_run_id)
+
+            if step_run_id:
+                return step_run_id
+
+        return self.find_step_run(task) if self.find_step_run else None
@@ -0,0 +1,200 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from types import FrameType
+from typing import Any, Callable
+
+## how often the sampler takes a sample of every thread's stack, in seconds
+SAMPLE_INTERVAL = 0.01
+
+## the longest a single profile can run for, in seconds
+MAX_PROFILE_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class RunTag:
+    """The step run (or get group key run) a sampled stack was running for."""
+
+    run_id: str
+    action_id: str
+
+    def __str__(self) -> str:
+        return f"step run {self.run_id} ({self.action_id})"
+
+
+## a frame's file, function and line
+Frame = tuple[str, str, int]
+
+
+class StackSampler:
+    """
+    Samples every thread's stack every `interval` seconds from a thread of its own, like py-spy but
+    in process, so a worker can be profiled where a profiler can't be attached to it. Only the
+    frames' code objects and lines are read while sampling, and stacks are formatted once it's done.
+    Since the sampler needs the GIL to sample, a thread is sampled where it releases the GIL: code
+    holding it, like a sync call blocking the event loop, shows up where it is, but an event loop
+    busy with many short callbacks mostly shows up waiting in `select`.
+
+    Each sample of a thread is tagged with the run it was running for, as found by `find_run`, which
+    is passed the thread's id and, for the thread of the event loop profiling it, the task the loop
+    was running.
+    """
+
+    def __init__(
+        self,
+        find_run: Callable[[int, "asyncio.Task[Any] | None"], RunTag | None],
+        interval: float = SAMPLE_INTERVAL,
+    ) -> None:
+        self.find_run = find_run
+        self.interval = interval
+
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.loop_thread_id: int | None = None
+        self.frames: dict[Frame, int] = {}
+        self.stacks: dict[tuple[int, ...], int] = {}
+        ## each thread's samples, in order, as the time each was taken, its run and its stack
+        self.samples: dict[int, list[tuple[float, RunTag | None, int]]] = {}
+        self.thread_names: dict[int, str] = {}
+
+        self.started_at = 0.0
+        self.ended_at = 0.0
+
+    async def aio_profile(self, seconds: float) -> None:
+        """Samples for `seconds` from a thread, without blocking the running loop."""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+
+        stopped = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample, args=(stopped,), name="hatchet-profiler", daemon=True
+        )
+        sampler.start()
+
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stopped.set()
+            await asyncio.to_thread(sampler.join)
+
+    def _sample(self, stopped: threading.Event) -> None:
+        own_id = threading.get_ident()
+        self.started_at = time.monotonic()
+        self._name_threads()
+
+        while not stopped.wait(self.interval):
+            now = time.monotonic() - self.started_at
+            frames = sys._current_frames()
+
+            ## reads the loop's running task from this thread, which is only a dict lookup
+            task = asyncio.current_task(self.loop) if self.loop else None
+
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+
+                run = self.find_run(
+                    thread_id, task if thread_id == self.loop_thread_id else None
+                )
+                self.samples.setdefault(thread_id, []).append(
+                    (now, run, self._intern(frame))
+                )
+
+        self.ended_at = time.monotonic() - self.started_at
+        self._name_threads()
+
+    def _name_threads(self) -> None:
+        for thread in threading.enumerate():
+            if thread.ident is not None:
+                self.thread_names[thread.ident] = thread.name
+
+    def _intern(self, frame: FrameType | None) -> int:
+        stack: list[int] = []
+
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_filename, code.co_name, frame.f_lineno)
+            stack.append(self.frames.setdefault(key, len(self.frames)))
+            frame = frame.f_back
+
+        ## outermost frame first
+        stack.reverse()
+
+        return self.stacks.setdefault(tuple(stack), len(self.stacks))
+
+    def _thread_name(self, thread_id: int) -> str:
+        return self.thread_names.get(thread_id, f"thread {thread_id}")
+
+    def collapsed(self) -> str:
+        """
+        The samples in the collapsed stack format of Brendan Gregg's `flamegraph.pl` (and
+        speedscope, inferno, etc.): a line per distinct stack, its frames separated by `;`, followed
+        by how many times it was sampled. A stack sampled while its thread was running a run has
+        the run as its root.
+        """
+        frames = [f"{name} ({filename}:{line})" for filename, name, line in self.frames]
+        stacks = list(self.stacks)
+        counts = Counter[tuple[RunTag | None, int]](
+            (run, stack)
+            for samples in self.samples.values()
+            for _, run, stack in samples
+        )
+
+        lines = []
+
+        for (run, stack), count in counts.most_common():
+            names = [*([str(run)] if run else []), *(frames[i] for i in stacks[stack])]
+            ## `;` separates frames, and the count follows the last space
+            lines.append(";".join(n.replace(";", ":") for n in names) + f" {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict[str, Any]:
+        """
+        The samples in speedscope's file format (https://www.speedscope.app), as a sampled profile
+        per thread. A sample taken while a thread was running a run has the run as its root frame.
+        """
+        frames: list[dict[str, Any]] = [
+            {"name": name, "file": filename, "line": line}
+            for filename, name, line in self.frames
+        ]
+        run_frames: dict[RunTag, int] = {}
+        stacks = list(self.stacks)
+        profiles = []
+
+        for thread_id, samples in self.samples.items():
+            stack_samples = []
+
+            for _, run, stack in samples:
+                root = []
+
+                if run is not None:
+                    if run not in run_frames:
+                        run_frames[run] = len(frames)
+                        frames.append({"name": str(run)})
+
+                    root = [run_frames[run]]
+
+                stack_samples.append(root + list(stacks[stack]))
+
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": self._thread_name(thread_id),
+                    "unit": "seconds",
+                    "startValue": samples[0][0] - self.interval,
+                    "endValue": samples[-1][0],
+                    "samples": stack_samples,
+                    "weights": [self.interval] * len(samples),
+                }
+            )
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"hatchet worker ({self.ended_at:.1f}s)",
+            "exporter": "hatchet-sdk",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
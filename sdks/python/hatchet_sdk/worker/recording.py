@@ -0,0 +1,57 @@
+import struct
+import time
+from pathlib import Path
+from typing import Iterator
+
+from hatchet_sdk.contracts.dispatcher_pb2 import AssignedAction
+
+MAGIC = b"hatchet-actions\x01"
+
+## how long after the first action each one was received, in seconds, and how long its message is
+_RECORD_HEADER = struct.Struct("<dI")
+
+
+class ActionRecorder:
+    """
+    Writes the `AssignedAction`s an action listener receives to `path`, each as the time it was
+    received (relative to the first) and its length-prefixed protobuf message. Each is flushed as
+    it's written, so a recording survives the worker being killed.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.first: float | None = None
+
+    def record(self, action: AssignedAction) -> None:
+        now = time.monotonic()
+
+        if self.first is None:
+            self.first = now
+
+        message = action.SerializeToString()
+
+        self.file.write(_RECORD_HEADER.pack(now - self.first, len(message)) + message)
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def read_recording(path: str | Path) -> Iterator[tuple[float, AssignedAction]]:
+    """
+    The actions in a recording written by an `ActionRecorder`, with when each was received. A
+    record cut short by the worker being killed mid-write is left out.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a recording of a worker's actions")
+
+        while len(header := f.read(_RECORD_HEADER.size)) == _RECORD_HEADER.size:
+            offset, length = _RECORD_HEADER.unpack(header)
+            message = f.read(length)
+
+            if len(message) < length:
+                return
+
+            yield offset, AssignedAction.FromString(message)
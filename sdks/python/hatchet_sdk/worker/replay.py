@@ -0,0 +1,434 @@
+"""
+Replays the actions a worker received, recorded with `worker_action_record_dir`, into the worker
+runtime with a `FakeEngineProcess` standing in for the engine, and reports how quickly the runtime
+got through them: throughput, event loop lag, and how long the step runs spent in each stage.
+
+    python -m hatchet_sdk.worker.replay recording.actions --workflows my_app.workflows:wf --speed max
+
+Actions go through the worker's action and event channels to its run loop manager, the way the
+action listener process hands them over, or with `--runner` straight to a `Runner`, so the runtime
+can be compared across executors, IPC transports and serializers on the same traffic.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+from prometheus_client import REGISTRY
+
+from hatchet_sdk.bench import LatencyHistogram
+from hatchet_sdk.clients.dispatcher.action_listener import ActionRecord, ActionType
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.contracts.dispatcher_pb2 import (
+    GROUP_KEY_EVENT_TYPE_FAILED,
+    STEP_EVENT_TYPE_FAILED,
+    AssignedAction,
+)
+from hatchet_sdk.logger import logger
+from hatchet_sdk.runnables.types import ExecutorType
+from hatchet_sdk.runnables.workflow import BaseWorkflow
+from hatchet_sdk.testing import FakeEngineProcess
+from hatchet_sdk.worker.action_listener_process import RESULT_EVENT_TYPES, ActionEvent
+from hatchet_sdk.worker.ipc import IPCChannel, LocalChannel
+from hatchet_sdk.worker.latency import STEP_STAGES, StepStage, mark, stage_durations
+from hatchet_sdk.worker.loop_monitor import LoopLagMonitor
+from hatchet_sdk.worker.recording import read_recording
+from hatchet_sdk.worker.runner.run_loop_manager import (
+    STOP_LOOP,
+    STOP_LOOP_TYPE,
+    WorkerActionRunLoopManager,
+)
+from hatchet_sdk.worker.runner.runner import Runner
+from hatchet_sdk.worker.worker import Worker
+
+_STARTS = (ActionType.START_STEP_RUN, ActionType.START_GET_GROUP_KEY)
+
+
+@dataclass
+class ReplayResult:
+    actions: int = 0
+    ## actions for tasks that weren't among the workflows replayed into
+    skipped: int = 0
+    completed: int = 0
+    failed: int = 0
+    ## step runs that hadn't finished by the time the replay gave up waiting
+    unfinished: int = 0
+    elapsed: float = 0
+    loop_lag: LatencyHistogram = field(default_factory=LatencyHistogram)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    stages: dict[StepStage, LatencyHistogram] = field(
+        default_factory=lambda: {stage: LatencyHistogram() for stage in STEP_STAGES}
+    )
+
+    @property
+    def throughput(self) -> float:
+        return (self.completed + self.failed) / self.elapsed if self.elapsed else 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "actions": self.actions,
+            "skipped": self.skipped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "unfinished": self.unfinished,
+            "elapsed": round(self.elapsed, 3),
+            "step_runs_per_sec": round(self.throughput, 1),
+            "loop_lag": self.loop_lag.to_dict(),
+            "latency": self.latency.to_dict(),
+            "stages": {
+                stage.value: histogram.to_dict()
+                for stage, histogram in self.stages.items()
+                if histogram.count
+            },
+        }
+
+
+class ActionReplayer:
+    """
+    Replays the recording at `path` into a worker for `workflows`, at `speed` times the speed it was
+    recorded at, or as fast as it can be fed in if `speed` is None. With `target="run_loop"` the
+    actions go through the worker's action channels (so `worker_ipc_transport` and
+    `worker_single_process` in `config` apply) to its run loop managers, and with `target="runner"`
+    straight to a `Runner`'s `run`.
+
+    The worker's clients talk to a `FakeEngineProcess`, which answers whatever the tasks send the
+    engine, and results go no further than the event channels, where the replay takes them in the
+    action listener's place. `config` holds `ClientConfig` fields to replay with.
+    """
+
+    def __init__(
+        self,
+        workflows: list[BaseWorkflow[Any]],
+        path: str | Path,
+        speed: float | None = 1.0,
+        slots: int = 100,
+        executor: ExecutorType = ExecutorType.THREAD,
+        target: Literal["run_loop", "runner"] = "run_loop",
+        config: dict[str, Any] = {},
+        drain_timeout: float = 30,
+    ) -> None:
+        self.workflows = workflows
+        self.path = path
+        self.speed = speed
+        self.slots = slots
+        self.executor = executor
+        self.target = target
+        self.config = config
+        self.drain_timeout = drain_timeout
+
+        self.result = ReplayResult()
+        ## the step runs replayed whose results haven't come back yet
+        self.pending: set[str] = set()
+        self.fed = False
+        self.drained = asyncio.Event()
+
+    def run(self) -> ReplayResult:
+        with FakeEngineProcess() as engine:
+            return asyncio.run(self._replay(engine.client_config(**self.config)))
+
+    async def _replay(self, config: ClientConfig) -> ReplayResult:
+        loop = asyncio.get_running_loop()
+        actions = list(read_recording(self.path))
+
+        worker = Worker(
+            "replay",
+            config,
+            slots=self.slots,
+            owned_loop=False,
+            handle_kill=False,
+            workflows=self.workflows,
+            executor=self.executor,
+        )
+        worker.loop = loop
+
+        ## the replay is stopped like any other script, not like a worker
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT):
+            signal.signal(signum, signal.SIG_DFL)
+
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        monitor = LoopLagMonitor(
+            loop,
+            config.worker_loop_lag_threshold or 1,
+            on_lag=self.result.loop_lag.record,
+        )
+        monitor.start()
+
+        ## whether each task replayed into is durable
+        registered = {
+            **{action_id: False for action_id in worker.action_registry},
+            **{action_id: True for action_id in worker.durable_action_registry},
+        }
+        channels: dict[bool, IPCChannel[ActionRecord | Any | STOP_LOOP_TYPE]] = {}
+        event_queues: list[IPCChannel[ActionEvent | STOP_LOOP_TYPE]] = []
+        managers: list[WorkerActionRunLoopManager] = []
+        runners: dict[bool, Runner] = {}
+
+        for is_durable in (False, True):
+            registry = (
+                worker.durable_action_registry if is_durable else worker.action_registry
+            )
+
+            if not registry:
+                continue
+
+            event_queue = (
+                worker.durable_event_queue if is_durable else worker.event_queue
+            )
+
+            if self.target == "runner":
+                event_queue = LocalChannel()
+                runners[is_durable] = Runner(
+                    worker.name + ("_durable" if is_durable else ""),
+                    event_queue,
+                    config,
+                    1_000 if is_durable else self.slots,
+                    False,
+                    registry,
+                    worker.validator_registry,
+                    {},
+                    self.executor,
+                )
+            else:
+                channels[is_durable] = (
+                    worker.durable_action_queue if is_durable else worker.action_queue
+                )
+                managers.append(worker._run_action_runner(is_durable))
+
+            event_queues.append(event_queue)
+
+        collectors = [
+            asyncio.create_task(self._collect(event_queue))
+            for event_queue in event_queues
+        ]
+
+        start = time.monotonic()
+
+        if self.target == "run_loop" and not isinstance(
+            next(iter(channels.values()), None), LocalChannel
+        ):
+            ## the action listener process puts actions on the channels from another process, and
+            ## putting them from another thread keeps encoding them off the runner's loop as well
+            feeder = threading.Thread(
+                target=lambda: asyncio.run(
+                    self._feed(actions, registered, channels, runners, start)
+                ),
+                name="hatchet-replay-feeder",
+                daemon=True,
+            )
+            feeder.start()
+            await asyncio.to_thread(feeder.join)
+        else:
+            await self._feed(actions, registered, channels, runners, start)
+
+        self.fed = True
+
+        if not self.pending:
+            self.drained.set()
+
+        try:
+            await asyncio.wait_for(self.drained.wait(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"{len(self.pending)} step runs hadn't finished {self.drain_timeout}s after the last action was replayed"
+            )
+
+        self.result.elapsed = time.monotonic() - start
+        self.result.unfinished = len(self.pending)
+
+        monitor.stop()
+
+        ## unblocks the collectors, which may be waiting on an executor thread
+        for event_queue in event_queues:
+            event_queue.put(STOP_LOOP)
+
+        await asyncio.gather(*collectors)
+
+        for manager in managers:
+            manager.cleanup()
+
+        worker._close_channels()
+
+        for runner in runners.values():
+            runner.thread_pool.shutdown(wait=False, cancel_futures=True)
+
+        ## so that the worker's status gauge can be registered again by the next replay
+        REGISTRY.unregister(worker.worker_status_gauge)
+
+        return self.result
+
+    async def _feed(
+        self,
+        actions: list[tuple[float, AssignedAction]],
+        registered: dict[str, bool],
+        channels: dict[bool, IPCChannel[Any]],
+        runners: dict[bool, Runner],
+        start: float,
+    ) -> None:
+        for offset, assigned_action in actions:
+            if self.speed is not None:
+                delay = start + offset / self.speed - time.monotonic()
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            action = ActionRecord.from_proto(assigned_action, "replay")
+            is_durable = registered.get(action.action_id)
+
+            if is_durable is None:
+                self.result.skipped += 1
+                continue
+
+            mark(action, StepStage.RECEIVED)
+            self.result.actions += 1
+
+            if action.action_type in _STARTS:
+                self.pending.add(action.step_run_id or action.get_group_key_run_id)
+
+            mark(action, StepStage.LISTENER)
+
+            if is_durable in runners:
+                mark(action, StepStage.IPC)
+                runners[is_durable].run(action)
+            else:
+                channels[is_durable].put(action)
+
+    async def _collect(
+        self, event_queue: IPCChannel[ActionEvent | STOP_LOOP_TYPE]
+    ) -> None:
+        while True:
+            event = await event_queue.aio_get()
+
+            if event == STOP_LOOP:
+                return
+
+            if event.type not in RESULT_EVENT_TYPES:
+                continue
+
+            action = event.action
+            mark(action, StepStage.EVENT_IPC)
+
+            if event.type in (STEP_EVENT_TYPE_FAILED, GROUP_KEY_EVENT_TYPE_FAILED):
+                self.result.failed += 1
+            else:
+                self.result.completed += 1
+
+            durations = stage_durations(action.timings)
+
+            for stage, _, duration in durations:
+                self.result.stages[stage].record(duration)
+
+            if durations:
+                self.result.latency.record(sum(d for _, _, d in durations))
+
+            self.pending.discard(action.step_run_id or action.get_group_key_run_id)
+
+            if self.fed and not self.pending:
+                self.drained.set()
+
+
+def _summary(result: ReplayResult) -> str:
+    lines = [
+        f"{result.actions} actions replayed ({result.skipped} skipped) in {result.elapsed:.2f}s: "
+        f"{result.completed} completed, {result.failed} failed, {result.unfinished} unfinished, "
+        f"{result.throughput:.1f} step runs/s",
+        f"{'':16} {'count':>8} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}",
+    ]
+
+    for name, histogram in [
+        ("loop lag", result.loop_lag),
+        ("total", result.latency),
+        *[(stage.value, result.stages[stage]) for stage in STEP_STAGES],
+    ]:
+        if not histogram.count:
+            continue
+
+        lines.append(
+            f"{name:16} {histogram.count:>8}"
+            + "".join(
+                f" {histogram.percentile(p) / 1000:>7.2f}ms" for p in (50, 90, 99)
+            )
+            + f" {histogram.max / 1000:>7.2f}ms"
+        )
+
+    return "\n".join(lines)
+
+
+def _import_workflow(spec: str) -> BaseWorkflow[Any]:
+    module, _, attr = spec.partition(":")
+    workflow = getattr(importlib.import_module(module), attr)
+
+    if not isinstance(workflow, BaseWorkflow):
+        raise TypeError(f"{spec} is not a workflow")
+
+    return workflow
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m hatchet_sdk.worker.replay",
+        description=__doc__.split("\n\n")[0].strip(),
+    )
+    parser.add_argument(
+        "recording", help="a file written with worker_action_record_dir"
+    )
+    parser.add_argument(
+        "--workflows",
+        required=True,
+        nargs="+",
+        help="the workflows to replay into, as module:attribute",
+    )
+    parser.add_argument(
+        "--speed",
+        default="1",
+        help='how many times faster than recorded to replay, or "max"',
+    )
+    parser.add_argument("--slots", type=int, default=100)
+    parser.add_argument(
+        "--executor", choices=[e.value for e in ExecutorType], default="thread"
+    )
+    parser.add_argument(
+        "--runner",
+        action="store_true",
+        help="run actions with a Runner directly instead of through the worker's channels",
+    )
+    parser.add_argument(
+        "--config",
+        type=json.loads,
+        default={},
+        help='ClientConfig fields as JSON, e.g. \'{"worker_ipc_transport": "shm"}\'',
+    )
+    parser.add_argument("--drain-timeout", type=float, default=30)
+    parser.add_argument("--json", help="a file to write the results to, as JSON")
+    args = parser.parse_args(argv)
+
+    result = ActionReplayer(
+        [_import_workflow(spec) for spec in args.workflows],
+        args.recording,
+        speed=None if args.speed == "max" else float(args.speed),
+        slots=args.slots,
+        executor=ExecutorType(args.executor),
+        target="runner" if args.runner else "run_loop",
+        config=args.config,
+        drain_timeout=args.drain_timeout,
+    ).run()
+
+    print(_summary(result))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result.to_dict(), f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Sequence
+
+from hatchet_sdk.context.context import Context
+from hatchet_sdk.logger import logger
+from hatchet_sdk.runnables.types import BatchConfig
+
+
+class TaskBatcher:
+    """
+    Collects the step runs of a batch task as they're assigned and runs them through the task's
+    function together, once `max_batch` runs are waiting or `max_wait` has passed since the first of
+    them arrived. Each run gets its own output (or exception) back from `submit`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: BatchConfig,
+        run_batch: Callable[[list[Context]], Awaitable[Sequence[Any]]],
+    ) -> None:
+        self.name = name
+        self.max_batch = config.max_batch
+        self.max_wait = config.max_wait.total_seconds()
+        self.run_batch = run_batch
+
+        self.pending: list[tuple[Context, asyncio.Future[Any]]] = []
+        self.timer: asyncio.TimerHandle | None = None
+        self.running: set[asyncio.Task[None]] = set()
+
+    async def submit(self, ctx: Context) -> Any:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+
+        self.pending.append((ctx, future))
+
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.pending = (
+            self.pending[: self.max_batch],
+            self.pending[self.max_batch :],
+        )
+
+        ## runs cancelled while they waited don't take part
+        batch = [(ctx, future) for ctx, future in batch if not future.done()]
+
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+        if self.pending:
+            self.timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush
+            )
+
+    async def _run(self, batch: list[tuple[Context, asyncio.Future[Any]]]) -> None:
+        logger.debug(f"running batch of {len(batch)} step runs for {self.name}")
+
+        try:
+            outputs = list(await self.run_batch([ctx for ctx, _ in batch]))
+
+            if len(outputs) != len(batch):
+                raise ValueError(
+                    f"{self.name} returned {len(outputs)} outputs for a batch of {len(batch)} inputs"
+                )
+        except Exception as e:
+            outputs = [e] * len(batch)
+
+        for (_, future), output in zip(batch, outputs):
+            if future.done():
+                continue
+
+            if isinstance(output, BaseException):
+                future.set_exception(output)
+            else:
+                future.set_result(output)
@@ -0,0 +1,478 @@
+import asyncio
+import multiprocessing
+import multiprocessing.context
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from importlib import import_module
+from multiprocessing.connection import Connection
+from types import CodeType
+from typing import Any, Callable, Literal, cast
+
+from hatchet_sdk.clients.admin import AdminClient
+from hatchet_sdk.clients.dispatcher.action_listener import ActionRecord
+from hatchet_sdk.clients.dispatcher.dispatcher import DispatcherClient
+from hatchet_sdk.clients.events import EventClient
+from hatchet_sdk.clients.rest_client import RestApi
+from hatchet_sdk.clients.run_event_listener import RunEventListenerClient
+from hatchet_sdk.context.context import Context
+from hatchet_sdk.context.worker_context import WorkerContext
+from hatchet_sdk.logger import logger
+from hatchet_sdk.runnables.contextvars import (
+    ctx_step_run_id,
+    ctx_worker_id,
+    ctx_workflow_run_id,
+)
+from hatchet_sdk.runnables.task import Task
+from hatchet_sdk.runnables.types import ExecutorType
+from hatchet_sdk.utils.typing import WorkflowValidator
+
+BridgedMethod = Literal[
+    "log", "stream", "release_slot", "refresh_timeout", "upsert_worker_labels"
+]
+
+## the `Context` attributes backed by the clients a pool process has no connection for
+UNAVAILABLE_CONTEXT_ATTRIBUTES = {
+    "admin_client": "admin client",
+    "rest_client": "REST client",
+    "workflow_run_event_listener": "run event listener",
+}
+
+
+@dataclass
+class _Job:
+    run_id: str
+    module: str
+    qualname: str
+    action: ActionRecord
+    namespace: str
+    labels: dict[str, str | int]
+    validator_registry: dict[str, WorkflowValidator]
+
+
+class ProcessTaskError(Exception):
+    """Raised in the worker when a task running in a pool process fails. The message carries the child's traceback."""
+
+    pass
+
+
+class _ParentBridge:
+    """
+    Stands in for the event and dispatcher clients inside a pool process. The parent owns the gRPC
+    connections, so the calls a `Context` makes are forwarded over the pipe and executed there.
+    """
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+        # the context's log and stream thread pools send concurrently with the main thread
+        self.lock = threading.Lock()
+
+    def send(self, message: tuple[Any, ...]) -> None:
+        with self.lock:
+            self.conn.send(message)
+
+    def _call(self, method: BridgedMethod, **kwargs: Any) -> None:
+        self.send(("call", method, kwargs))
+
+    def buffer_log(self, message: str, step_run_id: str) -> None:
+        self._call("log", message=message, step_run_id=step_run_id)
+
+    def buffer_stream(self, data: str | bytes, step_run_id: str) -> None:
+        self._call("stream", data=data, step_run_id=step_run_id)
+
+    async def aio_buffer_stream(self, data: str | bytes, step_run_id: str) -> None:
+        self.buffer_stream(data, step_run_id)
+
+    def release_slot(self, step_run_id: str) -> None:
+        self._call("release_slot", step_run_id=step_run_id)
+
+    def refresh_timeout(self, step_run_id: str, increment_by: str) -> None:
+        self._call(
+            "refresh_timeout", step_run_id=step_run_id, increment_by=increment_by
+        )
+
+    def upsert_worker_labels(
+        self, worker_id: str | None, labels: dict[str, str | int]
+    ) -> None:
+        self._call("upsert_worker_labels", worker_id=worker_id, labels=labels)
+
+
+class _Unavailable:
+    """
+    Stands in for the clients a pool process has no connection for (the admin and REST clients and
+    the run event listener), so using one raises a clear error instead of an `AttributeError` on `None`.
+    `check_process_task` rejects the tasks that use one by name when they're registered, so this only
+    catches the uses it can't see, like a helper the task passes its context to.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        raise RuntimeError(
+            f"the {self.name} is not available to tasks running in a process pool, so `{attr}` can't be used"
+        )
+
+
+def runs_in_process_pool(task: Task[Any, Any], default: ExecutorType) -> bool:
+    if task.is_async_function or task.is_durable or task.batch:
+        return False
+
+    return (task.executor or default) == ExecutorType.PROCESS
+
+
+def _names(code: CodeType) -> set[str]:
+    names = set(code.co_names)
+
+    ## including those of the lambdas, comprehensions, and functions defined in it
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names |= _names(const)
+
+    return names
+
+
+def check_process_task(task: Task[Any, Any]) -> None:
+    """
+    Raises a `ValueError` when the worker registers a task it would run in a process pool that no pool
+    process can run: one that isn't defined at the top level of a module, so the process can't import
+    it, or one that uses a client the process has no connection for.
+    """
+    if "<locals>" in task.fn.__qualname__:
+        raise ValueError(
+            f"{task.name} must be defined at the top level of a module to run in a process pool"
+        )
+
+    used = [
+        client
+        for attr, client in UNAVAILABLE_CONTEXT_ATTRIBUTES.items()
+        if attr in _names(task.fn.__code__)
+    ]
+
+    if used:
+        raise ValueError(
+            f"{task.name} uses the {', '.join(used)}, which is not available to tasks running in a process pool. "
+            "Run it with `ExecutorType.THREAD` instead"
+        )
+
+
+def _resolve_task(module_name: str, qualname: str) -> Task[Any, Any]:
+    obj: Any = import_module(module_name)
+
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+
+    ## The decorators replace the function with a `Task` (or a `Standalone` wrapping one)
+    if isinstance(obj, Task):
+        return obj
+
+    task = getattr(obj, "_task", None)
+
+    if isinstance(task, Task):
+        return task
+
+    raise TypeError(
+        f"`{module_name}.{qualname}` does not refer to a Hatchet task, so it cannot be run in a process pool"
+    )
+
+
+def _create_child_context(job: _Job, bridge: _ParentBridge) -> Context:
+    worker = WorkerContext(labels=job.labels, client=cast(DispatcherClient, bridge))
+    worker._worker_id = job.action.worker_id
+
+    return Context(
+        job.action,
+        cast(DispatcherClient, bridge),
+        cast(AdminClient, _Unavailable("admin client")),
+        cast(EventClient, bridge),
+        cast(RestApi, _Unavailable("REST client")),
+        None,
+        None,
+        cast(RunEventListenerClient, _Unavailable("run event listener")),
+        worker,
+        job.namespace,
+        validator_registry=job.validator_registry,
+    )
+
+
+def _pool_process_main(conn: Connection) -> None:
+    bridge = _ParentBridge(conn)
+    tasks: dict[tuple[str, str], Task[Any, Any]] = {}
+
+    while True:
+        try:
+            job: _Job | None = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        if job is None:
+            return
+
+        ctx_step_run_id.set(job.action.step_run_id)
+        ctx_workflow_run_id.set(job.action.workflow_run_id)
+        ctx_worker_id.set(job.action.worker_id)
+
+        try:
+            key = (job.module, job.qualname)
+
+            if key not in tasks:
+                tasks[key] = _resolve_task(job.module, job.qualname)
+
+            output = tasks[key].call(_create_child_context(job, bridge))
+            bridge.send(("result", job.run_id, output))
+        except Exception as e:
+            trace = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+            bridge.send(
+                ("error", job.run_id, f"{e}\n\nraised in pool process:\n{trace}")
+            )
+
+
+class _PoolProcess:
+    def __init__(self, pool: "TaskProcessPool") -> None:
+        parent_conn, child_conn = pool.mp_context.Pipe()
+
+        self.conn = parent_conn
+        self.process = pool.mp_context.Process(
+            target=_pool_process_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.run_id: str | None = None
+        self.future: asyncio.Future[Any] | None = None
+        self.retired = False
+
+        ## runs the calls the process makes through its bridge one at a time, in the order it made them
+        self.calls = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="hatchet-pool-bridge"
+        )
+
+        self.reader = threading.Thread(target=pool._read, args=(self,), daemon=True)
+        self.reader.start()
+
+
+class TaskProcessPool:
+    """
+    A warm pool of `spawn`ed processes for CPU-bound sync tasks, which would otherwise be serialized
+    by the GIL on the runner's thread pool. Each process runs one step run at a time, so a cancelled
+    step run is stopped by killing its process and replacing it.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        dispatcher_client: DispatcherClient,
+        event_client: EventClient,
+        namespace: str,
+        labels: dict[str, str | int],
+        validator_registry: dict[str, WorkflowValidator],
+    ) -> None:
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.max_workers = max_workers
+        self.namespace = namespace
+        self.labels = labels
+        self.validator_registry = validator_registry
+
+        self.handlers: dict[BridgedMethod, Callable[..., None]] = {
+            "log": event_client.buffer_log,
+            "stream": event_client.buffer_stream,
+            "release_slot": dispatcher_client.release_slot,
+            "refresh_timeout": dispatcher_client.refresh_timeout,
+            "upsert_worker_labels": dispatcher_client.upsert_worker_labels,
+        }
+
+        self.loop = asyncio.get_running_loop()
+        self.idle: asyncio.Queue[_PoolProcess] = asyncio.Queue()
+        self.running: dict[str, _PoolProcess] = {}
+        self.closed = False
+
+        for _ in range(max_workers):
+            self._spawn()
+
+        logger.debug(f"starting process pool with {max_workers} processes")
+
+    @staticmethod
+    def default_size(slots: int | None) -> int:
+        cpus = os.cpu_count() or 1
+
+        return max(1, min(slots or cpus, cpus))
+
+    def _spawn(self) -> None:
+        ## starting a `spawn`ed process blocks until its interpreter is up, so it's done off the loop
+        spawning = self.loop.run_in_executor(None, _PoolProcess, self)
+        spawning.add_done_callback(self._on_spawned)
+
+    def _on_spawned(self, spawning: "asyncio.Future[_PoolProcess]") -> None:
+        if spawning.cancelled():
+            return
+
+        if e := spawning.exception():
+            logger.error(f"failed to start pool process: {e}")
+
+            if not self.closed:
+                self.loop.call_later(1, self._spawn)
+
+            return
+
+        proc = spawning.result()
+
+        if self.closed:
+            self._stop(proc)
+        else:
+            self.idle.put_nowait(proc)
+
+    def _read(self, proc: _PoolProcess) -> None:
+        while True:
+            try:
+                message = proc.conn.recv()
+            except (EOFError, OSError):
+                if not self.loop.is_closed():
+                    self.loop.call_soon_threadsafe(self._on_exit, proc)
+                return
+
+            if self.loop.is_closed():
+                return
+
+            self.loop.call_soon_threadsafe(self._on_message, proc, message)
+
+    def _on_message(self, proc: _PoolProcess, message: tuple[Any, ...]) -> None:
+        ## a retired process's executor is shut down, and its run has already been resolved
+        if proc.retired:
+            return
+
+        match message:
+            case ("call", method, kwargs):
+                proc.calls.submit(self._call, method, kwargs)
+            case ("result", run_id, output):
+                self._resolve(proc, run_id, lambda future: future.set_result(output))
+            case ("error", run_id, error):
+                self._resolve(
+                    proc,
+                    run_id,
+                    lambda future: future.set_exception(ProcessTaskError(error)),
+                )
+            case _:
+                logger.error(f"unknown message from pool process: {message[0]}")
+
+    def _resolve(
+        self,
+        proc: _PoolProcess,
+        run_id: str,
+        resolve: Callable[["asyncio.Future[Any]"], None],
+    ) -> None:
+        ## the calls the run made before finishing (e.g. its last log lines) are handed off before it resolves
+        drained = asyncio.wrap_future(proc.calls.submit(lambda: None), loop=self.loop)
+
+        def on_drained(_: "asyncio.Future[None]") -> None:
+            if proc.future and not proc.future.done() and proc.run_id == run_id:
+                resolve(proc.future)
+
+        drained.add_done_callback(on_drained)
+
+    def _call(self, method: BridgedMethod, kwargs: dict[str, Any]) -> None:
+        try:
+            self.handlers[method](**kwargs)
+        except Exception as e:
+            logger.error(f"failed to run {method} on behalf of pool process: {e}")
+
+    def _on_exit(self, proc: _PoolProcess) -> None:
+        if proc.retired or self.closed:
+            return
+
+        ## a result the process sent before exiting resolves its run first
+        drained = asyncio.wrap_future(proc.calls.submit(lambda: None), loop=self.loop)
+        drained.add_done_callback(lambda _: self._on_died(proc))
+
+    def _on_died(self, proc: _PoolProcess) -> None:
+        if proc.retired or self.closed:
+            return
+
+        ## The process died on its own (e.g. a segfault or the OOM killer), so fail its step run and replace it
+        proc.retired = True
+        proc.calls.shutdown(wait=False)
+
+        if proc.future and not proc.future.done():
+            proc.future.set_exception(
+                ProcessTaskError(
+                    f"pool process {proc.process.pid} exited unexpectedly while running {proc.run_id}"
+                )
+            )
+
+        self._spawn()
+
+    def _retire(self, proc: _PoolProcess) -> None:
+        proc.retired = True
+
+        if proc.process.is_alive():
+            logger.info(f"killing pool process {proc.process.pid} ({proc.run_id})")
+            proc.process.kill()
+
+        proc.conn.close()
+        proc.calls.shutdown(wait=False)
+
+        if not self.closed:
+            self._spawn()
+
+    async def run(self, task: Task[Any, Any], action: ActionRecord, run_id: str) -> Any:
+        module, qualname = task.fn.__module__, task.fn.__qualname__
+        proc = await self.idle.get()
+
+        ## a process that died while idle is only noticed when it's picked up
+        while proc.retired:
+            proc = await self.idle.get()
+
+        proc.run_id = run_id
+        proc.future = self.loop.create_future()
+        self.running[run_id] = proc
+
+        try:
+            proc.conn.send(
+                _Job(
+                    run_id=run_id,
+                    module=module,
+                    qualname=qualname,
+                    action=action,
+                    namespace=self.namespace,
+                    labels=self.labels,
+                    validator_registry=self.validator_registry,
+                )
+            )
+
+            return await proc.future
+        except asyncio.CancelledError:
+            self._retire(proc)
+            raise
+        finally:
+            del self.running[run_id]
+
+            if not proc.retired:
+                proc.run_id = None
+                proc.future = None
+                self.idle.put_nowait(proc)
+
+    def shutdown(self) -> None:
+        self.closed = True
+
+        procs = list(self.running.values())
+
+        while not self.idle.empty():
+            procs.append(self.idle.get_nowait())
+
+        for proc in procs:
+            self._stop(proc)
+
+    def _stop(self, proc: _PoolProcess) -> None:
+        proc.retired = True
+        proc.calls.shutdown(wait=False)
+
+        try:
+            proc.conn.send(None)
+        except (OSError, ValueError):
+            pass
+
+        proc.process.join(timeout=1)
+
+        if proc.process.is_alive():
+            proc.process.kill()
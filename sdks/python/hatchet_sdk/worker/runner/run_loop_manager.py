@@ -1,16 +1,18 @@
 import asyncio
 import logging
-from multiprocessing import Queue
 from typing import Any, Literal, TypeVar
 
 from hatchet_sdk.client import Client
-from hatchet_sdk.clients.dispatcher.action_listener import Action
+from hatchet_sdk.clients.dispatcher.action_listener import ActionRecord
 from hatchet_sdk.config import ClientConfig
 from hatchet_sdk.logger import logger
 from hatchet_sdk.runnables.task import Task
+from hatchet_sdk.runnables.types import ExecutorType
 from hatchet_sdk.utils.typing import WorkflowValidator
-from hatchet_sdk.worker.action_listener_process import ActionEvent
-from hatchet_sdk.worker.runner.runner import Runner
+from hatchet_sdk.worker.action_listener_process import ActionEvent, ActionTimings
+from hatchet_sdk.worker.ipc import IPCChannel
+from hatchet_sdk.worker.latency import StepStage, mark, observe_step_latency
+from hatchet_sdk.worker.runner.runner import FLUSH_TIMEOUT, Runner
 from hatchet_sdk.worker.runner.utils.capture_logs import capture_logs
 
 STOP_LOOP_TYPE = Literal["STOP_LOOP"]
@@ -27,12 +29,13 @@ class WorkerActionRunLoopManager:
         validator_registry: dict[str, WorkflowValidator],
         slots: int | None,
         config: ClientConfig,
-        action_queue: "Queue[Action | STOP_LOOP_TYPE]",
-        event_queue: "Queue[ActionEvent]",
+        action_queue: IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE],
+        event_queue: IPCChannel[ActionEvent | STOP_LOOP_TYPE],
         loop: asyncio.AbstractEventLoop,
         handle_kill: bool = True,
         debug: bool = False,
         labels: dict[str, str | int] = {},
+        executor: ExecutorType = ExecutorType.THREAD,
     ) -> None:
         self.name = name
         self.action_registry = action_registry
@@ -45,6 +48,7 @@ class WorkerActionRunLoopManager:
         self.handle_kill = handle_kill
         self.debug = debug
         self.labels = labels
+        self.executor = executor
 
         if self.debug:
             logger.setLevel(logging.DEBUG)
@@ -75,7 +79,12 @@ class WorkerActionRunLoopManager:
     def cleanup(self) -> None:
         self.killing = True
 
-        self.action_queue.put(STOP_LOOP)
+        if self.runner and self.runner.process_pool:
+            self.runner.process_pool.shutdown()
+
+        ## the action queue is read on this loop, which can't wait for room in it
+        if not self.action_queue.try_put(STOP_LOOP):
+            self.loop.create_task(self.action_queue.aio_put(STOP_LOOP))
 
     async def wait_for_tasks(self) -> None:
         if self.runner:
@@ -91,6 +100,7 @@ class WorkerActionRunLoopManager:
             self.action_registry,
             self.validator_registry,
             self.labels,
+            self.executor,
         )
 
         logger.debug(f"'{self.name}' waiting for {list(self.action_registry.keys())}")
@@ -100,11 +110,16 @@ class WorkerActionRunLoopManager:
                 logger.debug("stopping action runner loop...")
                 break
 
+            if isinstance(action, ActionTimings):
+                observe_step_latency(action.action_id, action.timings)
+                continue
+
+            mark(action, StepStage.IPC)
             self.runner.run(action)
         logger.debug("action runner loop stopped")
 
-    async def _get_action(self) -> Action | STOP_LOOP_TYPE:
-        return await self.loop.run_in_executor(None, self.action_queue.get)
+    async def _get_action(self) -> ActionRecord | ActionTimings | STOP_LOOP_TYPE:
+        return await self.action_queue.aio_get()
 
     async def exit_gracefully(self) -> None:
         if self.killing:
@@ -119,6 +134,11 @@ class WorkerActionRunLoopManager:
         # task list.
         await asyncio.sleep(1)
 
+        try:
+            await self.client.event.aio_flush_buffered(timeout=FLUSH_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"could not flush logs and streams: {e}")
+
     def exit_forcefully(self) -> None:
         logger.info("forcefully exiting runner...")
         self.cleanup()
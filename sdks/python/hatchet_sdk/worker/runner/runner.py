@@ -2,19 +2,16 @@ import asyncio
 import contextvars
 import ctypes
 import functools
-import json
 import traceback
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from multiprocessing import Queue
 from threading import Thread, current_thread
-from typing import Any, Callable, Dict, Literal, cast, overload
-
-from pydantic import BaseModel
+from typing import Any, Awaitable, Callable, Dict, Literal, Sequence, cast, overload
 
 from hatchet_sdk.client import Client
 from hatchet_sdk.clients.admin import AdminClient
-from hatchet_sdk.clients.dispatcher.action_listener import Action, ActionType
+from hatchet_sdk.clients.dispatcher.action_listener import ActionRecord, ActionType
 from hatchet_sdk.clients.dispatcher.dispatcher import DispatcherClient
 from hatchet_sdk.clients.durable_event_listener import DurableEventListener
 from hatchet_sdk.clients.run_event_listener import RunEventListenerClient
@@ -31,6 +28,7 @@ from hatchet_sdk.contracts.dispatcher_pb2 import (
     STEP_EVENT_TYPE_STARTED,
 )
 from hatchet_sdk.logger import logger
+from hatchet_sdk.payloads import aio_encode_payload
 from hatchet_sdk.runnables.contextvars import (
     ctx_step_run_id,
     ctx_worker_id,
@@ -39,11 +37,19 @@ from hatchet_sdk.runnables.contextvars import (
     workflow_spawn_indices,
 )
 from hatchet_sdk.runnables.task import Task
-from hatchet_sdk.runnables.types import R, TWorkflowInput
+from hatchet_sdk.runnables.types import BatchConfig, ExecutorType, R, TWorkflowInput
 from hatchet_sdk.utils.typing import WorkflowValidator
-from hatchet_sdk.worker.action_listener_process import ActionEvent
+from hatchet_sdk.worker.action_listener_process import STOP_LOOP_TYPE, ActionEvent
+from hatchet_sdk.worker.ipc import IPCChannel
+from hatchet_sdk.worker.latency import StepStage, mark
+from hatchet_sdk.worker.runner.batching import TaskBatcher
+from hatchet_sdk.worker.runner.process_pool import TaskProcessPool, runs_in_process_pool
+from hatchet_sdk.worker.runner.task_profiler import aio_call_profiled, call_profiled
 from hatchet_sdk.worker.runner.utils.capture_logs import copy_context_vars
 
+## how long a finished step run waits for its buffered log lines and stream chunks to be sent, in seconds
+FLUSH_TIMEOUT = 5
+
 
 class WorkerStatus(Enum):
     INITIALIZED = 1
@@ -56,13 +62,14 @@ class Runner:
     def __init__(
         self,
         name: str,
-        event_queue: "Queue[ActionEvent]",
+        event_queue: IPCChannel[ActionEvent | STOP_LOOP_TYPE],
         config: ClientConfig,
         slots: int | None = None,
         handle_kill: bool = True,
         action_registry: dict[str, Task[TWorkflowInput, R]] = {},
         validator_registry: dict[str, WorkflowValidator] = {},
         labels: dict[str, str | int] = {},
+        executor: ExecutorType = ExecutorType.THREAD,
     ):
         # We store the config so we can dynamically create clients for the dispatcher client.
         self.config = config
@@ -75,10 +82,14 @@ class Runner:
         self.validator_registry = validator_registry
 
         self.event_queue = event_queue
+        ## events waiting for room in the event queue, sent in order by `event_sender`
+        self.unsent_events: deque[ActionEvent] = deque()
+        self.event_sender: asyncio.Task[None] | None = None
 
         # The thread pool is used for synchronous functions which need to run concurrently
         self.thread_pool = ThreadPoolExecutor(max_workers=slots)
         self.threads: Dict[str, Thread] = {}  # Store run ids and threads
+        self.executor = executor
 
         self.killing = False
         self.handle_kill = handle_kill
@@ -92,13 +103,52 @@ class Runner:
         self.durable_event_listener = DurableEventListener(self.config)
 
         self.worker_context = WorkerContext(
-            labels=labels, client=Client(config=config).dispatcher
+            labels=labels, client=self.dispatcher_client
         )
 
-    def create_workflow_run_url(self, action: Action) -> str:
+        self.batchers: dict[str, TaskBatcher] = {}
+
+        # The process pool is only started if a registered sync task needs it, since warming it spawns processes
+        self.process_pool: TaskProcessPool | None = None
+
+        if any(self.runs_in_process_pool(t) for t in self.action_registry.values()):
+            self.process_pool = TaskProcessPool(
+                max_workers=TaskProcessPool.default_size(slots),
+                dispatcher_client=self.dispatcher_client,
+                event_client=self.client.event,
+                namespace=self.client.config.namespace,
+                labels=labels,
+                validator_registry=self.validator_registry,
+            )
+
+    def put_event(self, event: ActionEvent) -> None:
+        """
+        Sends `event` to the action listener. Events are put from done callbacks on the loop, so if
+        the event queue is full they're sent from a task once there's room, rather than blocking it.
+        """
+        if not self.unsent_events and self.event_queue.try_put(event):
+            return
+
+        self.unsent_events.append(event)
+
+        if self.event_sender is None or self.event_sender.done():
+            self.event_sender = asyncio.create_task(self._send_unsent_events())
+
+    async def _send_unsent_events(self) -> None:
+        try:
+            while self.unsent_events:
+                await self.event_queue.aio_put(self.unsent_events[0])
+                self.unsent_events.popleft()
+        except Exception as e:
+            logger.error(
+                f"could not send {len(self.unsent_events)} action events to the action listener: {e}"
+            )
+            self.unsent_events.clear()
+
+    def create_workflow_run_url(self, action: ActionRecord) -> str:
         return f"{self.config.server_url}/workflow-runs/{action.workflow_run_id}?tenant={action.tenant_id}"
 
-    def run(self, action: Action) -> None:
+    def run(self, action: ActionRecord) -> None:
         if self.worker_context.id() is None:
             self.worker_context._worker_id = action.worker_id
 
@@ -119,26 +169,31 @@ class Runner:
                 log = f"unknown action type: {action.action_type}"
                 logger.error(log)
 
-    def step_run_callback(self, action: Action) -> Callable[[asyncio.Task[Any]], None]:
+    def step_run_callback(
+        self, action: ActionRecord
+    ) -> Callable[[asyncio.Task[Any]], None]:
         def inner_callback(task: asyncio.Task[Any]) -> None:
             self.cleanup_run_id(action.step_run_id)
 
             errored = False
             cancelled = task.cancelled()
 
-            # Get the output from the future
+            # Get the serialized output from the future
             try:
                 if not cancelled:
-                    output = task.result()
+                    payload = task.result()
             except Exception as e:
                 errored = True
 
                 # This except is coming from the application itself, so we want to send that to the Hatchet instance
-                self.event_queue.put(
+                error = str(pretty_format_exception(f"{e}", e))
+                mark(action, StepStage.SERIALIZATION)
+
+                self.put_event(
                     ActionEvent(
                         action=action,
                         type=STEP_EVENT_TYPE_FAILED,
-                        payload=str(pretty_format_exception(f"{e}", e)),
+                        payload=error,
                     )
                 )
 
@@ -147,11 +202,13 @@ class Runner:
                 )
 
             if not errored and not cancelled:
-                self.event_queue.put(
+                mark(action, StepStage.SERIALIZATION)
+
+                self.put_event(
                     ActionEvent(
                         action=action,
                         type=STEP_EVENT_TYPE_COMPLETED,
-                        payload=self.serialize_output(output),
+                        payload=payload,
                     )
                 )
 
@@ -162,7 +219,7 @@ class Runner:
         return inner_callback
 
     def group_key_run_callback(
-        self, action: Action
+        self, action: ActionRecord
     ) -> Callable[[asyncio.Task[Any]], None]:
         def inner_callback(task: asyncio.Task[Any]) -> None:
             self.cleanup_run_id(action.get_group_key_run_id)
@@ -170,17 +227,20 @@ class Runner:
             errored = False
             cancelled = task.cancelled()
 
-            # Get the output from the future
+            # Get the serialized output from the future
             try:
                 if not cancelled:
-                    output = task.result()
+                    payload = task.result()
             except Exception as e:
                 errored = True
-                self.event_queue.put(
+                error = str(pretty_format_exception(f"{e}", e))
+                mark(action, StepStage.SERIALIZATION)
+
+                self.put_event(
                     ActionEvent(
                         action=action,
                         type=GROUP_KEY_EVENT_TYPE_FAILED,
-                        payload=str(pretty_format_exception(f"{e}", e)),
+                        payload=error,
                     )
                 )
 
@@ -189,11 +249,13 @@ class Runner:
                 )
 
             if not errored and not cancelled:
-                self.event_queue.put(
+                mark(action, StepStage.SERIALIZATION)
+
+                self.put_event(
                     ActionEvent(
                         action=action,
                         type=GROUP_KEY_EVENT_TYPE_COMPLETED,
-                        payload=self.serialize_output(output),
+                        payload=payload,
                     )
                 )
 
@@ -204,7 +266,7 @@ class Runner:
         return inner_callback
 
     def thread_action_func(
-        self, ctx: Context, task: Task[TWorkflowInput, R], action: Action
+        self, ctx: Context, task: Task[TWorkflowInput, R], action: ActionRecord
     ) -> R:
         if action.step_run_id is not None and action.step_run_id != "":
             self.threads[action.step_run_id] = current_thread()
@@ -214,14 +276,19 @@ class Runner:
         ):
             self.threads[action.get_group_key_run_id] = current_thread()
 
-        return task.call(ctx)
+        mark(action, StepStage.EXECUTOR_QUEUE)
+
+        return call_profiled(task, ctx, self.config)
+
+    def runs_in_process_pool(self, task: Task[TWorkflowInput, R]) -> bool:
+        return runs_in_process_pool(task, self.executor)
 
     # We wrap all actions in an async func
     async def async_wrapped_action_func(
         self,
         ctx: Context,
         task: Task[TWorkflowInput, R],
-        action: Action,
+        action: ActionRecord,
         run_id: str,
     ) -> R:
         ctx_step_run_id.set(action.step_run_id)
@@ -230,7 +297,13 @@ class Runner:
 
         try:
             if task.is_async_function:
-                return await task.aio_call(ctx)
+                mark(action, StepStage.EXECUTOR_QUEUE)
+                return await aio_call_profiled(task, ctx, self.config)
+            elif self.process_pool and self.runs_in_process_pool(task):
+                ## the pool's queue is in another process, so it's counted as user code
+                mark(action, StepStage.EXECUTOR_QUEUE)
+                # cancelling the asyncio task kills the pool process, so there's no thread to force kill
+                return cast(R, await self.process_pool.run(task, action, run_id))
             else:
                 pfunc = functools.partial(
                     # we must copy the context vars to the new thread, as only asyncio natively supports
@@ -254,8 +327,75 @@ class Runner:
             )
             raise e
         finally:
+            mark(action, StepStage.USER_CODE)
+            await self.flush_buffered(action.step_run_id)
+            mark(action, StepStage.FLUSH)
+            self.cleanup_run_id(run_id)
+
+    def get_batcher(self, task: Task[TWorkflowInput, R]) -> TaskBatcher:
+        if task.name not in self.batchers:
+
+            async def run_batch(ctxs: list[Context]) -> Sequence[Any]:
+                for ctx in ctxs:
+                    mark(ctx.action, StepStage.EXECUTOR_QUEUE)
+
+                if task.is_async_function:
+                    return await task.aio_call_batch(ctxs)
+
+                pfunc = functools.partial(
+                    copy_context_vars,
+                    contextvars.copy_context().items(),
+                    task.call_batch,
+                    ctxs,
+                )
+
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(self.thread_pool, pfunc)
+
+            self.batchers[task.name] = TaskBatcher(
+                task.name, cast(BatchConfig, task.batch), run_batch
+            )
+
+        return self.batchers[task.name]
+
+    async def batched_action_func(
+        self,
+        ctx: Context,
+        task: Task[TWorkflowInput, R],
+        action: ActionRecord,
+        run_id: str,
+    ) -> R:
+        ctx_step_run_id.set(action.step_run_id)
+        ctx_workflow_run_id.set(action.workflow_run_id)
+        ctx_worker_id.set(action.worker_id)
+
+        try:
+            return cast(R, await self.get_batcher(task).submit(ctx))
+        except Exception as e:
+            logger.error(
+                pretty_format_exception(
+                    f"exception raised in batched action ({action.action_id}, retry={action.retry_count}):\n{e}",
+                    e,
+                )
+            )
+            raise e
+        finally:
+            mark(action, StepStage.USER_CODE)
+            await self.flush_buffered(action.step_run_id)
+            mark(action, StepStage.FLUSH)
             self.cleanup_run_id(run_id)
 
+    async def flush_buffered(self, step_run_id: str) -> None:
+        ## sends the step run's buffered log lines and stream chunks before it's reported finished
+        try:
+            await self.client.event.aio_flush_buffered(
+                step_run_id, timeout=FLUSH_TIMEOUT
+            )
+        except Exception as e:
+            logger.warning(
+                f"could not flush logs and streams of step run {step_run_id}: {e}"
+            )
+
     def cleanup_run_id(self, run_id: str | None) -> None:
         if run_id in self.tasks:
             del self.tasks[run_id]
@@ -268,19 +408,22 @@ class Runner:
 
     @overload
     def create_context(
-        self, action: Action, is_durable: Literal[True] = True
+        self, action: ActionRecord, is_durable: Literal[True] = True
     ) -> DurableContext: ...
 
     @overload
     def create_context(
-        self, action: Action, is_durable: Literal[False] = False
+        self, action: ActionRecord, is_durable: Literal[False] = False
     ) -> Context: ...
 
     def create_context(
-        self, action: Action, is_durable: bool = True
+        self, action: ActionRecord, is_durable: bool = True
     ) -> Context | DurableContext:
         constructor = DurableContext if is_durable else Context
 
+        ## lets the context read inputs and parent outputs that were offloaded to the blob store
+        action.action_payload.blob_store = self.config.blob_store
+
         return constructor(
             action,
             self.dispatcher_client,
@@ -296,7 +439,8 @@ class Runner:
         )
 
     ## IMPORTANT: Keep this method's signature in sync with the wrapper in the OTel instrumentor
-    async def handle_start_step_run(self, action: Action) -> None:
+    async def handle_start_step_run(self, action: ActionRecord) -> None:
+        mark(action, StepStage.DISPATCH)
         action_name = action.action_id
 
         # Find the corresponding action function from the registry
@@ -306,16 +450,25 @@ class Runner:
             context = self.create_context(
                 action, True if action_func.is_durable else False
             )
+            mark(action, StepStage.CONTEXT)
 
             self.contexts[action.step_run_id] = context
-            self.event_queue.put(
+            self.put_event(
                 ActionEvent(action=action, type=STEP_EVENT_TYPE_STARTED, payload="")
             )
 
+            wrapped_action_func = (
+                self.batched_action_func
+                if action_func.batch
+                else self.async_wrapped_action_func
+            )
+
             loop = asyncio.get_event_loop()
             task = loop.create_task(
-                self.async_wrapped_action_func(
-                    context, action_func, action, action.step_run_id
+                self.aio_serialized(
+                    wrapped_action_func(
+                        context, action_func, action, action.step_run_id
+                    )
                 )
             )
 
@@ -335,9 +488,13 @@ class Runner:
                 workflow_spawn_indices.pop(action.workflow_run_id)
 
     ## IMPORTANT: Keep this method's signature in sync with the wrapper in the OTel instrumentor
-    async def handle_start_group_key_run(self, action: Action) -> Exception | None:
+    async def handle_start_group_key_run(
+        self, action: ActionRecord
+    ) -> Exception | None:
+        mark(action, StepStage.DISPATCH)
         action_name = action.action_id
         context = self.create_context(action)
+        mark(action, StepStage.CONTEXT)
 
         self.contexts[action.get_group_key_run_id] = context
 
@@ -346,7 +503,7 @@ class Runner:
 
         if action_func:
             # send an event that the group key run has started
-            self.event_queue.put(
+            self.put_event(
                 ActionEvent(
                     action=action, type=GROUP_KEY_EVENT_TYPE_STARTED, payload=""
                 )
@@ -354,8 +511,10 @@ class Runner:
 
             loop = asyncio.get_event_loop()
             task = loop.create_task(
-                self.async_wrapped_action_func(
-                    context, action_func, action, action.get_group_key_run_id
+                self.aio_serialized(
+                    self.async_wrapped_action_func(
+                        context, action_func, action, action.get_group_key_run_id
+                    )
                 )
             )
 
@@ -429,18 +588,24 @@ class Runner:
         finally:
             self.cleanup_run_id(run_id)
 
-    def serialize_output(self, output: Any) -> str:
-        if isinstance(output, BaseModel):
-            return output.model_dump_json()
+    async def aio_serialized(self, output: Awaitable[Any]) -> bytes:
+        """
+        A run's output, serialized to be sent. It's serialized as part of the run's task, so that
+        offloading it to the blob store, which is done from a thread, fails the run if it fails.
+        """
+        return await self.aio_serialize_output(await output)
 
-        if output is not None:
-            try:
-                return json.dumps(output, default=str)
-            except Exception as e:
-                logger.error(f"Could not serialize output: {e}")
-                return str(output)
+    async def aio_serialize_output(self, output: Any) -> bytes:
+        if output is None:
+            return b""
+
+        try:
+            data = self.config.serializer.dumps(output)
+        except Exception as e:
+            logger.error(f"Could not serialize output: {e}")
+            return str(output).encode("utf-8")
 
-        return ""
+        return await aio_encode_payload(data, self.config)
 
     async def wait_for_tasks(self) -> None:
         running = len(self.tasks.keys())
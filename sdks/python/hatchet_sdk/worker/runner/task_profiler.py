@@ -0,0 +1,201 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from types import TracebackType
+
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.context.context import Context
+from hatchet_sdk.logger import logger
+from hatchet_sdk.runnables.task import Task
+from hatchet_sdk.runnables.types import R, TWorkflowInput
+
+## how many functions and allocation sites a profile's summary lists
+TOP_ENTRIES = 20
+
+## only one run is profiled at a time, since cProfile profiles every thread from Python 3.12 and tracemalloc is global
+_profiling = threading.Lock()
+
+
+class TaskProfiler:
+    """
+    Profiles a run of a task with cProfile and, with `trace_memory`, the memory it allocates with
+    tracemalloc, between entering and exiting it. Its summary, the functions the run spent the most
+    time in and the lines that allocated the most memory, is logged to the run, or written along
+    with the profile to `output_dir`.
+
+    A profile of an async task includes whatever else ran on the event loop while it was awaiting,
+    and, from Python 3.12, whatever ran on other threads.
+    """
+
+    def __init__(
+        self, ctx: Context, trace_memory: bool, output_dir: str | None
+    ) -> None:
+        self.ctx = ctx
+        self.trace_memory = trace_memory
+        self.output_dir = output_dir
+
+        self.profile = cProfile.Profile()
+        self.enabled = False
+        self.started_tracing = False
+        self.before: tracemalloc.Snapshot | None = None
+        self.after: tracemalloc.Snapshot | None = None
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    @classmethod
+    def sample(
+        cls, task: Task[TWorkflowInput, R], config: ClientConfig, ctx: Context
+    ) -> "TaskProfiler | None":
+        """A profiler for this run, if it's sampled and no other run is being profiled."""
+        ## get group key runs aren't profiled, having no step run to report to
+        if not ctx.step_run_id:
+            return None
+
+        rate = (
+            task.profile.sample_rate
+            if task.profile
+            else config.worker_profile_sample_rate
+        )
+
+        if rate <= 0 or random.random() >= rate:
+            return None
+
+        if not _profiling.acquire(blocking=False):
+            return None
+
+        return cls(
+            ctx,
+            (
+                task.profile.trace_memory
+                if task.profile
+                else config.worker_profile_trace_memory
+            ),
+            config.worker_profile_dir,
+        )
+
+    def __enter__(self) -> "TaskProfiler":
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+
+            self.before = tracemalloc.take_snapshot()
+
+        try:
+            self.profile.enable()
+            self.enabled = True
+        except ValueError as e:
+            ## Python 3.12+ only runs one profiler at a time, so one the task started itself wins
+            logger.warning(f"could not profile step run {self.ctx.step_run_id}: {e}")
+            self._stop_tracing()
+
+        self.started_at = time.perf_counter()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.profile.disable()
+        self.elapsed = time.perf_counter() - self.started_at
+
+        try:
+            if self.enabled and self.before is not None:
+                self.after = tracemalloc.take_snapshot()
+
+            self._stop_tracing()
+        finally:
+            _profiling.release()
+
+    def _stop_tracing(self) -> None:
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def summary(self) -> str:
+        stats = io.StringIO()
+        pstats.Stats(self.profile, stream=stats).sort_stats(
+            pstats.SortKey.CUMULATIVE
+        ).print_stats(TOP_ENTRIES)
+
+        summary = (
+            f"profile of step run {self.ctx.step_run_id} ({self.ctx.action.action_id}),"
+            f" which took {self.elapsed:.3f}s:\n{stats.getvalue().strip()}\n"
+        )
+
+        if self.before is not None and self.after is not None:
+            ## leaves out the snapshots and the profiler themselves
+            ignore = [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ]
+            allocations = self.after.filter_traces(ignore).compare_to(
+                self.before.filter_traces(ignore), "lineno"
+            )
+
+            summary += "\nlargest allocations:\n" + "\n".join(
+                str(allocation) for allocation in allocations[:TOP_ENTRIES]
+            )
+
+        return summary
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+
+        try:
+            if self.output_dir is None:
+                self.ctx.log(self.summary())
+                return
+
+            path = Path(self.output_dir) / self.ctx.step_run_id
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            self.profile.dump_stats(path.with_suffix(".prof"))
+            path.with_suffix(".txt").write_text(self.summary())
+        except Exception as e:
+            logger.error(
+                f"could not report the profile of step run {self.ctx.step_run_id}: {e}"
+            )
+
+
+def call_profiled(
+    task: Task[TWorkflowInput, R], ctx: Context, config: ClientConfig
+) -> R:
+    """Calls a sync task, profiling it if it's sampled. Called on the thread that runs it."""
+    profiler = TaskProfiler.sample(task, config, ctx)
+
+    if profiler is None:
+        return task.call(ctx)
+
+    try:
+        with profiler:
+            return task.call(ctx)
+    finally:
+        profiler.report()
+
+
+async def aio_call_profiled(
+    task: Task[TWorkflowInput, R], ctx: Context, config: ClientConfig
+) -> R:
+    """Calls an async task, profiling it if it's sampled."""
+    profiler = TaskProfiler.sample(task, config, ctx)
+
+    if profiler is None:
+        return await task.aio_call(ctx)
+
+    try:
+        with profiler:
+            return await task.aio_call(ctx)
+    finally:
+        ## summarizing a profile takes long enough to stall the loop
+        await asyncio.to_thread(profiler.report)
@@ -1,6 +1,5 @@
 import functools
 import logging
-from concurrent.futures import ThreadPoolExecutor
 from contextvars import ContextVar
 from io import StringIO
 from typing import Any, Awaitable, Callable, ItemsView, ParamSpec, TypeVar
@@ -37,25 +36,23 @@ class InjectingFilter(logging.Filter):
 class CustomLogHandler(logging.StreamHandler):  # type: ignore[type-arg]
     def __init__(self, event_client: EventClient, stream: StringIO | None = None):
         super().__init__(stream)
-        self.logger_thread_pool = ThreadPoolExecutor(max_workers=1)
         self.event_client = event_client
 
-    def _log(self, line: str, step_run_id: str | None) -> None:
-        try:
-            if not step_run_id:
-                return
-
-            self.event_client.log(message=line, step_run_id=step_run_id)
-        except Exception as e:
-            logger.error(f"Error logging: {e}")
-
     def emit(self, record: logging.LogRecord) -> None:
         super().emit(record)
 
-        log_entry = self.format(record)
-
         ## TODO: Change how we do this to not assign to the log record
-        self.logger_thread_pool.submit(self._log, log_entry, record.step_run_id)  # type: ignore
+        step_run_id: str | None = record.step_run_id  # type: ignore[attr-defined]
+
+        if not step_run_id:
+            return
+
+        try:
+            self.event_client.buffer_log(
+                message=self.format(record), step_run_id=step_run_id
+            )
+        except Exception as e:
+            logger.error(f"Error logging: {e}")
 
 
 def capture_logs(
@@ -5,12 +5,15 @@ import os
 import re
 import signal
 import sys
+import time
+from collections import abc
 from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
-from multiprocessing import Queue
+from functools import cached_property
 from multiprocessing.process import BaseProcess
 from types import FrameType
-from typing import Any, TypeVar, get_type_hints
+from typing import Any, TypeVar, get_args, get_origin, get_type_hints
 
 from aiohttp import web
 from aiohttp.web_request import Request
@@ -18,25 +21,49 @@ from aiohttp.web_response import Response
 from prometheus_client import Gauge, generate_latest
 from pydantic import BaseModel
 
+from hatchet_sdk.blob_store import BlobStore
 from hatchet_sdk.client import Client
-from hatchet_sdk.clients.dispatcher.action_listener import Action
+from hatchet_sdk.clients.dispatcher.action_listener import ActionRecord
 from hatchet_sdk.config import ClientConfig
 from hatchet_sdk.contracts.v1.workflows_pb2 import CreateWorkflowVersionRequest
 from hatchet_sdk.logger import logger
+from hatchet_sdk.runnables.contextvars import ctx_step_run_id
 from hatchet_sdk.runnables.task import Task
+from hatchet_sdk.runnables.types import ExecutorType
 from hatchet_sdk.runnables.workflow import BaseWorkflow
 from hatchet_sdk.utils.typing import WorkflowValidator, is_basemodel_subclass
 from hatchet_sdk.worker.action_listener_process import (
     ActionEvent,
+    ActionTimings,
+    WorkerActionListenerProcess,
     worker_action_listener_process,
 )
+from hatchet_sdk.worker.ipc import (
+    ActionCodec,
+    ActionEventCodec,
+    IPCChannel,
+    LocalChannel,
+    QueueChannel,
+    ShmRingChannel,
+)
+from hatchet_sdk.worker.latency import StepStage
+from hatchet_sdk.worker.loop_monitor import LoopLagMonitor
+from hatchet_sdk.worker.profiler import MAX_PROFILE_SECONDS, RunTag, StackSampler
+from hatchet_sdk.worker.runner.process_pool import (
+    check_process_task,
+    runs_in_process_pool,
+)
 from hatchet_sdk.worker.runner.run_loop_manager import (
     STOP_LOOP_TYPE,
     WorkerActionRunLoopManager,
 )
+from hatchet_sdk.worker.runner.runner import Runner
 
 T = TypeVar("T")
 
+## how often the worker deletes blobs older than `blob_store_retention`, in seconds
+BLOB_STORE_GC_INTERVAL = 60 * 60
+
 
 class WorkerStatus(Enum):
     INITIALIZED = 1
@@ -59,6 +86,22 @@ class HealthCheckResponse(BaseModel):
     python_version: str
 
 
+class InFlightRun(BaseModel):
+    run_id: str
+    runner: str
+    action_id: str | None
+    workflow_run_id: str | None
+    retry_count: int | None
+    ## since the action listener received it, in seconds
+    age: float | None
+    ## the state of its asyncio task, if it has one
+    task: str | None
+    ## the thread pool thread running it, if it's a sync task
+    thread: str | None
+    thread_alive: bool | None
+    cancelled: bool
+
+
 class Worker:
     def __init__(
         self,
@@ -70,6 +113,7 @@ class Worker:
         owned_loop: bool = True,
         handle_kill: bool = True,
         workflows: list[BaseWorkflow[Any]] = [],
+        executor: ExecutorType = ExecutorType.THREAD,
     ) -> None:
         self.config = config
         self.name = self.config.namespace + name
@@ -78,6 +122,7 @@ class Worker:
         self.labels = labels
         self.handle_kill = handle_kill
         self.owned_loop = owned_loop
+        self.executor = executor
 
         self.action_registry: dict[str, Task[Any, Any]] = {}
         self.durable_action_registry: dict[str, Task[Any, Any]] = {}
@@ -90,19 +135,20 @@ class Worker:
         self.action_listener_process: BaseProcess | None = None
         self.durable_action_listener_process: BaseProcess | None = None
 
+        ## only set in single process mode, where the listeners run on the worker's loop
+        self.action_listener: WorkerActionListenerProcess | None = None
+        self.durable_action_listener: WorkerActionListenerProcess | None = None
+
         self.action_listener_health_check: asyncio.Task[None]
+        self.blob_store_gc: asyncio.Task[None] | None = None
+        self.loop_lag_monitor: LoopLagMonitor | None = None
+        self.profiling = False
 
         self.action_runner: WorkerActionRunLoopManager | None = None
         self.durable_action_runner: WorkerActionRunLoopManager | None = None
 
         self.ctx = multiprocessing.get_context("spawn")
 
-        self.action_queue: "Queue[Action | STOP_LOOP_TYPE]" = self.ctx.Queue()
-        self.event_queue: "Queue[ActionEvent]" = self.ctx.Queue()
-
-        self.durable_action_queue: "Queue[Action | STOP_LOOP_TYPE]" = self.ctx.Queue()
-        self.durable_event_queue: "Queue[ActionEvent]" = self.ctx.Queue()
-
         self.loop: asyncio.AbstractEventLoop
 
         self.client = Client(config=self.config, debug=self.debug)
@@ -119,6 +165,62 @@ class Worker:
 
         self.register_workflows(workflows)
 
+    ## the channels to the action listeners are created when a listener or runner is started with
+    ## them, since a worker without durable tasks never uses the durable ones, and shm rings are large
+    @cached_property
+    def action_queue(self) -> IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE]:
+        return self._create_action_channel()
+
+    @cached_property
+    def event_queue(self) -> IPCChannel[ActionEvent | STOP_LOOP_TYPE]:
+        return self._create_event_channel()
+
+    @cached_property
+    def durable_action_queue(
+        self,
+    ) -> IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE]:
+        return self._create_action_channel()
+
+    @cached_property
+    def durable_event_queue(self) -> IPCChannel[ActionEvent | STOP_LOOP_TYPE]:
+        return self._create_event_channel()
+
+    def _close_channels(self) -> None:
+        for name in (
+            "action_queue",
+            "event_queue",
+            "durable_action_queue",
+            "durable_event_queue",
+        ):
+            channel: IPCChannel[Any] | None = self.__dict__.get(name)
+
+            if channel is not None:
+                channel.close()
+
+    def _create_action_channel(
+        self,
+    ) -> IPCChannel[ActionRecord | ActionTimings | STOP_LOOP_TYPE]:
+        if self.config.worker_single_process:
+            return LocalChannel()
+
+        if self.config.worker_ipc_transport == "shm":
+            return ShmRingChannel(
+                self.ctx, ActionCodec(), self.config.worker_ipc_buffer_size
+            )
+
+        return QueueChannel(self.ctx)
+
+    def _create_event_channel(self) -> IPCChannel[ActionEvent | STOP_LOOP_TYPE]:
+        if self.config.worker_single_process:
+            return LocalChannel()
+
+        if self.config.worker_ipc_transport == "shm":
+            return ShmRingChannel(
+                self.ctx, ActionEventCodec(), self.config.worker_ipc_buffer_size
+            )
+
+        return QueueChannel(self.ctx)
+
     def register_workflow_from_opts(self, opts: CreateWorkflowVersionRequest) -> None:
         try:
             self.client.admin.put_workflow(opts.name, opts)
@@ -133,6 +235,10 @@ class Worker:
         opts = workflow._get_create_opts(namespace)
         name = workflow._get_name(namespace)
 
+        for step in workflow.tasks:
+            if runs_in_process_pool(step, self.executor):
+                check_process_task(step)
+
         try:
             self.client.admin.put_workflow(name, opts)
         except Exception as e:
@@ -154,6 +260,18 @@ class Worker:
 
             return_type = get_type_hints(step.fn).get("return")
 
+            ## a batch task returns a list with an output (or an exception) per step run
+            if step.batch and get_origin(return_type) in (list, abc.Sequence):
+                return_type = next(
+                    (
+                        t
+                        for t in get_args(get_args(return_type)[0])
+                        or get_args(return_type)
+                        if is_basemodel_subclass(t)
+                    ),
+                    None,
+                )
+
             self.validator_registry[action_name] = WorkflowValidator(
                 workflow_input=workflow.config.input_validator,
                 step_output=return_type if is_basemodel_subclass(return_type) else None,
@@ -200,6 +318,83 @@ class Worker:
 
         return web.Response(body=generate_latest(), content_type="text/plain")
 
+    async def _debug_profile_handler(self, request: Request) -> Response:
+        try:
+            seconds = float(request.query.get("seconds", "10"))
+        except ValueError:
+            raise web.HTTPBadRequest(text="seconds must be a number")
+
+        output = request.query.get("format", "collapsed")
+
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            raise web.HTTPBadRequest(
+                text=f"seconds must be between 0 and {MAX_PROFILE_SECONDS}"
+            )
+
+        if output not in ("collapsed", "speedscope"):
+            raise web.HTTPBadRequest(text="format must be collapsed or speedscope")
+
+        ## samplers would sample each other, and double the overhead
+        if self.profiling:
+            raise web.HTTPConflict(text="the worker is already being profiled")
+
+        self.profiling = True
+        sampler = StackSampler(self._find_run)
+
+        try:
+            await sampler.aio_profile(seconds)
+        finally:
+            self.profiling = False
+
+        if output == "speedscope":
+            return web.json_response(sampler.speedscope())
+
+        return web.Response(text=sampler.collapsed(), content_type="text/plain")
+
+    async def _debug_tasks_handler(self, request: Request) -> Response:
+        now = time.time()
+        runs: list[InFlightRun] = []
+
+        for runner in self._runners():
+            for run_id in {*runner.tasks, *runner.threads, *runner.contexts}:
+                context = runner.contexts.get(run_id)
+                task = runner.tasks.get(run_id)
+                thread = runner.threads.get(run_id)
+                action = context.action if context else None
+                received_at = (
+                    action.timings.get(StepStage.RECEIVED)
+                    or action.timings.get(StepStage.DISPATCH)
+                    if action
+                    else None
+                )
+
+                runs.append(
+                    InFlightRun(
+                        run_id=run_id,
+                        runner=runner.name,
+                        action_id=action.action_id if action else None,
+                        workflow_run_id=action.workflow_run_id if action else None,
+                        retry_count=action.retry_count if action else None,
+                        age=round(now - received_at, 3) if received_at else None,
+                        task=(
+                            None
+                            if task is None
+                            else (
+                                "cancelled"
+                                if task.cancelled()
+                                else "done" if task.done() else "running"
+                            )
+                        ),
+                        thread=thread.name if thread else None,
+                        thread_alive=thread.is_alive() if thread else None,
+                        cancelled=context.exit_flag if context else False,
+                    )
+                )
+
+        runs.sort(key=lambda run: run.age or 0, reverse=True)
+
+        return web.json_response([run.model_dump() for run in runs])
+
     async def _start_health_server(self) -> None:
         port = self.config.healthcheck.port
 
@@ -211,6 +406,14 @@ class Worker:
             ]
         )
 
+        if self.config.healthcheck.debug_endpoints:
+            app.add_routes(
+                [
+                    web.get("/debug/profile", self._debug_profile_handler),
+                    web.get("/debug/tasks", self._debug_tasks_handler),
+                ]
+            )
+
         runner = web.AppRunner(app)
 
         try:
@@ -255,15 +458,43 @@ class Worker:
         if self.config.healthcheck.enabled:
             await self._start_health_server()
 
-        if self.has_any_non_durable:
-            self.action_listener_process = self._start_action_listener(is_durable=False)
-            self.action_runner = self._run_action_runner(is_durable=False)
+        if self.config.worker_single_process:
+            logger.debug("running action listeners on the worker's event loop")
+
+            if self.has_any_non_durable:
+                self.action_listener = self._start_local_action_listener(
+                    is_durable=False
+                )
+                self.action_runner = self._run_action_runner(is_durable=False)
+
+            if self.has_any_durable:
+                self.durable_action_listener = self._start_local_action_listener(
+                    is_durable=True
+                )
+                self.durable_action_runner = self._run_action_runner(is_durable=True)
+        else:
+            if self.has_any_non_durable:
+                self.action_listener_process = self._start_action_listener(
+                    is_durable=False
+                )
+                self.action_runner = self._run_action_runner(is_durable=False)
+
+            if self.has_any_durable:
+                self.durable_action_listener_process = self._start_action_listener(
+                    is_durable=True
+                )
+                self.durable_action_runner = self._run_action_runner(is_durable=True)
+
+        if self.config.worker_loop_lag_threshold is not None:
+            self.loop_lag_monitor = LoopLagMonitor(
+                self.loop, self.config.worker_loop_lag_threshold, self._find_step_run
+            )
+            self.loop_lag_monitor.start()
 
-        if self.has_any_durable:
-            self.durable_action_listener_process = self._start_action_listener(
-                is_durable=True
+        if self.config.blob_store is not None:
+            self.blob_store_gc = self.loop.create_task(
+                self._delete_expired_blobs(self.config.blob_store)
             )
-            self.durable_action_runner = self._run_action_runner(is_durable=True)
 
         self.action_listener_health_check = self.loop.create_task(
             self._check_listener_health()
@@ -271,13 +502,19 @@ class Worker:
 
         await self.action_listener_health_check
 
+        self._close_channels()
+
+    def _slots(self, is_durable: bool) -> int:
+        ## the same in every mode, and matching `GetActionListenerRequest`'s default
+        return 1_000 if is_durable else self.slots or 100
+
     def _run_action_runner(self, is_durable: bool) -> WorkerActionRunLoopManager:
         # Retrieve the shared queue
         return WorkerActionRunLoopManager(
             self.name + ("_durable" if is_durable else ""),
             self.durable_action_registry if is_durable else self.action_registry,
             self.validator_registry,
-            1_000 if is_durable else self.slots,
+            self._slots(is_durable),
             self.config,
             self.durable_action_queue if is_durable else self.action_queue,
             self.durable_event_queue if is_durable else self.event_queue,
@@ -285,6 +522,7 @@ class Worker:
             self.handle_kill,
             self.client.debug,
             self.labels,
+            self.executor,
         )
 
     def _start_action_listener(
@@ -300,7 +538,7 @@ class Worker:
                         if is_durable
                         else list(self.action_registry.keys())
                     ),
-                    1_000 if is_durable else self.slots,
+                    self._slots(is_durable),
                     self.config,
                     self.durable_action_queue if is_durable else self.action_queue,
                     self.durable_event_queue if is_durable else self.event_queue,
@@ -317,19 +555,58 @@ class Worker:
             logger.error(f"failed to start action listener: {e}")
             sys.exit(1)
 
+    def _start_local_action_listener(
+        self, is_durable: bool
+    ) -> WorkerActionListenerProcess:
+        listener = WorkerActionListenerProcess(
+            self.name + ("_durable" if is_durable else ""),
+            (
+                list(self.durable_action_registry.keys())
+                if is_durable
+                else list(self.action_registry.keys())
+            ),
+            self._slots(is_durable),
+            self.config,
+            self.durable_action_queue if is_durable else self.action_queue,
+            self.durable_event_queue if is_durable else self.event_queue,
+            self.handle_kill,
+            self.client.debug,
+            self.labels,
+            client=self.client,
+        )
+
+        self.loop.create_task(listener.start())
+
+        return listener
+
+    def _listeners_dead(self) -> bool:
+        if self.config.worker_single_process:
+            listeners = [
+                listener
+                for listener in [self.action_listener, self.durable_action_listener]
+                if listener
+            ]
+
+            return all(listener.killing for listener in listeners)
+
+        return bool(
+            (
+                not self.action_listener_process
+                and not self.durable_action_listener_process
+            )
+            or (
+                self.action_listener_process
+                and self.durable_action_listener_process
+                and not self.action_listener_process.is_alive()
+                and not self.durable_action_listener_process.is_alive()
+            )
+        )
+
     async def _check_listener_health(self) -> None:
         logger.debug("starting action listener health check...")
         try:
             while not self.killing:
-                if (
-                    not self.action_listener_process
-                    and not self.durable_action_listener_process
-                ) or (
-                    self.action_listener_process
-                    and self.durable_action_listener_process
-                    and not self.action_listener_process.is_alive()
-                    and not self.durable_action_listener_process.is_alive()
-                ):
+                if self._listeners_dead():
                     logger.debug("child action listener process killed...")
                     self._status = WorkerStatus.UNHEALTHY
                     if not self.killing:
@@ -341,6 +618,76 @@ class Worker:
         except Exception as e:
             logger.error(f"error checking listener health: {e}")
 
+    def _find_step_run(self, task: "asyncio.Task[Any]") -> str | None:
+        ## called from the loop monitor's watchdog thread, so the runner's tasks are copied before they're iterated
+        for manager in [self.action_runner, self.durable_action_runner]:
+            if manager and manager.runner:
+                for step_run_id, step_run_task in list(manager.runner.tasks.items()):
+                    if step_run_task is task:
+                        return step_run_id
+
+        return None
+
+    def _runners(self) -> list[Runner]:
+        return [
+            manager.runner
+            for manager in [self.action_runner, self.durable_action_runner]
+            if manager and manager.runner
+        ]
+
+    def _find_run(
+        self, thread_id: int, task: "asyncio.Task[Any] | None"
+    ) -> RunTag | None:
+        ## called from the profiler's thread, so the runner's dicts are copied before they're iterated
+        for runner in self._runners():
+            run_id: str | None = None
+
+            if task is None:
+                run_id = next(
+                    (
+                        run_id
+                        for run_id, thread in list(runner.threads.items())
+                        if thread.ident == thread_id
+                    ),
+                    None,
+                )
+            else:
+                ## tasks the step run's task created share its context, where it can be read (Python 3.12+)
+                get_context = getattr(task, "get_context", None)
+
+                if get_context is not None:
+                    run_id = get_context().get(ctx_step_run_id)
+
+                run_id = run_id or next(
+                    (
+                        run_id
+                        for run_id, run_task in list(runner.tasks.items())
+                        if run_task is task
+                    ),
+                    None,
+                )
+
+            context = runner.contexts.get(run_id) if run_id else None
+
+            if run_id and context is not None:
+                return RunTag(run_id, context.action.action_id)
+
+        return None
+
+    async def _delete_expired_blobs(self, blob_store: BlobStore) -> None:
+        ## the engine doesn't tell us when runs expire, so blobs are kept for the configured retention period
+        while not self.killing:
+            try:
+                cutoff = datetime.now(timezone.utc) - self.config.blob_store_retention
+                deleted = await asyncio.to_thread(blob_store.delete_older_than, cutoff)
+
+                if deleted:
+                    logger.debug(f"deleted {deleted} expired blobs")
+            except Exception as e:
+                logger.error(f"error deleting expired blobs: {e}")
+
+            await asyncio.sleep(BLOB_STORE_GC_INTERVAL)
+
     def _setup_signal_handlers(self) -> None:
         signal.signal(signal.SIGTERM, self._handle_exit_signal)
         signal.signal(signal.SIGINT, self._handle_exit_signal)
@@ -355,6 +702,23 @@ class Worker:
         logger.info("received SIGQUIT...")
         self.loop.create_task(self._exit_forcefully())
 
+    async def _pause_local_action_listeners(self) -> None:
+        ## a listener process pauses assignment from its own signal handler, one on our loop has to be told
+        for listener in [self.action_listener, self.durable_action_listener]:
+            if listener and listener.listener:
+                try:
+                    await listener.pause_task_assignment()
+                except Exception as e:
+                    logger.error(f"failed to pause task assignment: {e}")
+
+    async def _close_local_action_listeners(self) -> None:
+        for listener in [self.action_listener, self.durable_action_listener]:
+            if listener and not listener.killing:
+                await listener.cleanup()
+
+                if listener.event_send_loop_task:
+                    await listener.event_send_loop_task
+
     async def _close(self) -> None:
         logger.info(f"closing worker '{self.name}'...")
         self.killing = True
@@ -365,7 +729,17 @@ class Worker:
         if self.durable_action_runner is not None:
             self.durable_action_runner.cleanup()
 
-        await self.action_listener_health_check
+        if self.blob_store_gc is not None:
+            self.blob_store_gc.cancel()
+
+        if self.loop_lag_monitor is not None:
+            self.loop_lag_monitor.stop()
+
+        try:
+            await self.action_listener_health_check
+        finally:
+            ## the listener processes may still be using them, but they only lose the names of the shm rings
+            self._close_channels()
 
     async def exit_gracefully(self) -> None:
         logger.debug(f"gracefully stopping worker: {self.name}")
@@ -375,6 +749,8 @@ class Worker:
 
         self.killing = True
 
+        await self._pause_local_action_listeners()
+
         if self.action_runner:
             await self.action_runner.wait_for_tasks()
             await self.action_runner.exit_gracefully()
@@ -383,6 +759,8 @@ class Worker:
             await self.durable_action_runner.wait_for_tasks()
             await self.durable_action_runner.exit_gracefully()
 
+        await self._close_local_action_listeners()
+
         if self.action_listener_process and self.action_listener_process.is_alive():
             self.action_listener_process.kill()
 
@@ -404,6 +782,7 @@ class Worker:
         logger.debug(f"forcefully stopping worker: {self.name}")
 
         await self._close()
+        await self._close_local_action_listeners()
 
         if self.action_listener_process:
             self.action_listener_process.kill()
@@ -0,0 +1,195 @@
+import json
+import pickle
+from pathlib import Path
+from typing import cast
+
+import pytest
+from pydantic import BaseModel, ValidationError
+from pydantic_core import from_json
+
+from hatchet_sdk.blob_store import LocalBlobStore
+from hatchet_sdk.clients.dispatcher import action_listener
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    ActionPayload,
+    ActionRecord,
+    ActionType,
+)
+from hatchet_sdk.compression import compress_payload
+
+
+class CountingBlobStore(LocalBlobStore):
+    def __init__(self, root: str) -> None:
+        super().__init__(root)
+        self.reads: list[str] = []
+
+    def read(self, key: str) -> bytes:
+        self.reads.append(key)
+        return super().read(key)
+
+
+class Input(BaseModel):
+    n: int
+    name: str = "default"
+
+
+def payload(
+    blob_store: LocalBlobStore | None = None, **fields: object
+) -> ActionPayload:
+    return ActionPayload.from_raw(json.dumps(fields).encode(), blob_store)
+
+
+def test_fields_are_decoded_when_first_read() -> None:
+    p = payload(input={"n": 1}, parents={"step": {"out": 2}}, triggered_by="event")
+
+    assert "input" not in p.__dict__ and "parents" not in p.__dict__
+
+    assert p.input == {"n": 1}
+    assert "input" in p.__dict__ and "parents" not in p.__dict__
+
+    assert p.parents == {"step": {"out": 2}}
+    assert p.triggered_by == "event"
+
+
+def test_missing_fields_have_defaults() -> None:
+    p = ActionPayload()
+
+    assert p.input == {}
+    assert p.parents == {}
+    assert p.step_run_errors == {}
+    assert p.triggered_by is None
+
+
+def test_an_invalid_payload_fails_when_read() -> None:
+    p = ActionPayload.from_raw(b"not json")
+
+    with pytest.raises(ValueError):
+        p.input
+
+
+def test_compressed_fields_are_decompressed() -> None:
+    input = {"n": 1, "name": "x" * 1000}
+    p = ActionPayload.from_raw(
+        b'{"input": ' + compress_payload(json.dumps(input).encode(), 1) + b"}"
+    )
+
+    assert p.input == input
+    assert p.validate_input(Input) == Input.model_validate(input)
+
+
+def test_offloaded_fields_are_only_read_back_when_used(tmp_path: Path) -> None:
+    store = CountingBlobStore(str(tmp_path))
+    p = payload(
+        store,
+        input=json.loads(store.offload(b'{"n": 1}')),
+        parents={"step": json.loads(store.offload(b'{"out": 2}'))},
+    )
+
+    assert p.validate_input(Input) == Input(n=1)
+    assert len(store.reads) == 1
+
+    assert p.parents == {"step": {"out": 2}}
+    assert len(store.reads) == 2
+
+
+def test_the_span_attributes_have_the_decoded_input() -> None:
+    input = {"n": 1, "name": "x" * 1000}
+    action = ActionRecord(
+        worker_id="worker",
+        tenant_id="tenant",
+        workflow_run_id="workflow-run",
+        get_group_key_run_id="",
+        job_id="job",
+        job_name="job",
+        job_run_id="job-run",
+        step_id="step",
+        step_run_id="step-run",
+        action_id="workflow:step",
+        action_type=ActionType.START_STEP_RUN,
+        retry_count=0,
+        action_payload=ActionPayload.from_raw(
+            b'{"input": ' + compress_payload(json.dumps(input).encode(), 1) + b"}"
+        ),
+    )
+
+    assert (
+        json.loads(cast(str, action.otel_attributes["hatchet.action_payload"]))["input"]
+        == input
+    )
+
+
+def test_validate_input_does_not_decode_the_input_field() -> None:
+    p = payload(input={"n": 1})
+
+    assert p.validate_input(Input) == Input(n=1)
+    assert "input" not in p.__dict__
+
+
+def test_validate_input_validates_against_the_input_validator_alone() -> None:
+    with pytest.raises(ValidationError) as e:
+        payload(input={"name": "x"}).validate_input(Input)
+
+    assert e.value.title == "Input"
+
+
+def test_the_raw_payload_is_parsed_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    parsed: list[object] = []
+
+    def counting_from_json(data: str | bytes) -> object:
+        parsed.append(data)
+        return from_json(data)
+
+    monkeypatch.setattr(action_listener, "from_json", counting_from_json)
+    p = payload(input={"n": 1}, parents={"step": {"out": 2}}, triggered_by="event")
+
+    p.validate_input(Input)
+    p.input, p.parents, p.triggered_by, p.overrides
+
+    assert len(parsed) == 1
+
+
+def test_a_raw_payload_has_the_model_surface() -> None:
+    p = payload(input={"n": 1}, triggered_by="event", extra="kept")
+
+    assert p.model_dump() == {
+        "input": {"n": 1},
+        "parents": {},
+        "overrides": {},
+        "user_data": {},
+        "step_run_errors": {},
+        "triggered_by": "event",
+        "triggers": {},
+        "extra": "kept",
+    }
+    assert p == ActionPayload.model_validate(
+        {"input": {"n": 1}, "triggered_by": "event", "extra": "kept"}
+    )
+    assert ActionPayload.model_validate_json(p.model_dump_json()) == p
+    assert p.model_copy(update={"triggered_by": "cron"}).triggered_by == "cron"
+
+
+def test_validate_input_of_a_missing_input() -> None:
+    class Defaults(BaseModel):
+        name: str = "default"
+
+    assert payload().validate_input(Defaults) == Defaults()
+
+    with pytest.raises(ValueError):
+        payload().validate_input(Input)
+
+
+def test_validate_input_uses_an_already_decoded_input() -> None:
+    p = payload(input={"n": 1})
+
+    assert p.input == {"n": 1}
+    assert p.validate_input(Input) == Input(n=1)
+
+
+def test_only_the_raw_payload_is_pickled() -> None:
+    p = payload(input={"n": 1})
+    p.input
+
+    unpickled = pickle.loads(pickle.dumps(p))
+
+    assert unpickled.raw == p.raw
+    assert "input" not in unpickled.__dict__
+    assert unpickled.input == {"n": 1}
@@ -0,0 +1,93 @@
+import pickle
+from typing import Any, cast
+
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    Action,
+    ActionPayload,
+    ActionRecord,
+    ActionType,
+)
+from hatchet_sdk.context.context import Context
+from hatchet_sdk.worker.latency import StepStage, mark
+
+FIELDS: dict[str, Any] = {
+    "worker_id": "worker",
+    "tenant_id": "tenant",
+    "workflow_run_id": "workflow-run",
+    "get_group_key_run_id": "",
+    "job_id": "job",
+    "job_name": "job",
+    "job_run_id": "job-run",
+    "step_id": "step",
+    "step_run_id": "step-run",
+    "action_id": "workflow:step",
+    "action_type": ActionType.START_STEP_RUN,
+    "retry_count": 1,
+}
+
+
+def context(action: Action | ActionRecord) -> Context:
+    ## the clients are never used by the context's action
+    unused = cast(Any, None)
+
+    return Context(action, unused, unused, unused, unused, None, None, unused, unused)
+
+
+def record() -> ActionRecord:
+    return ActionRecord(
+        **FIELDS,
+        action_payload=ActionPayload.from_raw(b'{"input": {"n": 1}}'),
+        raw_additional_metadata='{"source": "test"}',
+    )
+
+
+def test_a_context_exposes_its_record_as_an_action() -> None:
+    ctx = context(record())
+
+    ## read straight off the record, without building the action
+    assert ctx.retry_count == 1
+    assert ctx.additional_metadata == {"source": "test"}
+    assert "_action" in vars(ctx) and isinstance(vars(ctx)["_action"], ActionRecord)
+
+    action = ctx.action
+
+    assert isinstance(action, Action)
+    assert action.model_dump()["additional_metadata"] == {"source": "test"}
+    assert action.model_dump()["action_payload"]["input"] == {"n": 1}
+    assert ctx.action is action
+
+
+def test_stages_marked_on_a_contexts_action_show_on_its_record() -> None:
+    assigned = record()
+    ctx = context(assigned)
+
+    mark(ctx.action, StepStage.EXECUTOR_QUEUE)
+
+    assert StepStage.EXECUTOR_QUEUE in assigned.timings
+    assert "timings" not in ctx.action.model_dump()
+
+
+def test_an_action_can_be_built_and_assigned_to() -> None:
+    action = Action(
+        **FIELDS,
+        action_payload=ActionPayload(input={"n": 1}),
+        additional_metadata={"source": "test"},
+    )
+    ctx = context(action)
+
+    assert ctx.additional_metadata == {"source": "test"}
+
+    ctx.action.additional_metadata = {"source": "changed"}
+
+    assert ctx.additional_metadata == {"source": "changed"}
+    assert ctx.input == {"n": 1}
+
+
+def test_a_record_pickles_as_its_constructor_arguments() -> None:
+    assigned = record()
+    assigned.timings[StepStage.RECEIVED] = 1.5
+
+    unpickled = pickle.loads(pickle.dumps(assigned))
+
+    assert unpickled == assigned
+    assert unpickled.additional_metadata == {"source": "test"}
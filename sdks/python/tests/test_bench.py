@@ -0,0 +1,149 @@
+import asyncio
+from typing import Any, cast
+
+import pytest
+
+from hatchet_sdk.bench import LatencyHistogram, LoadGenerator, _summary
+from hatchet_sdk.client import Client
+from hatchet_sdk.clients.admin import WorkflowRunTriggerConfig
+
+
+class Ref:
+    def __init__(self, workflow_run_id: str, takes: float, fails: bool) -> None:
+        self.workflow_run_id = workflow_run_id
+        self.takes = takes
+        self.fails = fails
+
+    async def aio_result(self) -> dict[str, Any]:
+        await asyncio.sleep(self.takes)
+
+        if self.fails:
+            raise RuntimeError("run failed")
+
+        return {}
+
+
+class Admin:
+    """Stands in for the admin client, with runs that take `takes` seconds to finish."""
+
+    def __init__(self, takes: float = 0, fails: bool = False) -> None:
+        self.takes = takes
+        self.fails = fails
+        self.triggers: list[int] = []
+
+    def _ref(self) -> Ref:
+        return Ref(f"run-{len(self.triggers)}", self.takes, self.fails)
+
+    async def aio_run_workflow(self, workflow_name: str, *args: Any) -> Ref:
+        self.triggers.append(1)
+
+        return self._ref()
+
+    async def aio_run_workflows(
+        self, workflows: list[WorkflowRunTriggerConfig]
+    ) -> list[Ref]:
+        self.triggers.append(len(workflows))
+
+        return [self._ref() for _ in workflows]
+
+
+class FakeClient:
+    def __init__(self, admin: Admin) -> None:
+        self.admin = admin
+
+
+def generator(admin: Admin, **kwargs: Any) -> LoadGenerator:
+    return LoadGenerator(cast(Client, FakeClient(admin)), "workflow", **kwargs)
+
+
+def test_percentiles_are_within_1_percent() -> None:
+    histogram = LatencyHistogram()
+
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.min == 1000
+    assert histogram.max == 1_000_000
+
+    for p in (50, 90, 99):
+        assert histogram.percentile(p) == pytest.approx(p * 10_000, rel=0.01)
+
+    assert histogram.percentile(100) == histogram.max
+
+
+def test_merged_histograms_count_both() -> None:
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(0.001)
+    second.record(0.002)
+
+    first.merge(second)
+
+    assert (first.count, first.min, first.max) == (2, 1000, 2000)
+    assert first.to_dict()["buckets"] == [(1000, 1), (2000, 1)]
+
+
+def test_an_empty_histogram_only_has_a_count() -> None:
+    assert LatencyHistogram().to_dict() == {"count": 0}
+
+
+async def test_runs_are_triggered_at_the_rate_and_waited_on() -> None:
+    admin = Admin(takes=0.01)
+
+    result = await generator(admin, rate=100, duration=0.2).run()
+
+    assert admin.triggers == [1] * 20
+    assert (result.triggered, result.completed, result.failed) == (20, 20, 0)
+    assert result.trigger.count == 20
+    assert result.result.count == 20
+
+    ## a result is measured from when its run was scheduled, so it takes at least the run's time
+    assert result.result.min is not None and result.result.min >= 10_000
+
+
+async def test_bulk_triggers_send_bulk_size_runs_at_a_time() -> None:
+    admin = Admin()
+
+    result = await generator(admin, rate=100, duration=0.2, bulk_size=5).run()
+
+    assert admin.triggers == [5] * 4
+    assert result.completed == 20
+
+
+async def test_failed_runs_are_counted_but_not_timed() -> None:
+    result = await generator(Admin(fails=True), rate=100, duration=0.1).run()
+
+    assert (result.completed, result.failed) == (0, 10)
+    assert result.result.count == 0
+    assert sum(interval.failed for interval in result.timeline) == 10
+
+
+async def test_runs_in_the_warmup_are_not_counted() -> None:
+    admin = Admin()
+
+    result = await generator(admin, rate=100, duration=0.1, warmup=0.1).run()
+
+    assert len(admin.triggers) == 20
+    assert result.triggered == 10
+
+
+async def test_arrivals_over_max_in_flight_are_dropped() -> None:
+    result = await generator(
+        Admin(takes=1), rate=100, duration=0.1, max_in_flight=4
+    ).run()
+
+    assert (result.triggered, result.dropped) == (4, 6)
+
+
+async def test_results_can_be_exported_and_summarized() -> None:
+    result = await generator(Admin(), rate=100, duration=0.1).run()
+
+    exported = result.to_dict()
+
+    assert exported["completed"] == 10
+    assert exported["result_latency"]["count"] == 10
+    assert sum(second["completed"] for second in exported["timeline"]) == 10
+
+    assert _summary(result).startswith(
+        "workflow: 10 triggered, 10 completed, 0 failed, 0 trigger errors, 0 dropped"
+    )
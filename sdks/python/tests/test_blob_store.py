@@ -0,0 +1,119 @@
+import json
+import pickle
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from hatchet_sdk.blob_store import (
+    BlobNotFoundError,
+    LocalBlobStore,
+    get_blob_store,
+    resolve_blob_reference,
+)
+
+
+class CountingBlobStore(LocalBlobStore):
+    def __init__(self, root: str, cache_bytes: int = 1024) -> None:
+        super().__init__(root, cache_bytes)
+        self.reads: list[str] = []
+
+    def read(self, key: str) -> bytes:
+        self.reads.append(key)
+        return super().read(key)
+
+
+def key(store: LocalBlobStore, data: bytes) -> str:
+    ## offloads `data`, returning the key of its blob
+    return str(json.loads(store.offload(data))["hatchet__blob"])
+
+
+def test_offloaded_blobs_are_read_back(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+
+    assert store.get(key(store, b"data")) == b"data"
+
+
+def test_blobs_are_keyed_by_the_day_they_were_written(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+
+    assert key(store, b"data").startswith(f"{datetime.now(timezone.utc):%Y/%m/%d}/")
+
+
+def test_reads_are_cached(tmp_path: Path) -> None:
+    store = CountingBlobStore(str(tmp_path))
+    k = key(store, b"data")
+
+    assert store.get(k) == store.get(k) == b"data"
+    assert store.reads == [k]
+
+
+def test_the_least_recently_read_blobs_are_evicted(tmp_path: Path) -> None:
+    store = CountingBlobStore(str(tmp_path), cache_bytes=10)
+    first, second = key(store, b"x" * 5), key(store, b"y" * 5)
+
+    store.get(first)
+    store.get(second)
+    store.get(first)
+    ## over the cache's size, so the least recently read (second) is evicted
+    store.get(key(store, b"z" * 5))
+
+    assert list(store.cache) == [first, store.reads[-1]]
+    assert store.cached_bytes == 10
+
+
+def test_blobs_bigger_than_the_cache_arent_cached(tmp_path: Path) -> None:
+    store = CountingBlobStore(str(tmp_path), cache_bytes=4)
+    k = key(store, b"data!")
+
+    store.get(k)
+    store.get(k)
+
+    assert store.reads == [k, k]
+    assert store.cached_bytes == 0
+
+
+def test_a_pickled_store_leaves_its_cache_behind(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+    k = key(store, b"data")
+    store.get(k)
+
+    unpickled = pickle.loads(pickle.dumps(store))
+
+    assert unpickled.cache == {}
+    assert unpickled.get(k) == b"data"
+
+
+def test_reading_a_missing_blob_fails(tmp_path: Path) -> None:
+    with pytest.raises(BlobNotFoundError):
+        LocalBlobStore(str(tmp_path)).get("2024/01/01/missing")
+
+
+def test_old_blobs_are_deleted(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+    store.put("2024/01/01/old", b"old")
+    store.put("2024/01/02/old", b"old")
+    k = key(store, b"new")
+
+    assert store.delete_older_than(datetime.now(timezone.utc) - timedelta(days=1)) == 2
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [k.split("/")[0]]
+    assert store.get(k) == b"new"
+
+
+def test_stores_are_created_from_urls(tmp_path: Path) -> None:
+    store = get_blob_store(f"file://{tmp_path}")
+
+    assert isinstance(store, LocalBlobStore)
+    assert store.root == str(tmp_path)
+
+    with pytest.raises(ValueError):
+        get_blob_store("ftp://host/path")
+
+
+def test_only_blob_references_are_resolved(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+
+    assert resolve_blob_reference({"hatchet__blob": "key"}, store) is None
+    assert resolve_blob_reference({"hatchet__blob": 1, "size": 1}, store) is None
+    assert resolve_blob_reference({"key": "value"}, store) is None
@@ -0,0 +1,180 @@
+from datetime import datetime
+from typing import Any, cast
+
+import grpc
+import pytest
+import tenacity
+
+from hatchet_sdk.blob_store import BlobStore
+from hatchet_sdk.clients.bulk import (
+    BulkRequestError,
+    aio_send_chunked,
+    chunk_indices,
+    item_bytes,
+    retry_not_applied,
+    send_chunked,
+)
+from hatchet_sdk.clients.events import EventClient
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.contracts.events_pb2 import PushEventRequest
+
+
+def events(*sizes: int) -> list[PushEventRequest]:
+    return [PushEventRequest(key="k", payload="x" * size) for size in sizes]
+
+
+def test_chunk_indices_of_nothing() -> None:
+    assert chunk_indices([], max_bytes=100) == []
+
+
+def test_chunk_indices_caps_items_per_chunk() -> None:
+    assert chunk_indices(events(*[1] * 5), max_bytes=10_000, max_items=2) == [
+        range(0, 2),
+        range(2, 4),
+        range(4, 5),
+    ]
+
+
+def test_chunk_indices_caps_bytes_per_chunk() -> None:
+    items = events(100, 100, 100, 100)
+    size = item_bytes(items[0])
+
+    chunks = chunk_indices(items, max_bytes=2 * size)
+
+    assert chunks == [range(0, 2), range(2, 4)]
+
+
+def test_chunk_indices_keeps_an_oversized_item_on_its_own() -> None:
+    items = events(10, 1000, 10)
+
+    chunks = chunk_indices(items, max_bytes=item_bytes(items[0]) * 2)
+
+    assert chunks == [range(0, 1), range(1, 2), range(2, 3)]
+
+
+def test_send_chunked_returns_results_in_input_order() -> None:
+    items = events(*[50] * 10)
+
+    results = send_chunked(
+        items,
+        lambda chunk: [len(item.payload) for item in chunk],
+        max_bytes=item_bytes(items[0]) * 3,
+        max_in_flight=4,
+    )
+
+    assert results == [50] * 10
+
+
+def test_a_request_that_fits_is_sent_as_is() -> None:
+    items = events(1, 2)
+
+    def send(chunk: list[PushEventRequest]) -> list[int]:
+        raise RuntimeError("unavailable")
+
+    ## its error is raised unchanged, rather than as a `BulkRequestError`
+    with pytest.raises(RuntimeError):
+        send_chunked(items, send, max_bytes=10_000, max_in_flight=2)
+
+
+def test_send_chunked_reports_the_items_of_failed_chunks() -> None:
+    items = events(1, 2, 3, 4)
+
+    def send(chunk: list[PushEventRequest]) -> list[int]:
+        if any(len(item.payload) == 3 for item in chunk):
+            raise RuntimeError("unavailable")
+
+        return [len(item.payload) for item in chunk]
+
+    with pytest.raises(BulkRequestError) as e:
+        send_chunked(items, send, max_bytes=item_bytes(items[3]) * 2, max_in_flight=2)
+
+    assert e.value.results == [1, 2, None, None]
+    assert e.value.failed_indices == [2, 3]
+
+
+async def test_aio_send_chunked_checks_each_chunks_results() -> None:
+    items = events(1, 2, 3, 4)
+
+    async def send(chunk: list[PushEventRequest]) -> list[int]:
+        return [len(item.payload) for item in chunk][:1]
+
+    with pytest.raises(BulkRequestError) as e:
+        await aio_send_chunked(
+            items, send, max_bytes=item_bytes(items[3]) * 2, max_in_flight=2
+        )
+
+    assert e.value.failed_indices == [0, 1, 2, 3]
+
+
+class Failure(grpc.RpcError):
+    def __init__(self, code: grpc.StatusCode) -> None:
+        self._code = code
+
+    def code(self) -> grpc.StatusCode:
+        return self._code
+
+
+def failing_chunk(*codes: grpc.StatusCode) -> Any:
+    calls: list[int] = []
+
+    @retry_not_applied
+    def send(chunk: list[PushEventRequest]) -> list[int]:
+        calls.append(len(chunk))
+
+        if len(calls) <= len(codes):
+            raise Failure(codes[len(calls) - 1])
+
+        return [len(item.payload) for item in chunk]
+
+    return cast(Any, send).retry_with(wait=tenacity.wait_none()), calls
+
+
+def test_a_chunk_that_was_not_applied_is_retried() -> None:
+    send, calls = failing_chunk(
+        grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED
+    )
+
+    assert send_chunked(events(1, 2), send, max_bytes=10_000, max_in_flight=2) == [
+        1,
+        2,
+    ]
+    assert calls == [2, 2, 2]
+
+
+def test_a_chunk_that_may_have_been_applied_is_reported_rather_than_retried() -> None:
+    send, calls = failing_chunk(grpc.StatusCode.DEADLINE_EXCEEDED)
+    items = events(1, 2)
+
+    with pytest.raises(BulkRequestError) as e:
+        send_chunked(items, send, max_bytes=item_bytes(items[1]), max_in_flight=1)
+
+    assert calls == [1, 1]
+    assert e.value.results == [None, 2]
+    assert e.value.failed_indices == [0]
+
+
+class UnreachableBlobStore(BlobStore):
+    def put(self, key: str, data: bytes) -> None:
+        raise ConnectionError("unreachable")
+
+    def read(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def delete_older_than(self, cutoff: datetime) -> int:
+        raise NotImplementedError
+
+
+def test_only_serialization_errors_are_reported_as_encoding_errors() -> None:
+    events = EventClient(
+        cast(Any, None),
+        ClientConfig(
+            token="token",
+            tenant_id="tenant",
+            host_port="localhost:7077",
+            blob_store=UnreachableBlobStore(),
+            blob_offload_threshold=1,
+        ),
+    )
+
+    with pytest.raises(ConnectionError):
+        events._encode_payload({"n": 1})
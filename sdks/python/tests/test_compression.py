@@ -0,0 +1,31 @@
+import base64
+import json
+import os
+
+from hatchet_sdk.compression import compress_payload, decompressed_payload
+
+DATA = json.dumps({"rows": [{"id": i, "name": "row"} for i in range(200)]}).encode()
+
+
+def test_small_payloads_are_not_compressed() -> None:
+    assert compress_payload(DATA, None) == DATA
+    assert compress_payload(DATA, len(DATA) + 1) == DATA
+
+
+def test_compressed_payload_round_trip() -> None:
+    compressed = compress_payload(DATA, 1)
+
+    assert len(compressed) < len(DATA)
+    assert decompressed_payload(json.loads(compressed)) == DATA
+
+
+def test_incompressible_payloads_are_sent_as_is() -> None:
+    data = json.dumps(base64.b64encode(os.urandom(4096)).decode()).encode()
+
+    assert compress_payload(data, 1) == data
+
+
+def test_plain_payloads_are_not_decompressed() -> None:
+    assert decompressed_payload({"hatchet__compressed": "zlib"}) is None
+    assert decompressed_payload({"hatchet__compressed": "zlib", "data": 1}) is None
+    assert decompressed_payload(json.loads(DATA)) is None
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import grpc
+import pytest
+from prometheus_client import REGISTRY
+
+from hatchet_sdk.clients.dispatcher import action_listener
+from hatchet_sdk.clients.dispatcher.action_listener import ActionListener
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.connection import (
+    ChannelRegistry,
+    LoopBoundChannel,
+    evict_conn,
+    shared_conn,
+)
+from hatchet_sdk.contracts.dispatcher_pb2_grpc import DispatcherStub
+
+config = ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+
+
+def open_aio_channels() -> float | None:
+    return REGISTRY.get_sample_value("hatchet_grpc_channels_open", {"kind": "aio"})
+
+
+def test_channels_of_a_closed_loop_are_closed_and_no_longer_counted() -> None:
+    before = open_aio_channels()
+
+    async def connect() -> grpc.aio.Channel:
+        return shared_conn(config, True)
+
+    loop = asyncio.new_event_loop()
+    channel = loop.run_until_complete(connect())
+
+    assert open_aio_channels() == (before or 0) + 1
+
+    loop.close()
+
+    assert open_aio_channels() == before
+    assert channel._channel.closed()  # type: ignore[attr-defined]
+
+
+def test_an_evicted_sync_channel_is_rebuilt() -> None:
+    registry = ChannelRegistry()
+    channel = registry.get(config, aio=False)
+
+    assert registry.get(config, aio=False) is channel
+
+    registry.evict(config, aio=False)
+
+    assert registry.get(config, aio=False) is not channel
+    assert registry.open_channels(aio=False) == 1
+
+
+async def test_loop_bound_channels_move_to_the_rebuilt_channel() -> None:
+    bound = LoopBoundChannel(config)
+    stub = bound.stub(DispatcherStub)
+
+    assert bound.stub(DispatcherStub) is stub
+
+    evict_conn(config, True)
+
+    assert bound.stub(DispatcherStub) is not stub
+    assert bound.channel is shared_conn(config, True)
+
+
+async def test_the_action_listener_reconnects_on_a_new_channel(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def no_backoff(*args: object) -> None:
+        pass
+
+    monkeypatch.setattr(action_listener, "exp_backoff_sleep", no_backoff)
+
+    listener = ActionListener(config, "worker")
+    listener.listen_strategy = "v1"
+
+    ## the first connection uses the channel the other clients share
+    shared = shared_conn(config, True)
+    (await listener.get_listen_client()).cancel()
+
+    assert shared_conn(config, True) is shared
+
+    listener.retries = 1
+    listener.last_connection_attempt = time.time()
+    (await listener.get_listen_client()).cancel()
+
+    assert shared_conn(config, True) is not shared
@@ -0,0 +1,196 @@
+import threading
+from collections.abc import Iterator
+from typing import Any, cast
+
+import pytest
+
+from hatchet_sdk.clients.event_producer import (
+    EventBufferFullError,
+    EventProducer,
+    EventProducerClosedError,
+)
+from hatchet_sdk.clients.events import EventClient
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.contracts.events_pb2 import BulkPushEventRequest, Event, Events
+from hatchet_sdk.contracts.events_pb2_grpc import EventsServiceStub
+
+
+class EventsService:
+    """Stands in for the engine's events service, holding bulk pushes until `released` is set."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.released = threading.Event()
+        self.released.set()
+        self.pushed: list[list[str]] = []
+
+    def BulkPush(self, request: BulkPushEventRequest, metadata: Any) -> Events:
+        self.released.wait(5)
+
+        if self.fail:
+            raise RuntimeError("engine unavailable")
+
+        self.pushed.append([event.key for event in request.events])
+
+        return Events(
+            events=[Event(eventId=f"id-{event.key}") for event in request.events]
+        )
+
+
+@pytest.fixture
+def service() -> EventsService:
+    return EventsService()
+
+
+@pytest.fixture
+def client(service: EventsService) -> EventClient:
+    return EventClient(
+        cast(EventsServiceStub, service),
+        ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077"),
+    )
+
+
+@pytest.fixture
+def producers() -> Iterator[list[EventProducer]]:
+    created: list[EventProducer] = []
+
+    yield created
+
+    for producer in created:
+        producer.close(timeout=5)
+
+
+def producer(
+    client: EventClient, producers: list[EventProducer], **kwargs: Any
+) -> EventProducer:
+    producers.append(client.producer(**kwargs))
+
+    return producers[-1]
+
+
+def test_events_sent_together_are_pushed_in_one_batch(
+    client: EventClient, service: EventsService, producers: list[EventProducer]
+) -> None:
+    p = producer(client, producers, linger_ms=100)
+
+    futures = [p.send(f"key-{i}", {"i": i}) for i in range(5)]
+
+    assert [f.result(timeout=5).eventId for f in futures] == [
+        f"id-key-{i}" for i in range(5)
+    ]
+    assert service.pushed == [[f"key-{i}" for i in range(5)]]
+
+
+def test_batches_are_capped_at_max_batch(
+    client: EventClient, service: EventsService, producers: list[EventProducer]
+) -> None:
+    p = producer(client, producers, max_batch=2, linger_ms=100, max_in_flight=1)
+
+    for i in range(5):
+        p.send(f"key-{i}", {})
+
+    p.flush(timeout=5)
+
+    assert [len(batch) for batch in service.pushed] == [2, 2, 1]
+
+
+def test_a_full_buffer_drops_new_events(
+    client: EventClient, service: EventsService, producers: list[EventProducer]
+) -> None:
+    service.released.clear()
+    p = producer(client, producers, linger_ms=0, max_buffer_bytes=1, on_full="drop")
+
+    first = p.send("first", {})
+    dropped = p.send("dropped", {})
+
+    with pytest.raises(EventBufferFullError):
+        dropped.result(timeout=5)
+
+    service.released.set()
+
+    assert first.result(timeout=5).eventId == "id-first"
+    assert service.pushed == [["first"]]
+
+
+def test_a_full_buffer_blocks_until_the_timeout(
+    client: EventClient, service: EventsService, producers: list[EventProducer]
+) -> None:
+    service.released.clear()
+    p = producer(client, producers, max_buffer_bytes=1, block_timeout=0.05)
+
+    p.send("first", {})
+
+    with pytest.raises(EventBufferFullError):
+        p.send("blocked", {})
+
+    service.released.set()
+
+
+def test_a_full_buffer_blocks_until_there_is_room(
+    client: EventClient, service: EventsService, producers: list[EventProducer]
+) -> None:
+    service.released.clear()
+    p = producer(client, producers, linger_ms=0, max_buffer_bytes=1)
+
+    p.send("first", {})
+
+    second = threading.Thread(target=p.send, args=("second", {}))
+    second.start()
+    second.join(0.1)
+
+    ## held back until the first event has been pushed
+    assert second.is_alive()
+
+    service.released.set()
+    second.join(5)
+    p.flush(timeout=5)
+
+    assert service.pushed == [["first"], ["second"]]
+
+
+def test_a_failed_push_fails_its_events(
+    client: EventClient, service: EventsService, producers: list[EventProducer]
+) -> None:
+    service.fail = True
+    p = producer(client, producers)
+
+    future = p.send("key", {})
+
+    with pytest.raises(RuntimeError, match="engine unavailable"):
+        future.result(timeout=5)
+
+    ## a failed push still frees its room in the buffer
+    p.flush(timeout=5)
+    assert p.buffered_bytes == 0
+
+
+def test_events_sent_after_closing_fail(client: EventClient) -> None:
+    p = client.producer()
+    p.close(timeout=5)
+
+    with pytest.raises(EventProducerClosedError):
+        p.send("key", {})
+
+
+async def test_aio_send_resolves_to_the_pushed_event(
+    client: EventClient, producers: list[EventProducer]
+) -> None:
+    p = producer(client, producers)
+
+    assert (await p.aio_send("key", {})).eventId == "id-key"
+
+
+def test_the_producer_is_a_context_manager(
+    client: EventClient, service: EventsService
+) -> None:
+    with client.producer(linger_ms=10_000) as p:
+        future = p.send("key", {})
+
+    ## closing it flushes the buffered events
+    assert future.done()
+    assert service.pushed == [["key"]]
+
+
+def test_an_invalid_max_batch_is_rejected(client: EventClient) -> None:
+    with pytest.raises(ValueError):
+        EventProducer(client, max_batch=0)
@@ -0,0 +1,257 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import grpc
+import pytest
+
+from hatchet_sdk.contracts import events_pb2 as event_protos
+from hatchet_sdk.contracts import workflows_pb2 as v0_workflow_protos
+from hatchet_sdk.contracts.dispatcher_pb2 import (
+    STEP_EVENT_TYPE_COMPLETED,
+    STEP_EVENT_TYPE_FAILED,
+    STEP_EVENT_TYPE_STARTED,
+    AssignedAction,
+    StepActionEvent,
+    StepActionEventType,
+    SubscribeToWorkflowRunsRequest,
+    WorkerListenRequest,
+    WorkerRegisterRequest,
+)
+from hatchet_sdk.contracts.dispatcher_pb2_grpc import DispatcherStub
+from hatchet_sdk.contracts.events_pb2_grpc import EventsServiceStub
+from hatchet_sdk.contracts.v1 import workflows_pb2 as workflow_protos
+from hatchet_sdk.contracts.v1.workflows_pb2_grpc import AdminServiceStub
+from hatchet_sdk.contracts.workflows_pb2_grpc import WorkflowServiceStub
+from hatchet_sdk.testing import FakeEngine
+
+
+class Worker:
+    """Talks to the engine the way a worker does, over the dispatcher service."""
+
+    def __init__(self, channel: grpc.Channel, actions: list[str], slots: int) -> None:
+        self.dispatcher = DispatcherStub(channel)  # type: ignore[no-untyped-call]
+        self.id = self.dispatcher.Register(
+            WorkerRegisterRequest(workerName="worker", actions=actions, maxRuns=slots)
+        ).workerId
+        self.actions: Iterator[AssignedAction] = self.dispatcher.ListenV2(
+            WorkerListenRequest(workerId=self.id)
+        )
+
+    def next_action(self) -> tuple[AssignedAction, dict[str, Any]]:
+        action = next(self.actions)
+
+        return action, json.loads(action.actionPayload)
+
+    def send(
+        self, action: AssignedAction, event_type: StepActionEventType, payload: Any
+    ) -> None:
+        self.dispatcher.SendStepActionEvent(
+            StepActionEvent(
+                workerId=self.id,
+                jobId=action.jobId,
+                jobRunId=action.jobRunId,
+                stepId=action.stepId,
+                stepRunId=action.stepRunId,
+                actionId=action.actionId,
+                eventType=event_type,
+                eventPayload=json.dumps(payload),
+            )
+        )
+
+    def complete(self, action: AssignedAction, output: Any) -> None:
+        self.send(action, STEP_EVENT_TYPE_STARTED, {})
+        self.send(action, STEP_EVENT_TYPE_COMPLETED, output)
+
+
+@pytest.fixture
+def engine() -> Iterator[FakeEngine]:
+    with FakeEngine() as engine:
+        yield engine
+
+
+@pytest.fixture
+def channel(engine: FakeEngine) -> Iterator[grpc.Channel]:
+    with grpc.insecure_channel(engine.host_port) as channel:
+        yield channel
+
+
+def register(
+    channel: grpc.Channel,
+    name: str,
+    tasks: dict[str, list[str]],
+    retries: int = 0,
+    event_triggers: list[str] = [],
+) -> None:
+    AdminServiceStub(channel).PutWorkflow(  # type: ignore[no-untyped-call]
+        workflow_protos.CreateWorkflowVersionRequest(
+            name=name,
+            tasks=[
+                workflow_protos.CreateTaskOpts(
+                    readable_id=task,
+                    action=f"{name}:{task}",
+                    parents=parents,
+                    retries=retries,
+                )
+                for task, parents in tasks.items()
+            ],
+            event_triggers=event_triggers,
+        )
+    )
+
+
+def trigger(channel: grpc.Channel, name: str, input: Any) -> str:
+    response = WorkflowServiceStub(channel).TriggerWorkflow(  # type: ignore[no-untyped-call]
+        v0_workflow_protos.TriggerWorkflowRequest(name=name, input=json.dumps(input))
+    )
+
+    return str(response.workflow_run_id)
+
+
+def statuses(engine: FakeEngine, run_id: str) -> dict[str, str]:
+    async def read() -> dict[str, str]:
+        run = engine.workflow_runs[run_id]
+
+        return {task: step_run.status for task, step_run in run.step_runs.items()}
+
+    return engine.call(read).result()
+
+
+def test_a_dags_tasks_run_once_their_parents_have_completed(
+    engine: FakeEngine, channel: grpc.Channel
+) -> None:
+    register(channel, "dag", {"first": [], "second": ["first"]})
+    worker = Worker(channel, ["dag:first", "dag:second"], slots=10)
+
+    run_id = trigger(channel, "dag", {"n": 1})
+
+    first, payload = worker.next_action()
+    assert (first.workflowRunId, first.stepId) == (run_id, "first")
+    assert payload["input"] == {"n": 1}
+    assert statuses(engine, run_id) == {"first": "assigned"}
+
+    worker.complete(first, {"out": 1})
+
+    second, payload = worker.next_action()
+    assert second.stepId == "second"
+    assert payload["parents"] == {"first": {"out": 1}}
+
+    worker.complete(second, {"out": 2})
+    engine.wait_for_runs([run_id], timeout=5)
+
+    assert statuses(engine, run_id) == {"first": "completed", "second": "completed"}
+
+
+def test_run_results_are_streamed_to_subscribers(
+    engine: FakeEngine, channel: grpc.Channel
+) -> None:
+    register(channel, "single", {"task": []})
+    worker = Worker(channel, ["single:task"], slots=10)
+    run_id = trigger(channel, "single", {})
+
+    results = DispatcherStub(channel).SubscribeToWorkflowRuns(  # type: ignore[no-untyped-call]
+        iter([SubscribeToWorkflowRunsRequest(workflowRunId=run_id)])
+    )
+
+    action, _ = worker.next_action()
+    worker.complete(action, {"out": 1})
+
+    event = next(results)
+    results.cancel()
+
+    assert event.workflowRunId == run_id
+    assert [(r.stepReadableId, json.loads(r.output)) for r in event.results] == [
+        ("task", {"out": 1})
+    ]
+
+
+def test_a_failed_task_is_retried(engine: FakeEngine, channel: grpc.Channel) -> None:
+    register(channel, "flaky", {"task": []}, retries=1)
+    worker = Worker(channel, ["flaky:task"], slots=10)
+    run_id = trigger(channel, "flaky", {})
+
+    action, _ = worker.next_action()
+    worker.send(action, STEP_EVENT_TYPE_FAILED, "boom")
+
+    retry, _ = worker.next_action()
+    assert retry.retryCount == 1
+
+    worker.complete(retry, {})
+    engine.wait_for_runs([run_id], timeout=5)
+
+    assert statuses(engine, run_id) == {"task": "completed"}
+
+
+def test_a_worker_is_only_assigned_as_many_tasks_as_it_has_slots(
+    engine: FakeEngine, channel: grpc.Channel
+) -> None:
+    register(channel, "single", {"task": []})
+    worker = Worker(channel, ["single:task"], slots=1)
+    first_run, second_run = trigger(channel, "single", {}), trigger(
+        channel, "single", {}
+    )
+
+    first, _ = worker.next_action()
+    assert statuses(engine, second_run) == {"task": "queued"}
+
+    worker.complete(first, {})
+
+    second, _ = worker.next_action()
+    assert (first.workflowRunId, second.workflowRunId) == (first_run, second_run)
+
+
+def test_events_trigger_the_workflows_listening_for_them(
+    engine: FakeEngine, channel: grpc.Channel
+) -> None:
+    register(channel, "on-event", {"task": []}, event_triggers=["user:created"])
+    worker = Worker(channel, ["on-event:task"], slots=10)
+
+    event = EventsServiceStub(channel).Push(  # type: ignore[no-untyped-call]
+        event_protos.PushEventRequest(key="user:created", payload='{"id": 1}')
+    )
+
+    action, payload = worker.next_action()
+
+    assert payload["input"] == {"id": 1}
+    assert engine.events[event.eventId].key == "user:created"
+
+
+def test_logs_are_recorded_per_step_run(
+    engine: FakeEngine, channel: grpc.Channel
+) -> None:
+    EventsServiceStub(channel).PutLog(  # type: ignore[no-untyped-call]
+        event_protos.PutLogRequest(stepRunId="step-run", message="line")
+    )
+
+    assert engine.logs["step-run"] == ["line"]
+
+
+def test_triggering_an_unknown_workflow_fails(
+    engine: FakeEngine, channel: grpc.Channel
+) -> None:
+    with pytest.raises(grpc.RpcError) as e:
+        trigger(channel, "unknown", {})
+
+    assert e.value.code() == grpc.StatusCode.NOT_FOUND
+
+
+def test_generated_runs_are_waited_for(
+    engine: FakeEngine, channel: grpc.Channel
+) -> None:
+    register(channel, "single", {"task": []})
+
+    run_ids = engine.generate("single", count=3).result(timeout=5)
+
+    assert len(set(run_ids)) == 3
+
+    ## nothing runs them without a worker
+    with pytest.raises(TimeoutError):
+        engine.wait_for_runs(run_ids, timeout=0.1)
+
+    worker = Worker(channel, ["single:task"], slots=10)
+
+    for _ in run_ids:
+        action, _ = worker.next_action()
+        worker.complete(action, {})
+
+    engine.wait_for_runs(run_ids, timeout=5)
@@ -0,0 +1,287 @@
+import asyncio
+import multiprocessing
+import signal
+from collections.abc import Iterator
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+from prometheus_client import REGISTRY
+
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    ActionPayload,
+    ActionRecord,
+    ActionType,
+)
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.worker.action_listener_process import (
+    STOP_LOOP,
+    STOP_LOOP_TYPE,
+    ActionEvent,
+    ActionTimings,
+)
+from hatchet_sdk.worker.ipc import (
+    ActionCodec,
+    ActionEventCodec,
+    IPCChannelError,
+    ShmRingChannel,
+)
+from hatchet_sdk.worker.latency import StepStage
+from hatchet_sdk.worker.worker import Worker
+
+
+def action(**overrides: object) -> ActionRecord:
+    fields: dict[str, object] = {
+        "worker_id": "worker",
+        "tenant_id": "tenant",
+        "workflow_run_id": "workflow-run",
+        "get_group_key_run_id": "",
+        "job_id": "job",
+        "job_name": "jöb",
+        "job_run_id": "job-run",
+        "step_id": "step",
+        "step_run_id": "step-run",
+        "action_id": "workflow:step",
+        "action_type": ActionType.START_STEP_RUN,
+        "retry_count": 2,
+        "action_payload": ActionPayload.from_raw(b'{"input": {"n": 1}}'),
+        "raw_additional_metadata": '{"source": "test"}',
+        "child_workflow_index": 3,
+        "child_workflow_key": "child",
+        "parent_workflow_run_id": "parent",
+        "timings": {StepStage.LISTENER: 1.5, StepStage.IPC: 2.25},
+    }
+
+    return ActionRecord(**{**fields, **overrides})  # type: ignore[arg-type]
+
+
+def same_action(received: object, sent: ActionRecord) -> bool:
+    ## the raw payload is passed through as it was sent, rather than decoded and encoded again
+    return (
+        isinstance(received, ActionRecord)
+        and received.action_payload.raw == sent.action_payload.raw
+        and received == sent
+    )
+
+
+def test_action_codec_round_trip() -> None:
+    codec = ActionCodec()
+    sent = action()
+
+    received = codec.decode(memoryview(codec.encode(sent)))
+
+    assert isinstance(received, ActionRecord)
+    assert same_action(received, sent)
+    assert received.raw_additional_metadata == sent.raw_additional_metadata
+    assert received.timings == sent.timings
+
+
+def test_action_codec_round_trips_missing_fields() -> None:
+    codec = ActionCodec()
+    sent = action(
+        child_workflow_index=None, child_workflow_key=None, parent_workflow_run_id=None
+    )
+
+    assert same_action(codec.decode(memoryview(codec.encode(sent))), sent)
+
+
+def test_action_codec_round_trips_timings_and_stop() -> None:
+    codec = ActionCodec()
+    timings = ActionTimings(action_id="workflow:step", timings={StepStage.ACK: 3.0})
+
+    assert codec.decode(memoryview(codec.encode(timings))) == timings
+    assert codec.decode(memoryview(codec.encode(STOP_LOOP))) == STOP_LOOP
+
+
+def test_action_event_codec_round_trip() -> None:
+    codec = ActionEventCodec()
+    sent = ActionEvent(action=action(), type=1, payload=b'{"ok": true}')
+
+    received = codec.decode(memoryview(codec.encode(sent)))
+
+    assert isinstance(received, ActionEvent)
+    assert received.type == sent.type
+    assert received.payload == sent.payload
+    assert received.action.step_run_id == sent.action.step_run_id
+    assert received.action.timings == sent.action.timings
+    ## the action's payload doesn't travel back to the listener
+    assert received.action.action_payload.raw == b"{}"
+
+
+@pytest.fixture
+def channel() -> Iterator[ShmRingChannel[ActionEvent | STOP_LOOP_TYPE]]:
+    ch = ShmRingChannel[ActionEvent | STOP_LOOP_TYPE](
+        multiprocessing.get_context("spawn"), ActionEventCodec(), capacity=1024
+    )
+
+    yield ch
+
+    ch.close()
+
+
+def event(i: int, size: int) -> ActionEvent:
+    return ActionEvent(action=action(step_run_id=str(i)), type=i, payload=b"x" * size)
+
+
+async def test_shm_ring_channel_round_trip(
+    channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    assert channel.empty()
+
+    channel.put(event(1, 10))
+    channel.put(STOP_LOOP)
+
+    assert not channel.empty()
+
+    received = await channel.aio_get()
+
+    assert isinstance(received, ActionEvent)
+    assert received.action.step_run_id == "1"
+    assert received.payload == b"x" * 10
+    assert await channel.aio_get() == STOP_LOOP
+    assert channel.empty()
+
+
+async def test_shm_ring_channel_wraps_around(
+    channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    ## records of varying sizes, so they end at different offsets as the ring wraps around many times
+    for i in range(200):
+        channel.put(event(i, i % 37))
+        channel.put(event(i + 1000, i % 11))
+
+        first, second = await channel.aio_get(), await channel.aio_get()
+
+        assert isinstance(first, ActionEvent) and isinstance(second, ActionEvent)
+        assert (first.type, first.payload) == (i, b"x" * (i % 37))
+        assert (second.type, second.payload) == (i + 1000, b"x" * (i % 11))
+
+    assert channel.empty()
+
+
+async def test_shm_ring_channel_wakes_a_waiting_consumer(
+    channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    get = asyncio.create_task(channel.aio_get())
+
+    ## long enough for the consumer to find the ring empty and wait on its pipe
+    await asyncio.sleep(0.05)
+    assert not get.done()
+
+    channel.put(event(1, 10))
+
+    received = await asyncio.wait_for(get, 1)
+
+    assert isinstance(received, ActionEvent)
+    assert received.type == 1
+
+
+def test_shm_ring_channel_rejects_records_over_half_its_capacity(
+    channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    with pytest.raises(ValueError):
+        channel.put(event(1, 600))
+
+
+def fill(channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE]) -> int:
+    count = 0
+
+    while channel.try_put(event(count, 300)):
+        count += 1
+
+    return count
+
+
+async def test_a_put_on_a_full_ring_times_out(
+    channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    ## registers this process as the consumer
+    channel.put(STOP_LOOP)
+    assert await channel.aio_get() == STOP_LOOP
+
+    assert fill(channel) == 2
+
+    with pytest.raises(IPCChannelError, match="made no room"):
+        channel.put(event(2, 300), timeout=0.05)
+
+    assert channel.warned_full
+
+    await channel.aio_get()
+    channel.put(event(2, 300), timeout=0.05)
+
+    ## so that the next time the ring fills up is warned about too
+    assert not channel.warned_full
+
+
+async def test_aio_put_waits_for_room_without_blocking_the_loop(
+    channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    fill(channel)
+
+    put = asyncio.create_task(channel.aio_put(event(2, 300)))
+    await asyncio.sleep(0.05)
+    assert not put.done()
+
+    ## the loop is free to run the consumer, which makes room
+    first = await channel.aio_get()
+    await asyncio.wait_for(put, 1)
+
+    assert isinstance(first, ActionEvent) and first.type == 0
+    assert [(await channel.aio_get()).type for _ in range(2)] == [1, 2]  # type: ignore[union-attr]
+
+
+def get_one(channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE]) -> None:
+    asyncio.run(channel.aio_get())
+
+
+def test_a_put_fails_once_the_consumer_has_exited(
+    channel: ShmRingChannel[ActionEvent | STOP_LOOP_TYPE],
+) -> None:
+    consumer = multiprocessing.get_context("spawn").Process(
+        target=get_one, args=(channel,)
+    )
+    consumer.start()
+    channel.put(STOP_LOOP)
+    consumer.join(10)
+
+    fill(channel)
+
+    with pytest.raises(IPCChannelError, match="consumer has exited"):
+        channel.put(event(2, 300))
+
+
+def test_a_workers_rings_are_created_on_first_use_and_unlinked_on_close() -> None:
+    handlers = {
+        s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT)
+    }
+
+    worker = Worker(
+        "lazy-rings",
+        ClientConfig(
+            token="token",
+            tenant_id="tenant",
+            host_port="localhost:7077",
+            worker_ipc_transport="shm",
+        ),
+        owned_loop=False,
+        handle_kill=False,
+    )
+
+    try:
+        assert "action_queue" not in worker.__dict__
+
+        ring = worker.action_queue
+        assert isinstance(ring, ShmRingChannel)
+        assert worker.action_queue is ring
+
+        ## the durable rings are never created for a worker without durable tasks
+        worker._close_channels()
+
+        assert "durable_action_queue" not in worker.__dict__
+
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=ring.shm.name)
+    finally:
+        REGISTRY.unregister(worker.worker_status_gauge)
+
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
@@ -0,0 +1,66 @@
+from prometheus_client import REGISTRY
+
+from hatchet_sdk.worker.latency import StepStage, observe_step_latency, stage_durations
+
+
+def test_each_stage_after_the_first_takes_the_time_since_the_one_before() -> None:
+    timings = {StepStage.RECEIVED: 10.0, StepStage.LISTENER: 10.5, StepStage.IPC: 12.0}
+
+    assert stage_durations(timings) == [
+        (StepStage.LISTENER, 10.5, 0.5),
+        (StepStage.IPC, 12.0, 1.5),
+    ]
+
+
+def test_stages_are_ordered_by_stage_rather_than_by_when_they_were_marked() -> None:
+    timings = {StepStage.ACK: 13.0, StepStage.RECEIVED: 10.0, StepStage.USER_CODE: 12.0}
+
+    assert stage_durations(timings) == [
+        (StepStage.USER_CODE, 12.0, 2.0),
+        (StepStage.ACK, 13.0, 1.0),
+    ]
+
+
+def test_an_unmarked_stage_is_counted_in_the_next_marked_one() -> None:
+    timings = {StepStage.RECEIVED: 10.0, StepStage.DISPATCH: 11.0}
+
+    assert stage_durations(timings) == [(StepStage.DISPATCH, 11.0, 1.0)]
+
+
+def test_a_clock_stepping_backwards_doesnt_make_a_stage_negative() -> None:
+    timings = {StepStage.RECEIVED: 10.0, StepStage.LISTENER: 9.0}
+
+    assert stage_durations(timings) == [(StepStage.LISTENER, 9.0, 0)]
+
+
+def test_nothing_is_measured_from_a_single_stage() -> None:
+    assert stage_durations({StepStage.RECEIVED: 10.0}) == []
+
+
+def sample(name: str, **labels: str) -> float | None:
+    return REGISTRY.get_sample_value(name, labels)
+
+
+def test_each_stage_and_the_total_are_observed_per_action() -> None:
+    action_id = "latency-test:observed"
+
+    observe_step_latency(
+        action_id,
+        {StepStage.RECEIVED: 10.0, StepStage.IPC: 10.25, StepStage.ACK: 11.0},
+    )
+
+    stage = "hatchet_step_stage_duration_seconds"
+    assert sample(f"{stage}_sum", action_id=action_id, stage="ipc") == 0.25
+    assert sample(f"{stage}_sum", action_id=action_id, stage="ack") == 0.75
+    assert sample(f"{stage}_count", action_id=action_id, stage="dispatch") is None
+
+    assert sample("hatchet_step_latency_seconds_sum", action_id=action_id) == 1.0
+    assert sample("hatchet_step_latency_seconds_count", action_id=action_id) == 1.0
+
+
+def test_an_action_without_stages_isnt_observed() -> None:
+    action_id = "latency-test:unobserved"
+
+    observe_step_latency(action_id, {StepStage.RECEIVED: 10.0})
+
+    assert sample("hatchet_step_latency_seconds_count", action_id=action_id) is None
@@ -0,0 +1,160 @@
+import asyncio
+import sys
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+import pytest_asyncio
+
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.runnables.contextvars import ctx_step_run_id
+from hatchet_sdk.worker import loop_monitor
+from hatchet_sdk.worker.loop_monitor import LoopLagMonitor
+
+
+class RecordingLogger:
+    def __init__(self) -> None:
+        self.warnings: list[str] = []
+        self.errors: list[str] = []
+
+    def warning(self, message: str) -> None:
+        self.warnings.append(message)
+
+    def exception(self, message: str) -> None:
+        self.errors.append(message)
+
+
+@pytest.fixture
+def log(monkeypatch: pytest.MonkeyPatch) -> RecordingLogger:
+    recording = RecordingLogger()
+    monkeypatch.setattr(loop_monitor, "logger", recording)
+
+    return recording
+
+
+## the step run each task is running, which `find_step_run` looks tasks up in
+step_runs: dict["asyncio.Task[Any]", str] = {}
+
+
+@pytest_asyncio.fixture
+async def monitor() -> AsyncIterator[LoopLagMonitor]:
+    monitor = LoopLagMonitor(asyncio.get_running_loop(), 0.1, step_runs.get)
+    monitor.start()
+
+    ## until the probe has run once, so the monitor knows the loop's thread
+    await asyncio.sleep(0)
+
+    yield monitor
+
+    monitor.stop()
+    step_runs.clear()
+
+
+def blocking_call() -> None:
+    time.sleep(0.5)
+
+
+async def blocks() -> None:
+    blocking_call()
+
+
+async def waits() -> None:
+    await asyncio.sleep(0.6)
+
+
+async def test_a_blocked_loop_is_reported_with_the_blocking_step_run(
+    monitor: LoopLagMonitor, log: RecordingLogger
+) -> None:
+    waiting = asyncio.create_task(waits())
+    blocking = asyncio.create_task(blocks())
+    step_runs[waiting] = "waiting-step-run"
+    step_runs[blocking] = "blocking-step-run"
+
+    await asyncio.gather(waiting, blocking)
+
+    ## the stall is reported once, while it's still going on
+    [warning] = log.warnings
+
+    assert "by step run blocking-step-run" in warning
+    assert "in blocking_call" in warning
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 12), reason="a task's context can be read from 3.12"
+)
+async def test_the_step_run_is_read_from_the_blocking_tasks_context(
+    monitor: LoopLagMonitor, log: RecordingLogger
+) -> None:
+    async def step_run() -> None:
+        ctx_step_run_id.set("context-step-run")
+        blocking_call()
+
+    await asyncio.create_task(step_run())
+
+    [warning] = log.warnings
+
+    assert "by step run context-step-run" in warning
+
+
+async def test_short_stalls_are_not_reported(
+    monitor: LoopLagMonitor, log: RecordingLogger
+) -> None:
+    time.sleep(0.05)
+    await asyncio.sleep(0.3)
+
+    assert log.warnings == []
+
+
+async def test_a_stall_outside_of_a_step_run_is_still_reported(
+    monitor: LoopLagMonitor, log: RecordingLogger
+) -> None:
+    blocking_call()
+    await asyncio.sleep(0)
+
+    [warning] = log.warnings
+
+    assert "by step run" not in warning
+    assert "in blocking_call" in warning
+
+
+async def test_the_watchdog_outlives_a_failed_report(log: RecordingLogger) -> None:
+    finds: list[str] = []
+
+    def find_step_run(task: "asyncio.Task[Any]") -> str | None:
+        finds.append(task.get_name())
+
+        if len(finds) == 1:
+            raise RuntimeError("the runner's tasks changed size during iteration")
+
+        return "step-run"
+
+    async def blocks_twice() -> None:
+        blocking_call()
+        await asyncio.sleep(0.1)
+        blocking_call()
+
+    monitor = LoopLagMonitor(asyncio.get_running_loop(), 0.1, find_step_run)
+    monitor.start()
+    await asyncio.sleep(0)
+
+    try:
+        await asyncio.create_task(blocks_twice())
+    finally:
+        monitor.stop()
+
+    assert log.errors == ["failed to report a blocked event loop"]
+    [warning] = log.warnings
+    assert "by step run step-run" in warning
+
+
+def config() -> ClientConfig:
+    return ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+
+
+def test_the_monitor_is_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert config().worker_loop_lag_threshold is None
+
+    monkeypatch.setenv("HATCHET_CLIENT_WORKER_LOOP_LAG_THRESHOLD", "0.5")
+
+    assert config().worker_loop_lag_threshold == 0.5
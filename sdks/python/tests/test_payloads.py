@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from hatchet_sdk.blob_store import BlobNotFoundError, LocalBlobStore
+from hatchet_sdk.compression import compress_payload, decompressed_payload
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.payloads import aio_encode_payload, encode_payload, resolve_payload
+
+DATA = json.dumps({"rows": [{"id": i, "name": "row"} for i in range(200)]}).encode()
+
+
+def config(**kwargs: object) -> ClientConfig:
+    return ClientConfig(
+        token="token",
+        tenant_id="tenant",
+        host_port="localhost:7077",
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+def test_compressed_payload_round_trip() -> None:
+    compressed = compress_payload(DATA, 1)
+
+    assert len(compressed) < len(DATA)
+    assert decompressed_payload(json.loads(compressed)) == DATA
+    assert resolve_payload(json.loads(compressed), None) == DATA
+
+
+def test_plain_payloads_are_not_resolved() -> None:
+    assert resolve_payload({"hatchet__compressed": "zlib"}, None) is None
+    assert resolve_payload({"hatchet__blob": "key"}, None) is None
+    assert resolve_payload(json.loads(DATA), None) is None
+
+
+def test_payloads_under_the_offload_threshold_stay_inline(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+
+    assert encode_payload(DATA, config(blob_store=store)) == DATA
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_blob_claim_check_round_trip(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+
+    reference = json.loads(
+        encode_payload(DATA, config(blob_store=store, blob_offload_threshold=10))
+    )
+
+    assert reference["size"] == len(DATA)
+    assert resolve_payload(reference, LocalBlobStore(str(tmp_path))) == DATA
+
+
+def test_the_offload_threshold_applies_after_compression(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+    compressed = compress_payload(DATA, 1)
+
+    encoded = encode_payload(
+        DATA,
+        config(
+            blob_store=store,
+            payload_compression_threshold=1,
+            blob_offload_threshold=len(compressed) + 1,
+        ),
+    )
+
+    assert encoded == compressed
+
+
+def test_resolving_a_blob_without_a_store_fails() -> None:
+    with pytest.raises(BlobNotFoundError):
+        resolve_payload({"hatchet__blob": "2024/01/01/key", "size": 1}, None)
+
+
+def test_resolving_a_missing_blob_fails(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+
+    with pytest.raises(BlobNotFoundError):
+        resolve_payload({"hatchet__blob": "2024/01/01/key", "size": 1}, store)
+
+
+async def test_aio_blob_claim_check_round_trip(tmp_path: Path) -> None:
+    store = LocalBlobStore(str(tmp_path))
+
+    reference = json.loads(
+        await aio_encode_payload(
+            DATA, config(blob_store=store, blob_offload_threshold=10)
+        )
+    )
+
+    assert resolve_payload(reference, store) == DATA
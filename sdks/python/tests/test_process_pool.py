@@ -0,0 +1,248 @@
+import asyncio
+import signal
+import threading
+import time
+from collections.abc import AsyncIterator
+from typing import Any, cast
+
+import pytest
+import pytest_asyncio
+from prometheus_client import REGISTRY
+
+from hatchet_sdk import Context, EmptyModel, Hatchet
+from hatchet_sdk.clients.dispatcher.action_listener import (
+    ActionPayload,
+    ActionRecord,
+    ActionType,
+)
+from hatchet_sdk.clients.dispatcher.dispatcher import DispatcherClient
+from hatchet_sdk.clients.events import EventClient
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.runnables.types import ExecutorType
+from hatchet_sdk.worker.runner import process_pool
+from hatchet_sdk.worker.runner.process_pool import (
+    ProcessTaskError,
+    TaskProcessPool,
+    check_process_task,
+)
+from hatchet_sdk.worker.worker import Worker
+
+## the tasks below are imported again by the pool processes, so they're defined at the top level
+hatchet = Hatchet(
+    config=ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+)
+workflow = hatchet.workflow(name="pool")
+
+
+@workflow.task(executor=ExecutorType.PROCESS)
+def bridged(input: EmptyModel, ctx: Context) -> dict[str, int]:
+    ctx.log("line")
+    ctx.put_stream("chunk")
+    ctx.refresh_timeout("10s")
+    ctx.release_slot()
+
+    return {"ok": 1}
+
+
+@workflow.task(executor=ExecutorType.PROCESS)
+def fails(input: EmptyModel, ctx: Context) -> None:
+    raise RuntimeError("boom")
+
+
+@workflow.task(executor=ExecutorType.PROCESS)
+def sleeps(input: EmptyModel, ctx: Context) -> None:
+    ctx.log("started")
+    time.sleep(60)
+
+
+@workflow.task(executor=ExecutorType.PROCESS)
+def spawns(input: EmptyModel, ctx: Context) -> None:
+    ctx.admin_client.run_workflow("child", {})
+
+
+class RecordingClient:
+    """Stands in for the event and dispatcher clients, recording the calls bridged from pool processes."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def buffer_log(self, **kwargs: Any) -> None:
+        self.calls.append(("log", kwargs))
+
+    def buffer_stream(self, **kwargs: Any) -> None:
+        self.calls.append(("stream", kwargs))
+
+    def release_slot(self, step_run_id: str) -> None:
+        self.calls.append(("release_slot", {"step_run_id": step_run_id}))
+
+    def refresh_timeout(self, **kwargs: Any) -> None:
+        self.calls.append(("refresh_timeout", kwargs))
+
+    def upsert_worker_labels(self, **kwargs: Any) -> None:
+        self.calls.append(("upsert_worker_labels", kwargs))
+
+    async def wait_for(self, count: int) -> None:
+        deadline = time.monotonic() + 10
+
+        while len(self.calls) < count and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+
+def action(step_run_id: str) -> ActionRecord:
+    return ActionRecord(
+        worker_id="worker",
+        tenant_id="tenant",
+        workflow_run_id="workflow-run",
+        get_group_key_run_id="",
+        job_id="job",
+        job_name="job",
+        job_run_id="job-run",
+        step_id="step",
+        step_run_id=step_run_id,
+        action_id="workflow:step",
+        action_type=ActionType.START_STEP_RUN,
+        retry_count=0,
+        action_payload=ActionPayload(),
+    )
+
+
+@pytest.fixture
+def client() -> RecordingClient:
+    return RecordingClient()
+
+
+@pytest_asyncio.fixture
+async def pool(client: RecordingClient) -> AsyncIterator[TaskProcessPool]:
+    pool = TaskProcessPool(
+        max_workers=1,
+        dispatcher_client=cast(DispatcherClient, client),
+        event_client=cast(EventClient, client),
+        namespace="",
+        labels={},
+        validator_registry={},
+    )
+
+    yield pool
+
+    pool.shutdown()
+
+
+async def test_a_tasks_context_calls_are_bridged_to_the_parent(
+    pool: TaskProcessPool, client: RecordingClient
+) -> None:
+    output = await pool.run(bridged, action("step-run"), "run")
+
+    assert output == {"ok": 1}
+
+    await client.wait_for(4)
+
+    assert sorted(client.calls, key=lambda call: call[0]) == [
+        ("log", {"message": "line", "step_run_id": "step-run"}),
+        ("refresh_timeout", {"step_run_id": "step-run", "increment_by": "10s"}),
+        ("release_slot", {"step_run_id": "step-run"}),
+        ("stream", {"data": "chunk", "step_run_id": "step-run"}),
+    ]
+
+
+async def test_a_failed_task_raises_with_the_childs_traceback(
+    pool: TaskProcessPool,
+) -> None:
+    with pytest.raises(ProcessTaskError, match="boom") as e:
+        await pool.run(fails, action("step-run"), "run")
+
+    assert "raised in pool process" in str(e.value)
+
+
+async def test_cancelling_a_run_kills_its_process(
+    pool: TaskProcessPool, client: RecordingClient
+) -> None:
+    run = asyncio.create_task(pool.run(sleeps, action("step-run"), "run"))
+
+    await client.wait_for(1)
+    assert client.calls == [("log", {"message": "started", "step_run_id": "step-run"})]
+
+    process = pool.running["run"].process
+    run.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+    process.join(timeout=5)
+    assert not process.is_alive()
+
+    ## the killed process is replaced, so the pool can still run tasks
+    assert await pool.run(bridged, action("other"), "other") == {"ok": 1}
+
+
+async def test_bridged_calls_are_made_in_order_before_the_run_resolves(
+    pool: TaskProcessPool, client: RecordingClient
+) -> None:
+    await pool.run(bridged, action("step-run"), "run")
+
+    assert [name for name, _ in client.calls] == [
+        "log",
+        "stream",
+        "refresh_timeout",
+        "release_slot",
+    ]
+
+
+async def test_clients_a_pool_process_has_no_connection_for_raise(
+    pool: TaskProcessPool,
+) -> None:
+    with pytest.raises(
+        ProcessTaskError,
+        match="the admin client is not available to tasks running in a process pool",
+    ):
+        await pool.run(spawns, action("step-run"), "run")
+
+
+async def test_a_replacement_process_is_started_off_the_loop(
+    pool: TaskProcessPool, client: RecordingClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    spawned_on: list[threading.Thread] = []
+
+    class RecordingPoolProcess(process_pool._PoolProcess):
+        def __init__(self, pool: TaskProcessPool) -> None:
+            spawned_on.append(threading.current_thread())
+            super().__init__(pool)
+
+    monkeypatch.setattr(process_pool, "_PoolProcess", RecordingPoolProcess)
+
+    run = asyncio.create_task(pool.run(sleeps, action("step-run"), "run"))
+    await client.wait_for(1)
+    run.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+    assert await pool.run(bridged, action("other"), "other") == {"ok": 1}
+    assert spawned_on and threading.main_thread() not in spawned_on
+
+
+def test_a_task_a_pool_process_cannot_run_is_rejected_at_registration() -> None:
+    handlers = {
+        s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT)
+    }
+    worker = Worker("pool", hatchet._client.config)
+
+    try:
+        ## `spawns` uses the admin client, which isn't available in a pool process
+        with pytest.raises(ValueError, match="uses the admin client"):
+            worker.register_workflow(workflow)
+    finally:
+        REGISTRY.unregister(worker.worker_status_gauge)
+
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+
+
+def test_a_task_not_defined_at_the_top_level_is_rejected() -> None:
+    local = hatchet.workflow(name="local")
+
+    @local.task(executor=ExecutorType.PROCESS)
+    def nested(input: EmptyModel, ctx: Context) -> None:
+        pass
+
+    with pytest.raises(ValueError, match="top level of a module"):
+        check_process_task(nested)
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from hatchet_sdk.worker.profiler import RunTag, StackSampler
+
+THREAD_RUN = RunTag("thread-step-run", "workflow:thread_task")
+TASK_RUN = RunTag("task-step-run", "workflow:async_task")
+
+
+def sleeps_in_thread(stopped: threading.Event) -> None:
+    stopped.wait(5)
+
+
+def blocks_the_loop() -> None:
+    time.sleep(0.3)
+
+
+async def async_task() -> None:
+    await asyncio.sleep(0.05)
+    blocks_the_loop()
+
+
+## the run each task and thread is running, which `find_run` looks samples up in
+tasks: dict["asyncio.Task[Any]", RunTag] = {}
+threads: dict[int, RunTag] = {}
+
+
+def find_run(thread_id: int, task: "asyncio.Task[Any] | None") -> RunTag | None:
+    return tasks.get(task) if task else threads.get(thread_id)
+
+
+@pytest.fixture
+def sampler() -> Iterator[StackSampler]:
+    yield StackSampler(find_run)
+
+    tasks.clear()
+    threads.clear()
+
+
+async def profile(sampler: StackSampler) -> None:
+    stopped = threading.Event()
+    thread = threading.Thread(
+        target=sleeps_in_thread, args=(stopped,), name="sync-task"
+    )
+    thread.start()
+    assert thread.ident is not None
+    threads[thread.ident] = THREAD_RUN
+
+    task = asyncio.create_task(async_task())
+    tasks[task] = TASK_RUN
+
+    await sampler.aio_profile(0.5)
+
+    await task
+    stopped.set()
+    thread.join()
+
+
+async def test_collapsed_stacks_are_rooted_at_their_runs(
+    sampler: StackSampler,
+) -> None:
+    await profile(sampler)
+
+    lines = sampler.collapsed().splitlines()
+    stacks = {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in lines}
+
+    thread_stacks = [s for s in stacks if s.startswith(str(THREAD_RUN) + ";")]
+    task_stacks = [s for s in stacks if s.startswith(str(TASK_RUN) + ";")]
+
+    assert thread_stacks
+    assert all("sleeps_in_thread (" in s for s in thread_stacks)
+
+    ## the loop is sampled while the task blocks it
+    assert any(
+        s.rsplit(";", 1)[-1].startswith("blocks_the_loop (") for s in task_stacks
+    )
+
+    ## every sample is counted once, in order of how often its stack was sampled
+    assert sum(stacks.values()) == sum(len(s) for s in sampler.samples.values())
+    assert list(stacks.values()) == sorted(stacks.values(), reverse=True)
+
+
+async def test_speedscope_profiles_are_per_thread(sampler: StackSampler) -> None:
+    await profile(sampler)
+
+    output = sampler.speedscope()
+    frames = output["shared"]["frames"]
+    profiles = {profile["name"]: profile for profile in output["profiles"]}
+
+    assert output["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    assert {"sync-task", "MainThread"} <= profiles.keys()
+    assert "hatchet-profiler" not in profiles
+
+    for profile_ in profiles.values():
+        assert profile_["type"] == "sampled"
+        assert len(profile_["weights"]) == len(profile_["samples"])
+        assert all(0 <= i < len(frames) for s in profile_["samples"] for i in s)
+
+    ## runs are the root frames of their samples
+    roots = {frames[s[0]]["name"] for s in profiles["sync-task"]["samples"]}
+    assert roots == {str(THREAD_RUN)}
+
+
+def test_frame_names_cant_split_collapsed_stacks() -> None:
+    sampler = StackSampler(lambda thread_id, task: RunTag("run;id", "action"))
+    sampler.frames = {("file.py", "function", 1): 0}
+    sampler.stacks = {(0,): 0}
+    sampler.samples = {1: [(0.0, RunTag("run;id", "action"), 0)]}
+
+    assert sampler.collapsed() == "step run run:id (action);function (file.py:1) 1\n"
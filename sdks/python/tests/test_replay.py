@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+from typing import Literal
+
+import pytest
+
+from hatchet_sdk import Context, EmptyModel, Hatchet
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.contracts.dispatcher_pb2 import START_STEP_RUN, AssignedAction
+from hatchet_sdk.worker.recording import ActionRecorder, read_recording
+from hatchet_sdk.worker.replay import ActionReplayer
+
+hatchet = Hatchet(
+    config=ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+)
+workflow = hatchet.workflow(name="replayed")
+
+
+@workflow.task()
+def succeeds(input: EmptyModel, ctx: Context) -> dict[str, int]:
+    return {"ok": 1}
+
+
+@workflow.task()
+def fails(input: EmptyModel, ctx: Context) -> None:
+    raise RuntimeError("boom")
+
+
+def assigned(step_run_id: str, action_id: str) -> AssignedAction:
+    return AssignedAction(
+        tenantId="tenant",
+        workflowRunId=f"workflow-run-{step_run_id}",
+        jobId="job",
+        jobName="job",
+        jobRunId="job-run",
+        stepId="step",
+        stepRunId=step_run_id,
+        actionId=action_id,
+        actionType=START_STEP_RUN,
+        actionPayload=json.dumps({"input": {}, "parents": {}}),
+    )
+
+
+@pytest.fixture
+def recording(tmp_path: Path) -> Path:
+    path = tmp_path / "worker.actions"
+    recorder = ActionRecorder(path)
+
+    for i in range(5):
+        recorder.record(assigned(f"succeeds-{i}", "replayed:succeeds"))
+
+    recorder.record(assigned("fails", "replayed:fails"))
+    recorder.record(assigned("unknown", "other:task"))
+    recorder.close()
+
+    return path
+
+
+def test_a_recording_is_read_back_in_order(recording: Path) -> None:
+    actions = list(read_recording(recording))
+    offsets = [offset for offset, _ in actions]
+
+    assert [action.stepRunId for _, action in actions] == [
+        *[f"succeeds-{i}" for i in range(5)],
+        "fails",
+        "unknown",
+    ]
+    assert offsets[0] == 0
+    assert offsets == sorted(offsets)
+
+
+def test_a_record_cut_short_is_left_out(recording: Path) -> None:
+    recording.write_bytes(recording.read_bytes()[:-1])
+
+    assert len(list(read_recording(recording))) == 6
+
+
+def test_a_file_that_isnt_a_recording_is_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "other"
+    path.write_bytes(b"not a recording")
+
+    with pytest.raises(ValueError, match="not a recording"):
+        list(read_recording(path))
+
+
+@pytest.mark.parametrize("target", ["runner", "run_loop"])
+def test_a_recording_is_replayed_into_the_worker(
+    recording: Path, target: Literal["runner", "run_loop"]
+) -> None:
+    result = ActionReplayer(
+        [workflow],
+        recording,
+        speed=None,
+        target=target,
+        config={"worker_single_process": True},
+        drain_timeout=10,
+    ).run()
+
+    assert (result.actions, result.skipped) == (6, 1)
+    assert (result.completed, result.failed, result.unfinished) == (5, 1, 0)
+    assert result.latency.count == 6
+    assert result.to_dict()["stages"]["user_code"]["count"] == 6
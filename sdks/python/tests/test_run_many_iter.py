@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any, cast
+
+import pytest
+
+from hatchet_sdk import Hatchet
+from hatchet_sdk.clients.admin import WorkflowRunTriggerConfig
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.workflow_run import WorkflowRunRef
+
+hatchet = Hatchet(
+    config=ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+)
+workflow = hatchet.workflow(name="many")
+
+
+class FakeRef:
+    def __init__(self, id: str) -> None:
+        self.workflow_run_id = id
+        self.result: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.cancelled = False
+
+    async def aio_result(self) -> dict[str, Any]:
+        try:
+            return await self.result
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+class FakeAdmin:
+    def __init__(self) -> None:
+        self.refs: list[FakeRef] = []
+
+    async def aio_run_workflows(
+        self, workflows: list[WorkflowRunTriggerConfig]
+    ) -> list[WorkflowRunRef]:
+        refs = [FakeRef(str(len(self.refs) + i)) for i in range(len(workflows))]
+        self.refs.extend(refs)
+
+        return cast(list[WorkflowRunRef], refs)
+
+
+@pytest.fixture
+def admin(monkeypatch: pytest.MonkeyPatch) -> FakeAdmin:
+    fake = FakeAdmin()
+    monkeypatch.setattr(hatchet._client, "admin", fake)
+
+    return fake
+
+
+async def test_results_are_yielded_as_runs_complete(admin: FakeAdmin) -> None:
+    configs = [workflow.create_run_workflow_config() for _ in range(3)]
+    runs = workflow.aio_run_many_iter(configs)
+
+    first = asyncio.ensure_future(runs.__anext__())
+    await asyncio.sleep(0)
+
+    admin.refs[2].result.set_result({"n": 2})
+    ref, result = await first
+
+    assert ref.workflow_run_id == "2"
+    assert result == {"n": 2}
+
+    admin.refs[0].result.set_result({"n": 0})
+    admin.refs[1].result.set_result({"n": 1})
+
+    assert sorted([result["n"] async for _, result in runs]) == [0, 1]
+
+
+async def test_closing_early_closes_the_configs_and_cancels_pending_runs(
+    admin: FakeAdmin,
+) -> None:
+    closed = False
+
+    async def configs() -> AsyncIterator[WorkflowRunTriggerConfig]:
+        nonlocal closed
+
+        try:
+            for _ in range(10):
+                yield workflow.create_run_workflow_config()
+        finally:
+            closed = True
+
+    runs = workflow.aio_run_many_iter(configs(), max_in_flight=3)
+
+    first = asyncio.ensure_future(runs.__anext__())
+    await asyncio.sleep(0)
+
+    admin.refs[0].result.set_result({})
+    await first
+
+    await runs.aclose()
+
+    ## the source is closed on the spot, not left suspended until it's collected
+    assert closed
+    assert [ref.cancelled for ref in admin.refs] == [False, True, True]
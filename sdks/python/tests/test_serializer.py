@@ -0,0 +1,147 @@
+import math
+import pickle
+from datetime import datetime
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.serializer import (
+    JSONSerializer,
+    OrjsonSerializer,
+    PydanticCoreSerializer,
+    Serializer,
+    SerializerName,
+    get_serializer,
+)
+
+VALUE = {"str": "ünïcode", "int": 1, "float": 1.5, "list": [None, True], "nested": {}}
+
+
+class Model(BaseModel):
+    at: datetime
+    n: int
+
+
+@pytest.fixture(params=["pydantic", "orjson", "json"])
+def serializer(request: pytest.FixtureRequest) -> Serializer:
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+
+    return get_serializer(request.param)
+
+
+def test_round_trip(serializer: Serializer) -> None:
+    data = serializer.dumps(VALUE)
+
+    assert isinstance(data, bytes)
+    assert serializer.loads(data) == VALUE
+    assert serializer.loads(data.decode()) == VALUE
+
+
+def test_models_are_encoded_as_their_json_dump(serializer: Serializer) -> None:
+    model = Model(at=datetime(2024, 1, 2, 3, 4, 5), n=1)
+
+    assert serializer.loads(serializer.dumps({"model": model})) == {
+        "model": {"at": "2024-01-02T03:04:05", "n": 1}
+    }
+
+
+def test_values_that_cant_be_encoded_are_encoded_as_their_str(
+    serializer: Serializer,
+) -> None:
+    class Unknown:
+        def __str__(self) -> str:
+            return "unknown"
+
+    assert serializer.loads(serializer.dumps({"value": Unknown()})) == {
+        "value": "unknown"
+    }
+
+
+def test_serializers_can_be_pickled(serializer: Serializer) -> None:
+    ## the config, serializer included, is pickled into the action listener process
+    unpickled = pickle.loads(pickle.dumps(serializer))
+
+    assert type(unpickled) is type(serializer)
+    assert unpickled.loads(unpickled.dumps(VALUE)) == VALUE
+
+
+def test_pydantic_encodes_datetimes_as_iso_8601() -> None:
+    data = PydanticCoreSerializer().dumps(
+        {"at": datetime(2024, 1, 2, 3, 4, 5), "nan": math.nan}
+    )
+
+    ## compact, unlike the standard library's output
+    assert data == b'{"at":"2024-01-02T03:04:05","nan":NaN}'
+    assert math.isnan(PydanticCoreSerializer().loads(data)["nan"])
+
+
+def test_json_keeps_the_standard_librarys_output() -> None:
+    data = JSONSerializer().dumps(
+        {"at": datetime(2024, 1, 2, 3, 4, 5), "nan": math.nan}
+    )
+
+    assert data == b'{"at": "2024-01-02 03:04:05", "nan": NaN}'
+
+
+def test_orjson_encodes_non_string_keys() -> None:
+    pytest.importorskip("orjson")
+
+    assert OrjsonSerializer().loads(OrjsonSerializer().dumps({1: "a"})) == {"1": "a"}
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [("pydantic", PydanticCoreSerializer), ("json", JSONSerializer)],
+)
+def test_the_config_takes_a_serializer_by_name(
+    name: SerializerName, expected: type[Serializer]
+) -> None:
+    config = ClientConfig.model_validate(
+        {
+            "token": "token",
+            "tenant_id": "tenant",
+            "host_port": "localhost:7077",
+            "serializer": name,
+        }
+    )
+
+    assert type(config.serializer) is expected
+
+
+def test_the_config_takes_a_serializer_from_the_environment(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("HATCHET_CLIENT_SERIALIZER", "json")
+
+    config = ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+
+    assert isinstance(config.serializer, JSONSerializer)
+
+
+def test_pydantic_is_the_default() -> None:
+    config = ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+
+    assert isinstance(config.serializer, PydanticCoreSerializer)
+
+
+def test_an_unknown_serializer_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        get_serializer("yaml")  # type: ignore[arg-type]
+
+
+def test_a_custom_serializer_is_used_as_is() -> None:
+    class Custom(JSONSerializer):
+        def dumps(self, value: Any) -> bytes:
+            return b"custom"
+
+    config = ClientConfig(
+        token="token",
+        tenant_id="tenant",
+        host_port="localhost:7077",
+        serializer=Custom(),
+    )
+
+    assert config.serializer.dumps({}) == b"custom"
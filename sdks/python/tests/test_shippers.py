@@ -0,0 +1,107 @@
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from hatchet_sdk.clients.log_shipper import LogShipper, get_log_shipper
+from hatchet_sdk.clients.stream_shipper import StreamShipper, get_stream_shipper
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.contracts.events_pb2 import PutLogRequest, PutStreamEventRequest
+
+
+class EventsService:
+    """Stands in for the engine's events service, holding stream events until `released` is set."""
+
+    def __init__(self) -> None:
+        self.released = threading.Event()
+        self.released.set()
+        self.logs: list[tuple[str, str]] = []
+        self.stream_events: list[tuple[str, bytes]] = []
+
+    def PutLog(self, request: PutLogRequest, metadata: Any) -> None:
+        self.logs.append((request.stepRunId, request.message))
+
+    def PutStreamEvent(self, request: PutStreamEventRequest, metadata: Any) -> None:
+        self.released.wait(5)
+        self.stream_events.append((request.stepRunId, request.message))
+
+
+def config() -> ClientConfig:
+    return ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+
+
+@pytest.fixture
+def service() -> EventsService:
+    return EventsService()
+
+
+@pytest.fixture
+def log_shipper(service: EventsService) -> Iterator[LogShipper]:
+    shipper = LogShipper(config(), linger_ms=10_000)
+    shipper.client = service  # type: ignore[assignment]
+
+    yield shipper
+
+    shipper.close(timeout=5)
+
+
+@pytest.fixture
+def stream_shipper(service: EventsService) -> Iterator[StreamShipper]:
+    shipper = StreamShipper(config(), coalesce_ms=10_000, max_buffer_bytes=10)
+    shipper.client = service  # type: ignore[assignment]
+
+    yield shipper
+
+    service.released.set()
+    shipper.close(timeout=5)
+
+
+def test_a_step_runs_lines_are_sent_as_one_log_entry(
+    log_shipper: LogShipper, service: EventsService
+) -> None:
+    log_shipper.send("a", "1")
+    log_shipper.send("b", "1")
+    log_shipper.send("a", "2")
+
+    log_shipper.flush(timeout=5)
+
+    assert sorted(service.logs) == [("a", "1\n2"), ("b", "1")]
+
+
+def test_a_step_runs_chunks_are_sent_as_one_stream_event(
+    stream_shipper: StreamShipper, service: EventsService
+) -> None:
+    stream_shipper.send("a", b"12")
+    stream_shipper.send("a", b"34")
+
+    stream_shipper.flush("a", timeout=5)
+
+    assert service.stream_events == [("a", b"1234")]
+
+
+def test_streaming_waits_for_room_in_a_full_buffer(
+    stream_shipper: StreamShipper, service: EventsService
+) -> None:
+    service.released.clear()
+
+    stream_shipper.send("a", b"x" * 10)
+
+    full = threading.Thread(target=stream_shipper.send, args=("a", b"y"))
+    full.start()
+    full.join(0.1)
+
+    ## held back until the chunks before it have been sent, rather than dropped
+    assert full.is_alive()
+
+    service.released.set()
+    full.join(5)
+    stream_shipper.flush(timeout=5)
+
+    assert b"".join(chunk for _, chunk in service.stream_events) == b"x" * 10 + b"y"
+    assert stream_shipper.dropped == 0
+
+
+def test_each_process_shares_one_shipper_per_engine() -> None:
+    assert get_log_shipper(config()) is get_log_shipper(config())
+    assert get_stream_shipper(config()) is get_stream_shipper(config())
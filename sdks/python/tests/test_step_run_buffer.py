@@ -0,0 +1,165 @@
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from hatchet_sdk.clients.step_run_buffer import Buffered, BufferPolicy, StepRunBuffer
+
+
+class RecordingBuffer(StepRunBuffer[str]):
+    """Records the batches it sends, taking `send_delay` seconds to send each one."""
+
+    item_name = "line"
+
+    def __init__(
+        self,
+        max_buffered: int = 1000,
+        on_full: BufferPolicy = "drop_oldest",
+        max_in_flight: int = 4,
+        linger_ms: float = 10_000,
+        max_batch_bytes: int = 1024,
+        send_delay: float = 0,
+        fail: bool = False,
+    ) -> None:
+        self.batches: list[tuple[str, list[str]]] = []
+        self.lock = threading.Lock()
+        self.send_delay = send_delay
+        self.fail = fail
+
+        super().__init__(
+            max_buffered=max_buffered,
+            on_full=on_full,
+            block_timeout=0.1,
+            max_in_flight=max_in_flight,
+            linger_ms=linger_ms,
+            max_batch_bytes=max_batch_bytes,
+            thread_name="test-buffer",
+        )
+
+    def _size(self, item: str) -> int:
+        return len(item)
+
+    def _send_batch(self, step_run_id: str, items: list[Buffered[str]]) -> None:
+        time.sleep(self.send_delay)
+
+        if self.fail:
+            raise RuntimeError("engine unavailable")
+
+        with self.lock:
+            self.batches.append((step_run_id, [item for item, _ in items]))
+
+    def sent_to(self, step_run_id: str) -> list[str]:
+        return [item for s, items in self.batches if s == step_run_id for item in items]
+
+
+@pytest.fixture
+def buffers() -> Iterator[list[RecordingBuffer]]:
+    created: list[RecordingBuffer] = []
+
+    yield created
+
+    for buffer in created:
+        buffer.close(timeout=5)
+
+
+def test_items_are_only_sent_once_flushed(buffers: list[RecordingBuffer]) -> None:
+    buffer = RecordingBuffer()
+    buffers.append(buffer)
+
+    buffer.send("a", "1")
+    buffer.send("a", "2")
+
+    ## the linger is far longer than the test
+    time.sleep(0.05)
+    assert buffer.batches == []
+
+    buffer.flush("a", timeout=5)
+
+    assert buffer.batches == [("a", ["1", "2"])]
+    assert buffer.sent == 2
+
+
+def test_items_are_sent_once_the_linger_passes(
+    buffers: list[RecordingBuffer],
+) -> None:
+    buffer = RecordingBuffer(linger_ms=10)
+    buffers.append(buffer)
+
+    buffer.send("a", "1")
+
+    deadline = time.monotonic() + 5
+
+    while not buffer.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert buffer.batches == [("a", ["1"])]
+
+
+def test_a_step_runs_items_stay_in_order(buffers: list[RecordingBuffer]) -> None:
+    ## small batches and slow sends, so each step run's items take many batches while others are in flight
+    buffer = RecordingBuffer(max_batch_bytes=8, send_delay=0.001, linger_ms=1)
+    buffers.append(buffer)
+
+    for i in range(200):
+        for step_run_id in ("a", "b", "c"):
+            buffer.send(step_run_id, f"{i:03}")
+
+    buffer.flush(timeout=10)
+
+    for step_run_id in ("a", "b", "c"):
+        assert buffer.sent_to(step_run_id) == [f"{i:03}" for i in range(200)]
+
+    assert all(len(items) <= 2 for _, items in buffer.batches)
+
+
+def test_a_full_buffer_drops_its_oldest_items(buffers: list[RecordingBuffer]) -> None:
+    buffer = RecordingBuffer(max_buffered=3)
+    buffers.append(buffer)
+
+    for i in range(5):
+        buffer.send("a", str(i))
+
+    buffer.flush("a", timeout=5)
+
+    assert buffer.sent_to("a") == ["2", "3", "4"]
+    assert buffer.dropped == 2
+
+
+def test_a_full_blocking_buffer_drops_the_new_item_after_waiting(
+    buffers: list[RecordingBuffer],
+) -> None:
+    buffer = RecordingBuffer(max_buffered=2, on_full="block")
+    buffers.append(buffer)
+
+    for i in range(3):
+        buffer.send("a", str(i))
+
+    buffer.flush("a", timeout=5)
+
+    assert buffer.sent_to("a") == ["0", "1"]
+    assert buffer.dropped == 1
+
+
+def test_flush_returns_once_a_failed_batch_is_given_up_on(
+    buffers: list[RecordingBuffer],
+) -> None:
+    buffer = RecordingBuffer(fail=True)
+    buffers.append(buffer)
+
+    buffer.send("a", "1")
+    buffer.flush("a", timeout=5)
+
+    assert buffer.failed == 1
+    assert buffer.sent == 0
+
+
+def test_items_sent_after_closing_are_dropped() -> None:
+    buffer = RecordingBuffer()
+
+    buffer.send("a", "1")
+    buffer.close(timeout=5)
+    buffer.send("a", "2")
+
+    assert buffer.sent_to("a") == ["1"]
+    assert buffer.dropped == 1
@@ -0,0 +1,160 @@
+import pstats
+import tracemalloc
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.context.context import Context
+from hatchet_sdk.runnables.task import Task
+from hatchet_sdk.runnables.types import ProfileConfig
+from hatchet_sdk.worker.runner.task_profiler import (
+    TaskProfiler,
+    aio_call_profiled,
+    call_profiled,
+)
+
+
+class FakeAction:
+    action_id = "workflow:task"
+
+
+class FakeContext:
+    """Stands in for a run's context, recording what's logged to the run."""
+
+    def __init__(self, step_run_id: str = "step-run") -> None:
+        self.step_run_id = step_run_id
+        self.action = FakeAction()
+        self.logs: list[str] = []
+
+    def log(self, line: str) -> None:
+        self.logs.append(line)
+
+
+def allocates() -> list[bytes]:
+    return [bytes(1000) for _ in range(1000)]
+
+
+class FakeTask:
+    def __init__(self, profile: ProfileConfig | None) -> None:
+        self.profile = profile
+
+    ## returns what it allocated, so it's still allocated when the run's profile ends
+    def call(self, ctx: Context) -> dict[str, list[bytes]]:
+        return {"allocated": allocates()}
+
+    async def aio_call(self, ctx: Context) -> dict[str, list[bytes]]:
+        return {"allocated": allocates()}
+
+
+def task(
+    profile: ProfileConfig | None = ProfileConfig(),
+) -> Task[Any, dict[str, list[bytes]]]:
+    return cast(Task[Any, dict[str, list[bytes]]], FakeTask(profile))
+
+
+def config(**kwargs: Any) -> ClientConfig:
+    return ClientConfig(
+        token="token", tenant_id="tenant", host_port="localhost:7077", **kwargs
+    )
+
+
+def test_a_sampled_runs_profile_is_logged_to_it() -> None:
+    ctx = FakeContext()
+
+    output = call_profiled(task(), cast(Context, ctx), config())
+
+    assert output["allocated"] == allocates()
+
+    [summary] = ctx.logs
+
+    assert summary.startswith("profile of step run step-run (workflow:task)")
+    assert "(allocates)" in summary
+    assert "largest allocations" not in summary
+
+
+def test_traced_runs_report_where_they_allocated() -> None:
+    ctx = FakeContext()
+
+    call_profiled(task(ProfileConfig(trace_memory=True)), cast(Context, ctx), config())
+
+    [summary] = ctx.logs
+    allocations = summary.split("largest allocations:\n")[1]
+
+    ## the largest is the list comprehension in `allocates`, at about 1MB
+    line = allocates.__code__.co_firstlineno + 1
+    assert allocations.splitlines()[0].startswith(f"{__file__}:{line}: size=1")
+
+    ## tracing is stopped again, since it wasn't on before the run
+    assert not tracemalloc.is_tracing()
+
+
+async def test_async_runs_are_profiled() -> None:
+    ctx = FakeContext()
+
+    output = await aio_call_profiled(task(), cast(Context, ctx), config())
+
+    assert output["allocated"] == allocates()
+    assert "(allocates)" in ctx.logs[0]
+
+
+@pytest.mark.parametrize(
+    "profile, worker_rate, profiled",
+    [
+        (ProfileConfig(sample_rate=0), 1, False),
+        (None, 0, False),
+        (None, 1, True),
+        (ProfileConfig(sample_rate=1), 0, True),
+    ],
+)
+def test_the_tasks_sample_rate_overrides_the_workers(
+    profile: ProfileConfig | None, worker_rate: float, profiled: bool
+) -> None:
+    ctx = FakeContext()
+
+    call_profiled(
+        task(profile),
+        cast(Context, ctx),
+        config(worker_profile_sample_rate=worker_rate),
+    )
+
+    assert bool(ctx.logs) == profiled
+
+
+def test_only_one_run_is_profiled_at_a_time() -> None:
+    first = TaskProfiler.sample(task(), config(), cast(Context, FakeContext()))
+    assert first is not None
+
+    with first:
+        assert (
+            TaskProfiler.sample(task(), config(), cast(Context, FakeContext())) is None
+        )
+
+    ## and the next can be, once it's done
+    second = TaskProfiler.sample(task(), config(), cast(Context, FakeContext()))
+    assert second is not None
+
+    with second:
+        pass
+
+
+def test_get_group_key_runs_are_not_profiled() -> None:
+    assert TaskProfiler.sample(task(), config(), cast(Context, FakeContext(""))) is None
+
+
+def test_profiles_are_written_to_the_profile_dir(tmp_path: Path) -> None:
+    ctx = FakeContext()
+
+    call_profiled(task(), cast(Context, ctx), config(worker_profile_dir=str(tmp_path)))
+
+    assert ctx.logs == []
+    assert (
+        (tmp_path / "step-run.txt")
+        .read_text()
+        .startswith("profile of step run step-run")
+    )
+    assert any(
+        name == "allocates"
+        for _, _, name in pstats.Stats(str(tmp_path / "step-run.prof")).stats  # type: ignore[attr-defined]
+    )
@@ -0,0 +1,305 @@
+import asyncio
+from concurrent.futures import Future
+from typing import Any, cast
+
+import grpc
+import pytest
+
+from hatchet_sdk.clients.admin import AdminClient
+from hatchet_sdk.clients.bulk import item_bytes
+from hatchet_sdk.clients.trigger_coalescer import AioTriggerCoalescer, TriggerCoalescer
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.contracts import workflows_pb2 as v0_workflow_protos
+from hatchet_sdk.contracts.workflows_pb2_grpc import WorkflowServiceStub
+
+
+class StatusError(grpc.RpcError):
+    def __init__(self, code: grpc.StatusCode) -> None:
+        self._code = code
+
+    def code(self) -> grpc.StatusCode:
+        return self._code
+
+
+class WorkflowService:
+    """
+    Stands in for the engine's workflow service, failing bulk triggers with `bulk_error` and single
+    ones with `single_error`.
+    """
+
+    def __init__(
+        self,
+        bulk_error: grpc.StatusCode | None = None,
+        single_error: grpc.StatusCode | None = None,
+    ) -> None:
+        self.bulk_error = bulk_error
+        self.single_error = single_error
+        self.bulk_sizes: list[int] = []
+        self.single: list[str] = []
+
+    def BulkTriggerWorkflow(
+        self, request: v0_workflow_protos.BulkTriggerWorkflowRequest, metadata: Any
+    ) -> v0_workflow_protos.BulkTriggerWorkflowResponse:
+        self.bulk_sizes.append(len(request.workflows))
+
+        if self.bulk_error is not None:
+            raise StatusError(self.bulk_error)
+
+        return v0_workflow_protos.BulkTriggerWorkflowResponse(
+            workflow_run_ids=[f"bulk-{w.input}" for w in request.workflows]
+        )
+
+    def TriggerWorkflow(
+        self, request: v0_workflow_protos.TriggerWorkflowRequest, metadata: Any
+    ) -> v0_workflow_protos.TriggerWorkflowResponse:
+        self.single.append(request.input)
+
+        if request.input == "dupe":
+            raise StatusError(grpc.StatusCode.ALREADY_EXISTS)
+
+        if self.single_error is not None:
+            raise StatusError(self.single_error)
+
+        return v0_workflow_protos.TriggerWorkflowResponse(
+            workflow_run_id=f"single-{request.input}"
+        )
+
+
+class AioWorkflowService:
+    """The `WorkflowService` behind an aio stub, recording the loop each call was made on."""
+
+    def __init__(self, service: WorkflowService) -> None:
+        self.service = service
+        self.loops: list[asyncio.AbstractEventLoop] = []
+
+    async def BulkTriggerWorkflow(
+        self, request: v0_workflow_protos.BulkTriggerWorkflowRequest, metadata: Any
+    ) -> v0_workflow_protos.BulkTriggerWorkflowResponse:
+        self.loops.append(asyncio.get_running_loop())
+        return self.service.BulkTriggerWorkflow(request, metadata)
+
+    async def TriggerWorkflow(
+        self, request: v0_workflow_protos.TriggerWorkflowRequest, metadata: Any
+    ) -> v0_workflow_protos.TriggerWorkflowResponse:
+        self.loops.append(asyncio.get_running_loop())
+        return self.service.TriggerWorkflow(request, metadata)
+
+
+def request(input: str) -> v0_workflow_protos.TriggerWorkflowRequest:
+    return v0_workflow_protos.TriggerWorkflowRequest(name="workflow", input=input)
+
+
+def submit_all(
+    service: WorkflowService,
+    inputs: list[str],
+    max_batch: int = 100,
+    max_request_bytes: int = 1024 * 1024,
+) -> list["Future[str]"]:
+    ## submitted well within the linger, so they're batched the same way every time
+    coalescer = TriggerCoalescer(
+        cast(WorkflowServiceStub, service),
+        "token",
+        linger=0.2,
+        max_batch=max_batch,
+        max_request_bytes=max_request_bytes,
+    )
+
+    futures = [coalescer.submit(request(input)) for input in inputs]
+
+    for future in futures:
+        future.exception(timeout=5)
+
+    return futures
+
+
+def test_triggers_made_together_are_sent_as_one_bulk_trigger() -> None:
+    service = WorkflowService()
+
+    futures = submit_all(service, [str(i) for i in range(10)])
+
+    assert service.bulk_sizes == [10]
+    assert [f.result() for f in futures] == [f"bulk-{i}" for i in range(10)]
+
+
+def test_batches_are_split_by_count_and_size() -> None:
+    service = WorkflowService()
+    inputs = [str(i) * 100 for i in range(10)]
+
+    submit_all(
+        service,
+        inputs,
+        max_batch=4,
+        max_request_bytes=3 * item_bytes(request(inputs[0])),
+    )
+
+    ## batches of 4, 4 and 2 requests, of which only 3 fit in a request; a chunk of one is sent on its own
+    assert service.bulk_sizes == [3, 3, 2]
+    assert service.single == [inputs[3], inputs[7]]
+
+
+def test_a_rejected_batch_is_retried_one_by_one() -> None:
+    service = WorkflowService(bulk_error=grpc.StatusCode.ALREADY_EXISTS)
+
+    futures = submit_all(service, ["a", "dupe", "b"])
+
+    assert service.single == ["a", "dupe", "b"]
+    assert futures[0].result() == "single-a"
+    assert futures[2].result() == "single-b"
+
+    with pytest.raises(grpc.RpcError):
+        futures[1].result()
+
+
+@pytest.mark.parametrize(
+    "code", [grpc.StatusCode.DEADLINE_EXCEEDED, grpc.StatusCode.UNAVAILABLE]
+)
+def test_a_batch_that_may_have_been_accepted_is_not_retried(
+    code: grpc.StatusCode,
+) -> None:
+    service = WorkflowService(bulk_error=code)
+
+    futures = submit_all(service, ["a", "b", "c"])
+
+    assert service.single == []
+
+    for future in futures:
+        error = future.exception()
+        assert isinstance(error, StatusError) and error.code() == code
+
+
+async def aio_submit_all(
+    service: WorkflowService,
+    inputs: list[str],
+    max_batch: int = 100,
+    max_request_bytes: int = 1024 * 1024,
+) -> list[str | BaseException]:
+    stub = AioWorkflowService(service)
+    coalescer = AioTriggerCoalescer(
+        lambda: cast(WorkflowServiceStub, stub),
+        "token",
+        linger=0.2,
+        max_batch=max_batch,
+        max_request_bytes=max_request_bytes,
+    )
+
+    results = await asyncio.gather(
+        *(coalescer.submit(request(input)) for input in inputs),
+        return_exceptions=True,
+    )
+
+    ## sent on the loop the requests were made on, with no thread in between
+    assert stub.loops and set(stub.loops) == {asyncio.get_running_loop()}
+
+    return results
+
+
+async def test_aio_triggers_made_together_are_sent_as_one_bulk_trigger() -> None:
+    service = WorkflowService()
+
+    results = await aio_submit_all(service, [str(i) for i in range(10)])
+
+    assert service.bulk_sizes == [10]
+    assert results == [f"bulk-{i}" for i in range(10)]
+
+
+async def test_aio_batches_are_split_by_count_and_size() -> None:
+    service = WorkflowService()
+    inputs = [str(i) * 100 for i in range(10)]
+
+    await aio_submit_all(
+        service,
+        inputs,
+        max_batch=4,
+        max_request_bytes=3 * item_bytes(request(inputs[0])),
+    )
+
+    assert sorted(service.bulk_sizes) == [2, 3, 3]
+    assert sorted(service.single) == [inputs[3], inputs[7]]
+
+
+async def test_aio_a_rejected_batch_is_retried_one_by_one() -> None:
+    service = WorkflowService(bulk_error=grpc.StatusCode.ALREADY_EXISTS)
+
+    results = await aio_submit_all(service, ["a", "dupe", "b"])
+
+    assert service.single == ["a", "dupe", "b"]
+    assert results[0] == "single-a"
+    assert isinstance(results[1], grpc.RpcError)
+    assert results[2] == "single-b"
+
+
+async def test_aio_a_batch_that_may_have_been_accepted_is_not_retried() -> None:
+    service = WorkflowService(bulk_error=grpc.StatusCode.UNAVAILABLE)
+
+    results = await aio_submit_all(service, ["a", "b", "c"])
+
+    assert service.single == []
+    assert all(
+        isinstance(result, StatusError) and result.code() == grpc.StatusCode.UNAVAILABLE
+        for result in results
+    )
+
+
+async def test_aio_a_cancelled_trigger_is_not_sent() -> None:
+    service = WorkflowService()
+    coalescer = AioTriggerCoalescer(
+        lambda: cast(WorkflowServiceStub, AioWorkflowService(service)),
+        "token",
+        linger=0.1,
+        max_batch=100,
+        max_request_bytes=1024 * 1024,
+    )
+
+    cancelled = asyncio.create_task(coalescer.submit(request("a")))
+    sent = asyncio.create_task(coalescer.submit(request("b")))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await sent == "single-b"
+    assert service.single == ["b"]
+
+
+def admin_client(linger_ms: int | None) -> AdminClient:
+    return AdminClient(
+        ClientConfig(
+            token="token",
+            tenant_id="tenant",
+            host_port="localhost:7077",
+            trigger_coalesce_linger_ms=linger_ms,
+        )
+    )
+
+
+def test_run_workflow_raises_trigger_errors() -> None:
+    admin = admin_client(None)
+    admin.v0_client = cast(
+        WorkflowServiceStub, WorkflowService(single_error=grpc.StatusCode.NOT_FOUND)
+    )
+
+    with pytest.raises(grpc.RpcError):
+        admin.run_workflow("workflow", {})
+
+
+def test_aio_run_workflow_coalesces_on_each_running_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    admin = admin_client(100)
+    service = WorkflowService()
+    stub = AioWorkflowService(service)
+    monkeypatch.setattr(admin.aio_conn, "stub", lambda _: stub)
+
+    async def run_all() -> list[str]:
+        refs = await asyncio.gather(
+            *(admin.aio_run_workflow("workflow", {"i": i}) for i in range(5))
+        )
+
+        return [ref.workflow_run_id for ref in refs]
+
+    assert len(asyncio.run(run_all())) == 5
+    first = admin.aio_trigger_coalescer
+
+    ## a coalescer bound to a closed loop is replaced rather than reused
+    assert len(asyncio.run(run_all())) == 5
+    assert admin.aio_trigger_coalescer is not first
+    assert service.bulk_sizes == [5, 5]
+    assert len(set(stub.loops)) == 2
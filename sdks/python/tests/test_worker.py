@@ -0,0 +1,71 @@
+import signal
+from typing import Any, Coroutine
+
+import pytest
+from prometheus_client import REGISTRY
+
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.worker import worker as worker_module
+from hatchet_sdk.worker.worker import Worker
+
+config = ClientConfig(token="token", tenant_id="tenant", host_port="localhost:7077")
+
+
+class FakeProcess:
+    def __init__(self, target: Any, args: tuple[Any, ...]) -> None:
+        self.args = args
+        self.pid = 0
+
+    def start(self) -> None:
+        pass
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.processes: list[FakeProcess] = []
+
+    def Process(self, target: Any, args: tuple[Any, ...]) -> FakeProcess:
+        self.processes.append(FakeProcess(target, args))
+
+        return self.processes[-1]
+
+
+class FakeListener:
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.slots = args[2]
+
+    async def start(self) -> None:
+        pass
+
+
+class FakeLoop:
+    def create_task(self, coro: Coroutine[Any, Any, None]) -> None:
+        coro.close()
+
+
+def test_listeners_get_the_same_slots_in_either_mode(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    handlers = {
+        s: signal.getsignal(s) for s in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT)
+    }
+    worker = Worker("slots", config)
+
+    try:
+        ctx = FakeContext()
+        monkeypatch.setattr(worker, "ctx", ctx)
+        monkeypatch.setattr(worker, "loop", FakeLoop(), raising=False)
+        monkeypatch.setattr(worker_module, "WorkerActionListenerProcess", FakeListener)
+        ## the channels aren't used by the fakes
+        worker.__dict__.update(action_queue=None, event_queue=None)
+
+        worker._start_action_listener(is_durable=False)
+        local = worker._start_local_action_listener(is_durable=False)
+
+        ## neither leaves the listener request's slots unset when the worker's are
+        assert ctx.processes[0].args[2] == local.slots == 100
+    finally:
+        REGISTRY.unregister(worker.worker_status_gauge)
+
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
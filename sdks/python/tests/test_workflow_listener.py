@@ -0,0 +1,198 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from grpc._cython import cygrpc  # type: ignore[attr-defined]
+
+from hatchet_sdk.blob_store import LocalBlobStore
+from hatchet_sdk.clients.admin import DedupeViolationErr
+from hatchet_sdk.clients.workflow_listener import PooledWorkflowRunListener
+from hatchet_sdk.config import ClientConfig
+from hatchet_sdk.contracts.dispatcher_pb2 import (
+    StepRunResult,
+    SubscribeToWorkflowRunsRequest,
+    WorkflowRunEvent,
+)
+
+
+class SubscribeCall:
+    """Stands in for a `SubscribeToWorkflowRuns` stream, recording the run ids subscribed to on it."""
+
+    def __init__(self, requests: AsyncIterator[SubscribeToWorkflowRunsRequest]) -> None:
+        self.subscribed: list[str] = []
+        self.events: asyncio.Queue[Any] = asyncio.Queue()
+        self.reader = asyncio.create_task(self._read_requests(requests))
+
+    async def _read_requests(
+        self, requests: AsyncIterator[SubscribeToWorkflowRunsRequest]
+    ) -> None:
+        async for request in requests:
+            self.subscribed.append(request.workflowRunId)
+
+    async def read(self) -> Any:
+        return await self.events.get()
+
+    def cancel(self) -> None:
+        self.reader.cancel()
+
+
+class DispatcherService:
+    def __init__(self) -> None:
+        self.calls: list[SubscribeCall] = []
+
+    def SubscribeToWorkflowRuns(
+        self, requests: AsyncIterator[SubscribeToWorkflowRunsRequest], metadata: Any
+    ) -> SubscribeCall:
+        self.calls.append(SubscribeCall(requests))
+        return self.calls[-1]
+
+
+def finished(workflow_run_id: str, **results: dict[str, Any] | str) -> WorkflowRunEvent:
+    return WorkflowRunEvent(
+        workflowRunId=workflow_run_id,
+        results=[
+            (
+                StepRunResult(stepReadableId=step, error=result)
+                if isinstance(result, str)
+                else StepRunResult(stepReadableId=step, output=json.dumps(result))
+            )
+            for step, result in results.items()
+        ],
+    )
+
+
+async def settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def listener(tmp_path: Path) -> AsyncIterator[PooledWorkflowRunListener]:
+    config = ClientConfig(
+        token="token",
+        tenant_id="tenant",
+        host_port="localhost:7077",
+        blob_store=LocalBlobStore(str(tmp_path)),
+    )
+    listener = PooledWorkflowRunListener(config)
+    listener.client = DispatcherService()  # type: ignore[assignment]
+
+    yield listener
+
+    for task in (listener.listener_task, listener.interrupter):
+        if task is not None:
+            task.cancel()
+
+    if listener.listener is not None:
+        listener.listener.cancel()
+
+
+def service(listener: PooledWorkflowRunListener) -> DispatcherService:
+    assert isinstance(listener.client, DispatcherService)
+    return listener.client
+
+
+async def test_waiters_of_a_run_share_one_subscription(
+    listener: PooledWorkflowRunListener,
+) -> None:
+    first = asyncio.create_task(listener.result("run"))
+    second = asyncio.create_task(listener.result("run"))
+    await settle()
+
+    [call] = service(listener).calls
+    assert call.subscribed == ["run"]
+    assert len(listener.waiters["run"]) == 2
+
+    call.events.put_nowait(finished("run", step={"out": 1}))
+
+    assert await first == {"step": {"out": 1}}
+    assert await second == {"step": {"out": 1}}
+    assert listener.waiters == {}
+
+
+async def test_a_cancelled_waiter_is_forgotten(
+    listener: PooledWorkflowRunListener,
+) -> None:
+    waiting = asyncio.create_task(listener.result("run"))
+    await settle()
+
+    waiting.cancel()
+    await settle()
+
+    assert listener.waiters == {}
+
+    ## a run nobody waits on any more is subscribed to again by its next waiter
+    again = asyncio.create_task(listener.result("run"))
+    await settle()
+
+    [call] = service(listener).calls
+    assert call.subscribed == ["run", "run"]
+
+    call.events.put_nowait(finished("run", step={"out": 1}))
+
+    assert await again == {"step": {"out": 1}}
+
+
+async def test_a_waiter_of_another_run_keeps_waiting(
+    listener: PooledWorkflowRunListener,
+) -> None:
+    done = asyncio.create_task(listener.result("done"))
+    waiting = asyncio.create_task(listener.result("waiting"))
+    await settle()
+
+    service(listener).calls[0].events.put_nowait(finished("done", step={"out": 1}))
+
+    assert await done == {"step": {"out": 1}}
+    assert not waiting.done()
+    assert list(listener.waiters) == ["waiting"]
+
+    waiting.cancel()
+
+
+async def test_failed_runs_raise(listener: PooledWorkflowRunListener) -> None:
+    failed = asyncio.create_task(listener.result("failed"))
+    dupe = asyncio.create_task(listener.result("dupe"))
+    await settle()
+
+    call = service(listener).calls[0]
+    call.events.put_nowait(finished("failed", step="boom"))
+    call.events.put_nowait(finished("dupe", step="DUPLICATE_WORKFLOW_RUN: exists"))
+
+    with pytest.raises(Exception, match="boom"):
+        await failed
+
+    with pytest.raises(DedupeViolationErr):
+        await dupe
+
+
+async def test_offloaded_outputs_are_read_back(
+    listener: PooledWorkflowRunListener,
+) -> None:
+    assert listener.config.blob_store is not None
+    reference = json.loads(listener.config.blob_store.offload(b'{"out": 1}'))
+
+    result = asyncio.create_task(listener.result("run"))
+    await settle()
+
+    service(listener).calls[0].events.put_nowait(finished("run", step=reference))
+
+    assert await result == {"step": {"out": 1}}
+
+
+async def test_a_closed_stream_fails_its_waiters(
+    listener: PooledWorkflowRunListener,
+) -> None:
+    waiting = asyncio.create_task(listener.result("run"))
+    await settle()
+
+    ## an unexpected end of the stream
+    service(listener).calls[0].events.put_nowait(cygrpc.EOF)
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(waiting, 5)
+
+    assert listener.waiters == {}